@@ -0,0 +1,192 @@
+"""
+Dependências compartilhadas pelas rotas (injeção via FastAPI Depends)
+"""
+from typing import Optional
+import httpx
+from fastapi import Request
+from core.ai.embeddings import EMBEDDING_CACHE_NAMESPACE
+from core.ai.evaluation_cache import EVALUATION_CACHE_NAMESPACE, EvaluationScoreCache
+from core.ai.rate_limiter import ProviderRateController, parse_limit_overrides
+from core.ai.registry import ProviderRegistry
+from core.ai.vector_index import VectorIndexStore
+from core.resume.cache import PDF_ETAG_CACHE_NAMESPACE, RESUME_PARSE_CACHE_NAMESPACE
+from core.resume.downloader import PDFDownloader
+from core.resume.pdf_extractor import PDFTextExtractor
+from shared.cache import ResultCache, create_redis_client
+from shared.config import Config
+
+
+def create_resume_parse_cache(redis_client) -> Optional[ResultCache]:
+    """Cria o cache de parsing de currículos (None se desabilitado)"""
+    if not Config.RESUME_PARSE_CACHE_ENABLED:
+        return None
+    return ResultCache(
+        RESUME_PARSE_CACHE_NAMESPACE,
+        redis_client=redis_client,
+        ttl_seconds=Config.RESUME_PARSE_CACHE_TTL_SECONDS,
+        max_entries=Config.RESUME_PARSE_CACHE_MAX_ENTRIES,
+        local_max_entries=Config.RESUME_PARSE_CACHE_LOCAL_MAX_ENTRIES
+    )
+
+
+def create_evaluation_score_cache(redis_client) -> Optional[EvaluationScoreCache]:
+    """Cria o cache de notas de avaliação (None se desabilitado)"""
+    if not Config.EVALUATION_CACHE_ENABLED:
+        return None
+    cache = ResultCache(
+        EVALUATION_CACHE_NAMESPACE,
+        redis_client=redis_client,
+        ttl_seconds=Config.EVALUATION_CACHE_TTL_SECONDS,
+        max_entries=Config.EVALUATION_CACHE_MAX_ENTRIES,
+        local_max_entries=Config.EVALUATION_CACHE_LOCAL_MAX_ENTRIES
+    )
+    return EvaluationScoreCache(cache)
+
+
+def create_embedding_cache(redis_client) -> Optional[ResultCache]:
+    """Cria o cache de embeddings por conteúdo (None se desabilitado)"""
+    if not Config.EMBEDDING_CACHE_ENABLED:
+        return None
+    return ResultCache(
+        EMBEDDING_CACHE_NAMESPACE,
+        redis_client=redis_client,
+        ttl_seconds=Config.EMBEDDING_CACHE_TTL_SECONDS,
+        max_entries=Config.EMBEDDING_CACHE_MAX_ENTRIES,
+        local_max_entries=Config.EMBEDDING_CACHE_LOCAL_MAX_ENTRIES
+    )
+
+
+def create_pdf_download_client() -> httpx.AsyncClient:
+    """Cria o cliente HTTP compartilhado para download de PDFs"""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(Config.PDF_DOWNLOAD_TIMEOUT_SECONDS),
+        follow_redirects=True
+    )
+
+
+def create_pdf_etag_cache(redis_client) -> ResultCache:
+    """Cria o cache de ETags dos PDFs baixados (URL -> ETag + hash do conteúdo)"""
+    return ResultCache(
+        PDF_ETAG_CACHE_NAMESPACE,
+        redis_client=redis_client,
+        ttl_seconds=Config.PDF_DOWNLOAD_ETAG_TTL_SECONDS,
+        max_entries=Config.RESUME_PARSE_CACHE_MAX_ENTRIES,
+        local_max_entries=Config.RESUME_PARSE_CACHE_LOCAL_MAX_ENTRIES
+    )
+
+
+def create_pdf_extractor() -> PDFTextExtractor:
+    """Cria o extrator compartilhado de texto de PDFs (processos dedicados)"""
+    return PDFTextExtractor(
+        max_workers=Config.PDF_EXTRACTION_WORKERS,
+        timeout_seconds=Config.PDF_EXTRACTION_TIMEOUT_SECONDS,
+        max_pages=Config.PDF_EXTRACTION_MAX_PAGES
+    )
+
+
+def create_rate_controller(redis_client) -> Optional[ProviderRateController]:
+    """Cria o controle de rate limit e concorrência dos providers (None se desabilitado)"""
+    if not Config.PROVIDER_RATE_LIMIT_ENABLED:
+        return None
+    return ProviderRateController(
+        redis_client=redis_client,
+        requests_per_minute=Config.PROVIDER_REQUESTS_PER_MINUTE,
+        tokens_per_minute=Config.PROVIDER_TOKENS_PER_MINUTE,
+        limit_overrides=parse_limit_overrides(Config.PROVIDER_RATE_LIMITS),
+        max_wait_seconds=Config.PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS,
+        concurrency={
+            "initial": Config.ADAPTIVE_CONCURRENCY_INITIAL,
+            "min_limit": Config.ADAPTIVE_CONCURRENCY_MIN,
+            "max_limit": Config.ADAPTIVE_CONCURRENCY_MAX,
+            "latency_target_seconds": Config.ADAPTIVE_CONCURRENCY_LATENCY_TARGET_SECONDS,
+        }
+    )
+
+
+def create_vector_index_store() -> Optional[VectorIndexStore]:
+    """Cria o store de índices vetoriais por vaga (None se desabilitado)"""
+    if not Config.VECTOR_INDEX_ENABLED:
+        return None
+    return VectorIndexStore(
+        Config.VECTOR_INDEX_DIR,
+        backend=Config.VECTOR_INDEX_BACKEND,
+        max_open_indexes=Config.VECTOR_INDEX_MAX_OPEN,
+        hnsw_m=Config.HNSW_M,
+        hnsw_ef_construction=Config.HNSW_EF_CONSTRUCTION,
+        hnsw_ef_search=Config.HNSW_EF_SEARCH
+    )
+
+
+def get_provider_registry(request: Request) -> ProviderRegistry:
+    """
+    Retorna o ProviderRegistry criado no lifespan da aplicação
+
+    Se a aplicação foi iniciada sem lifespan (ex: TestClient fora de um bloco
+    with), o registro é criado sob demanda e guardado no estado da aplicação.
+    """
+    registry = getattr(request.app.state, "provider_registry", None)
+    if registry is None:
+        registry = ProviderRegistry(rate_controller=create_rate_controller(get_redis_client(request)))
+        request.app.state.provider_registry = registry
+    return registry
+
+
+def get_redis_client(request: Request):
+    """Cliente Redis compartilhado (None se REDIS_URL não estiver configurada)"""
+    if not hasattr(request.app.state, "redis"):
+        request.app.state.redis = create_redis_client()
+    return request.app.state.redis
+
+
+def get_resume_parse_cache(request: Request) -> Optional[ResultCache]:
+    """Cache de parsing de currículos criado no lifespan (ou sob demanda)"""
+    if not hasattr(request.app.state, "resume_parse_cache"):
+        request.app.state.resume_parse_cache = create_resume_parse_cache(get_redis_client(request))
+    return request.app.state.resume_parse_cache
+
+
+def get_evaluation_score_cache(request: Request) -> Optional[EvaluationScoreCache]:
+    """Cache de notas de avaliação criado no lifespan (ou sob demanda)"""
+    if not hasattr(request.app.state, "evaluation_score_cache"):
+        request.app.state.evaluation_score_cache = create_evaluation_score_cache(get_redis_client(request))
+    return request.app.state.evaluation_score_cache
+
+
+def get_embedding_cache(request: Request) -> Optional[ResultCache]:
+    """Cache de embeddings criado no lifespan (ou sob demanda)"""
+    if not hasattr(request.app.state, "embedding_cache"):
+        request.app.state.embedding_cache = create_embedding_cache(get_redis_client(request))
+    return request.app.state.embedding_cache
+
+
+def get_pdf_downloader(request: Request) -> PDFDownloader:
+    """Downloader de PDFs sobre o cliente HTTP criado no lifespan (ou sob demanda)"""
+    if not hasattr(request.app.state, "pdf_download_client"):
+        request.app.state.pdf_download_client = create_pdf_download_client()
+    return PDFDownloader(
+        request.app.state.pdf_download_client,
+        max_bytes=Config.PDF_DOWNLOAD_MAX_BYTES,
+        chunk_size=Config.PDF_DOWNLOAD_CHUNK_SIZE,
+        spool_max_bytes=Config.PDF_DOWNLOAD_SPOOL_MAX_BYTES
+    )
+
+
+def get_pdf_etag_cache(request: Request) -> ResultCache:
+    """Cache de ETags dos PDFs criado no lifespan (ou sob demanda)"""
+    if not hasattr(request.app.state, "pdf_etag_cache"):
+        request.app.state.pdf_etag_cache = create_pdf_etag_cache(get_redis_client(request))
+    return request.app.state.pdf_etag_cache
+
+
+def get_pdf_extractor(request: Request) -> PDFTextExtractor:
+    """Pool de extração de texto de PDFs criado no lifespan (ou sob demanda)"""
+    if not hasattr(request.app.state, "pdf_extractor"):
+        request.app.state.pdf_extractor = create_pdf_extractor()
+    return request.app.state.pdf_extractor
+
+
+def get_vector_index_store(request: Request) -> Optional[VectorIndexStore]:
+    """Store de índices vetoriais criado no lifespan (ou sob demanda)"""
+    if not hasattr(request.app.state, "vector_index_store"):
+        request.app.state.vector_index_store = create_vector_index_store()
+    return request.app.state.vector_index_store
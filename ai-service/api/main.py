@@ -1,32 +1,81 @@
 """
 Aplicação FastAPI principal do AI Service
 """
-import logging
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 import os
 
 from shared.config import Config, AIProvider
+from core.ai.registry import ProviderRegistry
+from core.prompts import get_prompt_registry
+from core.ai.usage import operation_for_path, usage_scope, usage_tracker
+from shared.cache import create_redis_client
+from shared.metrics import metrics
+from shared.structured_logging import dropped_records, setup_logging
+from shared.tracing import set_span_error, setup_tracing, shutdown_tracing, start_span, tracing_enabled
+from api.dependencies import (
+    create_resume_parse_cache,
+    create_evaluation_score_cache,
+    create_embedding_cache,
+    create_pdf_download_client,
+    create_pdf_etag_cache,
+    create_pdf_extractor,
+    create_rate_controller,
+    create_vector_index_store
+)
 from api.routes import ai, jobs, candidates, resumes, question_responses
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-    ]
+# Configurar logging (JSON por padrão, escrito no stdout por uma thread à parte)
+setup_logging(
+    level=Config.LOG_LEVEL,
+    json_output=Config.LOG_JSON,
+    queue_size=Config.LOG_QUEUE_SIZE,
+    sampling=Config.LOG_SAMPLING,
 )
 
 # Carrega variáveis de ambiente
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Cria os recursos compartilhados do processo e os libera no encerramento"""
+    # Carrega e compila os templates .prompt antes da primeira requisição
+    get_prompt_registry()
+    setup_tracing()
+    app.state.redis = create_redis_client()
+    app.state.provider_registry = ProviderRegistry(rate_controller=create_rate_controller(app.state.redis))
+    app.state.resume_parse_cache = create_resume_parse_cache(app.state.redis)
+    app.state.evaluation_score_cache = create_evaluation_score_cache(app.state.redis)
+    app.state.embedding_cache = create_embedding_cache(app.state.redis)
+    app.state.pdf_download_client = create_pdf_download_client()
+    app.state.pdf_etag_cache = create_pdf_etag_cache(app.state.redis)
+    app.state.pdf_extractor = create_pdf_extractor()
+    app.state.vector_index_store = create_vector_index_store()
+    usage_tracker.start(app.state.redis)
+    try:
+        yield
+    finally:
+        await usage_tracker.stop()
+        await app.state.provider_registry.aclose()
+        await app.state.pdf_download_client.aclose()
+        app.state.pdf_extractor.shutdown()
+        if app.state.vector_index_store is not None:
+            app.state.vector_index_store.close()
+        if app.state.redis is not None:
+            await app.state.redis.aclose()
+        shutdown_tracing()
+
+
 # Cria a aplicação FastAPI
 app = FastAPI(
     title="AI Service API",
     description="API configurável para diferentes providers de IA",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configuração de CORS
@@ -38,6 +87,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def tracing_middleware(request: Request, call_next):
+    """Abre o span da requisição como filho do traceparent recebido (quando o tracing está ativo)"""
+    if not tracing_enabled():
+        return await call_next(request)
+    with start_span(
+        f"{request.method} {request.url.path}",
+        {"http.method": request.method, "http.target": request.url.path},
+        parent_carrier=request.headers,
+        kind="server",
+    ) as span:
+        response = await call_next(request)
+        span.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 500:
+            set_span_error(span, f"HTTP {response.status_code}")
+        return response
+
+
+@app.middleware("http")
+async def usage_middleware(request: Request, call_next):
+    """Escopo de contabilização de tokens: operação da rota e vaga/empresa (X-Job-Id, X-Company-Id)"""
+    with usage_scope(
+        operation=operation_for_path(request.url.path),
+        job_id=request.headers.get("x-job-id"),
+        company_id=request.headers.get("x-company-id"),
+    ):
+        return await call_next(request)
+
+
 # Inclui as rotas
 app.include_router(ai.router)
 app.include_router(jobs.router)
@@ -66,6 +145,13 @@ async def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Métricas do processo no formato texto do Prometheus"""
+    metrics.set_gauge("ai_service_log_records_dropped", dropped_records())
+    return metrics.render()
+
+
 @app.get("/info")
 async def get_service_info():
     """Informações sobre o serviço"""
@@ -20,6 +20,7 @@ __all__ = [
     'JobQuestion',
     'JobCreationRequest',
     'JobEnhancementRequest',
+    'JobEnhancementResponse',
     'JobQuestionsRequest',
     'JobStagesRequest',
     'JobResponse',
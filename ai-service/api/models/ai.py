@@ -1,13 +1,14 @@
 """
 Modelos Pydantic para requisições de IA
 """
-from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional, Any, Literal
 
 
 class TextGenerationRequest(BaseModel):
     """Modelo para requisição de geração de texto"""
     prompt: str
+    model: Optional[str] = None
 
 
 class ChatRequest(BaseModel):
@@ -21,6 +22,13 @@ class EmbeddingRequest(BaseModel):
     text: str
 
 
+class EmbeddingBatchRequest(BaseModel):
+    """Modelo para requisição de embeddings em lote"""
+    texts: List[str] = Field(..., min_length=1)
+    # base64: float32 little-endian em uma string; binary: corpo application/octet-stream; float: listas JSON
+    encoding: Literal["base64", "binary", "float"] = "base64"
+
+
 class ProviderInfoResponse(BaseModel):
     """Modelo para resposta de informações do provider"""
     provider: str
@@ -45,6 +53,18 @@ class EmbeddingResponse(BaseModel):
     model: Optional[str] = None
 
 
+class EmbeddingBatchResponse(BaseModel):
+    """Modelo para resposta de embeddings em lote (matriz count x dimensions)"""
+    provider: str
+    model: str
+    count: int
+    dimensions: int
+    encoding: str
+    data: Optional[str] = None  # encoding=base64: float32 little-endian, linha a linha
+    embeddings: Optional[List[List[float]]] = None  # encoding=float
+    cache: Dict[str, int] = {}
+
+
 # Modelos para avaliação de candidatos
 class ResumeData(BaseModel):
     """Modelo para dados do currículo"""
@@ -58,6 +78,7 @@ class ResumeData(BaseModel):
 
 class JobData(BaseModel):
     """Modelo para dados da vaga"""
+    id: Optional[str] = None
     title: str
     description: str
     requirements: Optional[List[str]] = None
@@ -78,16 +99,68 @@ class CandidateEvaluationRequest(BaseModel):
     resume: ResumeData
     job: JobData
     question_responses: Optional[List[QuestionResponse]] = None
+    bypass_cache: bool = False  # Força nova avaliação, ignorando notas em cache
+
+
+class BatchCandidate(BaseModel):
+    """Modelo para um candidato dentro de uma avaliação em lote"""
+    candidate_id: str
+    resume: ResumeData
+    question_responses: Optional[List[QuestionResponse]] = None
+
+
+class CandidateBatchEvaluationRequest(BaseModel):
+    """Modelo para requisição de avaliação em lote (uma vaga, N candidatos)"""
+    job: JobData
+    candidates: List[BatchCandidate]
+    max_concurrency: Optional[int] = None
+    bypass_cache: bool = False
 
 
-class CandidateEvaluationResponse(BaseModel):
+class CandidateScores(BaseModel):
+    """Notas de avaliação de candidato (também é o schema da saída JSON do modelo)"""
+    overall_score: int = Field(..., ge=0, le=100)
+    question_responses_score: int = Field(..., ge=0, le=100)
+    education_score: int = Field(..., ge=0, le=100)
+    experience_score: int = Field(..., ge=0, le=100)
+
+
+class CandidateEvaluationResponse(CandidateScores):
     """Modelo para resposta de avaliação de candidato"""
-    overall_score: int  # 0-100
-    question_responses_score: int  # 0-100
-    education_score: int  # 0-100
-    experience_score: int  # 0-100
     provider: str  # Provider de IA usado para avaliação
     model: str  # Modelo de IA usado para avaliação
+    cache: str = "disabled"  # hit, miss, bypass ou disabled
+
+
+# Modelos para pré-ranqueamento por embeddings
+class CandidateIndexRequest(BaseModel):
+    """Modelo para requisição de indexação do currículo de uma candidatura"""
+    job_id: str
+    application_id: str
+    resume: ResumeData
+
+
+class CandidateRankRequest(BaseModel):
+    """Modelo para requisição de pré-ranqueamento dos candidatos de uma vaga"""
+    job_id: str
+    job: JobData
+    limit: Optional[int] = Field(None, ge=1)  # Padrão: VECTOR_INDEX_DEFAULT_LIMIT
+    offset: int = Field(0, ge=0)
+
+
+class RankedCandidate(BaseModel):
+    """Candidatura no pré-ranqueamento"""
+    application_id: str
+    rank: int  # Posição (1 = mais similar)
+    similarity: float  # Similaridade de cosseno entre currículo e vaga
+
+
+class CandidateRankResponse(BaseModel):
+    """Modelo para resposta de pré-ranqueamento"""
+    job_id: str
+    total: int  # Candidaturas indexadas na vaga
+    candidates: List[RankedCandidate]
+    backend: str
 
 
 # Modelos para avaliação de question responses
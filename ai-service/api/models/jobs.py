@@ -2,7 +2,7 @@
 Modelos Pydantic para requisições de jobs
 """
 from datetime import date, datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from pydantic import BaseModel, Field
 
 
@@ -43,6 +43,21 @@ class JobCreationRequest(BaseModel):
 class JobEnhancementRequest(BaseModel):
     """Modelo para requisição de melhoria de job"""
     enhancement_prompt: str
+    job: Dict[str, Any] = {}  # Job atual (title, description, requirements)
+    # Campos melhorados por /jobs/enhance (padrão: os três)
+    fields: List[Literal["title", "description", "requirements"]] = ["title", "description", "requirements"]
+    # Um único prompt com saída JSON em vez de uma chamada por campo (padrão: JOB_ENHANCEMENT_SINGLE_CALL)
+    single_call: Optional[bool] = None
+
+
+class JobEnhancementResponse(BaseModel):
+    """Modelo para resposta da melhoria combinada de job"""
+    job: Dict[str, Any]
+    enhanced_fields: List[str]
+    errors: Dict[str, str] = {}
+    timings_ms: Dict[str, float]
+    mode: str
+    provider: str
 
 
 class JobQuestionsRequest(BaseModel):
@@ -2,7 +2,7 @@
 Modelos Pydantic para o AI Service - Arquivo de exportação
 """
 # Importa modelos de jobs
-from .jobs import Job, JobQuestion, JobCreationRequest, JobEnhancementRequest, JobQuestionsRequest, JobStagesRequest, JobResponse
+from .jobs import Job, JobQuestion, JobCreationRequest, JobEnhancementRequest, JobEnhancementResponse, JobQuestionsRequest, JobStagesRequest, JobResponse
 
 # Importa modelos de resume
 from .resume import Resume, ResumeProfessionalExperience, ResumeAcademicFormation, ResumeAchievement, ResumeLanguage
@@ -14,6 +14,7 @@ __all__ = [
     'JobQuestion', 
     'JobCreationRequest',
     'JobEnhancementRequest',
+    'JobEnhancementResponse',
     'JobQuestionsRequest',
     'JobStagesRequest',
     'JobResponse',
@@ -1,15 +1,22 @@
 """
 Rotas para funcionalidades de IA
 """
+import base64
 import logging
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Dict, Any, Optional
 from shared.config import AIProvider, Config
 from shared.exceptions import AIProviderError, ProviderNotSupportedError, ProviderNotConfiguredError
-from core.ai.service import AIService
+from api.dependencies import get_embedding_cache, get_provider_registry
+from api.sse import sse_response
+from core.ai.embeddings import encode_float32
+from core.ai.registry import ProviderRegistry
+from core.ai.usage import USAGE_DIMENSIONS, current_usage_scope, usage_day, usage_tracker
+from shared.cache import ResultCache
 from api.models.ai import (
-    TextGenerationRequest, ChatRequest, EmbeddingRequest,
-    ProviderInfoResponse, AIResponse, EmbeddingResponse
+    TextGenerationRequest, ChatRequest, EmbeddingRequest, EmbeddingBatchRequest,
+    ProviderInfoResponse, AIResponse, EmbeddingResponse, EmbeddingBatchResponse
 )
 
 # Configurar logger
@@ -19,22 +26,27 @@ router = APIRouter(prefix="/ai", tags=["AI"])
 
 
 @router.post("/generate-text", response_model=AIResponse)
-async def generate_text(request: TextGenerationRequest):
+async def generate_text(
+    request: TextGenerationRequest,
+    registry: ProviderRegistry = Depends(get_provider_registry)
+):
     """Gera texto usando o provider configurado"""
     try:
         provider = AIProvider(Config.DEFAULT_AI_PROVIDER)
         
-        # Cria o serviço com API key opcional
-        ai_service = AIService(provider)
+        # Usa a instância compartilhada do provider
+        ai_service = registry.get_ai_service(provider)
         
         # Gera o texto
-        text = await ai_service.generate_text(
-            request.prompt,
-            model=request.model
-        )
+        kwargs = {"model": request.model} if request.model else {}
+        text = await ai_service.generate_text(request.prompt, **kwargs)
         
+        scope = current_usage_scope()
         return AIResponse(
-            text=text
+            text=text,
+            provider=provider.value,
+            model=request.model,
+            usage=scope.as_dict() if scope is not None else None
         )
         
     except (ProviderNotSupportedError, ProviderNotConfiguredError) as e:
@@ -43,15 +55,41 @@ async def generate_text(request: TextGenerationRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/generate-text/stream")
+async def stream_generated_text(
+    request: TextGenerationRequest,
+    http_request: Request,
+    registry: ProviderRegistry = Depends(get_provider_registry)
+) -> StreamingResponse:
+    """
+    Gera texto e envia os tokens via Server-Sent Events à medida que chegam
+
+    Eventos: `token` ({"text": ...}), `done` ({"provider": ..., "length": ...}) ou
+    `error` ({"detail": ...}). Se o cliente desconectar, a chamada ao provider é cancelada.
+    """
+    try:
+        provider = AIProvider(Config.DEFAULT_AI_PROVIDER)
+        
+        # Usa a instância compartilhada do provider
+        ai_service = registry.get_ai_service(provider)
+    except (ProviderNotSupportedError, ProviderNotConfiguredError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return sse_response(http_request, ai_service.stream_text(request.prompt), {"provider": provider.value})
+
+
 @router.post("/embedding", response_model=EmbeddingResponse)
-async def generate_embedding(request: EmbeddingRequest):
+async def generate_embedding(
+    request: EmbeddingRequest,
+    registry: ProviderRegistry = Depends(get_provider_registry)
+):
     """Gera embedding usando o provider configurado"""
     try:
         provider_name = Config.DEFAULT_AI_PROVIDER
         provider = AIProvider(provider_name)
         
-        # Cria o serviço com API key opcional
-        ai_service = AIService(provider)
+        # Usa a instância compartilhada do provider
+        ai_service = registry.get_ai_service(provider)
         
         # Gera o embedding
         embedding = await ai_service.generate_embedding(request.text)
@@ -67,4 +105,73 @@ async def generate_embedding(request: EmbeddingRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/embeddings/batch", response_model=EmbeddingBatchResponse)
+async def generate_embeddings_batch(
+    request: EmbeddingBatchRequest,
+    registry: ProviderRegistry = Depends(get_provider_registry),
+    cache: Optional[ResultCache] = Depends(get_embedding_cache)
+):
+    """
+    Gera embeddings de vários textos
+
+    Textos repetidos e já presentes no cache não vão ao provider; os demais são
+    enviados em lotes. Com `encoding=base64` (padrão) a matriz vem em `data` como
+    float32 little-endian; com `binary` o corpo da resposta são esses bytes
+    (`X-Embedding-Count` e `X-Embedding-Dimensions` nos headers).
+    """
+    if len(request.texts) > Config.EMBEDDING_BATCH_MAX_TEXTS:
+        raise HTTPException(status_code=400, detail=f"Máximo de {Config.EMBEDDING_BATCH_MAX_TEXTS} textos por requisição")
+    try:
+        provider = AIProvider(Config.EMBEDDING_PROVIDER)
+        
+        # Usa a instância compartilhada do provider
+        ai_service = registry.get_ai_service(provider)
+        
+        embeddings, stats = await ai_service.generate_embeddings_cached(request.texts, cache=cache)
+    except (ProviderNotSupportedError, ProviderNotConfiguredError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AIProviderError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    dimensions = len(embeddings[0]) if embeddings else 0
+    model = ai_service.get_embedding_model()
+    if request.encoding == "binary":
+        return Response(
+            content=encode_float32(embeddings),
+            media_type="application/octet-stream",
+            headers={
+                "X-Embedding-Count": str(len(embeddings)),
+                "X-Embedding-Dimensions": str(dimensions),
+                "X-Embedding-Model": model,
+                "X-Embedding-Cache-Hits": str(stats["cache_hits"]),
+            }
+        )
+    return EmbeddingBatchResponse(
+        provider=provider.value,
+        model=model,
+        count=len(embeddings),
+        dimensions=dimensions,
+        encoding=request.encoding,
+        data=base64.b64encode(encode_float32(embeddings)).decode("ascii") if request.encoding == "base64" else None,
+        embeddings=embeddings if request.encoding == "float" else None,
+        cache=stats
+    )
+
+
+@router.get("/usage/{dimension}/{value}")
+async def get_usage(dimension: str, value: str, day: Optional[str] = None):
+    """
+    Tokens, latência e custo acumulados no dia (AAAAMMDD, padrão hoje em UTC)
 
+    `dimension`: operation (parse, evaluate, question-eval, job-create...), model
+    (`provider:modelo`), job ou company. Os registros chegam ao Redis a cada
+    USAGE_FLUSH_INTERVAL_SECONDS.
+    """
+    if dimension not in USAGE_DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"Dimensão inválida; use uma de {', '.join(USAGE_DIMENSIONS)}")
+    if day is not None and not (len(day) == 8 and day.isdigit()):
+        raise HTTPException(status_code=400, detail="day deve estar no formato AAAAMMDD")
+    if not usage_tracker.enabled or usage_tracker.redis is None:
+        raise HTTPException(status_code=503, detail="Contabilização de uso no Redis desabilitada")
+    day = day or usage_day()
+    return {"dimension": dimension, "value": value, "day": day, "usage": await usage_tracker.get_usage(dimension, value, day)}
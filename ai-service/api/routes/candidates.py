@@ -1,15 +1,33 @@
 """
 Rotas para funcionalidades relacionadas a candidatos
 """
+import json
 import logging
+import math
 import os
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional, AsyncIterator
 from shared.config import AIProvider, Config
-from shared.exceptions import AIProviderError, ProviderNotSupportedError, ProviderNotConfiguredError
-from core.ai.service import AIService
+from shared.exceptions import (
+    AIProviderError,
+    ProviderNotConfiguredError,
+    ProviderNotSupportedError,
+    ProviderRateLimitError,
+    RateLimitExceededError,
+    VectorIndexError
+)
+from api.dependencies import (
+    get_provider_registry, get_evaluation_score_cache, get_vector_index_store, get_embedding_cache
+)
+from core.ai.evaluation_cache import EvaluationScoreCache
+from core.ai.prompt_compaction import build_job_text, build_resume_text
+from core.ai.registry import ProviderRegistry
+from core.ai.vector_index import VectorIndexStore
+from shared.cache import ResultCache
 from api.models.ai import (
-    CandidateEvaluationRequest, CandidateEvaluationResponse
+    CandidateEvaluationRequest, CandidateEvaluationResponse, CandidateBatchEvaluationRequest,
+    CandidateIndexRequest, CandidateRankRequest, CandidateRankResponse, RankedCandidate
 )
 
 # Configurar logger
@@ -18,8 +36,19 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/candidates", tags=["Candidates"])
 
 
+def _get_evaluation_config() -> tuple[str, str]:
+    """Provider e modelo de avaliação (EVALUATION_PROVIDER / EVALUATION_MODEL, com fallback para os padrões)"""
+    provider_name = os.getenv("EVALUATION_PROVIDER", Config.DEFAULT_AI_PROVIDER)
+    model = os.getenv("EVALUATION_MODEL") or Config.DEFAULT_MODEL
+    return provider_name, model
+
+
 @router.post("/evaluate", response_model=CandidateEvaluationResponse)
-async def evaluate_candidate(request: CandidateEvaluationRequest):
+async def evaluate_candidate(
+    request: CandidateEvaluationRequest,
+    registry: ProviderRegistry = Depends(get_provider_registry),
+    score_cache: Optional[EvaluationScoreCache] = Depends(get_evaluation_score_cache)
+):
     """Avalia a aderência de um candidato a uma vaga"""
     logger.info("🎯 Recebida requisição para avaliação de candidato")
     logger.info(f"👤 Candidato: {request.resume.personal_info.get('name', 'N/A') if request.resume.personal_info else 'N/A'}")
@@ -27,14 +56,14 @@ async def evaluate_candidate(request: CandidateEvaluationRequest):
     logger.info(f"❓ Respostas de perguntas: {len(request.question_responses) if request.question_responses else 0}")
     
     try:
-        # Usa variável de ambiente contextualizada para evaluation
-        provider_name = os.getenv("EVALUATION_PROVIDER", Config.DEFAULT_AI_PROVIDER)
+        # Usa variáveis de ambiente contextualizadas para evaluation
+        provider_name, model = _get_evaluation_config()
         provider = AIProvider(provider_name)
         
         logger.info(f"🔧 Usando provider para avaliação: {provider_name}")
         
-        # Cria o serviço com API key opcional
-        ai_service = AIService(provider)
+        # Usa a instância compartilhada do provider
+        ai_service = registry.get_routed_ai_service(provider, model)
         
         # Converte os dados para dict
         resume_dict = request.resume.model_dump()
@@ -43,39 +72,36 @@ async def evaluate_candidate(request: CandidateEvaluationRequest):
         if request.question_responses:
             question_responses = [qr.model_dump() for qr in request.question_responses]
         
-        # Usa variável de ambiente contextualizada para evaluation, com fallback para DEFAULT_MODEL
-        evaluation_model = os.getenv("EVALUATION_MODEL")
-        if evaluation_model:
-            model = evaluation_model
-        else:
-            model = Config.DEFAULT_MODEL
-        
         logger.info(f"🤖 Usando modelo para avaliação: {model}")
         
         # Avalia o candidato
         logger.info("🚀 Iniciando avaliação com AI Service...")
-        scores = await ai_service.evaluate_candidate(
+        scores, cache_status, route = await ai_service.evaluate_candidate_cached(
             resume_data=resume_dict,
             job_data=job_dict,
             question_responses=question_responses,
+            score_cache=score_cache,
+            bypass_cache=request.bypass_cache,
             model=model
         )
         
-        logger.info("✅ Avaliação concluída com sucesso")
+        logger.info(f"✅ Avaliação concluída com sucesso (cache: {cache_status})")
         logger.info(f"📊 Scores finais:")
         logger.info(f"   - Geral: {scores['overall_score']}/100")
         logger.info(f"   - Respostas: {scores['question_responses_score']}/100")
         logger.info(f"   - Formação: {scores['education_score']}/100")
         logger.info(f"   - Experiência: {scores['experience_score']}/100")
-        logger.info(f"🔧 Configuração usada: {provider_name} + {model}")
+        logger.info(f"🔧 Configuração usada: {route.provider.value} + {route.model}")
         
+        # Provider e modelo de quem respondeu (com hedge/failover pode não ser a rota principal)
         response = CandidateEvaluationResponse(
             overall_score=scores['overall_score'],
             question_responses_score=scores['question_responses_score'],
             education_score=scores['education_score'],
             experience_score=scores['experience_score'],
-            provider=provider_name,
-            model=model
+            provider=route.provider.value,
+            model=route.model,
+            cache=cache_status
         )
         
         logger.info("📤 Enviando resposta para o cliente")
@@ -84,9 +110,169 @@ async def evaluate_candidate(request: CandidateEvaluationRequest):
     except (ProviderNotSupportedError, ProviderNotConfiguredError) as e:
         logger.error(f"❌ Erro de configuração: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
+    except (RateLimitExceededError, ProviderRateLimitError) as e:
+        logger.warning(f"🚦 Rate limit do provider de IA: {str(e)}")
+        headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after else None
+        raise HTTPException(status_code=429, detail=str(e), headers=headers)
     except AIProviderError as e:
         logger.error(f"❌ Erro do provider de IA: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Erro inesperado: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erro interno do servidor: {str(e)}")
+
+
+@router.post("/evaluate-batch")
+async def evaluate_candidates_batch(
+    request: CandidateBatchEvaluationRequest,
+    registry: ProviderRegistry = Depends(get_provider_registry),
+    score_cache: Optional[EvaluationScoreCache] = Depends(get_evaluation_score_cache)
+):
+    """
+    Avalia N candidatos para uma mesma vaga
+
+    A resposta é um stream NDJSON: uma linha por candidato, na ordem em que as
+    avaliações terminam ({"type": "result", "status": "ok" | "error", ...}),
+    seguida de uma linha final {"type": "summary", ...} com os totais.
+    """
+    logger.info(f"🎯 Recebida avaliação em lote: {len(request.candidates)} candidatos para a vaga {request.job.title}")
+
+    if not request.candidates:
+        raise HTTPException(status_code=400, detail="A lista de candidatos não pode ser vazia")
+    if len(request.candidates) > Config.BATCH_EVALUATION_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo de {Config.BATCH_EVALUATION_MAX_ITEMS} candidatos por lote"
+        )
+
+    provider_name, model = _get_evaluation_config()
+    try:
+        ai_service = registry.get_routed_ai_service(AIProvider(provider_name), model)
+    except (ProviderNotSupportedError, ProviderNotConfiguredError) as e:
+        logger.error(f"❌ Erro de configuração: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ Erro inesperado: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro interno do servidor: {str(e)}")
+
+    max_concurrency = min(
+        request.max_concurrency or Config.BATCH_EVALUATION_MAX_CONCURRENCY,
+        Config.BATCH_EVALUATION_MAX_CONCURRENCY
+    )
+    job_dict = request.job.model_dump()
+    candidates = [candidate.model_dump() for candidate in request.candidates]
+
+    async def stream_results() -> AsyncIterator[str]:
+        succeeded = 0
+        failed = 0
+        async for result in ai_service.evaluate_candidates_batch(
+            job_data=job_dict,
+            candidates=candidates,
+            max_concurrency=max_concurrency,
+            score_cache=score_cache,
+            bypass_cache=request.bypass_cache,
+            model=model
+        ):
+            if result["status"] == "ok":
+                succeeded += 1
+            else:
+                failed += 1
+            yield json.dumps({"type": "result", **result}, ensure_ascii=False) + "\n"
+
+        logger.info(f"✅ Avaliação em lote concluída: {succeeded} sucessos, {failed} falhas")
+        yield json.dumps({
+            "type": "summary",
+            "total": len(candidates),
+            "succeeded": succeeded,
+            "failed": failed,
+            "provider": provider_name,
+            "model": model
+        }) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+def _require_vector_index(store: Optional[VectorIndexStore]) -> VectorIndexStore:
+    if store is None:
+        raise HTTPException(status_code=503, detail="Índice vetorial desabilitado (VECTOR_INDEX_ENABLED=false)")
+    return store
+
+
+async def _embed(registry: ProviderRegistry, text: str, cache: Optional[ResultCache]) -> List[float]:
+    """Embedding pelo provider de embeddings (EMBEDDING_PROVIDER), reaproveitando o cache por conteúdo"""
+    try:
+        ai_service = registry.get_ai_service(AIProvider(Config.EMBEDDING_PROVIDER))
+        embeddings, _ = await ai_service.generate_embeddings_cached([text], cache=cache)
+        return embeddings[0]
+    except (ValueError, ProviderNotSupportedError, ProviderNotConfiguredError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AIProviderError as e:
+        logger.error(f"❌ Erro ao gerar embedding: {str(e)}")
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@router.post("/index")
+async def index_candidate(
+    request: CandidateIndexRequest,
+    registry: ProviderRegistry = Depends(get_provider_registry),
+    store: Optional[VectorIndexStore] = Depends(get_vector_index_store),
+    embedding_cache: Optional[ResultCache] = Depends(get_embedding_cache)
+):
+    """
+    Indexa (ou reindexa) o embedding do currículo de uma candidatura no índice da vaga
+
+    Chamar à medida que as candidaturas chegam; o ranking em /candidates/rank
+    passa a considerar a candidatura imediatamente.
+    """
+    store = _require_vector_index(store)
+    embedding = await _embed(registry, build_resume_text(request.resume.model_dump()), embedding_cache)
+    try:
+        total = await store.add(request.job_id, request.application_id, embedding)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except VectorIndexError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(f"🧭 Candidatura {request.application_id} indexada na vaga {request.job_id} ({total} no índice)")
+    return {"job_id": request.job_id, "application_id": request.application_id, "total": total}
+
+
+@router.post("/rank", response_model=CandidateRankResponse)
+async def rank_candidates(
+    request: CandidateRankRequest,
+    registry: ProviderRegistry = Depends(get_provider_registry),
+    store: Optional[VectorIndexStore] = Depends(get_vector_index_store),
+    embedding_cache: Optional[ResultCache] = Depends(get_embedding_cache)
+):
+    """
+    Pré-ranqueia as candidaturas indexadas pela similaridade entre currículo e vaga
+
+    Use o topo (limit) para avaliar primeiro com o LLM e pagine (offset) o restante sob demanda.
+    """
+    store = _require_vector_index(store)
+    limit = request.limit or Config.VECTOR_INDEX_DEFAULT_LIMIT
+    embedding = await _embed(registry, build_job_text(request.job.model_dump()), embedding_cache)
+    try:
+        results, total = await store.search(request.job_id, embedding, request.offset + limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except VectorIndexError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    candidates = [
+        RankedCandidate(application_id=application_id, rank=position + 1, similarity=similarity)
+        for position, (application_id, similarity) in enumerate(results)
+    ][request.offset:]
+    return CandidateRankResponse(job_id=request.job_id, total=total, candidates=candidates, backend=store.backend)
+
+
+@router.delete("/index/jobs/{job_id}")
+async def delete_job_index(
+    job_id: str,
+    store: Optional[VectorIndexStore] = Depends(get_vector_index_store)
+):
+    """Remove o índice vetorial de uma vaga"""
+    store = _require_vector_index(store)
+    try:
+        deleted = await store.delete(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"job_id": job_id, "deleted": deleted}
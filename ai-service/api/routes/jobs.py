@@ -1,15 +1,18 @@
 """
 Rotas para funcionalidades de jobs
 """
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, Optional, Literal
 from shared.config import AIProvider, Config
-from shared.exceptions import JobCreationError, AIProviderError
-from core.ai.service import AIService
+from shared.exceptions import JobCreationError, AIProviderError, ProviderNotSupportedError, ProviderNotConfiguredError
+from api.dependencies import get_provider_registry
+from api.sse import sse_response
+from core.ai.registry import ProviderRegistry
 from core.jobs.creator import JobCreator
 from core.jobs.enhancer import JobEnhancer
 from api.models.jobs import (
-    JobCreationRequest, JobEnhancementRequest, JobQuestionsRequest,
+    JobCreationRequest, JobEnhancementRequest, JobEnhancementResponse, JobQuestionsRequest,
     JobStagesRequest, JobResponse
 )
 
@@ -17,15 +20,18 @@ router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
 
 @router.post("/create-from-prompt", response_model=JobResponse)
-async def create_job_from_prompt(request: JobCreationRequest):
+async def create_job_from_prompt(
+    request: JobCreationRequest,
+    registry: ProviderRegistry = Depends(get_provider_registry)
+):
     """Cria um job a partir de um prompt usando IA"""
     try:
         print(f"Received request: {request}")
         provider_name = Config.DEFAULT_AI_PROVIDER
         provider = AIProvider(provider_name)
         
-        # Cria o serviço de IA
-        ai_service = AIService(provider)
+        # Usa a instância compartilhada do provider
+        ai_service = registry.get_ai_service(provider)
         
         # Cria o serviço de jobs
         job_creator = JobCreator(ai_service)
@@ -59,3 +65,64 @@ async def create_job_from_prompt(request: JobCreationRequest):
         raise HTTPException(status_code=400, detail=str(e))
     except AIProviderError as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/enhance", response_model=JobEnhancementResponse)
+async def enhance_job(
+    request: JobEnhancementRequest,
+    registry: ProviderRegistry = Depends(get_provider_registry)
+):
+    """
+    Melhora título, descrição e requisitos de um job em uma única requisição
+
+    As melhorias rodam em paralelo (ou em um único prompt JSON com single_call).
+    Campos que falharem mantêm o valor original e aparecem em `errors`.
+    """
+    try:
+        provider_name = Config.DEFAULT_AI_PROVIDER
+        
+        # Usa a instância compartilhada do provider
+        ai_service = registry.get_ai_service(AIProvider(provider_name))
+        
+        single_call = Config.JOB_ENHANCEMENT_SINGLE_CALL if request.single_call is None else request.single_call
+        result = await JobEnhancer(ai_service).enhance_job(
+            request.job,
+            request.enhancement_prompt,
+            fields=request.fields,
+            single_call=single_call
+        )
+        
+        return JobEnhancementResponse(**result, provider=provider_name)
+        
+    except (ProviderNotSupportedError, ProviderNotConfiguredError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobCreationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AIProviderError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/enhance-{field}/stream")
+async def stream_job_enhancement(
+    field: Literal["description", "requirements", "title"],
+    request: JobEnhancementRequest,
+    http_request: Request,
+    registry: ProviderRegistry = Depends(get_provider_registry)
+) -> StreamingResponse:
+    """
+    Melhora a descrição, os requisitos ou o título de um job, enviando o texto
+    via Server-Sent Events à medida que é gerado
+
+    Eventos: `token` ({"text": ...}), `done` ({"field": ..., "provider": ..., "length": ...})
+    ou `error` ({"detail": ...}). Se o cliente desconectar, a chamada ao provider é cancelada.
+    """
+    try:
+        provider_name = Config.DEFAULT_AI_PROVIDER
+        
+        # Usa a instância compartilhada do provider
+        ai_service = registry.get_ai_service(AIProvider(provider_name))
+        chunks = JobEnhancer(ai_service).stream_enhancement(field, request.job, request.enhancement_prompt)
+    except (ProviderNotSupportedError, ProviderNotConfiguredError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return sse_response(http_request, chunks, {"field": field, "provider": provider_name})
@@ -4,11 +4,12 @@ Rotas para funcionalidades relacionadas a question responses
 import logging
 import os
 from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Any
 from shared.config import AIProvider, Config
 from shared.exceptions import QuestionEvaluationError
-from core.ai.service import AIService
+from api.dependencies import get_provider_registry
+from core.ai.registry import ProviderRegistry
 from core.question_evaluator.question_evaluator import QuestionEvaluator
 from api.models.ai import (
     QuestionEvaluationRequest, 
@@ -22,7 +23,10 @@ router = APIRouter(prefix="/question-responses", tags=["Question Responses"])
 
 
 @router.post("/evaluate", response_model=QuestionEvaluationResponse)
-async def evaluate_question_responses(request: QuestionEvaluationRequest):
+async def evaluate_question_responses(
+    request: QuestionEvaluationRequest,
+    registry: ProviderRegistry = Depends(get_provider_registry)
+):
     """Avalia as respostas de perguntas usando IA"""
     logger.info("🎯 Recebida requisição para avaliação de question responses")
     logger.info(f"💼 Vaga: {request.job_data.title}")
@@ -35,7 +39,7 @@ async def evaluate_question_responses(request: QuestionEvaluationRequest):
 
         logger.info(f"🔧 Usando provider para avaliação: {provider_name}")
 
-        ai_service = AIService(provider)
+        ai_service = registry.get_ai_service(provider)
 
         # Usa variável de ambiente contextualizada para evaluation, com fallback para DEFAULT_MODEL
         evaluation_model = os.getenv("EVALUATION_MODEL")
@@ -2,10 +2,8 @@
 Rotas para funcionalidades relacionadas a processamento de currículos
 """
 import logging
-import tempfile
-import requests
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict, Any, Optional
 from pydantic import BaseModel, HttpUrl
 import os
 import sys
@@ -13,10 +11,21 @@ import sys
 # Adiciona o diretório pai ao path para importar os módulos
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from core.ai.service import AIService
+from api.dependencies import (
+    get_provider_registry,
+    get_resume_parse_cache,
+    get_pdf_downloader,
+    get_pdf_etag_cache,
+    get_pdf_extractor
+)
+from core.ai.registry import ProviderRegistry
+from core.resume.cache import build_pdf_etag_cache_key
+from core.resume.downloader import DownloadedPDF, PDFDownloader
+from core.resume.pdf_extractor import PDFTextExtractor
 from core.resume.parser import ResumeParser
+from shared.cache import ResultCache
 from shared.config import AIProvider, Config
-from shared.exceptions import ResumeParsingError
+from shared.exceptions import PDFDownloadError, ResumeParsingError
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -36,127 +45,84 @@ class ResumeParseResponse(BaseModel):
     data: Dict[str, Any] = None
     error: str = None
     application_id: str
-
-
-def download_pdf_from_url(url: str) -> str:
-    """
-    Faz download de um PDF de uma URL e retorna o caminho do arquivo temporário
-    
-    Args:
-        url: URL do PDF para download
-        
-    Returns:
-        str: Caminho do arquivo temporário
-        
-    Raises:
-        HTTPException: Se houver erro no download
-    """
-    try:
-        logger.info(f"📥 Iniciando download do PDF: {url}")
-        
-        # Faz a requisição HTTP
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        # Verifica se o conteúdo é um PDF
-        content_type = response.headers.get('content-type', '').lower()
-        if 'pdf' not in content_type and not str(url).lower().endswith('.pdf'):
-            logger.warning(f"⚠️ Content-Type não é PDF - Content-Type: {content_type}")
-        
-        # Cria arquivo temporário
-        temp_file = tempfile.NamedTemporaryFile(
-            delete=False, 
-            suffix='.pdf'
-        )
-        temp_file.write(response.content)
-        temp_file.close()
-        
-        logger.info(f"✅ PDF baixado com sucesso: {temp_file.name}")
-        return temp_file.name
-        
-    except requests.exceptions.RequestException as e:
-        logger.error(f"❌ Erro no download: {str(e)}")
-        raise HTTPException(status_code=400, detail=f"Erro no download do PDF: {str(e)}")
-    except Exception as e:
-        logger.error(f"❌ Erro inesperado no download: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Erro interno no download: {str(e)}")
-
-
-def validate_pdf_file(file_path: str) -> bool:
-    """
-    Valida se o arquivo é um PDF válido
-    
-    Args:
-        file_path: Caminho do arquivo
-        
-    Returns:
-        bool: True se for um PDF válido
-    """
-    try:
-        if not os.path.exists(file_path):
-            return False
-            
-        # Verifica se o arquivo não está vazio
-        if os.path.getsize(file_path) == 0:
-            return False
-            
-        # Tenta ler o cabeçalho do PDF
-        with open(file_path, 'rb') as f:
-            header = f.read(4)
-            if header != b'%PDF':
-                return False
-                
-        return True
-        
-    except Exception as e:
-        logger.error(f"❌ Erro na validação do PDF: {str(e)}")
-        return False
+    cache: str = "disabled"  # hit, miss ou disabled
 
 
 @router.post("/parse-from-url", response_model=ResumeParseResponse)
-async def parse_resume_from_url(request: ResumeParseRequest):
+async def parse_resume_from_url(
+    request: ResumeParseRequest,
+    registry: ProviderRegistry = Depends(get_provider_registry),
+    cache: Optional[ResultCache] = Depends(get_resume_parse_cache),
+    downloader: PDFDownloader = Depends(get_pdf_downloader),
+    etag_cache: ResultCache = Depends(get_pdf_etag_cache),
+    extractor: PDFTextExtractor = Depends(get_pdf_extractor)
+):
     """
     Faz download de um PDF de uma URL e processa o currículo usando IA
     
+    O PDF é baixado em streaming para um arquivo temporário. Se o mesmo
+    arquivo já foi baixado antes, a requisição é condicional (If-None-Match)
+    e, quando o storage responde 304, o parsing em cache é reaproveitado.
+    
     Args:
         request: Requisição com URL do PDF e application_id
         
     Returns:
         ResumeParseResponse: Dados do currículo processado
     """
-    temp_file_path = None
+    download: Optional[DownloadedPDF] = None
     
     try:
         logger.info(f"🎯 Recebida requisição para parsing de currículo")
         logger.info(f"📄 URL: {request.url}")
         logger.info(f"🆔 Application ID: {request.application_id}")
         
-        # Faz download do PDF
-        temp_file_path = download_pdf_from_url(str(request.url))
-        
-        # Valida se é um PDF válido
-        if not validate_pdf_file(temp_file_path):
-            raise HTTPException(status_code=400, detail="Arquivo não é um PDF válido")
-        
         # Configura o provider de IA
         provider_name = Config.DEFAULT_AI_PROVIDER
         provider = AIProvider(provider_name)
         
         logger.info(f"🔧 Usando provider: {provider_name}")
         
-        # Inicializa o serviço de IA
-        ai_service = AIService(provider)
-        resume_parser = ResumeParser(ai_service)
-        
-        logger.info("🚀 Iniciando parsing com IA...")
-        
-        # Processa o currículo
-        resume_data = await resume_parser.parse_resume_from_pdf(
-            temp_file_path,
-            request.application_id
+        # Usa a instância compartilhada do provider
+        ai_service = registry.get_ai_service(provider)
+        resume_parser = ResumeParser(
+            ai_service,
+            cache=cache,
+            extractor=extractor,
+            sectioned=Config.RESUME_SECTIONED_PARSING_ENABLED,
+            sectioned_min_chars=Config.RESUME_SECTIONED_PARSING_MIN_CHARS
         )
         
-        logger.info("✅ Currículo processado com sucesso")
+        url = str(request.url)
+        etag_key = build_pdf_etag_cache_key(url)
+        known_version = await etag_cache.get(etag_key) if cache is not None else None
+        
+        # Faz download do PDF (condicional se já conhecemos a versão do arquivo)
+        download = await downloader.download(url, etag=(known_version or {}).get("etag"))
+        resume_data = None
+        cache_checked = False
+        if download.not_modified:
+            resume_data = await resume_parser.get_cached_resume(known_version["sha256"], request.application_id)
+            if resume_data is None:
+                # O arquivo não mudou, mas o parsing saiu do cache: baixa de novo
+                download = await downloader.download(url)
+                cache_checked = True
+        
+        if resume_data is None:
+            if download.etag and cache is not None:
+                await etag_cache.set(etag_key, {"etag": download.etag, "sha256": download.sha256})
+            
+            logger.info("🚀 Iniciando parsing com IA...")
+            
+            # Processa o currículo
+            resume_data = await resume_parser.parse_resume_from_file(
+                download.file,
+                request.application_id,
+                pdf_sha256=download.sha256,
+                check_cache=not cache_checked
+            )
+        
+        logger.info(f"✅ Currículo processado com sucesso (cache: {resume_parser.cache_status})")
         logger.info(f"📊 Dados extraídos:")
         logger.info(f"   - Resumo: {len(resume_data.get('summary', '') or '')} caracteres")
         logger.info(f"   - Experiências: {len(resume_data.get('professionalExperiences', []))}")
@@ -167,9 +133,12 @@ async def parse_resume_from_url(request: ResumeParseRequest):
         return ResumeParseResponse(
             success=True,
             data=resume_data,
-            application_id=request.application_id
+            application_id=request.application_id,
+            cache=resume_parser.cache_status
         )
         
+    except PDFDownloadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except ResumeParsingError as e:
         logger.error(f"❌ Erro no parsing do currículo: {str(e)}")
         raise HTTPException(status_code=422, detail=f"Erro no processamento do currículo: {str(e)}")
@@ -177,13 +146,9 @@ async def parse_resume_from_url(request: ResumeParseRequest):
         logger.error(f"❌ Erro inesperado: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erro interno do servidor: {str(e)}")
     finally:
-        # Remove arquivo temporário
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-                logger.info(f"🗑️ Arquivo temporário removido: {temp_file_path}")
-            except Exception as e:
-                logger.warning(f"⚠️ Erro ao remover arquivo temporário: {str(e)}")
+        # Remove o arquivo temporário (em memória ou em disco)
+        if download is not None:
+            download.close()
 
 
 @router.get("/health")
@@ -0,0 +1,58 @@
+"""
+Respostas Server-Sent Events (SSE) para geração de texto em streaming
+"""
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from shared.exceptions import AIProviderError, JobCreationError
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Desativa o buffer de proxies (nginx) para os tokens chegarem assim que gerados
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Formata um evento SSE com payload JSON"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _forward(request: Request, chunks: AsyncIterator[str],
+                   done_data: Optional[Dict[str, Any]]) -> AsyncIterator[str]:
+    length = 0
+    try:
+        async for chunk in chunks:
+            if await request.is_disconnected():
+                logger.info("🔌 Cliente desconectou; encerrando a geração no provider")
+                return
+            length += len(chunk)
+            yield sse_event("token", {"text": chunk})
+        yield sse_event("done", {**(done_data or {}), "length": length})
+    except (AIProviderError, JobCreationError) as e:
+        # O status 200 já foi enviado; o erro segue como evento
+        logger.error(f"❌ Erro durante o streaming: {str(e)}")
+        yield sse_event("error", {"detail": str(e)})
+    finally:
+        # Fecha o gerador do provider (e a conexão upstream) em qualquer saída,
+        # inclusive quando o servidor cancela a resposta por desconexão
+        await chunks.aclose()
+
+
+def sse_response(request: Request, chunks: AsyncIterator[str],
+                 done_data: Optional[Dict[str, Any]] = None) -> StreamingResponse:
+    """
+    Encaminha os trechos de texto como eventos SSE
+
+    Eventos: `token` ({"text": ...}) para cada trecho, `done` ao final (com
+    `done_data` e o tamanho total) ou `error` ({"detail": ...}) se a geração falhar.
+    """
+    return StreamingResponse(_forward(request, chunks, done_data), media_type="text/event-stream",
+                             headers=SSE_HEADERS)
@@ -0,0 +1,173 @@
+"""
+Benchmark: custo do logging por avaliação processada (AIService.evaluate_candidate)
+
+Executa N avaliações com um provider em memória (sem rede) e um stdout lento
+simulado (latência fixa por escrita, como um pipe cheio), em cada modo:
+
+- off: nível WARNING, sem logs (referência)
+- sync_text_debug: StreamHandler síncrono em texto no nível DEBUG (todas as linhas de detalhe)
+- sync_text: StreamHandler síncrono em texto no nível INFO
+- queue_json: fila não bloqueante + JSON (shared/structured_logging.py), nível INFO
+- queue_json_sampled: idem, com LOG_SAMPLING="evaluation=<taxa>,generation=<taxa>"
+
+O custo por mensagem é medido no event loop (quem loga); no modo com fila a
+escrita acontece na thread do listener, cujo tempo para esvaziar a fila é
+reportado à parte.
+
+Uso:
+    python -m benchmarks.logging_benchmark --messages 2000 --write-latency-us 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+MODES = ("off", "sync_text_debug", "sync_text", "queue_json", "queue_json_sampled")
+
+RESUME = {
+    "personal_info": {"name": "Maria Silva"},
+    "education": [{"degree": "Bacharelado em Ciência da Computação"}],
+    "experience": [{"title": "Desenvolvedora Backend", "company": "Empresa X"}] * 3,
+    "skills": ["Python", "FastAPI", "PostgreSQL", "Redis", "Docker"],
+    "languages": [{"language": "Inglês", "level": "Avançado"}],
+}
+JOB = {
+    "title": "Desenvolvedor(a) Python Sênior",
+    "description": "Desenvolvimento de APIs e serviços assíncronos",
+    "requirements": ["Python", "FastAPI", "Redis"],
+    "education_required": "Superior completo",
+    "experience_required": "5 anos",
+}
+QUESTIONS = [
+    {"question": f"Pergunta {i}: descreva um projeto em que você usou filas", "answer": "Resposta " * 20}
+    for i in range(1, 6)
+]
+
+
+class SlowStream:
+    """Destino de escrita com latência fixa por write (simula um stdout/pipe lento)"""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.lines = 0
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        with self._lock:
+            self.lines += text.count("\n")
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def _build_service():
+    from core.ai.base import BaseAIProvider
+    from core.ai.service import AIService
+    from shared.config import AIProvider
+
+    class StaticProvider(BaseAIProvider):
+        """Responde sempre a mesma avaliação, sem rede"""
+
+        def _get_api_key_from_env(self) -> Optional[str]:
+            return "benchmark"
+
+        async def generate_text(self, prompt: str, **kwargs) -> str:
+            return '{"overall_score": 82, "question_responses_score": 75, "education_score": 70, "experience_score": 90}'
+
+        async def generate_chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+            return ""
+
+        async def generate_embedding(self, text: str) -> List[float]:
+            return []
+
+        def get_provider_info(self) -> Dict[str, Any]:
+            return {"provider": "static"}
+
+    return AIService(AIProvider.OPENAI, provider_instance=StaticProvider())
+
+
+def _configure(mode: str, stream: SlowStream, sample_rate: float) -> Optional[logging.Handler]:
+    """Configura o logger raiz do modo; devolve o handler da fila nos modos queue_json"""
+    from shared.structured_logging import TEXT_FORMAT, setup_logging
+
+    root = logging.getLogger()
+    root.handlers.clear()
+    if mode.startswith("queue_json"):
+        sampling = f"evaluation={sample_rate},generation={sample_rate}" if mode == "queue_json_sampled" else ""
+        return setup_logging(level="INFO", json_output=True, sampling=sampling, stream=stream)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    root.addHandler(handler)
+    root.setLevel({"off": logging.WARNING, "sync_text_debug": logging.DEBUG}.get(mode, logging.INFO))
+    return None
+
+
+async def _run_mode(mode: str, total: int, latency_seconds: float, sample_rate: float) -> Dict[str, Any]:
+    from shared.structured_logging import dropped_records, shutdown_logging
+
+    service = _build_service()
+    stream = SlowStream(latency_seconds)
+    queue_handler = _configure(mode, stream, sample_rate)
+
+    # Aquecimento fora da medição (espera o listener escrever as linhas dele)
+    for _ in range(20):
+        await service.evaluate_candidate(RESUME, JOB, QUESTIONS)
+    while queue_handler is not None and queue_handler.queue.qsize():
+        time.sleep(0.001)
+    time.sleep(0.01)
+    stream.lines = 0
+
+    start = time.perf_counter()
+    for _ in range(total):
+        await service.evaluate_candidate(RESUME, JOB, QUESTIONS)
+    elapsed = time.perf_counter() - start
+
+    dropped = dropped_records()
+    drain_start = time.perf_counter()
+    shutdown_logging()
+    drain = time.perf_counter() - drain_start
+    logging.getLogger().handlers.clear()
+
+    return {
+        "mode": mode,
+        "messages": total,
+        "us_per_message": round(elapsed / total * 1e6, 1),
+        "lines_written": stream.lines,
+        "dropped": dropped,
+        "listener_drain_ms": round(drain * 1000, 1) if mode.startswith("queue_json") else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--write-latency-us", type=float, default=50.0, help="Latência de cada escrita no stdout")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="Taxa do modo queue_json_sampled")
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    latency = args.write_latency_us / 1e6
+    results = [asyncio.run(_run_mode(mode, args.messages, latency, args.sample_rate)) for mode in MODES]
+    baseline = results[0]["us_per_message"]
+    for result in results:
+        result["overhead_us_per_message"] = round(result["us_per_message"] - baseline, 1)
+        drain = f" | drenagem {result['listener_drain_ms']} ms" if result["listener_drain_ms"] is not None else ""
+        print(
+            f"{result['mode']:>18}: {result['us_per_message']:>8} µs/msg | "
+            f"overhead {result['overhead_us_per_message']:>8} µs/msg | "
+            f"linhas {result['lines_written']} | descartadas {result['dropped']}{drain}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
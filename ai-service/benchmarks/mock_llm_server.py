@@ -0,0 +1,182 @@
+"""
+Servidor local que imita a API da OpenAI para benchmarks
+
+Responde /v1/chat/completions e /v1/embeddings com latência e taxa de erro
+configuráveis, sem custo e sem depender de rede externa. Pedidos com saída
+estruturada recebem a resposta do schema (ex: resume_parse), os demais a
+resposta de avaliação.
+
+Uso standalone:
+    python -m benchmarks.mock_llm_server --port 9100 --latency-ms 200 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+DEFAULT_COMPLETION = (
+    '{"overall_score": 78, "question_responses_score": 70, '
+    '"education_score": 80, "experience_score": 75}'
+)
+
+# Respostas por schema de saída estruturada (response_format.json_schema.name)
+DEFAULT_SCHEMA_COMPLETIONS = {
+    "resume_parse": (
+        '{"summary": "Desenvolvedora backend com 6 anos de experiência em Python.", '
+        '"professionalExperiences": [{"companyName": "Acme", "position": "Engenheira de Software", '
+        '"startDate": "2019-03-01", "isCurrent": true, "description": "APIs e filas assíncronas"}], '
+        '"academicFormations": [{"institution": "Universidade Federal", "course": "Ciência da Computação", '
+        '"degree": "Bacharelado", "startDate": "2012-02-01", "endDate": "2016-12-01", "status": "completed"}], '
+        '"achievements": [{"title": "AWS Certified Developer"}], '
+        '"languages": [{"language": "Inglês", "proficiencyLevel": "advanced"}]}'
+    ),
+}
+
+
+@dataclass
+class MockLLMConfig:
+    """Parâmetros do servidor mock"""
+    latency_ms: float = 200.0
+    latency_sigma: float = 0.3
+    error_rate: float = 0.0
+    completion_text: str = DEFAULT_COMPLETION
+    schema_completions: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_SCHEMA_COMPLETIONS))
+    embedding_dimensions: int = 1536
+
+    def completion_for(self, body: Dict[str, Any]) -> str:
+        """Resposta para a requisição: a do schema pedido em response_format, se houver"""
+        schema_name = ((body.get("response_format") or {}).get("json_schema") or {}).get("name")
+        return self.schema_completions.get(schema_name, self.completion_text)
+
+    def sample_latency(self) -> float:
+        """Amostra uma latência (segundos) de uma distribuição log-normal com mediana latency_ms"""
+        if self.latency_ms <= 0:
+            return 0.0
+        return random.lognormvariate(math.log(self.latency_ms / 1000.0), self.latency_sigma)
+
+
+def create_app(config: MockLLMConfig) -> FastAPI:
+    """Cria a aplicação FastAPI do mock"""
+    app = FastAPI(title="Mock LLM")
+    app.state.requests_total = 0
+
+    async def _simulate(request: Request) -> Any:
+        request.app.state.requests_total += 1
+        await asyncio.sleep(config.sample_latency())
+        if config.error_rate and random.random() < config.error_rate:
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit (mock)", "type": "rate_limit_error"}}
+            )
+        return None
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        error = await _simulate(request)
+        if error is not None:
+            return error
+        body: Dict[str, Any] = await request.json()
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+        completion_text = config.completion_for(body)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": completion_text},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(completion_text) // 4,
+                "total_tokens": prompt_tokens + len(completion_text) // 4
+            }
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        error = await _simulate(request)
+        if error is not None:
+            return error
+        body: Dict[str, Any] = await request.json()
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        data = []
+        for index, text in enumerate(inputs):
+            rng = random.Random(text)
+            data.append({
+                "object": "embedding",
+                "index": index,
+                "embedding": [rng.uniform(-1, 1) for _ in range(config.embedding_dimensions)]
+            })
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "mock-embedding"),
+            "usage": {"prompt_tokens": 0, "total_tokens": 0}
+        }
+
+    @app.get("/stats")
+    async def stats(request: Request):
+        return {"requests_total": request.app.state.requests_total}
+
+    return app
+
+
+class MockLLMServer:
+    """Executa o mock em uma thread própria (para uso dentro de benchmarks)"""
+
+    def __init__(self, config: MockLLMConfig, host: str = "127.0.0.1", port: int = 9100):
+        self.host = host
+        self.port = port
+        self._server = uvicorn.Server(uvicorn.Config(
+            create_app(config), host=host, port=port, log_level="warning", access_log=False
+        ))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.05)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor mock compatível com a API da OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Mediana da latência")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Dispersão log-normal")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 429")
+    args = parser.parse_args()
+
+    config = MockLLMConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: leitura do .prompt por requisição vs. template pré-compilado (PromptRegistry)
+
+Para cada template mede o custo de montar o prompt como antes (abrir o arquivo,
+ler e aplicar str.format/replace) e com o registro (render sobre os trechos
+pré-compilados), e imprime a economia por requisição.
+
+Uso:
+    python -m benchmarks.prompt_registry_benchmark --iterations 20000
+"""
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from core.prompts import PromptRegistry
+
+# Valores de exemplo para as variáveis de cada template
+SAMPLE_VALUES: Dict[str, Dict[str, Any]] = {
+    "resume_parse": {"pdf_text": "Ana Silva - Desenvolvedora Python. " * 200},
+    "job_creation": {"user_prompt": "Vaga de desenvolvedor backend Python", "num_questions": 5, "num_stages": 4},
+    "question_evaluation": {
+        "job_title": "Desenvolvedor Python",
+        "job_description": "Vaga de backend",
+        "job_requirements": "Python, Django",
+        "question_responses": "Pergunta 1: Experiência?\nResposta 1: 5 anos\n",
+        "num_questions": 1,
+    },
+    "job_description_enhancement": {
+        "job_title": "Dev", "job_description": "Backend", "job_requirements": "Python",
+        "enhancement_prompt": "Deixe mais atrativa",
+    },
+}
+
+
+def _time_per_call(func: Callable[[], str], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def _legacy_render(path: str, name: str, values: Dict[str, Any]) -> Callable[[], str]:
+    """Comportamento anterior: abre e lê o arquivo a cada requisição"""
+    def render() -> str:
+        with open(path, 'r', encoding='utf-8') as file:
+            template = file.read()
+        if name == "resume_parse":
+            return template.replace('{pdf_text}', values["pdf_text"])
+        return template.format(**values)
+    return render
+
+
+def run(iterations: int) -> List[Dict[str, Any]]:
+    registry = PromptRegistry()
+    registry.load()
+    results = []
+    for name, values in SAMPLE_VALUES.items():
+        template = registry.get(name)
+        assert _legacy_render(template.path, name, values)() == template.render(**values)
+        legacy = _time_per_call(_legacy_render(template.path, name, values), iterations)
+        compiled = _time_per_call(lambda: registry.render(name, **values), iterations)
+        results.append({
+            "template": name,
+            "legacy_us": round(legacy * 1e6, 2),
+            "registry_us": round(compiled * 1e6, 2),
+            "saved_us_per_request": round((legacy - compiled) * 1e6, 2),
+            "speedup": round(legacy / compiled, 1) if compiled > 0 else None,
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    for result in results:
+        print(
+            f"{result['template']:>28}: antes {result['legacy_us']:>8} µs | "
+            f"registro {result['registry_us']:>8} µs | "
+            f"economia {result['saved_us_per_request']:>8} µs/req ({result['speedup']}x)"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: provider criado por requisição vs. provider compartilhado (ProviderRegistry)
+
+Sobe o mock local da OpenAI, executa N chamadas de generate_text com
+concorrência C em cada modo e compara requisições/s, latência e descritores
+de arquivo abertos (sockets que o modo antigo deixa para trás).
+
+Uso:
+    python -m benchmarks.provider_registry_benchmark --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+from benchmarks.mock_llm_server import MockLLMConfig, MockLLMServer
+
+
+def _open_fds() -> int:
+    """Número de descritores abertos pelo processo (Linux); -1 se indisponível"""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _run_mode(mode: str, total: int, concurrency: int) -> Dict[str, Any]:
+    from shared.config import AIProvider
+    from core.ai.registry import ProviderRegistry
+    from core.ai.service import AIService
+
+    registry = ProviderRegistry()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one_call() -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if mode == "per_request":
+                    # Comportamento anterior: um AIService (e um httpx.AsyncClient) por requisição
+                    ai_service = AIService(AIProvider.OPENAI)
+                else:
+                    ai_service = registry.get_ai_service(AIProvider.OPENAI)
+                await ai_service.generate_text("Avalie o candidato.", model="mock-model")
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    fds_before = _open_fds()
+    start = time.perf_counter()
+    await asyncio.gather(*(one_call() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    fds_after = _open_fds()
+    await registry.aclose()
+
+    return {
+        "mode": mode,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "latency_p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "open_fds_delta": fds_after - fds_before if fds_before >= 0 else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    server = MockLLMServer(MockLLMConfig(latency_ms=args.latency_ms), port=args.port).start()
+    # Precisa ser definido antes de importar shared.config (lido no import)
+    os.environ["OPENAI_API_KEY"] = "sk-benchmark"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+
+    try:
+        results = [
+            asyncio.run(_run_mode(mode, args.requests, args.concurrency))
+            for mode in ("per_request", "shared")
+        ]
+    finally:
+        server.stop()
+
+    for result in results:
+        print(
+            f"{result['mode']:>12}: {result['requests_per_second']:>8} req/s | "
+            f"p50 {result['latency_p50_ms']} ms | p95 {result['latency_p95_ms']} ms | "
+            f"fds +{result['open_fds_delta']} | erros {result['errors']}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 
 from .service import AIService
 from .factory import AIProviderFactory
+from .registry import ProviderRegistry
 from .base import BaseAIProvider
 from .openai import OpenAIProvider
 from .anthropic import AnthropicProvider
@@ -9,6 +10,7 @@ from .anthropic import AnthropicProvider
 __all__ = [
     'AIService',
     'AIProviderFactory', 
+    'ProviderRegistry',
     'BaseAIProvider',
     'OpenAIProvider',
     'AnthropicProvider'
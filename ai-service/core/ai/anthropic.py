@@ -1,15 +1,20 @@
 """
 Provider Anthropic para o AI Service
 """
-from typing import Dict, Any, Optional, List
+import json
+import time
+from typing import Dict, Any, Optional, List, AsyncIterator
 from shared.config import Config
 from shared.exceptions import TextGenerationError, EmbeddingError
 from .base import BaseAIProvider
+from .usage import anthropic_token_counts, usage_tracker
 
 
 class AnthropicProvider(BaseAIProvider):
     """Implementação do provider Anthropic"""
     
+    default_model = "claude-3-sonnet-20240229"
+    
     def _get_api_key_from_env(self) -> Optional[str]:
         """Obtém a chave da API Anthropic da variável de ambiente"""
         return Config.ANTHROPIC_API_KEY
@@ -27,29 +32,89 @@ class AnthropicProvider(BaseAIProvider):
     
     async def generate_text(self, prompt: str, **kwargs) -> str:
         """Gera texto usando Anthropic"""
-        model = kwargs.get('model', 'claude-3-sonnet-20240229')
+        model = kwargs.get('model', self.default_model)
         
         try:
+            if kwargs.get('json_schema'):
+                return await self._generate_structured(prompt, model, **kwargs)
+            start = time.perf_counter()
             response = await self.client.messages.create(
                 model=model,
                 messages=[{"role": "user", "content": prompt}]
             )
+            usage_tracker.record(
+                "anthropic", model, *anthropic_token_counts(response.usage),
+                latency_seconds=time.perf_counter() - start
+            )
             return response.content[0].text
         except Exception as e:
-            raise TextGenerationError(f"Erro ao gerar texto com Anthropic: {str(e)}")
+            message = f"Erro ao gerar texto com Anthropic: {str(e)}"
+            raise self._as_rate_limit_error(e, message) or TextGenerationError(message)
+    
+    async def _generate_structured(self, prompt: str, model: str, **kwargs) -> str:
+        """Saída estruturada via tool use forçado; devolve o input da ferramenta como JSON"""
+        name = kwargs.get('schema_name', 'output')
+        start = time.perf_counter()
+        response = await self.client.messages.create(
+            model=model,
+            max_tokens=kwargs.get('max_tokens', 4096),
+            messages=[{"role": "user", "content": prompt}],
+            tools=[{
+                "name": name,
+                "description": "Registra a resposta no formato estruturado solicitado",
+                "input_schema": kwargs['json_schema']
+            }],
+            tool_choice={"type": "tool", "name": name}
+        )
+        usage_tracker.record(
+            "anthropic", model, *anthropic_token_counts(response.usage), latency_seconds=time.perf_counter() - start
+        )
+        for block in response.content:
+            if getattr(block, 'type', None) == 'tool_use':
+                return json.dumps(block.input, ensure_ascii=False)
+        return response.content[0].text
+    
+    async def stream_text(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Gera texto usando Anthropic, devolvendo os tokens à medida que chegam"""
+        model = kwargs.get('model', self.default_model)
+        
+        start = time.perf_counter()
+        try:
+            # O context manager fecha a resposta HTTP ao sair (inclusive por cancelamento)
+            async with self.client.messages.stream(
+                model=model,
+                max_tokens=kwargs.get('max_tokens', 4096),
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+                final_message = await stream.get_final_message()
+                usage_tracker.record(
+                    "anthropic", model, *anthropic_token_counts(final_message.usage),
+                    latency_seconds=time.perf_counter() - start
+                )
+        except Exception as e:
+            message = f"Erro no streaming de texto com Anthropic: {str(e)}"
+            raise self._as_rate_limit_error(e, message) or TextGenerationError(message)
     
     async def generate_chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """Gera resposta de chat usando Anthropic"""
-        model = kwargs.get('model', 'claude-3-sonnet-20240229')
+        model = kwargs.get('model', self.default_model)
         
         try:
+            start = time.perf_counter()
             response = await self.client.messages.create(
                 model=model,
                 messages=messages
             )
+            usage_tracker.record(
+                "anthropic", model, *anthropic_token_counts(response.usage),
+                latency_seconds=time.perf_counter() - start
+            )
             return response.content[0].text
         except Exception as e:
-            raise TextGenerationError(f"Erro ao gerar chat com Anthropic: {str(e)}")
+            message = f"Erro ao gerar chat com Anthropic: {str(e)}"
+            raise self._as_rate_limit_error(e, message) or TextGenerationError(message)
     
     async def generate_embedding(self, text: str) -> List[float]:
         """Gera embeddings usando Anthropic"""
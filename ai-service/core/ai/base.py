@@ -1,15 +1,19 @@
 """
 Classe base para providers de IA
 """
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator
 from shared.config import AIProvider
-from shared.exceptions import ProviderNotConfiguredError, APIKeyError
+from shared.exceptions import ProviderNotConfiguredError, APIKeyError, ProviderRateLimitError
 
 
 class BaseAIProvider(ABC):
     """Classe base abstrata para implementar diferentes providers de IA"""
     
+    # Modelo usado quando a chamada não informa `model`
+    default_model: Optional[str] = None
+    
     def __init__(self, api_key: Optional[str] = None, **kwargs):
         self.api_key = api_key or self._get_api_key_from_env()
         self.config = kwargs
@@ -24,9 +28,24 @@ class BaseAIProvider(ABC):
     
     @abstractmethod
     async def generate_text(self, prompt: str, **kwargs) -> str:
-        """Gera texto usando o provider específico"""
+        """
+        Gera texto usando o provider específico
+        
+        Com `json_schema` (e `schema_name`) nos kwargs, providers com saída
+        estruturada devolvem um JSON nesse schema (ver core/ai/structured_output.py).
+        """
         pass
     
+    async def stream_text(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Gera texto em partes, à medida que o provider as devolve
+        
+        A implementação padrão devolve o texto completo de uma vez; providers com
+        suporte a streaming sobrescrevem. Fechar o iterador (aclose) ou cancelar a
+        task que o consome encerra a chamada ao provider.
+        """
+        yield await self.generate_text(prompt, **kwargs)
+    
     @abstractmethod
     async def generate_chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """Gera resposta de chat usando o provider específico"""
@@ -37,11 +56,45 @@ class BaseAIProvider(ABC):
         """Gera embeddings usando o provider específico"""
         pass
     
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Gera embeddings de vários textos (na mesma ordem)
+        
+        A implementação padrão faz uma chamada por texto, em paralelo; providers
+        com API de lote sobrescrevem. O tamanho dos lotes é controlado por quem chama.
+        """
+        return list(await asyncio.gather(*(self.generate_embedding(text) for text in texts)))
+    
     @abstractmethod
     def get_provider_info(self) -> Dict[str, Any]:
         """Retorna informações sobre o provider"""
         pass
     
+    @staticmethod
+    def _as_rate_limit_error(error: Exception, message: str) -> Optional[ProviderRateLimitError]:
+        """
+        Converte um erro 429 do SDK do provider em ProviderRateLimitError
+        
+        Returns:
+            ProviderRateLimitError (com o Retry-After, se informado) ou None se não for 429
+        """
+        if getattr(error, 'status_code', None) != 429:
+            return None
+        response = getattr(error, 'response', None)
+        retry_after = None
+        try:
+            header = response.headers.get('retry-after') if response is not None else None
+            retry_after = float(header) if header else None
+        except (TypeError, ValueError):
+            pass
+        return ProviderRateLimitError(message, retry_after=retry_after)
+    
     def validate_config(self) -> bool:
         """Valida se o provider está configurado corretamente"""
         return self.api_key is not None and self.api_key.strip() != ""
+    
+    async def aclose(self) -> None:
+        """Libera o cliente HTTP do provider (conexões do pool)"""
+        client = getattr(self, 'client', None)
+        if client is not None and hasattr(client, 'close'):
+            await client.close()
@@ -0,0 +1,74 @@
+"""
+Embeddings em lote: deduplicação, cache por conteúdo e formato compacto
+
+Textos repetidos são enviados uma única vez; cada texto único é buscado no
+cache pela chave `<sha256 do texto>:<provider:modelo>` e apenas os misses vão
+ao provider, em lotes que respeitam o limite de itens e de tokens por
+requisição. Os vetores são guardados e devolvidos como float32 little-endian
+em base64 (cerca de 4x menor que listas de floats em JSON).
+"""
+import base64
+import sys
+from array import array
+from typing import Iterable, List, Sequence
+
+from shared.cache import sha256_hex
+from .prompt_compaction import estimate_tokens
+
+EMBEDDING_CACHE_NAMESPACE = "ai-service:embedding"
+
+
+def build_embedding_cache_key(text: str, model: str) -> str:
+    """Chave do cache de embeddings: <sha256 do texto>:<provider:modelo>"""
+    return f"{sha256_hex(text.encode('utf-8'))}:{model}"
+
+
+def encode_float32(vectors: Iterable[Sequence[float]]) -> bytes:
+    """Concatena os vetores (linha a linha) como float32 little-endian"""
+    packed = array("f")
+    for vector in vectors:
+        packed.extend(vector)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def decode_float32(data: bytes, dimensions: int) -> List[List[float]]:
+    """Inverso de encode_float32: bytes float32 little-endian -> lista de vetores"""
+    packed = array("f")
+    packed.frombytes(data)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return [packed[start:start + dimensions].tolist() for start in range(0, len(packed), dimensions)]
+
+
+def encode_embedding_base64(vector: Sequence[float]) -> str:
+    """Um vetor como base64 de float32 (formato das entradas do cache)"""
+    return base64.b64encode(encode_float32([vector])).decode("ascii")
+
+
+def decode_embedding_base64(data: str) -> List[float]:
+    """Inverso de encode_embedding_base64"""
+    raw = base64.b64decode(data)
+    return decode_float32(raw, len(raw) // 4)[0]
+
+
+def chunk_texts(texts: Sequence[str], max_items: int, max_tokens: int) -> List[List[str]]:
+    """
+    Divide os textos em lotes com no máximo `max_items` textos e ~`max_tokens` tokens
+
+    Um texto maior que `max_tokens` sozinho forma um lote (o provider decide se aceita).
+    """
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
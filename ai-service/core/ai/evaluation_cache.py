@@ -0,0 +1,82 @@
+"""
+Cache das notas de avaliação de candidatos
+
+A chave é um fingerprint determinístico das entradas canonicalizadas
+(currículo, vaga, respostas), do provider/modelo e da versão do prompt de
+avaliação. Retentativas da ai-score-queue e o fluxo de question responses
+reaproveitam a mesma nota sem nova chamada ao LLM.
+
+O conteúdo da vaga faz parte do fingerprint: editar a vaga já gera chaves
+novas, e as notas antigas expiram pelo TTL, sem invalidação explícita.
+"""
+import hashlib
+import json
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+from shared.cache import ResultCache
+
+EVALUATION_CACHE_NAMESPACE = "ai-service:evaluation-score"
+
+# Incrementar quando o prompt de avaliação (AIService._build_evaluation_prompt) mudar
+EVALUATION_PROMPT_VERSION = "3"
+
+
+def _canonicalize(value: Any) -> Any:
+    """Normaliza strings (unicode NFC, espaços nas pontas) e remove campos vazios"""
+    if isinstance(value, dict):
+        return {
+            key: _canonicalize(item) for key, item in value.items()
+            if item is not None and item != "" and item != [] and item != {}
+        }
+    if isinstance(value, list):
+        return [_canonicalize(item) for item in value]
+    if isinstance(value, str):
+        return unicodedata.normalize("NFC", value).strip()
+    return value
+
+
+def build_evaluation_fingerprint(resume_data: Dict[str, Any], job_data: Dict[str, Any],
+                                 question_responses: Optional[List[Dict[str, str]]],
+                                 provider: str, model: str) -> str:
+    """
+    Fingerprint SHA-256 das entradas de uma avaliação
+
+    Args:
+        resume_data: Dados do currículo
+        job_data: Dados da vaga (o id não entra no fingerprint)
+        question_responses: Respostas das perguntas
+        provider: Provider de IA
+        model: Modelo de IA
+
+    Returns:
+        Hash hexadecimal
+    """
+    job_content = {key: value for key, value in job_data.items() if key != "id"}
+    payload = {
+        "resume": _canonicalize(resume_data),
+        "job": _canonicalize(job_content),
+        "question_responses": _canonicalize(question_responses or []),
+        "provider": provider,
+        "model": model,
+        "prompt_version": EVALUATION_PROMPT_VERSION,
+    }
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class EvaluationScoreCache:
+    """Cache de notas por vaga e fingerprint das entradas"""
+
+    def __init__(self, cache: ResultCache):
+        self.cache = cache
+
+    def build_key(self, job_id: Optional[str], fingerprint: str) -> str:
+        """Chave do cache: <vaga>:<fingerprint>"""
+        return f"{job_id or 'no-job-id'}:{fingerprint}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self.cache.get(key)
+
+    async def set(self, key: str, scores: Dict[str, Any]) -> None:
+        await self.cache.set(key, scores)
@@ -2,15 +2,19 @@
 Provider OpenAI para o AI Service
 """
 import os
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, AsyncIterator
 from shared.config import Config
 from shared.exceptions import TextGenerationError, EmbeddingError
 from .base import BaseAIProvider
+from .usage import openai_token_counts, usage_tracker
 
 
 class OpenAIProvider(BaseAIProvider):
     """Implementação do provider OpenAI"""
     
+    default_model = Config.DEFAULT_MODEL
+    
     def _get_api_key_from_env(self) -> Optional[str]:
         """Obtém a chave da API OpenAI da variável de ambiente"""
         return Config.OPENAI_API_KEY
@@ -24,7 +28,10 @@ class OpenAIProvider(BaseAIProvider):
             # Configuração específica para evitar problemas de compatibilidade
             http_client = httpx.AsyncClient(
                 timeout=httpx.Timeout(Config.REQUEST_TIMEOUT),
-                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
+                limits=httpx.Limits(
+                    max_keepalive_connections=Config.PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+                    max_connections=Config.PROVIDER_MAX_CONNECTIONS
+                )
             )
             
             self.client = openai.AsyncOpenAI(
@@ -36,41 +43,110 @@ class OpenAIProvider(BaseAIProvider):
     
     async def generate_text(self, prompt: str, **kwargs) -> str:
         """Gera texto usando OpenAI"""
-        model = kwargs.get('model', Config.DEFAULT_MODEL)
+        model = kwargs.get('model', self.default_model)
+        
+        request = {"model": model, "messages": [{"role": "user", "content": prompt}]}
+        if kwargs.get('json_schema'):
+            # Saída estruturada: a resposta é um JSON no schema informado
+            request["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": kwargs.get('schema_name', 'output'), "schema": kwargs['json_schema']}
+            }
         
         try:
-            response = await self.client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}]
+            start = time.perf_counter()
+            response = await self.client.chat.completions.create(**request)
+            usage_tracker.record(
+                "openai", model, *openai_token_counts(response.usage), latency_seconds=time.perf_counter() - start
             )
             return response.choices[0].message.content
         except Exception as e:
-            raise TextGenerationError(f"Erro ao gerar texto com OpenAI: {str(e)}")
+            message = f"Erro ao gerar texto com OpenAI: {str(e)}"
+            raise self._as_rate_limit_error(e, message) or TextGenerationError(message)
+    
+    async def stream_text(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Gera texto usando OpenAI, devolvendo os tokens à medida que chegam"""
+        model = kwargs.get('model', self.default_model)
+        
+        start = time.perf_counter()
+        try:
+            # include_usage: o último chunk (sem choices) traz o usage da chamada
+            stream = await self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+        except Exception as e:
+            message = f"Erro ao gerar texto com OpenAI: {str(e)}"
+            raise self._as_rate_limit_error(e, message) or TextGenerationError(message)
+        
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage_tracker.record(
+                        "openai", model, *openai_token_counts(chunk.usage),
+                        latency_seconds=time.perf_counter() - start
+                    )
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        except Exception as e:
+            raise TextGenerationError(f"Erro no streaming de texto com OpenAI: {str(e)}")
+        finally:
+            # Encerra a conexão com a OpenAI também quando o consumidor desiste
+            await stream.close()
     
     async def generate_chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """Gera resposta de chat usando OpenAI"""
         model = kwargs.get('model', 'gpt-5-2025-08-07')
         
         try:
+            start = time.perf_counter()
             response = await self.client.chat.completions.create(
                 model=model,
                 messages=messages
             )
+            usage_tracker.record(
+                "openai", model, *openai_token_counts(response.usage), latency_seconds=time.perf_counter() - start
+            )
             return response.choices[0].message.content
         except Exception as e:
-            raise TextGenerationError(f"Erro ao gerar chat com OpenAI: {str(e)}")
+            message = f"Erro ao gerar chat com OpenAI: {str(e)}"
+            raise self._as_rate_limit_error(e, message) or TextGenerationError(message)
     
     async def generate_embedding(self, text: str) -> List[float]:
         """Gera embeddings usando OpenAI"""
         try:
+            start = time.perf_counter()
             response = await self.client.embeddings.create(
                 model="text-embedding-ada-002",
                 input=text
             )
+            usage_tracker.record(
+                "openai", "text-embedding-ada-002", *openai_token_counts(response.usage),
+                latency_seconds=time.perf_counter() - start
+            )
             return response.data[0].embedding
         except Exception as e:
             raise EmbeddingError(f"Erro ao gerar embedding com OpenAI: {str(e)}")
     
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Gera embeddings de vários textos em uma única requisição"""
+        try:
+            start = time.perf_counter()
+            response = await self.client.embeddings.create(
+                model="text-embedding-ada-002",
+                input=texts
+            )
+            usage_tracker.record(
+                "openai", "text-embedding-ada-002", *openai_token_counts(response.usage),
+                latency_seconds=time.perf_counter() - start
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except Exception as e:
+            raise EmbeddingError(f"Erro ao gerar embeddings com OpenAI: {str(e)}")
+    
     def get_provider_info(self) -> Dict[str, Any]:
         """Retorna informações sobre o provider OpenAI"""
         return {
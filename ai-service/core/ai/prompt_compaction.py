@@ -0,0 +1,226 @@
+"""
+Serialização compacta de currículo e vaga para o prompt de avaliação
+
+Antes, o prompt recebia o repr() dos dicts e listas (aspas, chaves, campos
+vazios e contatos que não influenciam a nota). Aqui os dados viram linhas
+curtas e determinísticas:
+
+    Experiência profissional:
+    - Desenvolvedor Python | Empresa X | 2019-01 a atual | Django, APIs REST
+
+Campos vazios e irrelevantes para a avaliação são descartados, textos longos
+são truncados em limite de palavra e cada seção tem um orçamento de tokens.
+A contagem de tokens é uma estimativa (caracteres / 4), suficiente para
+orçamento e métricas sem depender do tokenizer de cada provider.
+"""
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+# Caracteres por token usados na estimativa
+CHARS_PER_TOKEN = 4
+
+# Campos que não influenciam a avaliação (identificadores, contatos, datas de registro)
+DROPPED_FIELDS = frozenset({
+    "id", "applicationId", "application_id", "resume_id", "candidate_id",
+    "email", "phone", "telefone", "address", "endereco", "linkedin", "github",
+    "website", "portfolio", "photo", "photo_url",
+    "created_at", "updated_at", "createdAt", "updatedAt",
+})
+
+# Limite de tokens de um texto livre (descrições, respostas)
+FIELD_TOKEN_BUDGET = 120
+
+# Limite de tokens por seção do prompt; itens além do orçamento são omitidos
+SECTION_TOKEN_BUDGETS: Dict[str, int] = {
+    "job_description": 400,
+    "job_list": 250,
+    "personal_info": 60,
+    "education": 200,
+    "experience": 700,
+    "skills": 150,
+    "languages": 60,
+    "achievements": 200,
+    "question_responses": 800,
+}
+
+# Ordem preferida dos campos ao serializar um item (os demais vêm depois, em ordem alfabética)
+FIELD_ORDER = (
+    "name", "title", "position", "role", "degree", "course", "field", "institution",
+    "company", "companyName", "language", "level", "proficiency",
+    "location", "description", "responsibilities", "achievements",
+)
+
+# Campos que identificam o item (cargo, empresa, curso...) e vêm antes do período
+HEADING_FIELDS = frozenset(FIELD_ORDER[:FIELD_ORDER.index("location")])
+
+# Campos combinados em um único período ("início a fim")
+PERIOD_FIELDS = frozenset({"start_date", "startDate", "end_date", "endDate", "is_current", "isCurrent"})
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa de tokens de um texto (0 para texto vazio)"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Trunca um texto no limite de palavra mais próximo do orçamento"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0].rstrip(" ,.;:")
+    return f"{cut}…"
+
+
+def _period(data: Dict[str, Any]) -> str:
+    """Período de um item ("2019-01 a 2021-03", "2019-01 a atual") ou vazio"""
+    start = compact_value(data.get("start_date") or data.get("startDate"))
+    end = compact_value(data.get("end_date") or data.get("endDate"))
+    if data.get("is_current") is True or data.get("isCurrent") is True:
+        end = "atual"
+    if start and end:
+        return f"{start} a {end}"
+    return start or end
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    if isinstance(value, (list, tuple, dict)):
+        return all(_is_empty(item) for item in (value.values() if isinstance(value, dict) else value))
+    return False
+
+
+def _ordered_items(data: Dict[str, Any]) -> List[tuple]:
+    known = [(key, data[key]) for key in FIELD_ORDER if key in data]
+    rest = sorted((key, value) for key, value in data.items() if key not in FIELD_ORDER)
+    return known + rest
+
+
+def compact_value(value: Any, field_budget: int = FIELD_TOKEN_BUDGET) -> str:
+    """
+    Serializa um valor em texto compacto e determinístico
+
+    Strings são normalizadas (espaços) e truncadas; listas viram itens separados
+    por vírgula; dicts viram valores separados por " | " sem os nomes dos campos
+    conhecidos, descartando vazios e campos irrelevantes.
+    """
+    if _is_empty(value):
+        return ""
+    if isinstance(value, bool):
+        return "sim" if value else ""
+    if isinstance(value, str):
+        return truncate_to_tokens(" ".join(value.split()), field_budget)
+    if isinstance(value, (list, tuple)):
+        parts = [compact_value(item, field_budget) for item in value]
+        return ", ".join(part for part in parts if part)
+    if isinstance(value, dict):
+        parts = []
+        period = _period(value)
+        for key, item in _ordered_items(value):
+            if key in DROPPED_FIELDS or key in PERIOD_FIELDS:
+                continue
+            if period and key not in HEADING_FIELDS:
+                # O período vem logo depois de cargo/empresa/curso
+                parts.append(period)
+                period = ""
+            text = compact_value(item, field_budget)
+            if text:
+                parts.append(text if key in FIELD_ORDER else f"{key}: {text}")
+        if period:
+            parts.append(period)
+        return " | ".join(parts)
+    return str(value)
+
+
+def compact_list(items: Optional[Iterable[Any]], token_budget: int) -> str:
+    """
+    Serializa uma lista como linhas "- item", respeitando o orçamento da seção
+
+    Itens vazios ou repetidos são descartados; os que não cabem no orçamento
+    são resumidos em uma linha "(+N itens omitidos)".
+    """
+    lines: List[str] = []
+    seen = set()
+    used = 0
+    omitted = 0
+    for item in items or []:
+        text = compact_value(item)
+        if not text or text in seen:
+            continue
+        seen.add(text)
+        line = f"- {text}"
+        cost = estimate_tokens(line)
+        if used + cost > token_budget and lines:
+            omitted += 1
+            continue
+        lines.append(line)
+        used += cost
+    if omitted:
+        lines.append(f"(+{omitted} itens omitidos)")
+    return "\n".join(lines)
+
+
+def compact_inline(items: Optional[Iterable[Any]], token_budget: int) -> str:
+    """Serializa uma lista curta (habilidades, idiomas) em uma única linha"""
+    values: List[str] = []
+    for item in items or []:
+        text = compact_value(item)
+        if text and text not in values:
+            values.append(text)
+    return truncate_to_tokens(", ".join(values), token_budget)
+
+
+def _section(label: str, body: str, inline: bool = False) -> str:
+    if not body:
+        return ""
+    return f"{label}: {body}\n" if inline else f"{label}:\n{body}\n"
+
+
+def build_job_text(job_data: Dict[str, Any]) -> str:
+    """Dados da vaga no formato compacto (sem o id)"""
+    budgets = SECTION_TOKEN_BUDGETS
+    return "".join([
+        _section("Título", compact_value(job_data.get("title")), inline=True),
+        _section("Descrição", truncate_to_tokens(
+            compact_value(job_data.get("description"), budgets["job_description"]), budgets["job_description"]
+        ), inline=True),
+        _section("Requisitos", compact_list(job_data.get("requirements"), budgets["job_list"])),
+        _section("Responsabilidades", compact_list(job_data.get("responsibilities"), budgets["job_list"])),
+        _section("Formação necessária", compact_value(job_data.get("education_required")), inline=True),
+        _section("Experiência necessária", compact_value(job_data.get("experience_required")), inline=True),
+        _section("Habilidades necessárias", compact_inline(job_data.get("skills_required"), budgets["job_list"]),
+                 inline=True),
+    ])
+
+
+def build_resume_text(resume_data: Dict[str, Any]) -> str:
+    """Dados do currículo no formato compacto"""
+    budgets = SECTION_TOKEN_BUDGETS
+    personal_info = truncate_to_tokens(compact_value(resume_data.get("personal_info")), budgets["personal_info"])
+    return "".join([
+        _section("Informações pessoais", personal_info, inline=True),
+        _section("Formação acadêmica", compact_list(resume_data.get("education"), budgets["education"])),
+        _section("Experiência profissional", compact_list(resume_data.get("experience"), budgets["experience"])),
+        _section("Habilidades", compact_inline(resume_data.get("skills"), budgets["skills"]), inline=True),
+        _section("Idiomas", compact_inline(resume_data.get("languages"), budgets["languages"]), inline=True),
+        _section("Conquistas", compact_list(resume_data.get("achievements"), budgets["achievements"])),
+    ])
+
+
+def build_question_responses_text(question_responses: Optional[List[Dict[str, str]]]) -> str:
+    """Perguntas e respostas numeradas, com respostas longas truncadas"""
+    lines: List[str] = []
+    used = 0
+    for i, qr in enumerate(question_responses or [], 1):
+        block = (
+            f"Pergunta {i}: {compact_value(qr.get('question')) or 'N/A'}\n"
+            f"Resposta {i}: {compact_value(qr.get('answer')) or 'N/A'}\n"
+        )
+        used += estimate_tokens(block)
+        if used > SECTION_TOKEN_BUDGETS["question_responses"] and lines:
+            lines.append(f"(+{len(question_responses) - i + 1} respostas omitidas)\n")
+            break
+        lines.append(block)
+    return "".join(lines)
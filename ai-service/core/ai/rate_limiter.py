@@ -0,0 +1,346 @@
+"""
+Controle de taxa e de concorrência das chamadas aos providers de IA
+
+Dois mecanismos complementares, por (provider, modelo):
+
+- Token bucket de requisições/min e tokens/min compartilhado entre processos
+  via Redis (script Lua atômico, com o relógio do Redis). Todos os workers do
+  uvicorn consomem o mesmo orçamento, então rajadas esperam em vez de virar 429.
+  Sem Redis, o bucket é local ao processo.
+- Limite de concorrência adaptativo (AIMD): cresce +1 a cada "janela" de
+  chamadas bem-sucedidas e cai multiplicativamente quando o provider responde
+  429 ou quando a latência passa do alvo.
+
+Chamadas que recebem 429 aguardam (Retry-After ou backoff) e são repetidas
+enquanto houver tempo dentro de PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS.
+"""
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from shared.exceptions import ProviderRateLimitError, RateLimitExceededError
+from shared.metrics import metrics
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RATE_LIMIT_KEY_PREFIX = "ai-service:rate-limit"
+
+metrics.describe("ai_service_rate_limit_wait_seconds_total", "Tempo aguardando orçamento de rate limit, por provider/modelo")
+metrics.describe("ai_service_provider_throttled_total", "Respostas 429 recebidas dos providers, por provider/modelo")
+metrics.describe("ai_service_provider_concurrency_limit", "Limite de concorrência adaptativo atual, por provider/modelo")
+metrics.describe("ai_service_provider_in_flight", "Chamadas em andamento, por provider/modelo")
+
+# KEYS[1] = bucket de requisições, KEYS[2] = bucket de tokens
+# ARGV[1] = requisições/min, ARGV[2] = tokens/min, ARGV[3] = custo em tokens, ARGV[4] = TTL (ms)
+# Retorna {1, 0} se o orçamento foi reservado ou {0, espera em ms}
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+
+local function available(key, capacity)
+    local data = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    return math.min(capacity, tokens + math.max(0, now - ts) * capacity / 60000)
+end
+
+if cost > tpm then
+    cost = tpm
+end
+
+local requests = 0
+local tokens = 0
+local wait = 0
+if rpm > 0 then
+    requests = available(KEYS[1], rpm)
+    if requests < 1 then
+        wait = math.max(wait, (1 - requests) * 60000 / rpm)
+    end
+end
+if tpm > 0 then
+    tokens = available(KEYS[2], tpm)
+    if tokens < cost then
+        wait = math.max(wait, (cost - tokens) * 60000 / tpm)
+    end
+end
+if wait > 0 then
+    return {0, math.ceil(wait)}
+end
+
+if rpm > 0 then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(requests - 1), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], ttl)
+end
+if tpm > 0 then
+    redis.call('HSET', KEYS[2], 'tokens', tostring(tokens - cost), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[2], ttl)
+end
+return {1, 0}
+"""
+
+
+class LocalTokenBucket:
+    """Mesmo algoritmo do script Lua, em memória (quando não há Redis)"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def try_acquire(self, cost: int) -> float:
+        """Reserva 1 requisição e `cost` tokens; retorna 0 ou os segundos de espera"""
+        self._refill()
+        cost = min(cost, self.tokens_per_minute) if self.tokens_per_minute > 0 else 0
+        wait = 0.0
+        if self.requests_per_minute > 0 and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute > 0 and self._tokens < cost:
+            wait = max(wait, (cost - self._tokens) * 60 / self.tokens_per_minute)
+        if wait > 0:
+            return wait
+        self._requests -= 1
+        self._tokens -= cost
+        return 0.0
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limite de chamadas simultâneas com aumento aditivo e redução multiplicativa (AIMD)"""
+
+    def __init__(self, initial: float = 10, min_limit: int = 1, max_limit: int = 50,
+                 latency_target_seconds: float = 20.0,
+                 decrease_factor: float = 0.5, latency_decrease_factor: float = 0.9,
+                 decrease_cooldown_seconds: float = 1.0):
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_seconds = latency_target_seconds
+        self.decrease_factor = decrease_factor
+        self.latency_decrease_factor = latency_decrease_factor
+        self.decrease_cooldown_seconds = decrease_cooldown_seconds
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, outcome: str, latency_seconds: float) -> None:
+        """
+        Libera a vaga e ajusta o limite
+
+        Args:
+            outcome: "ok", "throttled" (429) ou outro valor ("error", "streamed"),
+                que libera a vaga sem alterar o limite
+            latency_seconds: Duração da chamada
+        """
+        async with self._condition:
+            self.in_flight -= 1
+            if outcome == "throttled":
+                self._decrease(self.decrease_factor)
+            elif outcome == "ok" and latency_seconds > self.latency_target_seconds:
+                self._decrease(self.latency_decrease_factor)
+            elif outcome == "ok":
+                # +1 a cada `limit` chamadas bem-sucedidas (uma janela cheia)
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def _decrease(self, factor: float) -> None:
+        # Várias chamadas da mesma rajada recebem 429 juntas; reduz uma vez por janela
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown_seconds:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+
+
+class ProviderRateController:
+    """Aplica rate limit e concorrência adaptativa às chamadas de um processo"""
+
+    def __init__(self, redis_client=None, requests_per_minute: int = 0, tokens_per_minute: int = 0,
+                 limit_overrides: Optional[Dict[str, Tuple[int, int]]] = None,
+                 max_wait_seconds: float = 60.0, concurrency: Optional[Dict[str, Any]] = None):
+        """
+        Inicializa o controlador
+
+        Args:
+            redis_client: Cliente Redis assíncrono (None = buckets locais ao processo)
+            requests_per_minute: Limite padrão de requisições/min (0 = sem limite)
+            tokens_per_minute: Limite padrão de tokens/min (0 = sem limite)
+            limit_overrides: Limites por "provider:modelo" ou "provider:*"
+            max_wait_seconds: Tempo máximo aguardando orçamento antes de falhar
+            concurrency: Parâmetros do AdaptiveConcurrencyLimiter
+        """
+        self._redis = redis_client
+        self._script = redis_client.register_script(TOKEN_BUCKET_SCRIPT) if redis_client is not None else None
+        self.default_limits = (requests_per_minute, tokens_per_minute)
+        self.limit_overrides = limit_overrides or {}
+        self.max_wait_seconds = max_wait_seconds
+        self._concurrency_config = concurrency or {}
+        self._local_buckets: Dict[str, LocalTokenBucket] = {}
+        self._limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+    def limits_for(self, provider: str, model: str) -> Tuple[int, int]:
+        """(requisições/min, tokens/min) de um provider/modelo"""
+        return (
+            self.limit_overrides.get(f"{provider}:{model}")
+            or self.limit_overrides.get(f"{provider}:*")
+            or self.default_limits
+        )
+
+    def concurrency_limiter(self, provider: str, model: str) -> AdaptiveConcurrencyLimiter:
+        key = f"{provider}:{model}"
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(**self._concurrency_config)
+            self._limiters[key] = limiter
+        return limiter
+
+    async def _try_acquire(self, provider: str, model: str, cost: int) -> float:
+        requests_per_minute, tokens_per_minute = self.limits_for(provider, model)
+        if requests_per_minute <= 0 and tokens_per_minute <= 0:
+            return 0.0
+        key = f"{provider}:{model}"
+        if self._script is not None:
+            try:
+                allowed, wait_ms = await self._script(
+                    keys=[f"{RATE_LIMIT_KEY_PREFIX}:{key}:requests", f"{RATE_LIMIT_KEY_PREFIX}:{key}:tokens"],
+                    args=[requests_per_minute, tokens_per_minute, cost, 120000]
+                )
+                return 0.0 if int(allowed) == 1 else int(wait_ms) / 1000
+            except Exception as e:
+                # Redis indisponível: segue com o bucket local em vez de bloquear as chamadas
+                logger.warning(f"⚠️ Rate limiter no Redis indisponível, usando bucket local: {str(e)}")
+        bucket = self._local_buckets.get(key)
+        if bucket is None:
+            bucket = LocalTokenBucket(requests_per_minute, tokens_per_minute)
+            self._local_buckets[key] = bucket
+        return bucket.try_acquire(cost)
+
+    async def acquire_budget(self, provider: str, model: str, cost: int, deadline: float) -> None:
+        """
+        Aguarda até reservar 1 requisição e `cost` tokens
+
+        Raises:
+            RateLimitExceededError: Orçamento não disponível antes do deadline
+        """
+        started = time.monotonic()
+        while True:
+            wait = await self._try_acquire(provider, model, cost)
+            if wait <= 0:
+                break
+            remaining = deadline - time.monotonic()
+            if wait > remaining:
+                raise RateLimitExceededError(
+                    f"Rate limit de {provider}:{model} sem orçamento disponível em {self.max_wait_seconds}s",
+                    retry_after=wait
+                )
+            # Jitter para que os processos em espera não tentem todos no mesmo instante
+            await asyncio.sleep(wait + random.uniform(0, 0.05))
+        waited = time.monotonic() - started
+        if waited > 0.01:
+            metrics.inc("ai_service_rate_limit_wait_seconds_total", waited, provider=provider, model=model)
+            logger.info(f"⏳ Aguardou {waited:.2f}s por orçamento de rate limit - {provider}:{model}")
+
+    @asynccontextmanager
+    async def _slot(self, provider: str, model: str) -> AsyncIterator[Dict[str, str]]:
+        limiter = self.concurrency_limiter(provider, model)
+        await limiter.acquire()
+        metrics.set_gauge("ai_service_provider_in_flight", limiter.in_flight, provider=provider, model=model)
+        state = {"outcome": "error"}
+        start = time.perf_counter()
+        try:
+            yield state
+        finally:
+            await limiter.release(state["outcome"], time.perf_counter() - start)
+            metrics.set_gauge("ai_service_provider_in_flight", limiter.in_flight, provider=provider, model=model)
+            metrics.set_gauge("ai_service_provider_concurrency_limit", limiter.limit, provider=provider, model=model)
+
+    @asynccontextmanager
+    async def reserve(self, provider: str, model: str, cost: int) -> AsyncIterator[None]:
+        """
+        Reserva orçamento e uma vaga de concorrência para uma chamada sem retry (streaming)
+
+        A duração de um stream depende do tamanho da resposta, então ela não
+        entra no ajuste do limite por latência; apenas 429 reduz o limite.
+
+        Raises:
+            RateLimitExceededError: Orçamento não disponível dentro do tempo máximo
+        """
+        await self.acquire_budget(provider, model, cost, time.monotonic() + self.max_wait_seconds)
+        async with self._slot(provider, model) as state:
+            try:
+                yield
+                state["outcome"] = "streamed"
+            except ProviderRateLimitError:
+                state["outcome"] = "throttled"
+                metrics.inc("ai_service_provider_throttled_total", provider=provider, model=model)
+                raise
+
+    async def run(self, provider: str, model: str, cost: int, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Executa uma chamada ao provider respeitando o orçamento e a concorrência
+
+        Em caso de 429, aguarda o Retry-After (ou backoff exponencial) e repete
+        enquanto houver tempo dentro de max_wait_seconds.
+
+        Raises:
+            RateLimitExceededError: Orçamento ou tentativas esgotados dentro do tempo máximo
+        """
+        deadline = time.monotonic() + self.max_wait_seconds
+        attempt = 0
+        while True:
+            await self.acquire_budget(provider, model, cost, deadline)
+            async with self._slot(provider, model) as state:
+                try:
+                    result = await call()
+                    state["outcome"] = "ok"
+                    return result
+                except ProviderRateLimitError as e:
+                    state["outcome"] = "throttled"
+                    metrics.inc("ai_service_provider_throttled_total", provider=provider, model=model)
+                    backoff = e.retry_after or min(30.0, 2 ** attempt) + random.uniform(0, 0.5)
+            attempt += 1
+            if time.monotonic() + backoff > deadline:
+                raise RateLimitExceededError(
+                    f"Provider {provider}:{model} continua limitando requisições (429)", retry_after=backoff
+                )
+            logger.warning(f"🚦 429 de {provider}:{model}; nova tentativa em {backoff:.1f}s")
+            await asyncio.sleep(backoff)
+
+
+def parse_limit_overrides(value: Optional[str]) -> Dict[str, Tuple[int, int]]:
+    """
+    Lê limites por modelo no formato "openai:gpt-4o=500/300000,anthropic:*=50/80000"
+
+    Returns:
+        Dict "provider:modelo" -> (requisições/min, tokens/min)
+    """
+    overrides: Dict[str, Tuple[int, int]] = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        key, limits = item.strip().split("=", 1)
+        requests_per_minute, _, tokens_per_minute = limits.partition("/")
+        overrides[key.strip()] = (int(requests_per_minute or 0), int(tokens_per_minute or 0))
+    return overrides
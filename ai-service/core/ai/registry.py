@@ -0,0 +1,126 @@
+"""
+Registro de providers de IA compartilhados pelo processo
+"""
+import logging
+from typing import Dict, Any, Optional, Tuple
+from shared.config import AIProvider, Config
+from .base import BaseAIProvider
+from .factory import AIProviderFactory
+from .rate_limiter import ProviderRateController
+from .router import ProviderRouter, Route, parse_routes
+from .service import AIService, is_valid_evaluation_output
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+
+class ProviderRegistry:
+    """
+    Mantém uma única instância de provider por (provider, api_key).
+
+    Cada provider carrega seu próprio cliente HTTP com pool de conexões, então
+    reaproveitar a instância evita um novo handshake TLS (e um cliente que nunca
+    é fechado) a cada requisição. O ciclo de vida é controlado pelo lifespan da
+    aplicação em api/main.py, que chama aclose() no encerramento.
+
+    O registro também guarda o controle de rate limit/concorrência, repassado a
+    todos os AIService criados por ele.
+    """
+
+    def __init__(self, rate_controller: Optional[ProviderRateController] = None):
+        self._providers: Dict[Tuple[AIProvider, str], BaseAIProvider] = {}
+        self.rate_controller = rate_controller
+        self._routers: Dict[Tuple[Route, ...], ProviderRouter] = {}
+
+    def get_provider(self, provider: AIProvider, api_key: Optional[str] = None) -> BaseAIProvider:
+        """
+        Retorna a instância compartilhada do provider, criando-a na primeira chamada
+
+        Args:
+            provider: Provider de IA
+            api_key: API key opcional (se não fornecida, usa a do ambiente)
+
+        Returns:
+            Instância do provider
+
+        Raises:
+            ProviderNotSupportedError: Se o provider não é suportado
+            ProviderNotConfiguredError: Se o provider não está configurado
+        """
+        key = (provider, api_key or Config.get_provider_api_key(provider) or "")
+        instance = self._providers.get(key)
+        if instance is None:
+            instance = AIProviderFactory.create_provider(provider, api_key)
+            self._providers[key] = instance
+            logger.info(f"🔌 Provider criado e registrado: {provider.value}")
+        return instance
+
+    def get_ai_service(self, provider: AIProvider, api_key: Optional[str] = None) -> AIService:
+        """
+        Cria um AIService leve que usa a instância compartilhada do provider
+
+        Args:
+            provider: Provider de IA
+            api_key: API key opcional
+
+        Returns:
+            AIService configurado
+        """
+        return AIService(
+            provider,
+            provider_instance=self.get_provider(provider, api_key),
+            rate_controller=self.rate_controller
+        )
+
+    def get_routed_ai_service(self, provider: AIProvider, model: str) -> AIService:
+        """
+        AIService que usa (provider, model) como rota principal e as rotas de
+        EVALUATION_FALLBACK_ROUTES para failover e hedge
+
+        Sem rotas alternativas, equivale a get_ai_service(provider). O roteador
+        (e suas estatísticas de latência/erro) é reaproveitado entre requisições;
+        respostas sem JSON de notas válido contam como falha da rota (failover).
+
+        Args:
+            provider: Provider da rota principal
+            model: Modelo da rota principal
+
+        Returns:
+            AIService configurado
+        """
+        primary = Route(provider, model)
+        routes = tuple([primary] + [route for route in parse_routes(Config.EVALUATION_FALLBACK_ROUTES)
+                                    if route != primary])
+        if len(routes) == 1:
+            return self.get_ai_service(provider)
+        router = self._routers.get(routes)
+        if router is None:
+            router = ProviderRouter(
+                self,
+                routes,
+                hedge_budget_ratio=Config.HEDGE_BUDGET_RATIO,
+                hedge_min_delay_seconds=Config.HEDGE_MIN_DELAY_SECONDS,
+                hedge_max_delay_seconds=Config.HEDGE_MAX_DELAY_SECONDS,
+                error_threshold=Config.ROUTER_ERROR_THRESHOLD,
+                validator=is_valid_evaluation_output
+            )
+            self._routers[routes] = router
+            logger.info(f"🔀 Roteador criado: {', '.join(route.key for route in routes)}")
+        return AIService(provider, provider_instance=router)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os providers atualmente registrados"""
+        return {
+            "registered_providers": [provider.value for provider, _ in self._providers.keys()],
+            "total": len(self._providers),
+            "routers": [router.get_provider_info() for router in self._routers.values()]
+        }
+
+    async def aclose(self) -> None:
+        """Fecha os clientes HTTP de todos os providers registrados"""
+        for (provider, _), instance in list(self._providers.items()):
+            try:
+                await instance.aclose()
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao fechar provider {provider.value}: {str(e)}")
+        self._providers.clear()
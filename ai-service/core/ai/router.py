@@ -0,0 +1,336 @@
+"""
+Roteamento entre providers/modelos com failover e requisições "hedged"
+
+Uma rota é um par (provider, modelo). A primeira rota configurada é a
+preferida; as demais são alternativas. Para cada chamada:
+
+- a rota preferida é chamada primeiro, a menos que sua taxa de erro (EWMA)
+  esteja acima do limite; rotas com erro vão para o fim da fila;
+- se a resposta não chega até o p95 de latência da rota, uma segunda
+  requisição ("hedge") vai para a alternativa de menor latência (EWMA). A
+  primeira resposta válida vence e a outra é cancelada;
+- hedges são limitados por orçamento (ex: no máximo 5% de chamadas extras);
+- se uma rota falha, a próxima é chamada (failover, fora do orçamento).
+
+A preferência não muda por latência: trocar de modelo muda as notas, então
+a rota alternativa só é usada quando a preferida está lenta ou falhando. Quem
+precisa saber qual rota respondeu (ex: o cache de notas, que só guarda
+respostas da rota principal) usa `record_answered_route()`.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from shared.config import AIProvider
+from shared.exceptions import AIProviderError
+from shared.metrics import metrics
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+metrics.describe("ai_service_router_requests_total", "Chamadas roteadas, por rota vencedora e resultado")
+metrics.describe("ai_service_router_hedges_total", "Requisições hedged disparadas, por rota alternativa")
+metrics.describe("ai_service_router_hedge_wins_total", "Requisições hedged que responderam primeiro")
+metrics.describe("ai_service_router_failovers_total", "Failovers para outra rota após erro, por rota de destino")
+metrics.describe("ai_service_router_latency_ewma_seconds", "Latência média móvel (EWMA) por rota")
+metrics.describe("ai_service_router_error_rate", "Taxa de erro média móvel (EWMA) por rota")
+
+
+class Route(NamedTuple):
+    """Provider e modelo usados em uma chamada"""
+    provider: AIProvider
+    model: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider.value}:{self.model}"
+
+
+class AnsweredRoute:
+    """Rota que respondeu a última chamada roteada dentro de `record_answered_route()`"""
+
+    def __init__(self) -> None:
+        self.route: Optional[Route] = None
+
+
+_answered_route: ContextVar[Optional[AnsweredRoute]] = ContextVar("ai_answered_route", default=None)
+
+
+@contextmanager
+def record_answered_route() -> Iterator[AnsweredRoute]:
+    """
+    Registra qual rota respondeu as chamadas roteadas feitas dentro do bloco
+
+    `route` continua None se nenhuma chamada passou por um ProviderRouter.
+    """
+    answered = AnsweredRoute()
+    token = _answered_route.set(answered)
+    try:
+        yield answered
+    finally:
+        _answered_route.reset(token)
+
+
+def _set_answered_route(route: Route) -> None:
+    answered = _answered_route.get()
+    if answered is not None:
+        answered.route = route
+
+
+def parse_routes(value: Optional[str]) -> List[Route]:
+    """
+    Lê rotas no formato "anthropic:claude-3-5-sonnet-latest,openai:gpt-4.1-mini"
+
+    Raises:
+        ValueError: Provider desconhecido ou item sem modelo
+    """
+    routes = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        provider, separator, model = item.partition(":")
+        if not separator or not model:
+            raise ValueError(f"Rota inválida (esperado provider:modelo): {item}")
+        routes.append(Route(AIProvider(provider.strip()), model.strip()))
+    return routes
+
+
+class RouteStats:
+    """Latência e taxa de erro (EWMA) e amostras recentes de latência de uma rota"""
+
+    def __init__(self, alpha: float = 0.2, window: int = 200, error_half_life_seconds: float = 60.0,
+                 min_samples: int = 20):
+        self.alpha = alpha
+        self.error_half_life_seconds = error_half_life_seconds
+        self.min_samples = min_samples
+        self.latency_ewma: Optional[float] = None
+        self._error_ewma = 0.0
+        self._error_updated_at = time.monotonic()
+        self._samples: deque = deque(maxlen=window)
+
+    def error_rate(self) -> float:
+        """Taxa de erro decaída com o tempo, para que uma rota sem tráfego volte a ser usada"""
+        elapsed = time.monotonic() - self._error_updated_at
+        return self._error_ewma * 0.5 ** (elapsed / self.error_half_life_seconds)
+
+    def _update_error(self, value: float) -> None:
+        self._error_ewma = self.error_rate() * (1 - self.alpha) + value * self.alpha
+        self._error_updated_at = time.monotonic()
+
+    def record_success(self, latency_seconds: float) -> None:
+        self._samples.append(latency_seconds)
+        if self.latency_ewma is None:
+            self.latency_ewma = latency_seconds
+        else:
+            self.latency_ewma = self.latency_ewma * (1 - self.alpha) + latency_seconds * self.alpha
+        self._update_error(0.0)
+
+    def record_error(self) -> None:
+        self._update_error(1.0)
+
+    def p95(self) -> Optional[float]:
+        """p95 das latências recentes (None com poucas amostras)"""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+class HedgeBudget:
+    """Orçamento de hedges: cada chamada rende `ratio` créditos e cada hedge custa 1"""
+
+    def __init__(self, ratio: float, max_credits: float = 10.0):
+        self.ratio = ratio
+        self.max_credits = max_credits
+        self._credits = 0.0
+
+    def record_request(self) -> None:
+        self._credits = min(self.max_credits, self._credits + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._credits < 1:
+            return False
+        self._credits -= 1
+        return True
+
+
+class ProviderRouter:
+    """
+    Provider "virtual" que distribui as chamadas entre rotas
+
+    Implementa a mesma interface de geração dos providers (generate_text,
+    generate_chat), então pode ser usado como provider_instance de um AIService.
+    Cada rota é chamada através do AIService do ProviderRegistry, mantendo o
+    rate limit por provider/modelo.
+    """
+
+    def __init__(self, registry, routes: Sequence[Route], hedge_budget_ratio: float = 0.05,
+                 hedge_min_delay_seconds: float = 2.0, hedge_max_delay_seconds: float = 30.0,
+                 error_threshold: float = 0.5,
+                 validator: Optional[Callable[[Any], bool]] = None):
+        """
+        Inicializa o roteador
+
+        Args:
+            registry: ProviderRegistry usado para obter o AIService de cada rota
+            routes: Rotas em ordem de preferência (a primeira é a principal)
+            hedge_budget_ratio: Fração máxima de chamadas extras por hedge (0 desativa)
+            hedge_min_delay_seconds: Espera mínima antes do hedge
+            hedge_max_delay_seconds: Espera antes do hedge enquanto não há p95 da rota
+            error_threshold: Taxa de erro acima da qual a rota deixa de ser a primeira
+            validator: Decide se uma resposta é válida (padrão: texto não vazio)
+        """
+        if not routes:
+            raise ValueError("O roteador precisa de pelo menos uma rota")
+        self.registry = registry
+        self.routes = list(routes)
+        self.budget = HedgeBudget(hedge_budget_ratio)
+        self.hedge_min_delay_seconds = hedge_min_delay_seconds
+        self.hedge_max_delay_seconds = hedge_max_delay_seconds
+        self.error_threshold = error_threshold
+        self.validator = validator or (lambda response: isinstance(response, str) and bool(response.strip()))
+        self.stats: Dict[Route, RouteStats] = {route: RouteStats() for route in self.routes}
+
+    def ordered_routes(self) -> List[Route]:
+        """Rotas saudáveis na ordem configurada, seguidas das com erro (menor taxa primeiro)"""
+        healthy = [route for route in self.routes if self.stats[route].error_rate() <= self.error_threshold]
+        failing = sorted(
+            (route for route in self.routes if route not in healthy),
+            key=lambda route: self.stats[route].error_rate()
+        )
+        return healthy + failing
+
+    def hedge_delay(self, route: Route) -> float:
+        p95 = self.stats[route].p95()
+        if p95 is None:
+            return self.hedge_max_delay_seconds
+        return min(self.hedge_max_delay_seconds, max(self.hedge_min_delay_seconds, p95))
+
+    def _next_alternative(self, remaining: List[Route]) -> Route:
+        """Alternativa de menor latência média; rotas sem histórico mantêm a ordem configurada"""
+        best = min(
+            remaining,
+            key=lambda route: (self.stats[route].latency_ewma is None, self.stats[route].latency_ewma or 0)
+        )
+        remaining.remove(best)
+        return best
+
+    async def _call_route(self, route: Route, method: str, payload: Any, kwargs: Dict[str, Any]) -> Any:
+        stats = self.stats[route]
+        start = time.perf_counter()
+        try:
+            service = self.registry.get_ai_service(route.provider)
+            response = await getattr(service, method)(payload, **{**kwargs, "model": route.model})
+        except asyncio.CancelledError:
+            # Perdedor de um hedge: não conta como erro nem como latência
+            raise
+        except Exception:
+            stats.record_error()
+            self._publish_stats(route)
+            raise
+        if self.validator(response):
+            stats.record_success(time.perf_counter() - start)
+        else:
+            stats.record_error()
+        self._publish_stats(route)
+        return response
+
+    def _publish_stats(self, route: Route) -> None:
+        stats = self.stats[route]
+        if stats.latency_ewma is not None:
+            metrics.set_gauge("ai_service_router_latency_ewma_seconds", stats.latency_ewma, route=route.key)
+        metrics.set_gauge("ai_service_router_error_rate", stats.error_rate(), route=route.key)
+
+    async def _route(self, method: str, payload: Any, kwargs: Dict[str, Any]) -> Any:
+        ordered = self.ordered_routes()
+        primary, remaining = ordered[0], ordered[1:]
+        self.budget.record_request()
+        pending: Dict[asyncio.Task, Route] = {}
+        hedge_pending = bool(remaining)
+        last_error: Optional[Exception] = None
+
+        def start(route: Route) -> None:
+            task = asyncio.create_task(self._call_route(route, method, payload, kwargs))
+            pending[task] = route
+
+        start(primary)
+        try:
+            while pending:
+                timeout = self.hedge_delay(primary) if hedge_pending and remaining else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # A rota principal passou do p95: hedge, se houver orçamento
+                    hedge_pending = False
+                    if self.budget.try_spend():
+                        route = self._next_alternative(remaining)
+                        metrics.inc("ai_service_router_hedges_total", route=route.key)
+                        logger.info(f"🏁 Hedge: {primary.key} lento, chamando também {route.key}")
+                        start(route)
+                    continue
+                for task in done:
+                    route = pending.pop(task)
+                    error = task.exception()
+                    if error is None and self.validator(task.result()):
+                        if route != primary:
+                            metrics.inc("ai_service_router_hedge_wins_total", route=route.key)
+                        metrics.inc("ai_service_router_requests_total", route=route.key, result="ok")
+                        _set_answered_route(route)
+                        return task.result()
+                    last_error = error or AIProviderError(f"Resposta inválida da rota {route.key}")
+                    logger.warning(f"⚠️ Rota {route.key} falhou: {str(last_error)}")
+                    if not pending and remaining:
+                        next_route = self._next_alternative(remaining)
+                        metrics.inc("ai_service_router_failovers_total", route=next_route.key)
+                        logger.info(f"🔀 Failover para {next_route.key}")
+                        start(next_route)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        metrics.inc("ai_service_router_requests_total", route=primary.key, result="error")
+        raise last_error
+
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        return await self._route("generate_text", prompt, kwargs)
+
+    async def generate_chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return await self._route("generate_chat", messages, kwargs)
+
+    async def stream_text(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        # Um stream já começou a ser entregue ao cliente: sem hedge nem failover
+        route = self.ordered_routes()[0]
+        _set_answered_route(route)
+        service = self.registry.get_ai_service(route.provider)
+        async for chunk in service.stream_text(prompt, **{**kwargs, "model": route.model}):
+            yield chunk
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        # Embeddings de modelos diferentes não são comparáveis: sempre a rota principal
+        return await self.registry.get_ai_service(self.routes[0].provider).generate_embedding(text)
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return await self.registry.get_ai_service(self.routes[0].provider).generate_embeddings(texts)
+
+    def get_provider_info(self) -> Dict[str, Any]:
+        return {
+            "provider": "router",
+            "routes": [route.key for route in self.routes],
+            "stats": {
+                route.key: {
+                    "latency_ewma_seconds": self.stats[route].latency_ewma,
+                    "error_rate": round(self.stats[route].error_rate(), 4),
+                    "p95_seconds": self.stats[route].p95(),
+                }
+                for route in self.routes
+            },
+        }
+
+    async def aclose(self) -> None:
+        """Os providers das rotas pertencem ao ProviderRegistry, que os fecha"""
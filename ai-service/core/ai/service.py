@@ -1,31 +1,109 @@
 """
 Serviço principal de IA que gerencia diferentes providers
 """
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
+from pydantic import ValidationError
 from shared.config import AIProvider, Config
-from shared.exceptions import AIProviderError
+from shared.exceptions import AIProviderError, TextGenerationError
+from shared.metrics import metrics
+from shared.tracing import start_span
+from shared.cache import ResultCache
+from .embeddings import (
+    build_embedding_cache_key,
+    chunk_texts,
+    decode_embedding_base64,
+    encode_embedding_base64
+)
+from .evaluation_cache import EvaluationScoreCache, build_evaluation_fingerprint
+from .prompt_compaction import (
+    build_job_text,
+    build_question_responses_text,
+    build_resume_text,
+    estimate_tokens
+)
 from .factory import AIProviderFactory
 from .base import BaseAIProvider
+from .rate_limiter import ProviderRateController
+from .router import Route, record_answered_route
+from .structured_output import get_output_model, parse_json_output, structured_output_kwargs
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
+metrics.describe_histogram(
+    "ai_service_evaluation_prompt_tokens",
+    "Tokens estimados do prompt de avaliação de candidatos",
+    buckets=(250, 500, 750, 1000, 1500, 2000, 3000, 4000, 6000, 8000)
+)
+metrics.describe("ai_service_embedding_texts_total", "Textos recebidos para embedding por origem (cache, provider, duplicate)")
+metrics.describe("ai_service_embedding_provider_batches_total", "Requisições de embeddings em lote enviadas ao provider")
+
+
+def parse_evaluation_scores(response_text: str) -> Dict[str, int]:
+    """
+    Lê as notas da resposta da avaliação, validadas pelo CandidateScores
+
+    Raises:
+        TextGenerationError: Resposta sem JSON ou com nota ausente, não numérica
+            ou fora de 0-100. Antes a nota inválida virava 50 (ou 0, se ausente),
+            o que distorcia o ranking; agora a avaliação falha e não entra no cache.
+    """
+    scores = parse_json_output(response_text, "candidate_evaluation")
+    if scores is None:
+        raise TextGenerationError("Resposta da avaliação sem JSON válido")
+    try:
+        return get_output_model("candidate_evaluation").model_validate(scores).model_dump()
+    except ValidationError as e:
+        logger.warning("⚠️ Notas inválidas na resposta da avaliação: %s", e)
+        raise TextGenerationError(f"Notas inválidas na resposta da avaliação: {e}")
+
+
+def is_valid_evaluation_output(response: Any) -> bool:
+    """Validador do roteador na avaliação: resposta sem notas válidas vai para failover"""
+    if not isinstance(response, str):
+        return False
+    try:
+        parse_evaluation_scores(response)
+    except TextGenerationError:
+        return False
+    return True
+
 
 class AIService:
     """Serviço principal para gerenciar diferentes providers de IA"""
     
-    def __init__(self, provider: AIProvider, api_key: Optional[str] = None, **kwargs):
+    def __init__(self, provider: AIProvider, api_key: Optional[str] = None,
+                 provider_instance: Optional[BaseAIProvider] = None,
+                 rate_controller: Optional[ProviderRateController] = None, **kwargs):
         """
         Inicializa o serviço de IA
         
         Args:
             provider: Provider de IA a ser usado
             api_key: API key opcional
+            provider_instance: Instância já criada do provider (ex: compartilhada
+                pelo ProviderRegistry). Se omitida, uma nova instância é criada.
+            rate_controller: Controle de rate limit/concorrência (None = chamadas diretas)
             **kwargs: Parâmetros adicionais para o provider
         """
         self.provider = provider
-        self.provider_instance = AIProviderFactory.create_provider(provider, api_key, **kwargs)
+        if provider_instance is None:
+            provider_instance = AIProviderFactory.create_provider(provider, api_key, **kwargs)
+        self.provider_instance = provider_instance
+        self.rate_controller = rate_controller
+    
+    def _resolve_model(self, kwargs: Dict[str, Any]) -> str:
+        """Modelo efetivo da chamada: o informado ou o padrão do provider"""
+        return kwargs.get("model") or self.provider_instance.default_model or Config.DEFAULT_MODEL
+    
+    async def _call_provider(self, call, prompt_tokens: int, **kwargs):
+        """Executa a chamada ao provider, passando pelo rate limit quando configurado"""
+        if self.rate_controller is None:
+            return await call()
+        cost = prompt_tokens + kwargs.get("max_tokens", Config.PROVIDER_ESTIMATED_COMPLETION_TOKENS)
+        return await self.rate_controller.run(self.provider.value, self._resolve_model(kwargs), cost, call)
     
     async def generate_text(self, prompt: str, **kwargs) -> str:
         """
@@ -39,30 +117,64 @@ class AIService:
             Texto gerado
         """
         logger.info(
-            f"🚀 Iniciando geração de texto - provider: {self.provider.value}, prompt_length: {len(prompt)}"
-        )
-        
-        # Log antes de chamar o provider
-        logger.info(
-            f"⏳ Aguardando resposta da API externa... - provider: {self.provider.value}, prompt_length: {len(prompt)}"
+            "🚀 Iniciando geração de texto - provider: %s, prompt_length: %d",
+            self.provider.value, len(prompt), extra={"event": "generation"}
         )
         
+        span_attributes = {
+            "ai.provider": self.provider.value,
+            "ai.model": self._resolve_model(kwargs),
+            "ai.prompt_length": len(prompt),
+        }
         try:
-            response = await self.provider_instance.generate_text(prompt, **kwargs)
+            with start_span("ai.generate_text", span_attributes, kind="client") as span:
+                response = await self._call_provider(
+                    lambda: self.provider_instance.generate_text(prompt, **kwargs), estimate_tokens(prompt), **kwargs
+                )
+                if span is not None:
+                    span.set_attribute("ai.response_length", len(response) if response else 0)
             
             # Log após receber resposta
             logger.info(
-                f"✅ Resposta recebida da API externa - provider: {self.provider.value}, response_length: {len(response) if response else 0}"
+                "✅ Resposta recebida da API externa - provider: %s, response_length: %d",
+                self.provider.value, len(response) if response else 0, extra={"event": "generation"}
             )
             
             return response
             
         except Exception as e:
-            logger.error(
-                f"❌ Erro na chamada para API externa - provider: {self.provider.value}, error: {str(e)}"
-            )
+            logger.error("❌ Erro na chamada para API externa - provider: %s, error: %s", self.provider.value, e)
             raise
     
+    async def stream_text(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Gera texto em partes, à medida que o provider as devolve
+        
+        Args:
+            prompt: Prompt para geração
+            **kwargs: Parâmetros adicionais
+            
+        Returns:
+            Iterador assíncrono com os trechos de texto
+        """
+        logger.info(
+            "🚀 Iniciando streaming de texto - provider: %s, prompt_length: %d",
+            self.provider.value, len(prompt), extra={"event": "generation"}
+        )
+        stream = self.provider_instance.stream_text(prompt, **kwargs)
+        try:
+            if self.rate_controller is None:
+                async for chunk in stream:
+                    yield chunk
+            else:
+                cost = estimate_tokens(prompt) + kwargs.get("max_tokens", Config.PROVIDER_ESTIMATED_COMPLETION_TOKENS)
+                async with self.rate_controller.reserve(self.provider.value, self._resolve_model(kwargs), cost):
+                    async for chunk in stream:
+                        yield chunk
+        finally:
+            # Propaga o encerramento (cliente desconectado, cancelamento) até a chamada ao provider
+            await stream.aclose()
+    
     async def generate_chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """
         Gera resposta de chat usando o provider configurado
@@ -74,7 +186,10 @@ class AIService:
         Returns:
             Resposta gerada
         """
-        return await self.provider_instance.generate_chat(messages, **kwargs)
+        prompt_tokens = sum(estimate_tokens(message.get("content") or "") for message in messages)
+        return await self._call_provider(
+            lambda: self.provider_instance.generate_chat(messages, **kwargs), prompt_tokens, **kwargs
+        )
     
     async def generate_embedding(self, text: str) -> List[float]:
         """
@@ -88,6 +203,89 @@ class AIService:
         """
         return await self.provider_instance.generate_embedding(text)
     
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Gera embeddings de vários textos em uma requisição ao provider
+        
+        Args:
+            texts: Textos (já dentro dos limites de lote do provider)
+            
+        Returns:
+            Embeddings na mesma ordem dos textos
+        """
+        return await self.provider_instance.generate_embeddings(texts)
+    
+    def get_embedding_model(self) -> str:
+        """Provider e modelo de embeddings (compõem as chaves do cache de embeddings)"""
+        model = self.provider_instance.get_provider_info().get("embedding_model", "default")
+        return f"{self.provider.value}:{model}"
+    
+    async def generate_embeddings_cached(self, texts: List[str], cache: Optional[ResultCache] = None,
+                                         max_batch_items: int = Config.EMBEDDING_BATCH_MAX_ITEMS,
+                                         max_batch_tokens: int = Config.EMBEDDING_BATCH_MAX_TOKENS,
+                                         max_concurrency: int = Config.EMBEDDING_BATCH_MAX_CONCURRENCY
+                                         ) -> Tuple[List[List[float]], Dict[str, int]]:
+        """
+        Gera embeddings de vários textos, deduplicando e reaproveitando o cache
+        
+        Args:
+            texts: Textos (podem se repetir)
+            cache: Cache de embeddings por conteúdo (se None, todos vão ao provider)
+            max_batch_items: Máximo de textos por requisição ao provider
+            max_batch_tokens: Máximo estimado de tokens por requisição ao provider
+            max_concurrency: Requisições simultâneas ao provider
+            
+        Returns:
+            Tupla (embeddings na ordem dos textos, contadores unique/cache_hits/provider_texts/provider_batches)
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        model = self.get_embedding_model()
+        keys = {text: build_embedding_cache_key(text, model) for text in unique_texts}
+        vectors: Dict[str, List[float]] = {}
+        
+        use_cache = cache is not None and cache.enabled
+        if use_cache:
+            cached = await cache.get_many(list(keys.values()))
+            for text, key in keys.items():
+                if key in cached:
+                    vectors[text] = decode_embedding_base64(cached[key]["embedding"])
+        
+        misses = [text for text in unique_texts if text not in vectors]
+        batches = chunk_texts(misses, max_batch_items, max_batch_tokens)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def embed_batch(batch: List[str]) -> None:
+            async with semaphore:
+                embeddings = await self.generate_embeddings(batch)
+            metrics.inc("ai_service_embedding_provider_batches_total", provider=self.provider.value)
+            for text, embedding in zip(batch, embeddings):
+                vectors[text] = embedding
+            if use_cache:
+                await cache.set_many({
+                    keys[text]: {"embedding": encode_embedding_base64(embedding)}
+                    for text, embedding in zip(batch, embeddings)
+                })
+        
+        await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        
+        stats = {
+            "unique": len(unique_texts),
+            "cache_hits": len(unique_texts) - len(misses),
+            "provider_texts": len(misses),
+            "provider_batches": len(batches),
+        }
+        metrics.inc("ai_service_embedding_texts_total", stats["cache_hits"], source="cache")
+        metrics.inc("ai_service_embedding_texts_total", stats["provider_texts"], source="provider")
+        metrics.inc("ai_service_embedding_texts_total", len(texts) - len(unique_texts), source="duplicate")
+        if use_cache:
+            metrics.inc("ai_service_cache_requests_total", stats["cache_hits"], cache="embedding", result="hit")
+            metrics.inc("ai_service_cache_requests_total", stats["provider_texts"], cache="embedding", result="miss")
+        logger.info(
+            f"🧮 Embeddings: {len(texts)} textos, {stats['unique']} únicos, "
+            f"{stats['cache_hits']} do cache, {stats['provider_texts']} em {stats['provider_batches']} lotes"
+        )
+        return [vectors[text] for text in texts], stats
+    
     def get_provider_info(self) -> Dict[str, Any]:
         """
         Retorna informações sobre o provider atual
@@ -116,8 +314,27 @@ class AIService:
             "providers_info": providers_info
         }
 
+    @staticmethod
+    def _log_evaluation_input(resume_data: Dict[str, Any], job_data: Dict[str, Any],
+                              question_responses: Optional[List[Dict[str, str]]]) -> None:
+        """Log detalhado (DEBUG) dos dados de entrada de uma avaliação"""
+        logger.debug("👤 Candidato: %s", (resume_data.get('personal_info') or {}).get('name', 'N/A'))
+        logger.debug(
+            "📄 Currículo: %d formações, %d experiências, %d habilidades, %d idiomas",
+            len(resume_data.get('education') or []), len(resume_data.get('experience') or []),
+            len(resume_data.get('skills') or []), len(resume_data.get('languages') or [])
+        )
+        logger.debug(
+            "💼 Vaga: %d requisitos, formação necessária: %s, experiência necessária: %s",
+            len(job_data.get('requirements') or []), job_data.get('education_required', 'N/A'),
+            job_data.get('experience_required', 'N/A')
+        )
+        for i, qr in enumerate(question_responses or [], 1):
+            logger.debug("❓ Pergunta %d: %s...", i, qr.get('question', 'N/A')[:50])
+
     async def evaluate_candidate(self, resume_data: Dict[str, Any], job_data: Dict[str, Any], 
                                question_responses: Optional[List[Dict[str, str]]] = None, 
+                               job_section: Optional[str] = None,
                                **kwargs) -> Dict[str, Any]:
         """
         Avalia a aderência de um candidato a uma vaga
@@ -126,106 +343,202 @@ class AIService:
             resume_data: Dados do currículo do candidato
             job_data: Dados da vaga
             question_responses: Respostas das perguntas (opcional)
+            job_section: Seção da vaga já renderizada (reaproveitada em lotes)
             **kwargs: Parâmetros adicionais
             
         Returns:
             Dict com as notas de avaliação
         """
-        logger.info("🚀 Iniciando avaliação de candidato")
-        logger.info(f"📋 Provider: {self.provider.value}")
-        logger.info(f"🎯 Vaga: {job_data.get('title', 'N/A')}")
-        logger.info(f"👤 Candidato: {resume_data.get('personal_info', {}).get('name', 'N/A')}")
-        
-        # Log dos dados do resume
-        logger.info("📄 Dados do currículo:")
-        logger.info(f"   - Formação: {len(resume_data.get('education', []))} registros")
-        logger.info(f"   - Experiência: {len(resume_data.get('experience', []))} registros")
-        logger.info(f"   - Habilidades: {len(resume_data.get('skills', []))} habilidades")
-        logger.info(f"   - Idiomas: {len(resume_data.get('languages', []))} idiomas")
-        
-        # Log dos dados da vaga
-        logger.info("💼 Dados da vaga:")
-        logger.info(f"   - Requisitos: {len(job_data.get('requirements', []))} requisitos")
-        logger.info(f"   - Formação necessária: {job_data.get('education_required', 'N/A')}")
-        logger.info(f"   - Experiência necessária: {job_data.get('experience_required', 'N/A')}")
-        
-        # Log das respostas das perguntas
-        if question_responses:
-            logger.info(f"❓ Respostas das perguntas: {len(question_responses)} respostas")
-            for i, qr in enumerate(question_responses, 1):
-                logger.info(f"   Pergunta {i}: {qr.get('question', 'N/A')[:50]}...")
-        else:
-            logger.info("❓ Nenhuma resposta de pergunta fornecida")
+        logger.info(
+            "🚀 Iniciando avaliação de candidato - provider: %s, vaga: %s",
+            self.provider.value, job_data.get('title', 'N/A'), extra={"event": "evaluation"}
+        )
+        # Detalhes da entrada só com DEBUG (evita formatar cada pergunta no caminho quente)
+        if logger.isEnabledFor(logging.DEBUG):
+            self._log_evaluation_input(resume_data, job_data, question_responses)
         
         # Constrói o prompt para avaliação
-        logger.info("🔧 Construindo prompt para avaliação...")
-        prompt = self._build_evaluation_prompt(resume_data, job_data, question_responses)
-        logger.info(f"📝 Tamanho do prompt: {len(prompt)} caracteres")
+        prompt = self._build_evaluation_prompt(resume_data, job_data, question_responses, job_section)
+        prompt_tokens = estimate_tokens(prompt)
+        metrics.observe("ai_service_evaluation_prompt_tokens", prompt_tokens)
+        logger.debug("📝 Tamanho do prompt: %d caracteres (~%d tokens)", len(prompt), prompt_tokens)
         
         # Gera a avaliação usando o provider
-        logger.info("🤖 Chamando provider de IA para avaliação...")
         try:
-            evaluation_text = await self.generate_text(prompt, **kwargs)
-            logger.info(f"✅ Resposta recebida do provider ({len(evaluation_text)} caracteres)")
+            evaluation_text = await self.generate_text(
+                prompt, **{**structured_output_kwargs("candidate_evaluation"), **kwargs}
+            )
+            logger.debug("✅ Resposta recebida do provider (%d caracteres)", len(evaluation_text))
         except Exception as e:
-            logger.error(f"❌ Erro ao gerar avaliação: {str(e)}")
+            logger.error("❌ Erro ao gerar avaliação: %s", e)
             raise
         
         # Extrai as notas da resposta
-        logger.info("📊 Extraindo notas da resposta...")
         scores = self._parse_evaluation_response(evaluation_text)
         
-        # Log dos resultados
-        logger.info("📈 Resultados da avaliação:")
-        logger.info(f"   - Nota Geral: {scores['overall_score']}/100")
-        logger.info(f"   - Respostas das Perguntas: {scores['question_responses_score']}/100")
-        logger.info(f"   - Formação Acadêmica: {scores['education_score']}/100")
-        logger.info(f"   - Experiência Profissional: {scores['experience_score']}/100")
-        
         # Análise qualitativa
         overall_score = scores['overall_score']
         if overall_score >= 80:
-            logger.info("🟢 Excelente candidato - Altamente recomendado")
+            recommendation = "🟢 Excelente candidato - Altamente recomendado"
         elif overall_score >= 60:
-            logger.info("🟡 Bom candidato - Recomendado com ressalvas")
+            recommendation = "🟡 Bom candidato - Recomendado com ressalvas"
         else:
-            logger.info("🔴 Candidato não adequado - Não recomendado")
+            recommendation = "🔴 Candidato não adequado - Não recomendado"
         
-        logger.info("✅ Avaliação de candidato concluída com sucesso")
+        logger.info(
+            "📈 Avaliação concluída - geral: %s/100, perguntas: %s/100, formação: %s/100, experiência: %s/100 - %s",
+            overall_score, scores['question_responses_score'], scores['education_score'],
+            scores['experience_score'], recommendation,
+            extra={"event": "evaluation", "prompt_tokens": prompt_tokens},
+        )
         
         return scores
     
-    def _build_evaluation_prompt(self, resume_data: Dict[str, Any], job_data: Dict[str, Any], 
-                                question_responses: Optional[List[Dict[str, str]]] = None) -> str:
+    async def evaluate_candidate_cached(self, resume_data: Dict[str, Any], job_data: Dict[str, Any],
+                                        question_responses: Optional[List[Dict[str, str]]] = None,
+                                        score_cache: Optional[EvaluationScoreCache] = None,
+                                        bypass_cache: bool = False,
+                                        job_section: Optional[str] = None,
+                                        **kwargs) -> Tuple[Dict[str, Any], str, Route]:
         """
-        Constrói o prompt para avaliação do candidato
+        Avalia o candidato reaproveitando notas já calculadas para as mesmas entradas
+        
+        O cache é da rota principal (provider do serviço + modelo): uma resposta
+        vinda de uma rota alternativa (hedge/failover do ProviderRouter) é
+        devolvida, mas não é guardada, para não servir notas de outro modelo
+        como se fossem da principal.
+        
+        Args:
+            resume_data: Dados do currículo do candidato
+            job_data: Dados da vaga
+            question_responses: Respostas das perguntas (opcional)
+            score_cache: Cache de notas (se None, sempre chama o provider)
+            bypass_cache: Força nova avaliação (o resultado substitui o do cache)
+            job_section: Seção da vaga já renderizada (reaproveitada em lotes)
+            **kwargs: Parâmetros adicionais (ex: model)
+            
+        Returns:
+            Tupla (notas, status do cache: "hit", "miss", "bypass" ou "disabled",
+            rota que respondeu)
+        """
+        primary = Route(self.provider, self._resolve_model(kwargs))
+        cache_key = None
+        cache_status = "disabled"
+        if score_cache is not None and score_cache.cache.enabled:
+            fingerprint = build_evaluation_fingerprint(
+                resume_data, job_data, question_responses,
+                provider=primary.provider.value,
+                model=primary.model
+            )
+            cache_key = score_cache.build_key(job_data.get("id"), fingerprint)
+            if bypass_cache:
+                cache_status = "bypass"
+            else:
+                cached_scores = await score_cache.get(cache_key)
+                cache_status = "hit" if cached_scores is not None else "miss"
+                metrics.inc("ai_service_cache_requests_total", cache="evaluation_score", result=cache_status)
+                if cached_scores is not None:
+                    logger.info("⚡ Notas encontradas no cache de avaliação")
+                    return cached_scores, cache_status, primary
+        
+        with record_answered_route() as answered:
+            scores = await self.evaluate_candidate(
+                resume_data, job_data, question_responses, job_section=job_section, **kwargs
+            )
+        route = answered.route or primary
+        if cache_key is not None:
+            if route == primary:
+                await score_cache.set(cache_key, scores)
+            else:
+                logger.info("🔀 Notas da rota alternativa %s não vão para o cache", route.key)
+        return scores, cache_status, route
+    
+    async def evaluate_candidates_batch(self, job_data: Dict[str, Any], candidates: List[Dict[str, Any]],
+                                        max_concurrency: int = 10,
+                                        score_cache: Optional[EvaluationScoreCache] = None,
+                                        bypass_cache: bool = False,
+                                        **kwargs) -> AsyncIterator[Dict[str, Any]]:
         """
-        prompt = f"""
+        Avalia vários candidatos para a mesma vaga, entregando cada resultado assim que fica pronto
+        
+        A seção da vaga é renderizada uma única vez e usada como prefixo idêntico
+        em todos os prompts (o que também permite o cache de prefixo do provider).
+        Falhas individuais não interrompem o lote: o item é retornado com status "error".
+        
+        Args:
+            job_data: Dados da vaga
+            candidates: Lista de dicts com candidate_id, resume e question_responses (opcional)
+            max_concurrency: Máximo de chamadas simultâneas ao provider
+            score_cache: Cache de notas (opcional)
+            bypass_cache: Força nova avaliação de todos os candidatos
+            **kwargs: Parâmetros adicionais (ex: model)
+            
+        Yields:
+            Dict com index, candidate_id, status e scores (com a rota que respondeu) ou error
+        """
+        job_section = self._build_job_section(job_data)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def evaluate_one(index: int, candidate: Dict[str, Any]) -> Dict[str, Any]:
+            result: Dict[str, Any] = {"index": index, "candidate_id": candidate.get("candidate_id")}
+            async with semaphore:
+                try:
+                    scores, cache_status, route = await self.evaluate_candidate_cached(
+                        resume_data=candidate["resume"],
+                        job_data=job_data,
+                        question_responses=candidate.get("question_responses"),
+                        score_cache=score_cache,
+                        bypass_cache=bypass_cache,
+                        job_section=job_section,
+                        **kwargs
+                    )
+                    result.update(
+                        status="ok", scores=scores, cache=cache_status,
+                        provider=route.provider.value, model=route.model
+                    )
+                except Exception as e:
+                    logger.error(f"❌ Erro ao avaliar candidato {result['candidate_id']}: {str(e)}")
+                    result.update(status="error", error=str(e))
+            return result
+        
+        tasks = [asyncio.create_task(evaluate_one(i, c)) for i, c in enumerate(candidates)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Cliente desconectou no meio do lote: não continua gastando chamadas
+            for task in tasks:
+                task.cancel()
+    
+    def _build_job_section(self, job_data: Dict[str, Any]) -> str:
+        """
+        Constrói a seção da vaga do prompt de avaliação
+        """
+        return f"""
 Você é um especialista em recursos humanos e precisa avaliar a aderência de um candidato a uma vaga.
 
 VAGA:
-Título: {job_data.get('title', 'N/A')}
-Descrição: {job_data.get('description', 'N/A')}
-Requisitos: {job_data.get('requirements', [])}
-Responsabilidades: {job_data.get('responsibilities', [])}
-Formação necessária: {job_data.get('education_required', 'N/A')}
-Experiência necessária: {job_data.get('experience_required', 'N/A')}
-Habilidades necessárias: {job_data.get('skills_required', [])}
-
+{build_job_text(job_data)}"""
+    
+    def _build_evaluation_prompt(self, resume_data: Dict[str, Any], job_data: Dict[str, Any], 
+                                question_responses: Optional[List[Dict[str, str]]] = None,
+                                job_section: Optional[str] = None) -> str:
+        """
+        Constrói o prompt para avaliação do candidato
+        
+        Currículo, vaga e respostas são serializados no formato compacto de
+        core.ai.prompt_compaction (sem campos vazios, com orçamento de tokens).
+        Ao alterar o formato, incremente EVALUATION_PROMPT_VERSION.
+        """
+        if job_section is None:
+            job_section = self._build_job_section(job_data)
+        prompt = job_section + f"""
 CURRÍCULO DO CANDIDATO:
-Informações pessoais: {resume_data.get('personal_info', {})}
-Formação acadêmica: {resume_data.get('education', [])}
-Experiência profissional: {resume_data.get('experience', [])}
-Habilidades: {resume_data.get('skills', [])}
-Idiomas: {resume_data.get('languages', [])}
-Conquistas: {resume_data.get('achievements', [])}
-"""
+{build_resume_text(resume_data)}"""
 
         if question_responses:
             prompt += "\nRESPOSTAS DAS PERGUNTAS:\n"
-            for i, qr in enumerate(question_responses, 1):
-                prompt += f"Pergunta {i}: {qr.get('question', 'N/A')}\n"
-                prompt += f"Resposta {i}: {qr.get('answer', 'N/A')}\n"
+            prompt += build_question_responses_text(question_responses)
 
         prompt += """
 Avalie o candidato considerando os seguintes critérios e retorne APENAS um JSON válido com as seguintes chaves:
@@ -249,50 +562,8 @@ Retorne APENAS o JSON, sem texto adicional:
     def _parse_evaluation_response(self, response_text: str) -> Dict[str, Any]:
         """
         Extrai as notas da resposta do modelo de IA
-        """
-        import json
-        import re
         
-        try:
-            # Tenta extrair JSON da resposta
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                scores = json.loads(json_str)
-                
-                # Valida e normaliza as notas
-                scores = {
-                    'overall_score': self._normalize_score(scores.get('overall_score', 0)),
-                    'question_responses_score': self._normalize_score(scores.get('question_responses_score', 0)),
-                    'education_score': self._normalize_score(scores.get('education_score', 0)),
-                    'experience_score': self._normalize_score(scores.get('experience_score', 0))
-                }
-                
-                return scores
-            else:
-                # Fallback: retorna notas padrão
-                return {
-                    'overall_score': 50,
-                    'question_responses_score': 50,
-                    'education_score': 50,
-                    'experience_score': 50
-                }
-                
-        except (json.JSONDecodeError, KeyError, TypeError):
-            # Em caso de erro, retorna notas padrão
-            return {
-                'overall_score': 50,
-                'question_responses_score': 50,
-                'education_score': 50,
-                'experience_score': 50
-            }
-    
-    def _normalize_score(self, score: Any) -> int:
-        """
-        Normaliza uma nota para o intervalo 0-100
+        Raises:
+            TextGenerationError: Resposta sem JSON ou com notas inválidas
         """
-        try:
-            score = int(float(score))
-            return max(0, min(100, score))
-        except (ValueError, TypeError):
-            return 50
+        return parse_evaluation_scores(response_text)
@@ -0,0 +1,113 @@
+"""
+Saída estruturada (JSON) dos providers
+
+Os schemas vêm dos modelos Pydantic de api/models, então o formato pedido ao
+modelo é o mesmo validado pela API. Providers com suporte recebem o schema
+(`json_schema` / `schema_name` nos kwargs de generate_text): OpenAI via
+response_format json_schema e Anthropic via tool use forçado. Os demais
+ignoram esses kwargs e a resposta é lida pelo parser incremental de JSON.
+"""
+import importlib
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from shared.json_stream import extract_json_object
+from shared.metrics import metrics
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+metrics.describe("ai_service_json_parse_failures_total", "Respostas sem JSON válido, por tipo de prompt")
+
+# Tipo de prompt -> modelo Pydantic (módulo, classe, campos de nível superior ou None = todos)
+OUTPUT_MODELS: Dict[str, Tuple[str, str, Optional[Tuple[str, ...]]]] = {
+    "candidate_evaluation": ("api.models.ai", "CandidateScores", None),
+    "resume_parse": ("api.models.resume", "Resume", None),
+    # Parsing por seção (core/resume/sections.py): cada prompt devolve só os campos da sua seção
+    "resume_section_summary": ("api.models.resume", "Resume", ("summary",)),
+    "resume_section_experience": ("api.models.resume", "Resume", ("professionalExperiences",)),
+    "resume_section_education": ("api.models.resume", "Resume", ("academicFormations",)),
+    "resume_section_languages": ("api.models.resume", "Resume", ("languages",)),
+    "resume_section_achievements": ("api.models.resume", "Resume", ("achievements",)),
+}
+
+# Campos preenchidos pelo serviço (identificadores, auditoria), nunca pelo modelo de IA
+EXCLUDED_SCHEMA_FIELDS = frozenset({
+    "id", "applicationId", "application_id", "createdAt", "created_at", "updatedAt", "updated_at",
+})
+
+
+def model_output_schema(model_cls: Any, exclude: frozenset = EXCLUDED_SCHEMA_FIELDS,
+                        only: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+    """
+    JSON Schema (com os aliases) de um modelo Pydantic, sem os campos excluídos
+
+    Args:
+        model_cls: Classe do modelo Pydantic
+        exclude: Campos removidos de todos os objetos do schema (inclusive $defs)
+        only: Se informado, mantém apenas esses campos no objeto de nível superior
+
+    Returns:
+        JSON Schema
+    """
+    schema = model_cls.model_json_schema(by_alias=True)
+    if only is not None:
+        schema["properties"] = {field: schema["properties"][field] for field in only}
+        schema["required"] = [field for field in schema.get("required", []) if field in only]
+
+    def strip(node: Any) -> None:
+        if isinstance(node, dict):
+            properties = node.get("properties")
+            if isinstance(properties, dict):
+                for field in exclude & properties.keys():
+                    del properties[field]
+                if "required" in node:
+                    node["required"] = [field for field in node["required"] if field not in exclude]
+            for value in node.values():
+                strip(value)
+        elif isinstance(node, list):
+            for value in node:
+                strip(value)
+
+    strip(schema)
+    return schema
+
+
+def get_output_model(prompt_type: str) -> Optional[Any]:
+    """Modelo Pydantic da resposta de um tipo de prompt (None se o tipo não tem schema)"""
+    if prompt_type not in OUTPUT_MODELS:
+        return None
+    module_name, class_name, _ = OUTPUT_MODELS[prompt_type]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+@lru_cache(maxsize=None)
+def get_output_schema(prompt_type: str) -> Optional[Dict[str, Any]]:
+    """Schema da resposta de um tipo de prompt (None se o tipo não tem schema)"""
+    model_cls = get_output_model(prompt_type)
+    if model_cls is None:
+        return None
+    return model_output_schema(model_cls, only=OUTPUT_MODELS[prompt_type][2])
+
+
+def structured_output_kwargs(prompt_type: str) -> Dict[str, Any]:
+    """kwargs de generate_text que pedem saída JSON no schema do tipo de prompt"""
+    schema = get_output_schema(prompt_type)
+    if schema is None:
+        return {}
+    return {"json_schema": schema, "schema_name": prompt_type}
+
+
+def parse_json_output(text: Optional[str], prompt_type: str) -> Optional[Dict[str, Any]]:
+    """
+    Lê o objeto JSON de uma resposta, contando falhas por tipo de prompt
+
+    Returns:
+        Dict com os dados ou None se a resposta não tem um objeto JSON válido
+    """
+    data = extract_json_object(text or "")
+    if data is None:
+        metrics.inc("ai_service_json_parse_failures_total", prompt_type=prompt_type)
+        logger.warning(f"⚠️ Resposta sem JSON válido ({prompt_type}): {(text or '')[:200]!r}")
+    return data
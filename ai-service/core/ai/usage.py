@@ -0,0 +1,363 @@
+"""
+Contabilização de tokens, custo e latência de cada chamada aos providers de LLM
+
+Os providers registram o `usage` de cada resposta (prompt, completion e tokens
+de prompt servidos do cache do provider) em `usage_tracker`. Cada registro:
+- soma no escopo da requisição atual (contextvar aberto pelo middleware, com a
+  operação derivada da rota e os ids de vaga/empresa dos headers
+  `X-Job-Id`/`X-Company-Id` enviados pelo async-task-service);
+- vai para um ring buffer em memória (append O(1), sem I/O na requisição),
+  descarregado periodicamente no Redis em hashes diários agregados por
+  operação, modelo, vaga e empresa.
+
+Chaves: `ai-service:usage:<AAAAMMDD>:<dimensão>:<valor>`, com os campos
+calls, prompt_tokens, completion_tokens, cached_tokens, latency_ms e cost_usd
+(nas dimensões job e company também `<operação>:<campo>`).
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from shared.config import Config
+from shared.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+USAGE_KEY_PREFIX = "ai-service:usage"
+USAGE_DIMENSIONS = ("operation", "model", "job", "company")
+USAGE_FIELDS = ("calls", "prompt_tokens", "completion_tokens", "cached_tokens", "latency_ms", "cost_usd")
+
+# Operação de cada rota (primeiro prefixo que casar)
+OPERATION_BY_PATH_PREFIX = (
+    ("/candidates/evaluate", "evaluate"),
+    ("/candidates/index", "embedding"),
+    ("/candidates/rank", "embedding"),
+    ("/resumes", "parse"),
+    ("/question-responses", "question-eval"),
+    ("/jobs", "job-create"),
+    ("/ai/embedding", "embedding"),
+    ("/ai", "generate"),
+)
+
+metrics.describe("ai_service_llm_tokens_total", "Tokens consumidos nos providers, por operação, modelo e tipo")
+metrics.describe("ai_service_llm_cost_usd_total", "Custo estimado (USD) das chamadas aos providers, por operação e modelo")
+metrics.describe("ai_service_usage_records_dropped_total", "Registros de uso descartados (buffer cheio ou falha no Redis)")
+
+
+def operation_for_path(path: str) -> str:
+    """Operação contabilizada para uma rota (ex: /candidates/evaluate-batch -> evaluate)"""
+    for prefix, operation in OPERATION_BY_PATH_PREFIX:
+        if path.startswith(prefix):
+            return operation
+    return "other"
+
+
+def usage_day(timestamp: Optional[float] = None) -> str:
+    """Dia (UTC, AAAAMMDD) usado nas chaves do Redis"""
+    moment = datetime.fromtimestamp(timestamp, tz=timezone.utc) if timestamp is not None else datetime.now(timezone.utc)
+    return moment.strftime("%Y%m%d")
+
+
+def clean_id(value: Optional[str]) -> str:
+    """Id de vaga/empresa vindo de header, limitado para uso em chaves do Redis"""
+    return (value or "").strip()[:128]
+
+
+def openai_token_counts(usage: Any) -> Tuple[int, int, int]:
+    """(prompt, completion, cached) a partir do `usage` de uma resposta da OpenAI"""
+    if usage is None:
+        return 0, 0, 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) if details is not None else 0
+    return (
+        int(getattr(usage, "prompt_tokens", 0) or 0),
+        int(getattr(usage, "completion_tokens", 0) or 0),
+        int(cached or 0),
+    )
+
+
+def anthropic_token_counts(usage: Any) -> Tuple[int, int, int]:
+    """
+    (prompt, completion, cached) a partir do `usage` de uma resposta da Anthropic
+
+    Na Anthropic `input_tokens` não inclui o que veio do cache; aqui o prompt é o
+    total (como na OpenAI) e `cached` é a parte lida do cache.
+    """
+    if usage is None:
+        return 0, 0, 0
+    cached = int(getattr(usage, "cache_read_input_tokens", 0) or 0)
+    created = int(getattr(usage, "cache_creation_input_tokens", 0) or 0)
+    prompt = int(getattr(usage, "input_tokens", 0) or 0) + cached + created
+    return prompt, int(getattr(usage, "output_tokens", 0) or 0), cached
+
+
+@dataclass
+class UsageRecord:
+    """Uma chamada a um provider"""
+    provider: str
+    model: str
+    operation: str
+    job_id: str
+    company_id: str
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    latency_seconds: float
+    cost_usd: float
+    timestamp: float
+
+
+@dataclass
+class UsageScope:
+    """Totais de uma requisição (operação e ids de vaga/empresa vêm do middleware)"""
+    operation: str = "other"
+    job_id: str = ""
+    company_id: str = ""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_seconds: float = 0.0
+    cost_usd: float = 0.0
+    models: List[str] = field(default_factory=list)
+
+    def add(self, record: UsageRecord) -> None:
+        self.calls += 1
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.cached_tokens += record.cached_tokens
+        self.latency_seconds += record.latency_seconds
+        self.cost_usd += record.cost_usd
+        if record.model not in self.models:
+            self.models.append(record.model)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            "latency_ms": round(self.latency_seconds * 1000, 1),
+            "cost_usd": round(self.cost_usd, 6),
+            "models": list(self.models),
+        }
+
+
+_current_scope: ContextVar[Optional[UsageScope]] = ContextVar("ai_usage_scope", default=None)
+
+
+@contextmanager
+def usage_scope(
+    operation: Optional[str] = None, job_id: Optional[str] = None, company_id: Optional[str] = None
+) -> Iterator[UsageScope]:
+    """Abre um escopo de contabilização; campos omitidos são herdados do escopo atual"""
+    parent = _current_scope.get()
+    scope = UsageScope(
+        operation=operation or (parent.operation if parent else "other"),
+        job_id=clean_id(job_id) or (parent.job_id if parent else ""),
+        company_id=clean_id(company_id) or (parent.company_id if parent else ""),
+    )
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def current_usage_scope() -> Optional[UsageScope]:
+    return _current_scope.get()
+
+
+def load_prices(raw: str) -> Dict[str, Dict[str, float]]:
+    """Tabela de preços (USD por 1M de tokens) a partir do JSON de LLM_PRICES_JSON"""
+    if not raw:
+        return {}
+    try:
+        prices = json.loads(raw)
+    except json.JSONDecodeError:
+        logger.warning("⚠️ LLM_PRICES_JSON inválido; custos não serão estimados")
+        return {}
+    return {model: {k: float(v) for k, v in values.items()} for model, values in prices.items()}
+
+
+class UsageTracker:
+    """Ring buffer de registros de uso, descarregado periodicamente no Redis"""
+
+    def __init__(
+        self,
+        buffer_size: int = 10000,
+        flush_interval_seconds: float = 10.0,
+        retention_days: int = 90,
+        prices: Optional[Dict[str, Dict[str, float]]] = None,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.flush_interval_seconds = flush_interval_seconds
+        self.retention_seconds = retention_days * 86400
+        self.prices = prices or {}
+        self._buffer: deque = deque(maxlen=max(1, buffer_size))
+        self._redis = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def redis(self):
+        return self._redis
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int) -> float:
+        """Custo em USD pela tabela de preços (modelo exato ou maior prefixo); 0 sem preço"""
+        price = self.prices.get(model)
+        if price is None:
+            candidates = [name for name in self.prices if model.startswith(name)]
+            price = self.prices[max(candidates, key=len)] if candidates else None
+        if price is None:
+            return 0.0
+        input_price = price.get("input", 0.0)
+        cached_price = price.get("cached_input", input_price)
+        return (
+            (prompt_tokens - cached_tokens) * input_price
+            + cached_tokens * cached_price
+            + completion_tokens * price.get("output", 0.0)
+        ) / 1_000_000
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int = 0,
+        cached_tokens: int = 0,
+        latency_seconds: float = 0.0,
+    ) -> Optional[UsageRecord]:
+        """Registra uma chamada (chamado pelos providers logo após a resposta)"""
+        if not self.enabled:
+            return None
+        scope = _current_scope.get()
+        operation = scope.operation if scope else "other"
+        record = UsageRecord(
+            provider=provider,
+            model=model or "default",
+            operation=operation,
+            job_id=scope.job_id if scope else "",
+            company_id=scope.company_id if scope else "",
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
+            latency_seconds=latency_seconds,
+            cost_usd=self.estimate_cost(model or "", prompt_tokens, completion_tokens, cached_tokens),
+            timestamp=time.time(),
+        )
+        if scope is not None:
+            scope.add(record)
+
+        for kind, value in (("prompt", prompt_tokens), ("completion", completion_tokens), ("cached", cached_tokens)):
+            if value:
+                metrics.inc("ai_service_llm_tokens_total", value, operation=operation, model=record.model, type=kind)
+        if record.cost_usd:
+            metrics.inc("ai_service_llm_cost_usd_total", record.cost_usd, operation=operation, model=record.model)
+
+        if self._redis is not None:
+            if len(self._buffer) == self._buffer.maxlen:
+                metrics.inc("ai_service_usage_records_dropped_total", reason="buffer_full")
+            self._buffer.append(record)
+        return record
+
+    def start(self, redis_client) -> None:
+        """Liga o descarregamento periódico no Redis (sem Redis, só escopo e métricas)"""
+        if not self.enabled or redis_client is None:
+            return
+        self._redis = redis_client
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Interrompe o descarregamento periódico e descarrega o que restou no buffer"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._redis is not None:
+            await self.flush()
+            self._redis = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+
+    @staticmethod
+    def _aggregate(records: List[UsageRecord]) -> Dict[str, Dict[str, float]]:
+        """Soma os registros por chave Redis e campo"""
+        totals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for record in records:
+            day = usage_day(record.timestamp)
+            values = {
+                "calls": 1,
+                "prompt_tokens": record.prompt_tokens,
+                "completion_tokens": record.completion_tokens,
+                "cached_tokens": record.cached_tokens,
+                "latency_ms": record.latency_seconds * 1000,
+                "cost_usd": record.cost_usd,
+            }
+            targets = [
+                (f"{USAGE_KEY_PREFIX}:{day}:operation:{record.operation}", False),
+                (f"{USAGE_KEY_PREFIX}:{day}:model:{record.provider}:{record.model}", False),
+            ]
+            if record.job_id:
+                targets.append((f"{USAGE_KEY_PREFIX}:{day}:job:{record.job_id}", True))
+            if record.company_id:
+                targets.append((f"{USAGE_KEY_PREFIX}:{day}:company:{record.company_id}", True))
+            for key, by_operation in targets:
+                for name, value in values.items():
+                    totals[key][name] += value
+                    if by_operation:
+                        totals[key][f"{record.operation}:{name}"] += value
+        return totals
+
+    async def flush(self) -> int:
+        """Descarrega o buffer no Redis (uma pipeline); devolve quantos registros foram gravados"""
+        if self._redis is None or not self._buffer:
+            return 0
+        records = []
+        while self._buffer:
+            records.append(self._buffer.popleft())
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key, values in self._aggregate(records).items():
+                    for name, value in values.items():
+                        if name.endswith(("latency_ms", "cost_usd")):
+                            pipe.hincrbyfloat(key, name, round(value, 6))
+                        else:
+                            pipe.hincrby(key, name, int(value))
+                    pipe.expire(key, self.retention_seconds)
+                await pipe.execute()
+        except Exception as e:  # noqa: BLE001
+            metrics.inc("ai_service_usage_records_dropped_total", len(records), reason="redis_error")
+            logger.warning(f"⚠️ Falha ao gravar uso dos providers no Redis ({len(records)} registros): {e}")
+            return 0
+        return len(records)
+
+    async def get_usage(self, dimension: str, value: str, day: Optional[str] = None) -> Dict[str, float]:
+        """Totais gravados no Redis de uma operação, modelo (`provider:modelo`), vaga ou empresa em um dia"""
+        if self._redis is None:
+            return {}
+        day = day or usage_day()
+        raw = await self._redis.hgetall(f"{USAGE_KEY_PREFIX}:{day}:{dimension}:{value}")
+        return {name: float(amount) for name, amount in raw.items()}
+
+
+# Instância global do processo (os providers registram aqui)
+usage_tracker = UsageTracker(
+    buffer_size=Config.USAGE_BUFFER_SIZE,
+    flush_interval_seconds=Config.USAGE_FLUSH_INTERVAL_SECONDS,
+    retention_days=Config.USAGE_RETENTION_DAYS,
+    prices=load_prices(Config.LLM_PRICES_JSON),
+    enabled=Config.USAGE_TRACKING_ENABLED,
+)
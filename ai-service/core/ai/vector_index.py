@@ -0,0 +1,390 @@
+"""
+Índice vetorial de currículos por vaga (pré-ranqueamento por embeddings)
+
+Cada vaga tem um diretório com os embeddings dos currículos em um array
+memory-mapped (vectors.npy, float32, vetores normalizados) e os ids das
+candidaturas em ids.txt (uma por linha, só acrescentado). O vetor é gravado
+antes do id: uma queda entre as duas escritas deixa apenas uma linha órfã no
+array, sobrescrita na próxima inserção. O array cresce dobrando a capacidade.
+
+A busca é por similaridade de cosseno (produto interno dos vetores
+normalizados): força bruta com NumPy por padrão ou grafo HNSW (hnswlib,
+opcional) para vagas com muitos candidatos. O grafo é salvo em hnsw.bin ao
+fechar o índice e, ao reabrir, as linhas inseridas depois do último save são
+acrescentadas a partir do array.
+
+O índice é local ao processo/instância: cada réplica do ai-service precisa do
+seu volume (ou de um volume compartilhado com um único escritor).
+"""
+import asyncio
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from shared.exceptions import VectorIndexError
+from shared.metrics import metrics
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência obrigatória só com o índice habilitado
+    np = None
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+metrics.describe("ai_service_vector_index_inserts_total", "Embeddings inseridos (ou atualizados) nos índices de vagas")
+metrics.describe_histogram(
+    "ai_service_vector_index_search_seconds",
+    "Latência das buscas no índice vetorial",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+# Ids de vaga/candidatura viram nomes de diretório e linhas de ids.txt
+VALID_ID = re.compile(r"^[A-Za-z0-9_.:-]{1,128}$")
+
+INITIAL_CAPACITY = 64
+
+VECTORS_FILE = "vectors.npy"
+IDS_FILE = "ids.txt"
+HNSW_FILE = "hnsw.bin"
+
+
+def validate_id(value: str, label: str) -> str:
+    """Garante que o id é seguro para uso em caminhos e arquivos"""
+    if not VALID_ID.match(value or "") or value in (".", ".."):
+        raise ValueError(f"{label} inválido: {value!r}")
+    return value
+
+
+def _normalize(vector: Sequence[float], dimension: Optional[int] = None) -> "np.ndarray":
+    array = np.asarray(vector, dtype=np.float32).reshape(-1)
+    if dimension is not None and array.shape[0] != dimension:
+        raise VectorIndexError(f"Dimensão do embedding ({array.shape[0]}) diferente da do índice ({dimension})")
+    norm = float(np.linalg.norm(array))
+    if norm == 0.0 or not np.isfinite(norm):
+        raise VectorIndexError("Embedding com norma zero ou inválida")
+    return array / norm
+
+
+class NumpyVectorIndex:
+    """Índice de uma vaga com busca por força bruta sobre o array memory-mapped"""
+
+    backend = "numpy"
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self._vectors: Optional["np.memmap"] = None
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        vectors_path = directory / VECTORS_FILE
+        if vectors_path.exists():
+            self._vectors = np.load(vectors_path, mmap_mode="r+")
+            ids_path = directory / IDS_FILE
+            if ids_path.exists():
+                self._ids = ids_path.read_text(encoding="utf-8").splitlines()
+            for position, item_id in enumerate(self._ids):
+                self._positions[item_id] = position
+
+    @property
+    def count(self) -> int:
+        return len(self._ids)
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return None if self._vectors is None else self._vectors.shape[1]
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    def _grow(self, dimension: int) -> None:
+        """Cria o array ou dobra a capacidade (cópia para um arquivo novo + rename)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        capacity = max(INITIAL_CAPACITY, self.capacity * 2)
+        tmp_path = self.directory / (VECTORS_FILE + ".tmp")
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, dimension))
+        if self._vectors is not None:
+            grown[:self.count] = self._vectors[:self.count]
+        grown.flush()
+        del grown
+        self._vectors = None
+        os.replace(tmp_path, self.directory / VECTORS_FILE)
+        self._vectors = np.load(self.directory / VECTORS_FILE, mmap_mode="r+")
+
+    def add(self, item_id: str, vector: Sequence[float]) -> int:
+        """
+        Insere ou atualiza o embedding de uma candidatura
+
+        Returns:
+            Posição (linha) do embedding no array
+        """
+        normalized = _normalize(vector, self.dimension)
+        position = self._positions.get(item_id)
+        if position is None:
+            position = self.count
+            if position >= self.capacity:
+                self._grow(normalized.shape[0])
+        self._vectors[position] = normalized
+        self._vectors.flush()
+        if item_id not in self._positions:
+            with open(self.directory / IDS_FILE, "a", encoding="utf-8") as ids_file:
+                ids_file.write(item_id + "\n")
+            self._ids.append(item_id)
+            self._positions[item_id] = position
+        return position
+
+    def search(self, vector: Sequence[float], limit: int) -> List[Tuple[str, float]]:
+        """Os `limit` ids mais similares, com a similaridade de cosseno, em ordem decrescente"""
+        if self.count == 0 or limit <= 0:
+            return []
+        query = _normalize(vector, self.dimension)
+        scores = self._vectors[:self.count] @ query
+        limit = min(limit, self.count)
+        if limit < self.count:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            top = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            top = np.argsort(-scores, kind="stable")
+        return [(self._ids[position], float(scores[position])) for position in top]
+
+    def close(self) -> None:
+        if self._vectors is not None:
+            self._vectors.flush()
+
+
+class HNSWVectorIndex(NumpyVectorIndex):
+    """Índice com grafo HNSW (hnswlib); o array memory-mapped continua sendo a fonte da verdade"""
+
+    backend = "hnsw"
+
+    def __init__(self, directory: Path, hnswlib, m: int = 16, ef_construction: int = 200, ef_search: int = 100):
+        super().__init__(directory)
+        self._hnswlib = hnswlib
+        self._m = m
+        self._ef_construction = ef_construction
+        self._ef_search = ef_search
+        self._graph = None
+        self._dirty = False
+        if self.count > 0:
+            self._load_graph()
+
+    def _new_graph(self, dimension: int, max_elements: int):
+        graph = self._hnswlib.Index(space="ip", dim=dimension)
+        graph.init_index(max_elements=max_elements, ef_construction=self._ef_construction, M=self._m)
+        graph.set_ef(self._ef_search)
+        return graph
+
+    def _load_graph(self) -> None:
+        """Carrega o grafo salvo e acrescenta as linhas inseridas depois do último save"""
+        graph_path = self.directory / HNSW_FILE
+        graph = None
+        if graph_path.exists():
+            try:
+                graph = self._hnswlib.Index(space="ip", dim=self.dimension)
+                graph.load_index(str(graph_path), max_elements=self.capacity)
+                graph.set_ef(self._ef_search)
+            except Exception as e:
+                logger.warning(f"⚠️ Grafo HNSW inválido em {graph_path} ({str(e)}); reconstruindo")
+                graph = None
+        if graph is None:
+            graph = self._new_graph(self.dimension, self.capacity)
+        saved = graph.get_current_count()
+        if saved < self.count:
+            graph.add_items(self._vectors[saved:self.count], np.arange(saved, self.count))
+            self._dirty = True
+        self._graph = graph
+
+    def add(self, item_id: str, vector: Sequence[float]) -> int:
+        position = super().add(item_id, vector)
+        if self._graph is None:
+            self._graph = self._new_graph(self.dimension, self.capacity)
+        elif self.capacity > self._graph.get_max_elements():
+            self._graph.resize_index(self.capacity)
+        # Um label existente tem o vetor atualizado no grafo
+        self._graph.add_items(self._vectors[position:position + 1], np.array([position]))
+        self._dirty = True
+        return position
+
+    def search(self, vector: Sequence[float], limit: int) -> List[Tuple[str, float]]:
+        if self.count == 0 or limit <= 0:
+            return []
+        query = _normalize(vector, self.dimension)
+        limit = min(limit, self.count)
+        self._graph.set_ef(max(self._ef_search, limit))
+        labels, distances = self._graph.knn_query(query, k=limit)
+        # Espaço "ip" do hnswlib: distância = 1 - produto interno
+        return [(self._ids[int(label)], 1.0 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+
+    def close(self) -> None:
+        super().close()
+        if self._graph is not None and self._dirty:
+            self._graph.save_index(str(self.directory / HNSW_FILE))
+            self._dirty = False
+
+
+class VectorIndexStore:
+    """
+    Índices vetoriais das vagas em um diretório local
+
+    Mantém abertos os índices usados mais recentemente (LRU); os demais são
+    fechados (flush do array e save do grafo) e reabertos sob demanda. Um índice
+    em uso nunca é fechado nem removido: cada operação o fixa (use_index) e a
+    LRU pode passar do limite até ele ser liberado. As operações de disco e
+    NumPy rodam em threads, fora do event loop.
+    """
+
+    def __init__(self, root_dir: str, backend: str = "numpy", max_open_indexes: int = 64,
+                 hnsw_m: int = 16, hnsw_ef_construction: int = 200, hnsw_ef_search: int = 100):
+        """
+        Inicializa o store
+
+        Args:
+            root_dir: Diretório com um subdiretório por vaga
+            backend: "numpy" (força bruta) ou "hnsw" (requer hnswlib; sem ele usa numpy)
+            max_open_indexes: Número máximo de índices mantidos abertos
+            hnsw_m: Parâmetro M do grafo HNSW
+            hnsw_ef_construction: ef usado na construção do grafo
+            hnsw_ef_search: ef mínimo das buscas
+        """
+        if np is None:
+            raise ImportError("numpy package is required. Install with: pip install numpy")
+        self.root_dir = Path(root_dir)
+        self.max_open_indexes = max_open_indexes
+        self._hnsw_options = {"m": hnsw_m, "ef_construction": hnsw_ef_construction, "ef_search": hnsw_ef_search}
+        self._hnswlib = None
+        if backend == "hnsw":
+            try:
+                import hnswlib
+                self._hnswlib = hnswlib
+            except ImportError:
+                logger.warning("⚠️ hnswlib não instalado; índice vetorial usando força bruta (numpy)")
+        elif backend != "numpy":
+            raise ValueError(f"Backend de índice vetorial não suportado: {backend}")
+        self.backend = "hnsw" if self._hnswlib is not None else "numpy"
+        self._indexes: "OrderedDict[str, NumpyVectorIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        # Usos em andamento por vaga e vagas sendo removidas
+        self._pins: Dict[str, int] = {}
+        self._deleting: Set[str] = set()
+
+    def _open(self, job_id: str) -> NumpyVectorIndex:
+        directory = self.root_dir / validate_id(job_id, "job_id")
+        if self._hnswlib is not None:
+            return HNSWVectorIndex(directory, self._hnswlib, **self._hnsw_options)
+        return NumpyVectorIndex(directory)
+
+    def _evict(self) -> None:
+        """Fecha os índices menos usados além do limite (com o lock do store; em uso não saem)"""
+        for job_id in list(self._indexes):
+            if len(self._indexes) <= self.max_open_indexes:
+                break
+            if job_id not in self._pins:
+                self._indexes.pop(job_id).close()
+
+    @contextmanager
+    def use_index(self, job_id: str) -> Iterator[NumpyVectorIndex]:
+        """
+        Índice da vaga (aberto sob demanda; o diretório só é criado na primeira inserção)
+
+        Enquanto o bloco roda, o índice fica fixado: a LRU não o fecha e a remoção
+        da vaga espera o fim do uso.
+        """
+        with self._released:
+            while job_id in self._deleting:
+                self._released.wait()
+            index = self._indexes.get(job_id)
+            if index is None:
+                index = self._open(job_id)
+                self._indexes[job_id] = index
+            else:
+                self._indexes.move_to_end(job_id)
+            self._pins[job_id] = self._pins.get(job_id, 0) + 1
+            self._evict()
+        try:
+            yield index
+        finally:
+            with self._released:
+                self._pins[job_id] -= 1
+                if self._pins[job_id] == 0:
+                    del self._pins[job_id]
+                    self._evict()
+                self._released.notify_all()
+
+    def _add(self, job_id: str, item_id: str, vector: Sequence[float]) -> int:
+        validate_id(item_id, "application_id")
+        with self.use_index(job_id) as index, index.lock:
+            index.add(item_id, vector)
+            count = index.count
+        metrics.inc("ai_service_vector_index_inserts_total", backend=index.backend)
+        return count
+
+    def _search(self, job_id: str, vector: Sequence[float], limit: int) -> Tuple[List[Tuple[str, float]], int]:
+        with self.use_index(job_id) as index, index.lock:
+            start = time.perf_counter()
+            results = index.search(vector, limit)
+            metrics.observe("ai_service_vector_index_search_seconds", time.perf_counter() - start,
+                            backend=index.backend)
+            return results, index.count
+
+    def _delete(self, job_id: str) -> bool:
+        directory = self.root_dir / validate_id(job_id, "job_id")
+        with self._released:
+            # Novos usos da vaga esperam; os em andamento terminam antes do rmtree
+            while job_id in self._deleting:
+                self._released.wait()
+            self._deleting.add(job_id)
+            while job_id in self._pins:
+                self._released.wait()
+            index = self._indexes.pop(job_id, None)
+        try:
+            if index is not None:
+                index.close()
+            if not directory.exists():
+                return False
+            shutil.rmtree(directory)
+            return True
+        finally:
+            with self._released:
+                self._deleting.discard(job_id)
+                self._released.notify_all()
+
+    async def add(self, job_id: str, item_id: str, vector: Sequence[float]) -> int:
+        """
+        Insere ou atualiza o embedding de uma candidatura no índice da vaga
+
+        Returns:
+            Total de candidaturas indexadas na vaga
+        """
+        return await asyncio.to_thread(self._add, job_id, item_id, vector)
+
+    async def search(self, job_id: str, vector: Sequence[float],
+                     limit: int) -> Tuple[List[Tuple[str, float]], int]:
+        """
+        Candidaturas mais similares ao vetor de consulta
+
+        Returns:
+            Tupla ([(application_id, similaridade)], total de candidaturas indexadas)
+        """
+        return await asyncio.to_thread(self._search, job_id, vector, limit)
+
+    async def delete(self, job_id: str) -> bool:
+        """Remove o índice de uma vaga (False se não existia)"""
+        return await asyncio.to_thread(self._delete, job_id)
+
+    def close(self) -> None:
+        """Fecha todos os índices abertos (chamado no encerramento da aplicação)"""
+        with self._lock:
+            indexes = list(self._indexes.values())
+            self._indexes.clear()
+        for index in indexes:
+            with index.lock:
+                index.close()
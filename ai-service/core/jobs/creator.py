@@ -5,8 +5,10 @@ import json
 import os
 from typing import Dict, Any, Optional, List
 from shared.exceptions import JobCreationError
-from shared.utils import extract_json_from_text, sanitize_text
+from shared.utils import sanitize_text
+from core.ai.structured_output import parse_json_output
 from core.ai.service import AIService
+from core.prompts import get_prompt_registry
 from shared.config import Config
 
 
@@ -83,24 +85,16 @@ class JobCreator:
             str: Prompt estruturado para a IA
         """
         try:
-            # Lê o prompt do arquivo de texto
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            prompt_file_path = os.path.join(current_dir, "job_creation.prompt")
-
-            with open(prompt_file_path, 'r', encoding='utf-8') as file:
-                prompt_template = file.read()
-
-            # Substitui a variável {user_prompt} pelo prompt do usuário
-            return prompt_template.format(
+            # Template pré-compilado do registro de prompts
+            return get_prompt_registry().render(
+                "job_creation",
                 user_prompt=user_prompt,
                 num_questions=num_questions,
                 num_stages=num_stages
             )
 
-        except FileNotFoundError:
-            raise JobCreationError("Arquivo de prompt não encontrado: job_creation.prompt")
-        except Exception as e:
-            raise JobCreationError(f"Erro ao ler arquivo de prompt: {str(e)}")
+        except KeyError as e:
+            raise JobCreationError(f"Erro no template de prompt 'job_creation': {str(e)}")
 
     def _extract_json_from_response(self, response: str) -> Dict[str, Any]:
         """
@@ -112,8 +106,8 @@ class JobCreator:
         Returns:
             Dict com os dados do job
         """
-        # Tenta extrair JSON usando utilitário
-        job_data = extract_json_from_text(response)
+        # Parser incremental (conta falhas por tipo de prompt)
+        job_data = parse_json_output(response, "job_creation")
 
         if not job_data:
             raise JobCreationError("Não foi possível extrair JSON válido da resposta da IA")
@@ -1,11 +1,31 @@
 """
 Serviço para melhoria de jobs usando IA
 """
-import os
-from typing import Dict, Any, Optional
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, Any, Optional, AsyncIterator, Sequence
 from shared.exceptions import JobCreationError
-from shared.utils import sanitize_text
+from shared.utils import extract_json_from_text, sanitize_text
 from core.ai.service import AIService
+from core.prompts import get_prompt_registry
+
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# Template de prompt usado para melhorar cada campo do job
+ENHANCEMENT_PROMPTS = {
+    "description": "job_description_enhancement",
+    "requirements": "job_requirements_enhancement",
+    "title": "job_title_enhancement",
+}
+
+# Prompt único que melhora vários campos de uma vez (resposta em JSON)
+FULL_ENHANCEMENT_PROMPT = "job_full_enhancement"
+
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
 
 
 class JobEnhancer:
@@ -107,62 +127,170 @@ class JobEnhancer:
         except Exception as e:
             raise JobCreationError(f"Erro ao melhorar título do job: {str(e)}")
     
-    def _create_enhancement_prompt(self, job: Dict[str, Any], enhancement_prompt: str) -> str:
-        """Cria prompt para melhoria da descrição"""
-        try:
-            # Lê o prompt do arquivo externo
-            prompt_file_path = os.path.join(os.path.dirname(__file__), 'job_description_enhancement.prompt')
+    async def enhance_job(self, job: Dict[str, Any], enhancement_prompt: str,
+                          fields: Sequence[str] = ("title", "description", "requirements"),
+                          single_call: bool = False) -> Dict[str, Any]:
+        """
+        Melhora vários campos do job de uma vez
+        
+        Por padrão as melhorias rodam em paralelo (uma chamada por campo), então a
+        latência é a da chamada mais lenta e não a soma. Com single_call, um único
+        prompt devolve todos os campos em JSON; se a resposta não puder ser
+        interpretada, cai para o modo paralelo.
+        
+        Args:
+            job: Dados do job atual
+            enhancement_prompt: Prompt específico para melhoria
+            fields: Campos a melhorar ("title", "description", "requirements")
+            single_call: Se deve usar um único prompt com saída JSON
             
-            with open(prompt_file_path, 'r', encoding='utf-8') as file:
-                prompt_template = file.read()
+        Returns:
+            Dict com o job mesclado (campos que falharam mantêm o valor original),
+            enhanced_fields, errors (campo -> mensagem), timings_ms e mode
             
-            # Substitui as variáveis no template
-            return prompt_template.format(
-                job=job,
-                enhancement_prompt=enhancement_prompt
+        Raises:
+            JobCreationError: Campo não suportado ou nenhum campo pôde ser melhorado
+        """
+        unsupported = [field for field in fields if field not in ENHANCEMENT_PROMPTS]
+        if unsupported or not fields:
+            raise JobCreationError(f"Campos não suportados para melhoria: {unsupported or list(fields)}")
+        fields = list(dict.fromkeys(fields))
+        start = time.perf_counter()
+        
+        result = None
+        if single_call:
+            result = await self._enhance_single_call(job, enhancement_prompt, fields)
+        if result is None:
+            result = await self._enhance_parallel(job, enhancement_prompt, fields)
+        
+        values, errors, timings_ms, mode = result
+        if not values:
+            raise JobCreationError(f"Erro ao melhorar o job: {errors}")
+        
+        enhanced_job = {**job, **values}
+        timings_ms["total"] = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(
+            f"✨ Job melhorado ({mode}): {sorted(values)} em {timings_ms['total']} ms"
+            + (f", falhas: {sorted(errors)}" if errors else "")
+        )
+        return {
+            "job": enhanced_job,
+            "enhanced_fields": [field for field in fields if field in values],
+            "errors": errors,
+            "timings_ms": timings_ms,
+            "mode": mode,
+        }
+    
+    async def _enhance_parallel(self, job: Dict[str, Any], enhancement_prompt: str, fields: Sequence[str]):
+        """Uma chamada por campo, em paralelo; falhas de um campo não afetam os outros"""
+        methods = {
+            "description": self.enhance_job_description,
+            "requirements": self.enhance_job_requirements,
+            "title": self.enhance_job_title,
+        }
+        timings_ms: Dict[str, float] = {}
+        
+        async def enhance(field: str) -> Any:
+            field_start = time.perf_counter()
+            try:
+                enhanced = await methods[field](job, enhancement_prompt)
+                return enhanced[field]
+            finally:
+                timings_ms[field] = round((time.perf_counter() - field_start) * 1000, 1)
+        
+        outcomes = await asyncio.gather(*(enhance(field) for field in fields), return_exceptions=True)
+        values: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for field, outcome in zip(fields, outcomes):
+            if isinstance(outcome, Exception):
+                errors[field] = str(outcome)
+            else:
+                values[field] = outcome
+        return values, errors, timings_ms, "parallel"
+    
+    async def _enhance_single_call(self, job: Dict[str, Any], enhancement_prompt: str, fields: Sequence[str]):
+        """Um único prompt com saída JSON; retorna None para cair no modo paralelo"""
+        call_start = time.perf_counter()
+        try:
+            prompt = get_prompt_registry().render(
+                FULL_ENHANCEMENT_PROMPT,
+                job_title=job.get('title', 'N/A'),
+                job_description=job.get('description', 'N/A'),
+                job_requirements=job.get('requirements', 'N/A'),
+                enhancement_prompt=enhancement_prompt,
+                fields=", ".join(fields)
             )
-            
-        except FileNotFoundError:
-            raise JobCreationError("Arquivo de prompt 'job_description_enhancement.prompt' não encontrado")
+            response = await self.ai_service.generate_text(prompt)
         except Exception as e:
-            raise JobCreationError(f"Erro ao ler arquivo de prompt: {str(e)}")
+            logger.warning(f"⚠️ Melhoria em chamada única falhou, usando chamadas paralelas: {str(e)}")
+            return None
+        timings_ms = {"single_call": round((time.perf_counter() - call_start) * 1000, 1)}
+        
+        data = extract_json_from_text(response) or {}
+        values = {
+            field: sanitize_text(data[field])
+            for field in fields
+            if isinstance(data.get(field), str) and data[field].strip()
+        }
+        if not values:
+            logger.warning("⚠️ Resposta da melhoria em chamada única sem JSON válido, usando chamadas paralelas")
+            return None
+        errors = {field: "Campo ausente na resposta JSON" for field in fields if field not in values}
+        return values, errors, timings_ms, "single_call"
     
-    def _create_requirements_enhancement_prompt(self, job: Dict[str, Any], enhancement_prompt: str) -> str:
-        """Cria prompt para melhoria dos requisitos"""
-        try:
-            # Lê o prompt do arquivo externo
-            prompt_file_path = os.path.join(os.path.dirname(__file__), 'job_requirements_enhancement.prompt')
-            
-            with open(prompt_file_path, 'r', encoding='utf-8') as file:
-                prompt_template = file.read()
+    async def stream_enhancement(self, field: str, job: Dict[str, Any],
+                                 enhancement_prompt: str) -> AsyncIterator[str]:
+        """
+        Melhora um campo do job devolvendo o texto à medida que é gerado
+        
+        Os trechos têm apenas caracteres de controle removidos; a normalização de
+        espaços feita por sanitize_text fica para quem monta o texto final.
+        
+        Args:
+            field: Campo a melhorar ("description", "requirements" ou "title")
+            job: Dados do job atual
+            enhancement_prompt: Prompt específico para melhoria
             
-            # Substitui as variáveis no template
-            return prompt_template.format(
-                job=job,
-                enhancement_prompt=enhancement_prompt
-            )
+        Returns:
+            Iterador assíncrono com os trechos de texto
             
-        except FileNotFoundError:
-            raise JobCreationError("Arquivo de prompt 'job_requirements_enhancement.prompt' não encontrado")
-        except Exception as e:
-            raise JobCreationError(f"Erro ao ler arquivo de prompt: {str(e)}")
+        Raises:
+            JobCreationError: Campo não suportado ou erro no template
+        """
+        if field not in ENHANCEMENT_PROMPTS:
+            raise JobCreationError(f"Campo não suportado para melhoria: {field}")
+        prompt = self._render_prompt(ENHANCEMENT_PROMPTS[field], job, enhancement_prompt)
+        
+        stream = self.ai_service.stream_text(prompt)
+        try:
+            async for chunk in stream:
+                chunk = _CONTROL_CHARS.sub('', chunk)
+                if chunk:
+                    yield chunk
+        finally:
+            await stream.aclose()
+    
+    def _create_enhancement_prompt(self, job: Dict[str, Any], enhancement_prompt: str) -> str:
+        """Cria prompt para melhoria da descrição"""
+        return self._render_prompt('job_description_enhancement', job, enhancement_prompt)
+    
+    def _create_requirements_enhancement_prompt(self, job: Dict[str, Any], enhancement_prompt: str) -> str:
+        """Cria prompt para melhoria dos requisitos"""
+        return self._render_prompt('job_requirements_enhancement', job, enhancement_prompt)
     
     def _create_title_enhancement_prompt(self, job: Dict[str, Any], enhancement_prompt: str) -> str:
         """Cria prompt para melhoria do título"""
+        return self._render_prompt('job_title_enhancement', job, enhancement_prompt)
+    
+    def _render_prompt(self, prompt_name: str, job: Dict[str, Any], enhancement_prompt: str) -> str:
+        """Renderiza um template de melhoria do registro de prompts"""
         try:
-            # Lê o prompt do arquivo externo
-            prompt_file_path = os.path.join(os.path.dirname(__file__), 'job_title_enhancement.prompt')
-            
-            with open(prompt_file_path, 'r', encoding='utf-8') as file:
-                prompt_template = file.read()
-            
-            # Substitui as variáveis no template
-            return prompt_template.format(
-                job=job,
+            return get_prompt_registry().render(
+                prompt_name,
+                job_title=job.get('title', 'N/A'),
+                job_description=job.get('description', 'N/A'),
+                job_requirements=job.get('requirements', 'N/A'),
                 enhancement_prompt=enhancement_prompt
             )
-            
-        except FileNotFoundError:
-            raise JobCreationError("Arquivo de prompt 'job_title_enhancement.prompt' não encontrado")
-        except Exception as e:
-            raise JobCreationError(f"Erro ao ler arquivo de prompt: {str(e)}")
+        except KeyError as e:
+            raise JobCreationError(f"Erro no template de prompt '{prompt_name}': {str(e)}")
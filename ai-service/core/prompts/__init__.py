@@ -0,0 +1,5 @@
+# Prompts module
+
+from .registry import PromptRegistry, PromptTemplate, get_prompt_registry
+
+__all__ = ['PromptRegistry', 'PromptTemplate', 'get_prompt_registry']
@@ -0,0 +1,174 @@
+"""
+Registro dos templates de prompt (arquivos core/**/*.prompt)
+
+Os arquivos são lidos uma única vez e pré-compilados em uma lista de trechos
+literais e variáveis; renderizar um prompt é apenas concatenar os trechos, sem
+abrir arquivo nem interpretar o template a cada requisição.
+
+Sintaxe dos templates: `{nome}` é uma variável e `{{` / `}}` são chaves
+literais (como em str.format). Qualquer outra chave é mantida como está, o que
+permite exemplos de JSON sem escape (ex: resume_parse.prompt).
+
+Cada template tem o hash SHA-256 do conteúdo e uma versão curta (12 caracteres)
+para compor chaves de cache. O recarregamento ao alterar o arquivo é opcional
+(PROMPTS_HOT_RELOAD, apenas em desenvolvimento).
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_TOKEN_PATTERN = re.compile(r"\{\{|\}\}|\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+def compile_template(source: str) -> List[Tuple[bool, str]]:
+    """
+    Compila um template em trechos (é_variável, texto ou nome da variável)
+
+    Args:
+        source: Conteúdo do arquivo .prompt
+
+    Returns:
+        Lista de trechos; trechos literais adjacentes já vêm unidos
+    """
+    segments: List[Tuple[bool, str]] = []
+    literal: List[str] = []
+    position = 0
+    for match in _TOKEN_PATTERN.finditer(source):
+        literal.append(source[position:match.start()])
+        token = match.group(0)
+        if token == "{{":
+            literal.append("{")
+        elif token == "}}":
+            literal.append("}")
+        else:
+            segments.append((False, "".join(literal)))
+            literal = []
+            segments.append((True, match.group(1)))
+        position = match.end()
+    literal.append(source[position:])
+    segments.append((False, "".join(literal)))
+    return [segment for segment in segments if segment[0] or segment[1]]
+
+
+class PromptTemplate:
+    """Template de prompt pré-compilado"""
+
+    def __init__(self, name: str, path: str, source: str):
+        self.name = name
+        self.path = path
+        self.source = source
+        self.sha256 = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        self.version = self.sha256[:12]
+        self.mtime = os.path.getmtime(path)
+        self._segments = compile_template(source)
+        self.variables = frozenset(value for is_variable, value in self._segments if is_variable)
+
+    def render(self, **values: Any) -> str:
+        """
+        Substitui as variáveis do template
+
+        Raises:
+            KeyError: Variável do template não informada
+        """
+        missing = self.variables - values.keys()
+        if missing:
+            raise KeyError(f"Variáveis não informadas para o prompt '{self.name}': {sorted(missing)}")
+        return "".join(str(values[value]) if is_variable else value for is_variable, value in self._segments)
+
+
+class PromptRegistry:
+    """Carrega e guarda os templates de prompt do serviço"""
+
+    def __init__(self, root_dir: str = CORE_DIR, hot_reload: bool = False):
+        """
+        Inicializa o registro
+
+        Args:
+            root_dir: Diretório onde os arquivos .prompt são procurados (recursivamente)
+            hot_reload: Se True, recarrega um template quando o arquivo muda (apenas dev)
+        """
+        self.root_dir = root_dir
+        self.hot_reload = hot_reload
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Lê e compila todos os arquivos .prompt"""
+        templates: Dict[str, PromptTemplate] = {}
+        for directory, _, files in os.walk(self.root_dir):
+            for file_name in sorted(files):
+                if not file_name.endswith(".prompt"):
+                    continue
+                name = file_name[:-len(".prompt")]
+                path = os.path.join(directory, file_name)
+                if name in templates:
+                    raise ValueError(f"Prompt duplicado: '{name}' ({templates[name].path} e {path})")
+                templates[name] = self._read(name, path)
+        with self._lock:
+            self._templates = templates
+        logger.info(f"📝 {len(templates)} templates de prompt carregados (hot reload: {self.hot_reload})")
+
+    @staticmethod
+    def _read(name: str, path: str) -> PromptTemplate:
+        with open(path, "r", encoding="utf-8") as file:
+            return PromptTemplate(name, path, file.read())
+
+    def get(self, name: str) -> PromptTemplate:
+        """
+        Retorna um template pelo nome do arquivo (sem a extensão .prompt)
+
+        Raises:
+            KeyError: Template inexistente
+        """
+        template = self._templates.get(name)
+        if template is None:
+            raise KeyError(f"Prompt não encontrado: {name}.prompt")
+        if self.hot_reload:
+            template = self._reload_if_changed(template)
+        return template
+
+    def _reload_if_changed(self, template: PromptTemplate) -> PromptTemplate:
+        try:
+            if os.path.getmtime(template.path) == template.mtime:
+                return template
+            reloaded = self._read(template.name, template.path)
+        except OSError as e:
+            logger.warning(f"⚠️ Erro ao recarregar o prompt '{template.name}': {str(e)}")
+            return template
+        with self._lock:
+            self._templates[template.name] = reloaded
+        logger.info(f"🔄 Prompt '{template.name}' recarregado (versão {reloaded.version})")
+        return reloaded
+
+    def render(self, name: str, **values: Any) -> str:
+        """Atalho para get(name).render(**values)"""
+        return self.get(name).render(**values)
+
+    def versions(self) -> Dict[str, str]:
+        """Versão de cada template carregado"""
+        return {name: template.version for name, template in sorted(self._templates.items())}
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Registro global do processo, carregado no primeiro uso"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                from shared.config import Config
+                registry = PromptRegistry(hot_reload=Config.PROMPTS_HOT_RELOAD)
+                registry.load()
+                _registry = registry
+    return _registry
@@ -1,12 +1,12 @@
 """
 Serviço para avaliação de respostas de perguntas usando IA
 """
-import json
-import os
 from typing import Dict, Any, Optional, List
 from shared.exceptions import QuestionEvaluationError
-from shared.utils import extract_json_from_text, sanitize_text
+from shared.utils import sanitize_text
+from core.ai.structured_output import parse_json_output
 from core.ai.service import AIService
+from core.prompts import get_prompt_registry
 from shared.config import AIProvider
 
 
@@ -80,13 +80,6 @@ class QuestionEvaluator:
             str: Prompt estruturado para a IA
         """
         try:
-            # Lê o prompt do arquivo de texto
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            prompt_file_path = os.path.join(current_dir, "question_evaluation.prompt")
-
-            with open(prompt_file_path, 'r', encoding='utf-8') as file:
-                prompt_template = file.read()
-
             # Formata as respostas das perguntas
             formatted_responses = []
             for i, response in enumerate(question_responses, 1):
@@ -95,8 +88,9 @@ class QuestionEvaluator:
                     f"Resposta {i}: {response.get('answer', 'N/A')}\n"
                 )
 
-            # Substitui as variáveis no template
-            return prompt_template.format(
+            # Substitui as variáveis no template pré-compilado
+            return get_prompt_registry().render(
+                "question_evaluation",
                 job_title=job_data.get('title', 'N/A'),
                 job_description=job_data.get('description', 'N/A'),
                 job_requirements=job_data.get('requirements', 'N/A'),
@@ -104,10 +98,8 @@ class QuestionEvaluator:
                 num_questions=len(question_responses)
             )
 
-        except FileNotFoundError:
-            raise QuestionEvaluationError("Arquivo de prompt não encontrado: question_evaluation.prompt")
-        except Exception as e:
-            raise QuestionEvaluationError(f"Erro ao ler arquivo de prompt: {str(e)}")
+        except KeyError as e:
+            raise QuestionEvaluationError(f"Erro no template de prompt 'question_evaluation': {str(e)}")
 
     def _extract_json_from_response(self, response: str) -> Dict[str, Any]:
         """
@@ -119,18 +111,10 @@ class QuestionEvaluator:
         Returns:
             Dict com os dados extraídos
         """
-        try:
-            # Tenta extrair JSON usando a função utilitária
-            json_data = extract_json_from_text(response)
-            return json_data
-        except Exception as e:
-            # Fallback: tenta extrair manualmente
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                raise QuestionEvaluationError("Não foi possível extrair JSON da resposta da IA")
+        json_data = parse_json_output(response, "question_evaluation")
+        if json_data is None:
+            raise QuestionEvaluationError("Não foi possível extrair JSON da resposta da IA")
+        return json_data
 
     def _validate_evaluation_data(self, evaluation_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -0,0 +1,37 @@
+"""
+Chaves do cache de parsing de currículos
+
+O resultado do parsing depende apenas do conteúdo do PDF, do template de
+prompt e do modelo; a chave combina os três, então um template alterado ou
+um modelo diferente gera automaticamente entradas novas.
+"""
+import hashlib
+
+from core.prompts import get_prompt_registry
+
+RESUME_PARSE_CACHE_NAMESPACE = "ai-service:resume-parse"
+
+# URL do PDF -> {etag, sha256} do último download (requisições condicionais)
+PDF_ETAG_CACHE_NAMESPACE = "ai-service:pdf-etag"
+
+
+def get_prompt_version() -> str:
+    """Versão do template de parsing (hash do conteúdo do resume_parse.prompt)"""
+    return get_prompt_registry().get('resume_parse').version
+
+
+def build_resume_parse_cache_key(pdf_sha256: str, model: str, prompt_version: str = None) -> str:
+    """
+    Monta a chave do cache: <sha256 do PDF>:<versão do prompt>:<modelo>
+
+    Args:
+        pdf_sha256: Hash SHA-256 do conteúdo do PDF
+        model: Provider e modelo usados no parsing (ex: openai:gpt-4)
+        prompt_version: Versão do template (padrão: hash do resume_parse.prompt)
+    """
+    return f"{pdf_sha256}:{prompt_version or get_prompt_version()}:{model}"
+
+
+def build_pdf_etag_cache_key(url: str) -> str:
+    """Chave do cache de ETags: hash da URL sem a query string (assinaturas presigned mudam)"""
+    return hashlib.sha256(url.split('?')[0].encode('utf-8')).hexdigest()
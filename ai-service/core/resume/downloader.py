@@ -0,0 +1,173 @@
+"""
+Download de PDFs em streaming, direto para um arquivo temporário
+
+O conteúdo nunca é carregado inteiro em memória: os chunks ficam em memória
+até `spool_max_bytes` e, acima disso, vão para um NamedTemporaryFile (escrito
+fora do event loop; o caminho dele é o que segue para o processo de extração),
+enquanto o tamanho máximo e a assinatura `%PDF` são verificados e o SHA-256
+é calculado. Suporta requisições condicionais (If-None-Match) contra o
+MinIO/S3, para não baixar de novo um arquivo que não mudou.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+import httpx
+
+from shared.exceptions import PDFDownloadError
+from shared.metrics import metrics
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+# A especificação permite até 1024 bytes de lixo antes do cabeçalho %PDF
+PDF_SNIFF_BYTES = 1024
+
+metrics.describe("ai_service_pdf_downloads_total", "Downloads de PDF por resultado")
+metrics.describe("ai_service_pdf_download_bytes_total", "Bytes de PDF baixados")
+metrics.describe("ai_service_pdf_download_seconds_total", "Tempo total gasto em downloads de PDF")
+metrics.describe(
+    "ai_service_pdf_download_last_throughput_bytes_per_second",
+    "Throughput do último download de PDF concluído"
+)
+
+
+@dataclass
+class DownloadedPDF:
+    """Resultado de um download de PDF"""
+    file: Optional[BinaryIO]
+    size: int = 0
+    sha256: Optional[str] = None
+    etag: Optional[str] = None
+    content_type: str = ""
+    elapsed_seconds: float = 0.0
+    not_modified: bool = False
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+
+class PDFDownloader:
+    """Baixa PDFs por streaming usando um httpx.AsyncClient compartilhado"""
+
+    def __init__(self, client: httpx.AsyncClient, max_bytes: int, chunk_size: int = 65536,
+                 spool_max_bytes: int = 1048576):
+        self._client = client
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.spool_max_bytes = spool_max_bytes
+
+    async def download(self, url: str, etag: Optional[str] = None) -> DownloadedPDF:
+        """
+        Faz download de um PDF
+
+        Args:
+            url: URL do PDF
+            etag: ETag da última versão conhecida; se o servidor responder 304,
+                o resultado vem com not_modified=True e sem arquivo
+
+        Returns:
+            DownloadedPDF com o arquivo posicionado no início
+
+        Raises:
+            PDFDownloadError: Erro HTTP, arquivo maior que o limite ou conteúdo que não é PDF
+        """
+        logger.info(f"📥 Iniciando download do PDF: {url}")
+        headers = {"If-None-Match": etag} if etag else {}
+        start = time.perf_counter()
+        spool: BinaryIO = io.BytesIO()
+        on_disk = False
+        try:
+            async with self._client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304:
+                    spool.close()
+                    metrics.inc("ai_service_pdf_downloads_total", result="not_modified")
+                    logger.info(f"♻️ PDF não modificado desde o último download (ETag {etag})")
+                    return DownloadedPDF(
+                        file=None, etag=etag, not_modified=True,
+                        elapsed_seconds=time.perf_counter() - start
+                    )
+                if response.status_code >= 400:
+                    raise PDFDownloadError(f"Erro no download do PDF: HTTP {response.status_code}")
+
+                content_length = response.headers.get("content-length")
+                if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+                    raise PDFDownloadError(
+                        f"PDF excede o tamanho máximo de {self.max_bytes} bytes", status_code=413
+                    )
+
+                content_type = response.headers.get("content-type", "").lower()
+                if 'pdf' not in content_type and not url.lower().split('?')[0].endswith('.pdf'):
+                    logger.warning(f"⚠️ Content-Type não é PDF - Content-Type: {content_type}")
+
+                digest = hashlib.sha256()
+                size = 0
+                head = b""
+                async for chunk in response.aiter_bytes(self.chunk_size):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise PDFDownloadError(
+                            f"PDF excede o tamanho máximo de {self.max_bytes} bytes", status_code=413
+                        )
+                    if len(head) < PDF_SNIFF_BYTES:
+                        head += chunk[:PDF_SNIFF_BYTES - len(head)]
+                        if len(head) >= PDF_SNIFF_BYTES and b"%PDF" not in head:
+                            raise PDFDownloadError("Arquivo não é um PDF válido")
+                    digest.update(chunk)
+                    if not on_disk and size > self.spool_max_bytes:
+                        spool = await asyncio.to_thread(self._move_to_disk, spool)
+                        on_disk = True
+                    if on_disk:
+                        await asyncio.to_thread(spool.write, chunk)
+                    else:
+                        spool.write(chunk)
+
+                if b"%PDF" not in head:
+                    raise PDFDownloadError("Arquivo não é um PDF válido")
+
+                elapsed = time.perf_counter() - start
+                spool.seek(0)
+                self._record_success(size, elapsed)
+                logger.info(
+                    f"✅ PDF baixado com sucesso: {size} bytes em {elapsed:.2f}s "
+                    f"({size / elapsed / 1024 if elapsed > 0 else 0:.0f} KiB/s)"
+                )
+                return DownloadedPDF(
+                    file=spool,
+                    size=size,
+                    sha256=digest.hexdigest(),
+                    etag=response.headers.get("etag"),
+                    content_type=content_type,
+                    elapsed_seconds=elapsed
+                )
+        except PDFDownloadError as e:
+            spool.close()
+            metrics.inc("ai_service_pdf_downloads_total", result="rejected")
+            logger.error(f"❌ Download rejeitado: {str(e)}")
+            raise
+        except httpx.HTTPError as e:
+            spool.close()
+            metrics.inc("ai_service_pdf_downloads_total", result="error")
+            logger.error(f"❌ Erro no download: {str(e)}")
+            raise PDFDownloadError(f"Erro no download do PDF: {str(e)}")
+
+    @staticmethod
+    def _move_to_disk(buffer: io.BytesIO) -> BinaryIO:
+        """Copia o que já foi baixado para um arquivo temporário nomeado (removido no close)"""
+        disk_file = tempfile.NamedTemporaryFile(suffix='.pdf')
+        disk_file.write(buffer.getvalue())
+        return disk_file
+
+    @staticmethod
+    def _record_success(size: int, elapsed: float) -> None:
+        metrics.inc("ai_service_pdf_downloads_total", result="ok")
+        metrics.inc("ai_service_pdf_download_bytes_total", size)
+        metrics.inc("ai_service_pdf_download_seconds_total", elapsed)
+        if elapsed > 0:
+            metrics.set_gauge("ai_service_pdf_download_last_throughput_bytes_per_second", size / elapsed)
@@ -1,31 +1,55 @@
 """
 Parser de currículos usando IA
 """
-import PyPDF2
-import tempfile
+import asyncio
 import os
+import tempfile
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, BinaryIO, Union
 from datetime import date
+from shared.cache import ResultCache, sha256_file, sha256_hex
+from shared.config import Config
 from shared.exceptions import ResumeParsingError
-from shared.utils import extract_json_from_text, sanitize_text
+from shared.metrics import metrics
+from core.ai.structured_output import parse_json_output, structured_output_kwargs
 from core.ai.service import AIService
+from core.prompts import get_prompt_registry
+from .cache import build_resume_parse_cache_key
+from .sections import SECTION_FIELDS, build_section_cache_key, is_segmented, segment_resume_text
+from .pdf_extractor import PDFTextExtractor, extract_text_from_pdf
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
+metrics.describe("ai_service_resume_parse_mode_total", "Parsings de currículo por modo (single ou sections)")
+
 
 class ResumeParser:
     """Serviço responsável por fazer parsing de currículos usando IA"""
     
-    def __init__(self, ai_service: AIService):
+    def __init__(self, ai_service: AIService, cache: Optional[ResultCache] = None,
+                 extractor: Optional[PDFTextExtractor] = None, sectioned: bool = False,
+                 sectioned_min_chars: int = 0):
         """
         Inicializa o parser de currículos
         
         Args:
             ai_service: Instância do AIService configurado
+            cache: Cache de resultados de parsing (opcional; também guarda as seções)
+            extractor: Extrator compartilhado de texto de PDFs (sem ele a extração
+                roda no próprio processo)
+            sectioned: Se True, currículos longos são divididos em seções e cada
+                seção é extraída por um prompt menor, em paralelo
+            sectioned_min_chars: Tamanho mínimo do texto para usar o modo por seção
         """
         self.ai_service = ai_service
+        self.cache = cache
+        self.extractor = extractor
+        self.sectioned = sectioned
+        self.sectioned_min_chars = sectioned_min_chars
+        # Resultado da última consulta ao cache: "hit", "miss" ou "disabled"
+        self.cache_status = "disabled"
     
     async def parse_resume_from_pdf(self, pdf_path: str, application_id: str) -> Dict[str, Any]:
         """
@@ -35,35 +59,78 @@ class ResumeParser:
             pdf_path: Caminho para o arquivo PDF
             application_id: ID da aplicação
             
+        Returns:
+            Dict com os dados do currículo parseado
+        """
+        with open(pdf_path, 'rb') as pdf_file:
+            return await self.parse_resume_from_file(pdf_file, application_id)
+    
+    async def get_cached_resume(self, pdf_sha256: str, application_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Consulta o cache de parsing pelo hash do PDF
+        
+        Args:
+            pdf_sha256: Hash SHA-256 do conteúdo do PDF
+            application_id: ID da aplicação
+            
+        Returns:
+            Dict com os dados do currículo ou None se não estiver em cache
+        """
+        if self.cache is None or not self.cache.enabled:
+            self.cache_status = "disabled"
+            return None
+        cached_data = await self.cache.get(self._build_cache_key(pdf_sha256))
+        self.cache_status = "hit" if cached_data is not None else "miss"
+        metrics.inc("ai_service_cache_requests_total", cache="resume_parse", result=self.cache_status)
+        if cached_data is None:
+            return None
+        logger.info("⚡ Currículo encontrado no cache de parsing")
+        return self._create_resume_model(cached_data, application_id)
+    
+    async def parse_resume_from_file(self, pdf_file: BinaryIO, application_id: str,
+                                     pdf_sha256: Optional[str] = None,
+                                     check_cache: bool = True) -> Dict[str, Any]:
+        """
+        Faz parsing de um currículo a partir de um arquivo PDF já aberto
+        
+        Args:
+            pdf_file: Arquivo PDF (binário, posicionado no início)
+            application_id: ID da aplicação
+            pdf_sha256: Hash do conteúdo, se já calculado (ex: durante o download)
+            check_cache: Se False, não consulta o cache (a consulta já foi feita)
+            
         Returns:
             Dict com os dados do currículo parseado
         """
         logger.info("⏳ Iniciando parsing do currículo...")
         try:
+            # Arquivo em disco: só o caminho segue para a extração; em memória, os bytes
+            pdf_path = self._file_path(pdf_file)
+            pdf_source = pdf_path or pdf_file.read()
+            use_cache = self.cache is not None and self.cache.enabled
+            if use_cache and pdf_sha256 is None:
+                pdf_sha256 = (
+                    await asyncio.to_thread(sha256_file, pdf_path) if pdf_path else sha256_hex(pdf_source)
+                )
+            if use_cache and check_cache:
+                cached_resume = await self.get_cached_resume(pdf_sha256, application_id)
+                if cached_resume is not None:
+                    return cached_resume
+            
             # Extrai texto do PDF
-            pdf_text = self._extract_text_from_pdf(pdf_path)
+            pdf_text = await self._extract_text_from_pdf(pdf_source)
             
             if not pdf_text.strip():
                 raise ResumeParsingError("Não foi possível extrair texto do PDF")
             
-            # Cria prompt para parsing
-            prompt = self._create_resume_parse_prompt(pdf_text)
-            
-            # Log antes de chamar o serviço de IA
-            logger.info("⏳ Aguardando resposta do serviço de IA para parsing do currículo...")
-            
-            # Gera parsing usando IA
-            response = await self.ai_service.generate_text(
-                prompt
-            )
+            resume_data = None
+            if self.sectioned and len(pdf_text) >= self.sectioned_min_chars:
+                resume_data = await self._parse_by_sections(pdf_text)
+            if resume_data is None:
+                resume_data = await self._parse_whole_text(pdf_text)
             
-            # Log após receber resposta da IA
-            logger.info(
-                "✅ Resposta recebida do serviço de IA para parsing do currículo"
-            )
-            
-            # Extrai dados do JSON
-            resume_data = self._parse_json_response(response)
+            if use_cache:
+                await self.cache.set(self._build_cache_key(pdf_sha256), resume_data)
             
             # Cria modelo do currículo
             resume = self._create_resume_model(resume_data, application_id)
@@ -73,26 +140,122 @@ class ResumeParser:
         except Exception as e:
             raise ResumeParsingError(f"Erro ao fazer parsing do currículo: {str(e)}")
     
-    def _extract_text_from_pdf(self, pdf_path: str) -> str:
+    async def _parse_whole_text(self, pdf_text: str) -> Dict[str, Any]:
+        """Extrai o currículo inteiro com um único prompt"""
+        # Cria prompt para parsing
+        prompt = self._create_resume_parse_prompt(pdf_text)
+        
+        # Log antes de chamar o serviço de IA
+        logger.info("⏳ Aguardando resposta do serviço de IA para parsing do currículo...")
+        
+        # Gera parsing usando IA
+        response = await self.ai_service.generate_text(
+            prompt,
+            **structured_output_kwargs("resume_parse")
+        )
+        
+        # Log após receber resposta da IA
+        logger.info(
+            "✅ Resposta recebida do serviço de IA para parsing do currículo"
+        )
+        metrics.inc("ai_service_resume_parse_mode_total", mode="single")
+        
+        # Extrai dados do JSON
+        return self._parse_json_response(response)
+    
+    async def _parse_by_sections(self, pdf_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Divide o texto em seções e extrai cada uma em paralelo
+        
+        Returns:
+            Dados do currículo no mesmo formato do prompt único, ou None se o texto
+            não tem seções reconhecíveis ou alguma seção falhou (usa o prompt único)
+        """
+        sections = segment_resume_text(pdf_text)
+        if not is_segmented(sections):
+            logger.info("📄 Seções do currículo não reconhecidas; usando prompt único")
+            return None
+        
+        start = time.perf_counter()
+        logger.info(f"🧩 Parsing por seções: {', '.join(sections)}")
+        results = await asyncio.gather(
+            *(self._parse_section(section, text) for section, text in sections.items()),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            logger.warning(f"⚠️ Falha no parsing por seções ({str(errors[0])}); usando prompt único")
+            return None
+        
+        resume_data: Dict[str, Any] = {}
+        for result in results:
+            resume_data.update(result)
+        metrics.inc("ai_service_resume_parse_mode_total", mode="sections")
+        logger.info(f"✅ Parsing por seções concluído em {time.perf_counter() - start:.2f}s")
+        return resume_data
+    
+    async def _parse_section(self, section: str, section_text: str) -> Dict[str, Any]:
+        """Extrai uma seção, reaproveitando o cache pelo hash do texto da seção"""
+        prompt_type = f"resume_section_{section}"
+        template = get_prompt_registry().get(prompt_type)
+        use_cache = self.cache is not None and self.cache.enabled
+        cache_key = build_section_cache_key(section, section_text, template.version, self._model_label())
+        if use_cache:
+            cached = await self.cache.get(cache_key)
+            metrics.inc("ai_service_cache_requests_total", cache="resume_section",
+                        result="hit" if cached is not None else "miss")
+            if cached is not None:
+                return cached
+        
+        response = await self.ai_service.generate_text(
+            template.render(section_text=section_text),
+            **structured_output_kwargs(prompt_type)
+        )
+        data = parse_json_output(response, prompt_type)
+        if data is None:
+            raise ResumeParsingError(f"Resposta sem JSON válido para a seção '{section}'")
+        section_data = {field: data[field] for field in SECTION_FIELDS[section] if field in data}
+        if use_cache:
+            await self.cache.set(cache_key, section_data)
+        return section_data
+    
+    def _model_label(self) -> str:
+        """Provider e modelo usados no parsing (compõem as chaves de cache)"""
+        return f"{self.ai_service.provider.value}:{Config.DEFAULT_MODEL}"
+    
+    def _build_cache_key(self, pdf_sha256: str) -> str:
+        """
+        Monta a chave do cache a partir do conteúdo do PDF, da versão do prompt e do modelo
+        
+        Args:
+            pdf_sha256: Hash SHA-256 do conteúdo do PDF
+            
+        Returns:
+            Chave do cache
+        """
+        return build_resume_parse_cache_key(pdf_sha256, self._model_label())
+    
+    @staticmethod
+    def _file_path(pdf_file: BinaryIO) -> Optional[str]:
+        """Caminho do arquivo no disco, se houver (arquivos abertos ou NamedTemporaryFile)"""
+        name = getattr(pdf_file, "name", None)
+        return name if isinstance(name, str) and os.path.isfile(name) else None
+    
+    async def _extract_text_from_pdf(self, pdf: Union[bytes, str]) -> str:
         """
         Extrai texto de um arquivo PDF
         
         Args:
-            pdf_path: Caminho para o arquivo PDF
+            pdf: Caminho do arquivo ou conteúdo do PDF
             
         Returns:
             Texto extraído do PDF
         """
+        if self.extractor is not None:
+            return await self.extractor.extract(pdf)
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = " "
-                
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + " \n"
-                
-                return sanitize_text(text)
-                
+            text, _ = extract_text_from_pdf(pdf)
+            return text
         except Exception as e:
             raise ResumeParsingError(f"Erro ao extrair texto do PDF: {str(e)}")
     
@@ -107,20 +270,11 @@ class ResumeParser:
             Prompt estruturado para a IA
         """
         try:
-            # Lê o prompt do arquivo externo
-            prompt_file_path = os.path.join(os.path.dirname(__file__), 'resume_parse.prompt')
+            # Template pré-compilado; o JSON de exemplo não precisa de escape
+            return get_prompt_registry().render('resume_parse', pdf_text=pdf_text)
             
-            with open(prompt_file_path, 'r', encoding='utf-8') as file:
-                prompt_template = file.read()
-            
-            # Substitui apenas a variável {pdf_text} usando replace (mais seguro)
-            # Isso evita problemas com chaves {} no JSON de exemplo
-            return prompt_template.replace('{pdf_text}', pdf_text)
-            
-        except FileNotFoundError:
-            raise ResumeParsingError("Arquivo de prompt 'resume_parse.prompt' não encontrado")
-        except Exception as e:
-            raise ResumeParsingError(f"Erro ao ler arquivo de prompt: {str(e)}")
+        except KeyError as e:
+            raise ResumeParsingError(f"Erro no template de prompt 'resume_parse': {str(e)}")
     
     def _parse_json_response(self, response: str) -> Dict[str, Any]:
         """
@@ -132,7 +286,7 @@ class ResumeParser:
         Returns:
             Dict com os dados do currículo
         """
-        resume_data = extract_json_from_text(response)
+        resume_data = parse_json_output(response, "resume_parse")
         
         if not resume_data:
             raise ResumeParsingError(f"Não foi possível extrair JSON válido da resposta da IA. AI Response: {response}")
@@ -0,0 +1,210 @@
+"""
+Extração de texto de PDFs fora do event loop
+
+O parsing com PyPDF2 é CPU-bound (um CV de 30 páginas leva segundos) e, feito
+dentro de um handler async, trava o worker do uvicorn. Cada extração roda em um
+processo próprio, criado a partir de um forkserver que já tem este módulo (e o
+PyPDF2) importado: o processo filho recebe o caminho do PDF em disco (ou os
+bytes, para arquivos pequenos que ficaram em memória) e devolve o texto
+sanitizado por um pipe.
+
+No máximo `max_workers` extrações rodam ao mesmo tempo (as demais esperam a
+vez) e o timeout conta só a execução. Um processo preso em um PDF patológico é
+encerrado ao estourar o timeout, sem afetar as outras extrações.
+"""
+import asyncio
+import io
+import logging
+import multiprocessing
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Optional, Set, Tuple, Union
+
+import PyPDF2
+
+from shared.exceptions import ResumeParsingError
+from shared.metrics import metrics
+from shared.utils import sanitize_text
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+metrics.describe_histogram(
+    "ai_service_pdf_extraction_seconds",
+    "Latência da extração de texto de PDFs (espera na fila + processamento)",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+)
+metrics.describe("ai_service_pdf_extraction_in_flight", "Extrações de PDF submetidas e ainda não concluídas")
+metrics.describe("ai_service_pdf_extraction_queue_depth", "Extrações de PDF aguardando um processo livre")
+metrics.describe("ai_service_pdf_extractions_total", "Extrações de PDF por resultado")
+
+
+def extract_text_from_pdf(pdf: Union[bytes, str], max_pages: int = 0) -> Tuple[str, int]:
+    """
+    Extrai o texto das primeiras páginas de um PDF
+
+    Executada nos processos de extração, por isso precisa ser uma função de módulo.
+
+    Args:
+        pdf: Conteúdo do PDF ou caminho do arquivo
+        max_pages: Número máximo de páginas lidas (0 = todas)
+
+    Returns:
+        Tupla (texto sanitizado, com as quebras de linha do PDF, e total de páginas do documento)
+    """
+    pdf_reader = PyPDF2.PdfReader(pdf if isinstance(pdf, str) else io.BytesIO(pdf))
+    total_pages = len(pdf_reader.pages)
+    page_count = min(total_pages, max_pages) if max_pages > 0 else total_pages
+    text = "\n".join(pdf_reader.pages[index].extract_text() or "" for index in range(page_count))
+
+    return sanitize_text(text, keep_line_breaks=True), total_pages
+
+
+def _extraction_worker(conn: Connection, pdf: Union[bytes, str], max_pages: int) -> None:
+    """Ponto de entrada do processo filho: devolve ("ok", resultado) ou ("error", mensagem)"""
+    try:
+        conn.send(("ok", extract_text_from_pdf(pdf, max_pages)))
+    except Exception as e:  # noqa: BLE001 - o erro volta para o processo pai
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+
+def _receive(conn: Connection) -> Any:
+    """Espera a resposta do processo filho (executada em uma thread)"""
+    try:
+        return conn.recv()
+    except EOFError:
+        return ("error", "processo de extração encerrado sem resposta")
+    finally:
+        conn.close()
+
+
+def _stop_process(process: multiprocessing.process.BaseProcess) -> None:
+    """Encerra um processo de extração (SIGTERM, depois SIGKILL) e o recolhe"""
+    if process.is_alive():
+        process.terminate()
+        process.join(timeout=1)
+    if process.is_alive():
+        process.kill()
+    process.join(timeout=1)
+
+
+def _process_context() -> multiprocessing.context.BaseContext:
+    """forkserver (filhos leves, sem herdar as threads do servidor) ou spawn onde não existe"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class PDFTextExtractor:
+    """Extração de texto de PDFs em processos dedicados, com concorrência limitada"""
+
+    def __init__(self, max_workers: int, timeout_seconds: float, max_pages: int = 0):
+        """
+        Inicializa o extrator
+
+        Args:
+            max_workers: Extrações simultâneas, cada uma em um processo (0 = extrai no
+                próprio processo, em uma thread)
+            timeout_seconds: Tempo máximo de execução por documento (sem contar a espera na fila)
+            max_pages: Número máximo de páginas lidas por documento (0 = todas)
+        """
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self.max_pages = max_pages
+        self._context: Optional[multiprocessing.context.BaseContext] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._processes: Set[multiprocessing.process.BaseProcess] = set()
+        self._in_flight = 0
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(self.max_workers, 1))
+        return self._slots
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("ai_service_pdf_extraction_in_flight", self._in_flight)
+        metrics.set_gauge(
+            "ai_service_pdf_extraction_queue_depth",
+            max(0, self._in_flight - max(self.max_workers, 1))
+        )
+
+    async def extract(self, pdf: Union[bytes, str]) -> str:
+        """
+        Extrai o texto de um PDF sem bloquear o event loop
+
+        Args:
+            pdf: Caminho do arquivo (preferível: só o caminho vai para o processo) ou conteúdo do PDF
+
+        Returns:
+            Texto extraído do PDF
+
+        Raises:
+            ResumeParsingError: PDF inválido ou extração acima do timeout
+        """
+        start = time.perf_counter()
+        self._in_flight += 1
+        self._update_gauges()
+        result = "error"
+        try:
+            async with self._get_slots():
+                if self.max_workers <= 0:
+                    text, total_pages = await asyncio.wait_for(
+                        asyncio.to_thread(extract_text_from_pdf, pdf, self.max_pages),
+                        timeout=self.timeout_seconds
+                    )
+                else:
+                    text, total_pages = await self._extract_in_process(pdf)
+            result = "ok"
+            if self.max_pages > 0 and total_pages > self.max_pages:
+                logger.warning(
+                    f"⚠️ PDF com {total_pages} páginas; apenas as {self.max_pages} primeiras foram lidas"
+                )
+            return text
+        except asyncio.TimeoutError:
+            result = "timeout"
+            raise ResumeParsingError(
+                f"Extração de texto do PDF excedeu o tempo limite de {self.timeout_seconds}s"
+            )
+        except ResumeParsingError:
+            raise
+        except Exception as e:
+            raise ResumeParsingError(f"Erro ao extrair texto do PDF: {str(e)}")
+        finally:
+            self._in_flight -= 1
+            self._update_gauges()
+            metrics.inc("ai_service_pdf_extractions_total", result=result)
+            metrics.observe("ai_service_pdf_extraction_seconds", time.perf_counter() - start)
+
+    async def _extract_in_process(self, pdf: Union[bytes, str]) -> Tuple[str, int]:
+        """Roda a extração em um processo novo; no timeout, só esse processo é encerrado"""
+        if self._context is None:
+            self._context = _process_context()
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_extraction_worker, args=(sender, pdf, self.max_pages), daemon=True
+        )
+        await asyncio.to_thread(process.start)
+        sender.close()
+        self._processes.add(process)
+        try:
+            status, value = await asyncio.wait_for(asyncio.to_thread(_receive, receiver), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Extração de PDF acima de {self.timeout_seconds}s; encerrando o processo {process.pid}")
+            raise
+        finally:
+            # Encerrar e recolher o processo bloqueia; fica fora do event loop
+            await asyncio.to_thread(_stop_process, process)
+            self._processes.discard(process)
+        if status != "ok":
+            raise ResumeParsingError(f"Erro ao extrair texto do PDF: {value}")
+        return value
+
+    def shutdown(self) -> None:
+        """Encerra as extrações em andamento (chamado no encerramento da aplicação)"""
+        for process in list(self._processes):
+            _stop_process(process)
+        self._processes.clear()
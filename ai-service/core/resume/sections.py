@@ -0,0 +1,97 @@
+"""
+Segmentação heurística do texto de currículos em seções
+
+Uma passada barata (sem IA) que reconhece títulos de seção comuns em
+português e inglês ("Experiência Profissional", "Formação Acadêmica",
+"Idiomas"...) em linhas curtas e agrupa o texto seguinte até o próximo
+título. O texto antes do primeiro título (cabeçalho, contato, objetivo) fica
+em "summary".
+
+Cada seção é enviada a um prompt menor (resume_section_<seção>.prompt) e
+tem cache próprio pelo hash do seu texto.
+"""
+import hashlib
+import re
+import unicodedata
+from typing import Dict, List, Tuple
+
+# Seção -> campos do JSON de currículo que ela produz
+SECTION_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "summary": ("summary",),
+    "experience": ("professionalExperiences",),
+    "education": ("academicFormations",),
+    "languages": ("languages",),
+    "achievements": ("achievements",),
+}
+
+# Títulos reconhecidos (sem acentos, minúsculos)
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "summary": (
+        "resumo", "resumo profissional", "perfil", "perfil profissional", "objetivo", "objetivos",
+        "sobre mim", "summary", "profile", "about me", "objective",
+    ),
+    "experience": (
+        "experiencia", "experiencias", "experiencia profissional", "experiencias profissionais",
+        "historico profissional", "atuacao profissional", "experience", "work experience",
+        "professional experience", "employment history",
+    ),
+    "education": (
+        "formacao", "formacao academica", "educacao", "escolaridade", "formacao escolar",
+        "education", "academic background",
+    ),
+    "languages": ("idiomas", "linguas", "languages"),
+    "achievements": (
+        "conquistas", "premios", "premiacoes", "certificacoes", "certificados", "cursos",
+        "cursos complementares", "atividades complementares", "achievements", "awards",
+        "certifications", "courses",
+    ),
+}
+
+# Títulos são linhas curtas
+MAX_HEADING_LENGTH = 50
+
+_HEADING_LOOKUP = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+
+def _normalize_heading(line: str) -> str:
+    text = unicodedata.normalize("NFKD", line).encode("ascii", "ignore").decode("ascii")
+    text = re.sub(r"[^a-zA-Z ]", " ", text).lower()
+    return " ".join(text.split())
+
+
+def detect_heading(line: str) -> str:
+    """Seção cujo título é a linha (ou "" se a linha não é um título)"""
+    stripped = line.strip()
+    if not stripped or len(stripped) > MAX_HEADING_LENGTH:
+        return ""
+    return _HEADING_LOOKUP.get(_normalize_heading(stripped), "")
+
+
+def segment_resume_text(text: str) -> Dict[str, str]:
+    """
+    Divide o texto do currículo por seção
+
+    Returns:
+        Dict seção -> texto (seções repetidas são concatenadas; vazias omitidas)
+    """
+    parts: Dict[str, List[str]] = {}
+    current = "summary"
+    for line in text.splitlines():
+        section = detect_heading(line)
+        if section:
+            current = section
+            continue
+        parts.setdefault(current, []).append(line)
+    sections = {section: "\n".join(lines).strip() for section, lines in parts.items()}
+    return {section: body for section, body in sections.items() if body}
+
+
+def is_segmented(sections: Dict[str, str]) -> bool:
+    """Se a segmentação encontrou seções suficientes para o modo por seção valer a pena"""
+    return len([section for section in sections if section != "summary"]) >= 2
+
+
+def build_section_cache_key(section: str, section_text: str, prompt_version: str, model: str) -> str:
+    """Chave do cache de uma seção: section:<seção>:<sha256 do texto>:<versão do prompt>:<modelo>"""
+    digest = hashlib.sha256(" ".join(section_text.split()).encode("utf-8")).hexdigest()
+    return f"section:{section}:{digest}:{prompt_version}:{model}"
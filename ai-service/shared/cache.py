@@ -0,0 +1,207 @@
+"""
+Cache de resultados em duas camadas: LRU local (opcional) + Redis com TTL
+
+Falhas do Redis nunca quebram a requisição: são registradas e tratadas como
+miss (leitura) ou ignoradas (escrita).
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared.config import Config
+
+# Configurar logger
+logger = logging.getLogger(__name__)
+
+
+def create_redis_client():
+    """
+    Cria o cliente Redis assíncrono a partir de REDIS_URL
+
+    Returns:
+        Cliente redis.asyncio ou None se REDIS_URL não estiver configurada
+    """
+    if not Config.REDIS_URL:
+        return None
+    import redis.asyncio as redis
+    return redis.from_url(Config.REDIS_URL, decode_responses=True)
+
+
+def sha256_hex(data: bytes) -> str:
+    """Hash SHA-256 em hexadecimal"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: str, chunk_size: int = 65536) -> str:
+    """Hash SHA-256 em hexadecimal de um arquivo, lido em blocos"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LocalLRUCache:
+    """LRU em memória com TTL por entrada (camada local, por processo)"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResultCache:
+    """
+    Cache de resultados (dicts serializáveis em JSON) de um namespace
+
+    No Redis, cada entrada é uma chave `<namespace>:<key>` com TTL. Um ZSET
+    `<namespace>:index` guarda o horário de escrita de cada chave e limita o
+    namespace a `max_entries`: ao exceder, as entradas mais antigas são removidas.
+    """
+
+    def __init__(self, namespace: str, redis_client=None, ttl_seconds: int = 86400,
+                 max_entries: int = 10000, local_max_entries: int = 0):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._redis = redis_client
+        self._local = LocalLRUCache(local_max_entries, ttl_seconds) if local_max_entries > 0 else None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis is not None or self._local is not None
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    @property
+    def _index_key(self) -> str:
+        return f"{self.namespace}:index"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna o valor em cache ou None"""
+        value = self._local.get(key) if self._local is not None else None
+        if value is None and self._redis is not None:
+            try:
+                raw = await self._redis.get(self._redis_key(key))
+                if raw is not None:
+                    value = json.loads(raw)
+                    if self._local is not None:
+                        self._local.set(key, value)
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao ler cache {self.namespace} no Redis: {str(e)}")
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retorna as entradas encontradas (chave -> valor) com um único MGET no Redis"""
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for key in keys:
+            value = self._local.get(key) if self._local is not None else None
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing and self._redis is not None:
+            try:
+                raws = await self._redis.mget([self._redis_key(key) for key in missing])
+                for key, raw in zip(missing, raws):
+                    if raw is None:
+                        continue
+                    found[key] = json.loads(raw)
+                    if self._local is not None:
+                        self._local.set(key, found[key])
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao ler cache {self.namespace} no Redis: {str(e)}")
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Grava o valor nas duas camadas"""
+        await self.set_many({key: value})
+
+    async def set_many(self, values: Dict[str, Dict[str, Any]]) -> None:
+        """Grava várias entradas nas duas camadas (um pipeline no Redis)"""
+        if not values:
+            return
+        if self._local is not None:
+            for key, value in values.items():
+                self._local.set(key, value)
+        if self._redis is None:
+            return
+        try:
+            now = time.time()
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.set(self._redis_key(key), json.dumps(value, ensure_ascii=False), ex=self.ttl_seconds)
+                pipe.zadd(self._index_key, {key: now for key in values})
+                # Entradas expiradas por TTL saem do índice
+                pipe.zremrangebyscore(self._index_key, "-inf", now - self.ttl_seconds)
+                pipe.zcard(self._index_key)
+                *_, size = await pipe.execute()
+
+            excess = int(size) - self.max_entries
+            if excess > 0:
+                evicted = await self._redis.zpopmin(self._index_key, excess)
+                if evicted:
+                    await self._redis.delete(*(self._redis_key(k) for k, _ in evicted))
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao gravar cache {self.namespace} no Redis: {str(e)}")
+
+    async def delete(self, key: str) -> None:
+        """Remove a entrada das duas camadas"""
+        if self._local is not None:
+            self._local.delete(key)
+        if self._redis is None:
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.delete(self._redis_key(key))
+                pipe.zrem(self._index_key, key)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao remover cache {self.namespace} no Redis: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de hit/miss do processo"""
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "local_entries": len(self._local) if self._local is not None else None,
+            "redis_enabled": self._redis is not None
+        }
@@ -32,6 +32,114 @@ class Config:
     # Configurações de timeout
     REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "30"))
     
+    # Pool de conexões HTTP dos providers (um cliente compartilhado por provider/API key)
+    PROVIDER_MAX_CONNECTIONS = int(os.getenv("PROVIDER_MAX_CONNECTIONS", "100"))
+    PROVIDER_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("PROVIDER_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    
+    # Recarrega os arquivos .prompt quando mudam (apenas desenvolvimento; nunca em produção)
+    PROMPTS_HOT_RELOAD = os.getenv("PROMPTS_HOT_RELOAD", "false").lower() == "true"
+    
+    # Redis (cache de resultados); sem REDIS_URL apenas o cache local é usado
+    REDIS_URL = os.getenv("REDIS_URL")
+    
+    # Cache de parsing de currículos (conteúdo do PDF + versão do prompt + modelo)
+    RESUME_PARSE_CACHE_ENABLED = os.getenv("RESUME_PARSE_CACHE_ENABLED", "true").lower() == "true"
+    RESUME_PARSE_CACHE_TTL_SECONDS = int(os.getenv("RESUME_PARSE_CACHE_TTL_SECONDS", "604800"))
+    RESUME_PARSE_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_PARSE_CACHE_MAX_ENTRIES", "10000"))
+    RESUME_PARSE_CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("RESUME_PARSE_CACHE_LOCAL_MAX_ENTRIES", "256"))
+    
+    # Parsing por seções para currículos longos (prompts menores em paralelo, cache por seção)
+    RESUME_SECTIONED_PARSING_ENABLED = os.getenv("RESUME_SECTIONED_PARSING_ENABLED", "false").lower() == "true"
+    RESUME_SECTIONED_PARSING_MIN_CHARS = int(os.getenv("RESUME_SECTIONED_PARSING_MIN_CHARS", "4000"))
+    
+    # Cache de notas de avaliação (fingerprint de currículo + vaga + respostas + modelo)
+    EVALUATION_CACHE_ENABLED = os.getenv("EVALUATION_CACHE_ENABLED", "true").lower() == "true"
+    EVALUATION_CACHE_TTL_SECONDS = int(os.getenv("EVALUATION_CACHE_TTL_SECONDS", "259200"))
+    EVALUATION_CACHE_MAX_ENTRIES = int(os.getenv("EVALUATION_CACHE_MAX_ENTRIES", "50000"))
+    EVALUATION_CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("EVALUATION_CACHE_LOCAL_MAX_ENTRIES", "1024"))
+    
+    # Download de PDFs (streaming para arquivo temporário, com limite de tamanho)
+    PDF_DOWNLOAD_MAX_BYTES = int(os.getenv("PDF_DOWNLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+    PDF_DOWNLOAD_TIMEOUT_SECONDS = float(os.getenv("PDF_DOWNLOAD_TIMEOUT_SECONDS", "30"))
+    PDF_DOWNLOAD_CHUNK_SIZE = int(os.getenv("PDF_DOWNLOAD_CHUNK_SIZE", "65536"))
+    PDF_DOWNLOAD_SPOOL_MAX_BYTES = int(os.getenv("PDF_DOWNLOAD_SPOOL_MAX_BYTES", str(1024 * 1024)))
+    PDF_DOWNLOAD_ETAG_TTL_SECONDS = int(os.getenv("PDF_DOWNLOAD_ETAG_TTL_SECONDS", "604800"))
+    
+    # Extração de texto de PDFs (um processo por extração, até N simultâneas; 0 = sem processos)
+    PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PDF_EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACTION_TIMEOUT_SECONDS", "20"))
+    PDF_EXTRACTION_MAX_PAGES = int(os.getenv("PDF_EXTRACTION_MAX_PAGES", "30"))
+    
+    # Rate limit por provider/modelo (token bucket no Redis, compartilhado entre workers; 0 = sem limite)
+    PROVIDER_RATE_LIMIT_ENABLED = os.getenv("PROVIDER_RATE_LIMIT_ENABLED", "true").lower() == "true"
+    PROVIDER_REQUESTS_PER_MINUTE = int(os.getenv("PROVIDER_REQUESTS_PER_MINUTE", "500"))
+    PROVIDER_TOKENS_PER_MINUTE = int(os.getenv("PROVIDER_TOKENS_PER_MINUTE", "200000"))
+    # Limites por modelo: "openai:gpt-4.1-2025-04-14=500/300000,anthropic:*=50/40000"
+    PROVIDER_RATE_LIMITS = os.getenv("PROVIDER_RATE_LIMITS", "")
+    PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS", "60"))
+    PROVIDER_ESTIMATED_COMPLETION_TOKENS = int(os.getenv("PROVIDER_ESTIMATED_COMPLETION_TOKENS", "800"))
+    
+    # Concorrência adaptativa (AIMD) por provider/modelo
+    ADAPTIVE_CONCURRENCY_INITIAL = int(os.getenv("ADAPTIVE_CONCURRENCY_INITIAL", "10"))
+    ADAPTIVE_CONCURRENCY_MIN = int(os.getenv("ADAPTIVE_CONCURRENCY_MIN", "1"))
+    ADAPTIVE_CONCURRENCY_MAX = int(os.getenv("ADAPTIVE_CONCURRENCY_MAX", "50"))
+    ADAPTIVE_CONCURRENCY_LATENCY_TARGET_SECONDS = float(os.getenv("ADAPTIVE_CONCURRENCY_LATENCY_TARGET_SECONDS", "20"))
+    
+    # Rotas alternativas da avaliação (failover e hedge): "anthropic:claude-3-5-sonnet-latest,openai:gpt-4.1-mini"
+    EVALUATION_FALLBACK_ROUTES = os.getenv("EVALUATION_FALLBACK_ROUTES", "")
+    # Fração máxima de chamadas extras por hedge (0 desativa o hedge; failover continua ativo)
+    HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.05"))
+    HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "2"))
+    HEDGE_MAX_DELAY_SECONDS = float(os.getenv("HEDGE_MAX_DELAY_SECONDS", "30"))
+    ROUTER_ERROR_THRESHOLD = float(os.getenv("ROUTER_ERROR_THRESHOLD", "0.5"))
+    
+    # Melhoria combinada de jobs (/jobs/enhance): um prompt JSON único em vez de uma chamada por campo
+    JOB_ENHANCEMENT_SINGLE_CALL = os.getenv("JOB_ENHANCEMENT_SINGLE_CALL", "false").lower() == "true"
+    
+    # Avaliação de candidatos em lote (/candidates/evaluate-batch)
+    BATCH_EVALUATION_MAX_CONCURRENCY = int(os.getenv("BATCH_EVALUATION_MAX_CONCURRENCY", "10"))
+    BATCH_EVALUATION_MAX_ITEMS = int(os.getenv("BATCH_EVALUATION_MAX_ITEMS", "500"))
+    
+    # Índice vetorial de currículos por vaga (/candidates/index e /candidates/rank)
+    VECTOR_INDEX_ENABLED = os.getenv("VECTOR_INDEX_ENABLED", "false").lower() == "true"
+    VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "data/vector-index")
+    VECTOR_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND", "numpy")  # numpy ou hnsw (requer hnswlib)
+    VECTOR_INDEX_MAX_OPEN = int(os.getenv("VECTOR_INDEX_MAX_OPEN", "64"))
+    VECTOR_INDEX_DEFAULT_LIMIT = int(os.getenv("VECTOR_INDEX_DEFAULT_LIMIT", "50"))
+    HNSW_M = int(os.getenv("HNSW_M", "16"))
+    HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+    HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "100"))
+    EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+    
+    # Embeddings em lote (/ai/embeddings/batch): limites por requisição ao provider e cache por conteúdo
+    EMBEDDING_BATCH_MAX_TEXTS = int(os.getenv("EMBEDDING_BATCH_MAX_TEXTS", "2048"))
+    EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "512"))
+    EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+    EMBEDDING_BATCH_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_BATCH_MAX_CONCURRENCY", "4"))
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "2592000"))
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+    EMBEDDING_CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_LOCAL_MAX_ENTRIES", "2048"))
+
+    # Contabilização de tokens/custo por chamada (buffer em memória descarregado no Redis)
+    USAGE_TRACKING_ENABLED = os.getenv("USAGE_TRACKING_ENABLED", "true").lower() == "true"
+    USAGE_BUFFER_SIZE = int(os.getenv("USAGE_BUFFER_SIZE", "10000"))
+    USAGE_FLUSH_INTERVAL_SECONDS = float(os.getenv("USAGE_FLUSH_INTERVAL_SECONDS", "10"))
+    USAGE_RETENTION_DAYS = int(os.getenv("USAGE_RETENTION_DAYS", "90"))
+    # Preços em USD por 1M de tokens: {"gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.6}}
+    LLM_PRICES_JSON = os.getenv("LLM_PRICES_JSON", "")
+
+    # Logging: JSON em uma fila não bloqueante, com amostragem por evento ("evaluation=0.1,...")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_JSON = os.getenv("LOG_JSON", "true").lower() == "true"
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+
+    # Tracing distribuído (OpenTelemetry, opcional): otlp, file, console ou none
+    OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "ai-service")
+    OTEL_TRACES_EXPORTER = os.getenv("OTEL_TRACES_EXPORTER", "none").lower()
+    OTEL_TRACES_FILE = os.getenv("OTEL_TRACES_FILE", "traces/ai-service.jsonl")
+    
     @classmethod
     def get_provider_api_key(cls, provider: AIProvider) -> Optional[str]:
         """Obtém a API key para um provider específico"""
@@ -28,6 +28,22 @@ class TextGenerationError(AIProviderError):
     pass
 
 
+class ProviderRateLimitError(TextGenerationError):
+    """Exceção quando o provider responde 429 (limite de requisições/tokens)"""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitExceededError(AIProviderError):
+    """Exceção quando não há orçamento de rate limit dentro do tempo máximo de espera"""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class EmbeddingError(AIProviderError):
     """Exceção quando há erro na geração de embeddings"""
     pass
@@ -46,3 +62,16 @@ class JobCreationError(Exception):
 class QuestionEvaluationError(Exception):
     """Exceção quando há erro na avaliação de respostas de perguntas"""
     pass
+
+
+class PDFDownloadError(Exception):
+    """Exceção quando há erro no download de um PDF"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class VectorIndexError(Exception):
+    """Exceção quando um embedding não é compatível com o índice vetorial da vaga"""
+    pass
@@ -0,0 +1,99 @@
+"""
+Parser incremental de JSON em respostas de LLM
+
+Encontra o primeiro objeto JSON completo em um texto que pode ter prosa,
+blocos ```json``` ou outros trechos antes e depois. O texto pode chegar em
+partes (streaming): o parser guarda a posição e a profundidade de chaves e
+colchetes (ignorando os que estão dentro de strings) e só tenta json.loads
+quando um objeto fecha, sem limite de aninhamento.
+"""
+import json
+from typing import Any, Dict, Optional
+
+
+class IncrementalJSONParser:
+    """Localiza o primeiro objeto JSON válido em um texto recebido em partes"""
+
+    def __init__(self):
+        self._text = ""
+        self._position = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.result: Optional[Dict[str, Any]] = None
+
+    def _reset_candidate(self, position: int) -> None:
+        self._position = position
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        """
+        Adiciona um trecho do texto
+
+        Returns:
+            O objeto JSON assim que ele estiver completo (e nas chamadas seguintes), ou None
+        """
+        if self.result is not None:
+            return self.result
+        self._text += chunk
+        text = self._text
+        i = self._position
+        while i < len(text):
+            char = text[i]
+            if self._start is None:
+                if char == "{":
+                    self._start = i
+                    self._depth = 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        parsed = json.loads(text[self._start:i + 1])
+                    except json.JSONDecodeError:
+                        parsed = None
+                    if isinstance(parsed, dict):
+                        self.result = parsed
+                        self._reset_candidate(i + 1)
+                        return parsed
+                    # Chaves de prosa ("{nome}") ou JSON inválido: recomeça após essa abertura
+                    start = self._start
+                    self._reset_candidate(start + 1)
+                    i = start + 1
+                    continue
+            i += 1
+        self._position = i
+        return None
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """
+        Indica que o texto terminou
+
+        Uma chave aberta que nunca fechou (ex: "{" solto na prosa antes do JSON)
+        é descartada e a busca continua a partir do caractere seguinte.
+        """
+        while self.result is None and self._start is not None:
+            self._reset_candidate(self._start + 1)
+            self.feed("")
+        return self.result
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Primeiro objeto JSON válido de um texto completo (None se não houver)"""
+    parser = IncrementalJSONParser()
+    parser.feed(text or "")
+    return parser.finish()
@@ -0,0 +1,128 @@
+"""
+Métricas simples do processo, expostas em GET /metrics (formato texto do Prometheus)
+"""
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+LabelsKey = Tuple[Tuple[str, str], ...]
+
+# Buckets padrão de latência (segundos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Histogram:
+    """Contagens acumuladas por bucket, soma e total de uma série"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Contadores, gauges e histogramas em memória, identificados por nome + labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelsKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelsKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelsKey, _Histogram]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._help: Dict[str, str] = {}
+
+    @staticmethod
+    def _labels_key(labels: Dict[str, str]) -> LabelsKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Registra a descrição (HELP) de uma métrica"""
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        """Incrementa um contador"""
+        key = self._labels_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """Define o valor de um gauge"""
+        key = self._labels_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def describe_histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Registra a descrição e os buckets (limites superiores, crescentes) de um histograma"""
+        self._help[name] = help_text
+        self._buckets[name] = tuple(sorted(buckets))
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Registra uma observação em um histograma"""
+        key = self._labels_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = _Histogram(self._buckets.get(name, DEFAULT_BUCKETS))
+            series[key].observe(value)
+
+    def get_histogram(self, name: str, **labels: str) -> Tuple[int, float]:
+        """Total de observações e soma de um histograma ((0, 0) se inexistente)"""
+        key = self._labels_key(labels)
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(key)
+            return (histogram.count, histogram.sum) if histogram else (0, 0.0)
+
+    def get(self, name: str, **labels: str) -> float:
+        """Valor atual de um contador ou gauge (0 se inexistente)"""
+        key = self._labels_key(labels)
+        with self._lock:
+            for store in (self._counters, self._gauges):
+                if name in store and key in store[name]:
+                    return store[name][key]
+        return 0.0
+
+    def render(self) -> str:
+        """Exporta todas as séries no formato texto do Prometheus"""
+        lines = []
+        with self._lock:
+            for metric_type, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(store):
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} {metric_type}")
+                    for labels, value in sorted(store[name].items()):
+                        label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                        series = f"{name}{{{label_text}}}" if label_text else name
+                        lines.append(f"{series} {value:g}")
+            for name in sorted(self._histograms):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                    prefix = f"{label_text}," if label_text else ""
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{prefix}le="{bound:g}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+                    suffix = f"{{{label_text}}}" if label_text else ""
+                    lines.append(f"{name}_sum{suffix} {histogram.sum:g}")
+                    lines.append(f"{name}_count{suffix} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+# Instância global do processo
+metrics = MetricsRegistry()
+
+metrics.describe("ai_service_log_records_dropped", "Registros de log descartados com a fila de logging cheia")
+metrics.describe("ai_service_cache_requests_total", "Consultas aos caches de resultado, por cache e resultado (hit/miss)")
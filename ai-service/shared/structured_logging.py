@@ -0,0 +1,177 @@
+"""
+Logging estruturado (JSON) sem bloquear o caminho quente
+
+- Os handlers do processo ficam atrás de uma fila: quem loga só enfileira o
+  registro (O(1), sem I/O) e uma thread (QueueListener) formata e escreve no
+  stdout. Um stdout lento não trava o event loop; com a fila cheia o registro
+  é descartado e contado em `dropped`.
+- A mensagem é formatada na thread do listener: use `logger.info("... %s", x)`
+  em vez de f-strings, com argumentos imutáveis (o registro é formatado depois).
+- Amostragem por tipo de mensagem (`LOG_SAMPLING="evaluation=0.1,core.ai.router=0.5"`):
+  a chave é o `event` passado em `extra` ou, sem ele, o nome do logger. WARNING
+  e acima nunca são amostrados.
+- Campos caros: `lazy(fn)` só chama `fn` se o registro passar pelo nível e pela
+  amostragem (vale como argumento da mensagem ou valor em `extra`).
+
+Mesma implementação do async-task-service (src/utils/structured_logging.py).
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional, TextIO
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Atributos padrão do LogRecord (o que sobra veio de `extra`)
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional["_Listener"] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+class LazyValue:
+    """Valor calculado só quando o registro é formatado"""
+
+    __slots__ = ("_fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self._fn = fn
+
+    def resolve(self) -> Any:
+        return self._fn()
+
+    def __str__(self) -> str:
+        return str(self._fn())
+
+    def __repr__(self) -> str:
+        return repr(self._fn())
+
+
+def lazy(fn: Callable[[], Any]) -> LazyValue:
+    """Adia o cálculo de um campo caro até a formatação (só acontece se o registro for emitido)"""
+    return LazyValue(fn)
+
+
+class JsonFormatter(logging.Formatter):
+    """Um objeto JSON por linha: ts, level, logger, message e os campos de `extra`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value.resolve() if isinstance(value, LazyValue) else value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def parse_sampling(raw: str) -> Dict[str, float]:
+    """Taxas de amostragem a partir de "chave=taxa,chave=taxa" (taxas entre 0 e 1)"""
+    rates: Dict[str, float] = {}
+    for item in (raw or "").split(","):
+        key, _, rate = item.partition("=")
+        if key.strip() and rate.strip():
+            rates[key.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Mantém uma fração dos registros abaixo de WARNING por `event` (ou nome do logger)"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rates.get(getattr(record, "event", None) or record.name)
+        return rate is None or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Enfileira o registro sem formatá-lo; descarta (e conta) quando a fila está cheia"""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # A fila é do próprio processo: a formatação fica para a thread do listener
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    """QueueListener que espera vaga na fila para o sentinela de parada (a fila pode estar cheia)"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+def setup_logging(
+    level: str = "INFO",
+    json_output: bool = True,
+    queue_size: int = 10000,
+    sampling: str = "",
+    stream: Optional[TextIO] = None,
+    text_format: str = TEXT_FORMAT,
+    logger: Optional[logging.Logger] = None,
+) -> NonBlockingQueueHandler:
+    """
+    Troca os handlers do logger (raiz, por padrão) por uma fila não bloqueante
+
+    A escrita no `stream` (stdout, por padrão) acontece na thread do listener.
+    Chamadas repetidas reaproveitam a fila já criada.
+    """
+    global _listener, _queue_handler
+    target = logger or logging.getLogger()
+    target.setLevel(getattr(logging, level.upper(), logging.INFO))
+
+    if _queue_handler is None:
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if json_output else logging.Formatter(text_format))
+        _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=max(1, queue_size)))
+        _queue_handler.addFilter(SamplingFilter(parse_sampling(sampling)))
+        _listener = _Listener(_queue_handler.queue, output, respect_handler_level=False)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+    target.handlers.clear()
+    target.addHandler(_queue_handler)
+    return _queue_handler
+
+
+def dropped_records() -> int:
+    """Registros descartados com a fila cheia desde o início do processo"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def shutdown_logging() -> None:
+    """Escreve o que resta na fila e para a thread do listener"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        for logger in [logging.getLogger()] + [
+            item for item in logging.Logger.manager.loggerDict.values() if isinstance(item, logging.Logger)
+        ]:
+            if _queue_handler in logger.handlers:
+                logger.removeHandler(_queue_handler)
+        _queue_handler = None
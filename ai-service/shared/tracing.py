@@ -0,0 +1,134 @@
+"""
+Tracing distribuído com OpenTelemetry (opcional)
+
+O contexto W3C (`traceparent`) chega nos headers das requisições do
+async-task-service; o middleware em api/main.py abre o span do servidor e os
+spans das chamadas aos providers (AIService.generate_text) ficam como filhos.
+
+Sem o pacote opentelemetry-sdk instalado, ou com OTEL_TRACES_EXPORTER=none,
+todas as funções viram no-op. Exportadores:
+- otlp: OTLP/HTTP para um collector (OTEL_EXPORTER_OTLP_ENDPOINT, padrão http://localhost:4318)
+- file: um span JSON por linha em OTEL_TRACES_FILE, para análise offline
+- console: spans no stdout
+"""
+import logging
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from shared.config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import propagate, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # pragma: no cover - dependência opcional
+    trace = None
+
+_provider = None
+_file_handle = None
+
+
+def setup_tracing(service_name: Optional[str] = None, exporter: Optional[str] = None) -> bool:
+    """
+    Configura o TracerProvider do processo conforme OTEL_TRACES_EXPORTER
+
+    Returns:
+        True se o tracing ficou ativo
+    """
+    global _provider, _file_handle
+    exporter = (exporter or Config.OTEL_TRACES_EXPORTER).lower()
+    if exporter in ("", "none") or _provider is not None:
+        return _provider is not None
+    if trace is None:
+        logger.warning(
+            "⚠️ OTEL_TRACES_EXPORTER=%s, mas o opentelemetry-sdk não está instalado; tracing desligado", exporter
+        )
+        return False
+
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        span_exporter = OTLPSpanExporter()
+    elif exporter == "file":
+        os.makedirs(os.path.dirname(os.path.abspath(Config.OTEL_TRACES_FILE)), exist_ok=True)
+        _file_handle = open(Config.OTEL_TRACES_FILE, "a", encoding="utf-8")
+        span_exporter = ConsoleSpanExporter(
+            out=_file_handle, formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    elif exporter == "console":
+        span_exporter = ConsoleSpanExporter()
+    else:
+        logger.warning("⚠️ Exportador de traces desconhecido: %s; tracing desligado", exporter)
+        return False
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": service_name or Config.OTEL_SERVICE_NAME}))
+    _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(_provider)
+    logger.info("🔭 Tracing habilitado - exporter: %s", exporter)
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Exporta os spans pendentes e libera o exportador"""
+    global _provider, _file_handle
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+    if _file_handle is not None:
+        _file_handle.close()
+        _file_handle = None
+
+
+def tracing_enabled() -> bool:
+    return _provider is not None
+
+
+def inject_context(carrier: Dict[str, str]) -> Dict[str, str]:
+    """Grava o contexto do span atual (traceparent) no carrier (headers ou _meta)"""
+    if _provider is not None:
+        propagate.inject(carrier)
+    return carrier
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: Optional[Mapping[str, Any]] = None,
+    parent_carrier: Optional[Mapping[str, str]] = None,
+    kind: str = "internal",
+) -> Iterator[Any]:
+    """
+    Abre um span (filho do atual ou do contexto em `parent_carrier`)
+
+    Exceções são registradas no span e repropagadas. Sem tracing, devolve None.
+    """
+    if _provider is None:
+        yield None
+        return
+
+    token = None
+    if parent_carrier is not None:
+        token = otel_context.attach(propagate.extract(dict(parent_carrier)))
+    try:
+        tracer = trace.get_tracer("cognitive-ats.ai-service")
+        span_kind = {"server": SpanKind.SERVER, "client": SpanKind.CLIENT}.get(kind, SpanKind.INTERNAL)
+        with tracer.start_as_current_span(
+            name, kind=span_kind, attributes=dict(attributes or {}), record_exception=True,
+            set_status_on_exception=True,
+        ) as span:
+            yield span
+    finally:
+        if token is not None:
+            otel_context.detach(token)
+
+
+def set_span_error(span: Any, message: str) -> None:
+    """Marca o span como erro sem exceção (ex: resposta HTTP 5xx)"""
+    if span is not None:
+        span.set_status(Status(StatusCode.ERROR, message))
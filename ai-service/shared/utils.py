@@ -1,10 +1,10 @@
 """
 Utilitários compartilhados do AI Service
 """
-import json
 import re
 from typing import Dict, Any, Optional
 from datetime import date, datetime
+from shared.json_stream import extract_json_object
 
 
 def convert_dates_to_iso(data: Any) -> Any:
@@ -31,31 +31,26 @@ def extract_json_from_text(text: str) -> Optional[Dict[str, Any]]:
     """
     Extrai JSON de um texto que pode conter outros caracteres
     
+    Usa o parser incremental (sem limite de aninhamento, ignora chaves dentro
+    de strings e trechos de prosa antes do JSON).
+    
     Args:
         text: Texto que pode conter JSON
         
     Returns:
         Dict com os dados JSON ou None se não encontrar
     """
-    # Procura por padrões JSON no texto
-    json_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-    matches = re.findall(json_pattern, text, re.DOTALL)
-    
-    for match in matches:
-        try:
-            return json.loads(match)
-        except json.JSONDecodeError:
-            continue
-    
-    return None
+    return extract_json_object(text)
 
 
-def sanitize_text(text: str) -> str:
+def sanitize_text(text: str, keep_line_breaks: bool = False) -> str:
     """
     Sanitiza texto removendo caracteres problemáticos
     
     Args:
         text: Texto a ser sanitizado
+        keep_line_breaks: Mantém uma quebra por linha não vazia (a segmentação
+            de currículos por seção depende delas)
         
     Returns:
         Texto sanitizado
@@ -66,6 +61,11 @@ def sanitize_text(text: str) -> str:
     # Remove caracteres de controle exceto quebras de linha
     text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
     
+    if keep_line_breaks:
+        # Normaliza espaços dentro de cada linha e descarta linhas vazias
+        lines = (re.sub(r'\s+', ' ', line).strip() for line in text.splitlines())
+        return "\n".join(line for line in lines if line)
+    
     # Normaliza espaços em branco
     text = re.sub(r'\s+', ' ', text)
     
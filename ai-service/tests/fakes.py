@@ -0,0 +1,77 @@
+"""
+Providers falsos e arquivos de exemplo usados nos testes (sem chamadas externas)
+"""
+from typing import Any, Dict, List, Optional
+
+from core.ai.base import BaseAIProvider
+from core.ai.service import AIService
+from shared.config import AIProvider
+
+
+class FakeProvider(BaseAIProvider):
+    """Provider em memória: falha para currículos cujo nome contém 'erro'"""
+
+    def __init__(self):
+        super().__init__(api_key="fake")
+        self.prompts: List[str] = []
+
+    def _get_api_key_from_env(self) -> Optional[str]:
+        return None
+
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        self.prompts.append(prompt)
+        if "erro" in prompt:
+            raise RuntimeError("falha simulada")
+        return '{"overall_score": 80, "question_responses_score": 70, "education_score": 60, "experience_score": 90}'
+
+    async def generate_chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return ""
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        return []
+
+    def get_provider_info(self) -> Dict[str, Any]:
+        return {"provider": "fake"}
+
+
+class FakeRegistry:
+    """ProviderRegistry que entrega o mesmo provider falso para qualquer provider/rota"""
+
+    def __init__(self, provider: FakeProvider):
+        self.provider = provider
+
+    def get_ai_service(self, provider: AIProvider, api_key: Optional[str] = None) -> AIService:
+        return AIService(provider, provider_instance=self.provider)
+
+    def get_routed_ai_service(self, provider: AIProvider, model: str) -> AIService:
+        return self.get_ai_service(provider)
+
+
+def build_text_pdf(pages: List[str]) -> bytes:
+    """Monta um PDF mínimo com o texto (Helvetica) de cada página; "\\n" separa linhas"""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages))), len(pages)
+        ),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        lines = " ".join(f"({line}) Tj 0 -14 Td" for line in text.split("\n"))
+        stream = f"BT /F1 12 Tf 72 720 Td {lines} ET"
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+
+    content = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(content))
+        content += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref_offset = len(content)
+    content += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    content += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    content += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return content
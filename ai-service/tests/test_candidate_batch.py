@@ -0,0 +1,67 @@
+"""
+Testes para a avaliação de candidatos em lote
+"""
+import json
+from typing import Any, Dict
+
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_provider_registry
+from api.main import app
+from tests.fakes import FakeProvider, FakeRegistry
+
+
+def _candidate(candidate_id: str, name: str) -> Dict[str, Any]:
+    return {
+        "candidate_id": candidate_id,
+        "resume": {"personal_info": {"name": name}, "skills": ["Python"]},
+    }
+
+
+def test_evaluate_batch_streams_partial_results():
+    """Cada candidato gera uma linha NDJSON; falhas não interrompem o lote"""
+    provider = FakeProvider()
+    app.dependency_overrides[get_provider_registry] = lambda: FakeRegistry(provider)
+    try:
+        client = TestClient(app)
+        response = client.post("/candidates/evaluate-batch", json={
+            "job": {"title": "Desenvolvedor Python", "description": "Vaga de backend"},
+            "candidates": [
+                _candidate("c1", "Ana"),
+                _candidate("c2", "erro"),
+                _candidate("c3", "Bruno"),
+            ],
+            "max_concurrency": 2,
+        })
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+
+    results = {line["candidate_id"]: line for line in lines if line["type"] == "result"}
+    assert results["c1"]["status"] == "ok"
+    assert results["c1"]["scores"]["overall_score"] == 80
+    assert results["c2"]["status"] == "error"
+    assert results["c3"]["status"] == "ok"
+
+    summary = lines[-1]
+    assert summary["type"] == "summary"
+    assert summary["total"] == 3
+    assert summary["succeeded"] == 2
+    assert summary["failed"] == 1
+
+    # A seção da vaga é a mesma em todos os prompts do lote
+    prefixes = {prompt.split("CURRÍCULO DO CANDIDATO:")[0] for prompt in provider.prompts}
+    assert len(prefixes) == 1
+
+
+def test_evaluate_batch_rejects_empty_list():
+    """Lote vazio é rejeitado"""
+    client = TestClient(app)
+    response = client.post("/candidates/evaluate-batch", json={
+        "job": {"title": "Desenvolvedor Python", "description": "Vaga de backend"},
+        "candidates": [],
+    })
+    assert response.status_code == 400
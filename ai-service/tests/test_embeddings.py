@@ -0,0 +1,88 @@
+"""
+Testes para os embeddings em lote (deduplicação, cache e formato float32)
+"""
+import asyncio
+import base64
+from typing import List
+
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_embedding_cache, get_provider_registry
+from api.main import app
+from core.ai.embeddings import chunk_texts, decode_float32, encode_float32
+from core.ai.service import AIService
+from shared.cache import ResultCache
+from shared.config import AIProvider
+from tests.fakes import FakeProvider, FakeRegistry
+
+
+class BatchEmbeddingProvider(FakeProvider):
+    """Embedding [tamanho do texto, 1.5]; registra cada lote recebido"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches: List[List[str]] = []
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        self.batches.append(list(texts))
+        return [[float(len(text)), 1.5] for text in texts]
+
+    def get_provider_info(self):
+        return {"provider": "fake", "embedding_model": "fake-embedding"}
+
+
+def test_dedupes_and_only_sends_cache_misses():
+    provider = BatchEmbeddingProvider()
+    service = AIService(AIProvider.OPENAI, provider_instance=provider)
+    cache = ResultCache("test:embedding", local_max_entries=100)
+
+    first, stats = asyncio.run(service.generate_embeddings_cached(["ab", "abc", "ab"], cache=cache))
+    second, second_stats = asyncio.run(service.generate_embeddings_cached(["abc", "abcd"], cache=cache))
+
+    assert first == [[2.0, 1.5], [3.0, 1.5], [2.0, 1.5]]
+    assert stats == {"unique": 2, "cache_hits": 0, "provider_texts": 2, "provider_batches": 1}
+    assert second == [[3.0, 1.5], [4.0, 1.5]]
+    assert second_stats["cache_hits"] == 1
+    assert provider.batches == [["ab", "abc"], ["abcd"]]
+
+
+def test_batches_respect_item_and_token_limits():
+    texts = ["x" * 40, "y" * 40, "z" * 40, "w"]
+
+    assert chunk_texts(texts, max_items=2, max_tokens=1000) == [texts[:2], texts[2:]]
+    assert chunk_texts(texts, max_items=10, max_tokens=15) == [[texts[0]], [texts[1]], texts[2:]]
+
+    provider = BatchEmbeddingProvider()
+    service = AIService(AIProvider.OPENAI, provider_instance=provider)
+    asyncio.run(service.generate_embeddings_cached(texts, max_batch_items=3, max_batch_tokens=1000))
+    assert [len(batch) for batch in provider.batches] == [3, 1]
+
+
+def test_float32_encoding_is_compact_and_reversible():
+    vectors = [[0.25, -1.0, 3.5], [1.0, 2.0, 0.125]]
+    data = encode_float32(vectors)
+
+    assert len(data) == 4 * 6
+    assert decode_float32(data, 3) == vectors
+
+
+def test_batch_endpoint_returns_base64_and_binary():
+    provider = BatchEmbeddingProvider()
+    cache = ResultCache("test:embedding-endpoint", local_max_entries=100)
+    app.dependency_overrides[get_provider_registry] = lambda: FakeRegistry(provider)
+    app.dependency_overrides[get_embedding_cache] = lambda: cache
+    try:
+        client = TestClient(app)
+        response = client.post("/ai/embeddings/batch", json={"texts": ["um", "dois", "um"]})
+        binary = client.post("/ai/embeddings/batch", json={"texts": ["dois", "tres"], "encoding": "binary"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["count"], body["dimensions"], body["model"]) == (3, 2, "openai:fake-embedding")
+    assert decode_float32(base64.b64decode(body["data"]), 2) == [[2.0, 1.5], [4.0, 1.5], [2.0, 1.5]]
+    assert binary.headers["content-type"] == "application/octet-stream"
+    assert binary.headers["x-embedding-cache-hits"] == "1"
+    assert decode_float32(binary.content, 2) == [[4.0, 1.5], [4.0, 1.5]]
+    assert provider.batches == [["um", "dois"], ["tres"]]
@@ -0,0 +1,115 @@
+"""
+Testes para o cache de notas de avaliação
+"""
+import asyncio
+
+from typing import Optional
+
+from core.ai.evaluation_cache import EvaluationScoreCache, build_evaluation_fingerprint
+from core.ai.router import ProviderRouter, Route
+from core.ai.service import AIService
+from shared.cache import ResultCache
+from shared.config import AIProvider
+from tests.fakes import FakeProvider
+
+RESUME = {"personal_info": {"name": "Ana"}, "skills": ["Python", "SQL"], "education": None}
+JOB = {"id": "job-1", "title": "Desenvolvedor Python", "description": "Backend"}
+
+
+def _service():
+    provider = FakeProvider()
+    return AIService(AIProvider.OPENAI, provider_instance=provider), provider
+
+
+def _cache():
+    return EvaluationScoreCache(ResultCache("test:evaluation", local_max_entries=100))
+
+
+def test_fingerprint_ignores_key_order_whitespace_and_empty_fields():
+    """Entradas equivalentes geram o mesmo fingerprint"""
+    a = build_evaluation_fingerprint(RESUME, JOB, None, "openai", "gpt-4")
+    b = build_evaluation_fingerprint(
+        {"skills": ["Python", "SQL"], "personal_info": {"name": " Ana "}},
+        {"description": "Backend", "title": "Desenvolvedor Python", "id": "outro-id"},
+        [],
+        "openai",
+        "gpt-4"
+    )
+    assert a == b
+    assert a != build_evaluation_fingerprint(RESUME, JOB, None, "openai", "gpt-4o")
+    assert a != build_evaluation_fingerprint(RESUME, {**JOB, "description": "Frontend"}, None, "openai", "gpt-4")
+
+
+def test_repeated_evaluation_is_served_from_cache():
+    """Segunda avaliação idêntica não chama o provider; bypass força nova chamada"""
+    service, provider = _service()
+    cache = _cache()
+
+    async def run():
+        first = await service.evaluate_candidate_cached(RESUME, JOB, score_cache=cache, model="gpt-4")
+        second = await service.evaluate_candidate_cached(RESUME, JOB, score_cache=cache, model="gpt-4")
+        third = await service.evaluate_candidate_cached(
+            RESUME, JOB, score_cache=cache, bypass_cache=True, model="gpt-4"
+        )
+        return first, second, third
+
+    (scores, first_status, _), (cached, second_status, _), (_, third_status, _) = asyncio.run(run())
+
+    assert (first_status, second_status, third_status) == ("miss", "hit", "bypass")
+    assert cached == scores
+    assert len(provider.prompts) == 2
+
+
+def test_edited_job_is_evaluated_again():
+    """Vaga editada (mesmo id, outro conteúdo) gera outra chave: nova chamada ao provider"""
+    service, provider = _service()
+    cache = _cache()
+
+    async def run():
+        await service.evaluate_candidate_cached(RESUME, JOB, score_cache=cache, model="gpt-4")
+        edited_job = {**JOB, "description": "Backend e dados"}
+        return await service.evaluate_candidate_cached(RESUME, edited_job, score_cache=cache, model="gpt-4")
+
+    _, status, _ = asyncio.run(run())
+
+    assert status == "miss"
+    assert len(provider.prompts) == 2
+
+
+class UnavailableProvider(FakeProvider):
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        raise RuntimeError("provider fora do ar")
+
+
+class FailingPrimaryRegistry:
+    """Registry das rotas: a principal (OpenAI) falha, a alternativa (Anthropic) responde"""
+
+    def __init__(self):
+        self.provider = FakeProvider()
+
+    def get_ai_service(self, provider: AIProvider, api_key: Optional[str] = None) -> AIService:
+        if provider == AIProvider.OPENAI:
+            return AIService(provider, provider_instance=UnavailableProvider())
+        return AIService(provider, provider_instance=self.provider)
+
+
+def test_answer_from_alternative_route_is_reported_and_not_cached():
+    """Failover: a resposta informa a rota que respondeu e não entra no cache da principal"""
+    registry = FailingPrimaryRegistry()
+    router = ProviderRouter(
+        registry, [Route(AIProvider.OPENAI, "gpt-4"), Route(AIProvider.ANTHROPIC, "claude-alt")],
+        hedge_budget_ratio=0.0
+    )
+    service = AIService(AIProvider.OPENAI, provider_instance=router)
+    cache = _cache()
+
+    async def run():
+        first = await service.evaluate_candidate_cached(RESUME, JOB, score_cache=cache, model="gpt-4")
+        second = await service.evaluate_candidate_cached(RESUME, JOB, score_cache=cache, model="gpt-4")
+        return first, second
+
+    (_, first_status, route), (_, second_status, _) = asyncio.run(run())
+
+    assert route == Route(AIProvider.ANTHROPIC, "claude-alt")
+    assert (first_status, second_status) == ("miss", "miss")
+    assert len(registry.provider.prompts) == 2
@@ -0,0 +1,92 @@
+"""
+Testes para a melhoria combinada de jobs (título, descrição e requisitos)
+"""
+import asyncio
+import json
+
+import pytest
+
+from core.ai.service import AIService
+from core.jobs.enhancer import JobEnhancer
+from shared.config import AIProvider
+from shared.exceptions import JobCreationError
+from tests.fakes import FakeProvider
+
+JOB = {"title": "Dev", "description": "Backend", "requirements": "Python", "id": "job-1"}
+
+
+class EnhancementProvider(FakeProvider):
+    """Responde conforme o prompt; cada chamada leva `delay` segundos"""
+
+    def __init__(self, delay: float = 0.0, fail: str = "", single_call_response: str = ""):
+        super().__init__()
+        self.delay = delay
+        self.fail = fail
+        self.single_call_response = single_call_response
+
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        if "Campos a melhorar" in prompt:
+            return self.single_call_response
+        for field, marker in (("title", "Melhore o título"), ("description", "Melhore a descrição"),
+                              ("requirements", "Melhore os requisitos")):
+            if marker in prompt:
+                if field == self.fail:
+                    raise RuntimeError(f"falha em {field}")
+                return f"  {field} melhorado\n"
+        raise AssertionError("prompt inesperado")
+
+
+def _enhancer(provider: FakeProvider) -> JobEnhancer:
+    return JobEnhancer(AIService(AIProvider.OPENAI, provider_instance=provider))
+
+
+def test_parallel_enhancement_takes_about_the_slowest_call():
+    provider = EnhancementProvider(delay=0.2)
+
+    result = asyncio.run(_enhancer(provider).enhance_job(JOB, "mais atrativo"))
+
+    assert result["mode"] == "parallel"
+    assert result["job"] == {**JOB, "title": "title melhorado", "description": "description melhorado",
+                             "requirements": "requirements melhorado"}
+    assert len(provider.prompts) == 3
+    # Em paralelo: bem menos que 3 x 200 ms
+    assert result["timings_ms"]["total"] < 450
+    assert set(result["timings_ms"]) == {"title", "description", "requirements", "total"}
+
+
+def test_partial_failure_keeps_original_value():
+    result = asyncio.run(_enhancer(EnhancementProvider(fail="requirements")).enhance_job(JOB, "x"))
+
+    assert result["enhanced_fields"] == ["title", "description"]
+    assert result["job"]["requirements"] == "Python"
+    assert "falha em requirements" in result["errors"]["requirements"]
+
+
+def test_all_fields_failing_raises():
+    with pytest.raises(JobCreationError):
+        asyncio.run(_enhancer(EnhancementProvider(fail="title")).enhance_job(JOB, "x", fields=["title"]))
+
+
+def test_single_call_uses_one_json_prompt():
+    provider = EnhancementProvider(single_call_response=json.dumps(
+        {"title": "Pessoa Desenvolvedora Python", "description": "Backend   com APIs"}
+    ))
+
+    result = asyncio.run(_enhancer(provider).enhance_job(JOB, "x", single_call=True))
+
+    assert len(provider.prompts) == 1
+    assert result["mode"] == "single_call"
+    assert result["job"]["description"] == "Backend com APIs"
+    assert result["errors"] == {"requirements": "Campo ausente na resposta JSON"}
+
+
+def test_single_call_falls_back_to_parallel_on_invalid_json():
+    provider = EnhancementProvider(single_call_response="não é JSON")
+
+    result = asyncio.run(_enhancer(provider).enhance_job(JOB, "x", fields=["title"], single_call=True))
+
+    assert result["mode"] == "parallel"
+    assert result["job"]["title"] == "title melhorado"
+    assert len(provider.prompts) == 2
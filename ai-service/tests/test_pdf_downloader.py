@@ -0,0 +1,69 @@
+"""
+Testes para o download de PDFs em streaming
+"""
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from core.resume.downloader import PDFDownloader
+from shared.cache import sha256_hex
+from shared.exceptions import PDFDownloadError
+
+PDF_BYTES = b"%PDF-1.4\n" + b"0" * 5000
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.headers.get("if-none-match") == '"v1"':
+        return httpx.Response(304)
+    if request.url.path == "/cv.pdf":
+        return httpx.Response(200, content=PDF_BYTES, headers={"etag": '"v1"'})
+    return httpx.Response(200, content=b"<html>nao e pdf</html>" * 100)
+
+
+def _download(url: str, etag: str = None, max_bytes: int = 1024 * 1024):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+            downloader = PDFDownloader(client, max_bytes=max_bytes, chunk_size=1024, spool_max_bytes=2048)
+            result = await downloader.download(url, etag=etag)
+            content = result.file.read() if result.file is not None else None
+            on_disk = result.file is not None and os.path.isfile(getattr(result.file, "name", None) or "")
+            result.close()
+            return result, content, on_disk
+
+    return asyncio.run(run())
+
+
+def test_download_streams_to_spooled_file():
+    """O conteúdo chega inteiro no arquivo temporário, com hash e ETag"""
+    result, content, on_disk = _download("http://storage/cv.pdf")
+
+    assert content == PDF_BYTES
+    # Acima de spool_max_bytes o arquivo vai para disco, com um caminho para a extração
+    assert on_disk
+    assert result.size == len(PDF_BYTES)
+    assert result.sha256 == sha256_hex(PDF_BYTES)
+    assert result.etag == '"v1"'
+    assert not result.not_modified
+
+
+def test_download_with_known_etag_returns_not_modified():
+    """Com If-None-Match o storage responde 304 e nada é baixado"""
+    result, content, _ = _download("http://storage/cv.pdf", etag='"v1"')
+
+    assert result.not_modified
+    assert content is None
+
+
+def test_download_rejects_files_over_limit():
+    """O limite de tamanho é aplicado durante o streaming"""
+    with pytest.raises(PDFDownloadError) as exc_info:
+        _download("http://storage/cv.pdf", max_bytes=1000)
+    assert exc_info.value.status_code == 413
+
+
+def test_download_rejects_non_pdf_content():
+    """Conteúdo sem a assinatura %PDF é rejeitado"""
+    with pytest.raises(PDFDownloadError):
+        _download("http://storage/pagina.html")
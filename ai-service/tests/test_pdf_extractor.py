@@ -0,0 +1,83 @@
+"""
+Testes para a extração de texto de PDFs em processos dedicados
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from core.resume import pdf_extractor
+from core.resume.pdf_extractor import PDFTextExtractor
+from shared.exceptions import ResumeParsingError
+from shared.metrics import metrics
+from tests.fakes import build_text_pdf
+
+
+def _spin_forever(conn, pid_path: str, max_pages: int = 0):
+    """Simula um PDF patológico: grava o pid do processo e nunca termina"""
+    # O caminho do arquivo de pid chega no lugar do caminho do PDF: o processo vem
+    # do forkserver e não enxerga variáveis de ambiente nem patches feitos pelo teste
+    with open(pid_path, "w") as pid_file:
+        pid_file.write(str(os.getpid()))
+    while True:
+        pass
+
+
+def test_extract_in_process_respects_page_cap():
+    """A extração roda em outro processo e lê no máximo max_pages páginas"""
+    extractor = PDFTextExtractor(max_workers=1, timeout_seconds=30, max_pages=2)
+    count_before, _ = metrics.get_histogram("ai_service_pdf_extraction_seconds")
+    try:
+        text = asyncio.run(extractor.extract(build_text_pdf(["Ana Silva", "Python", "Ingles"])))
+    finally:
+        extractor.shutdown()
+
+    assert text == "Ana Silva\nPython"
+    count_after, _ = metrics.get_histogram("ai_service_pdf_extraction_seconds")
+    assert count_after == count_before + 1
+    assert metrics.get("ai_service_pdf_extraction_in_flight") == 0
+
+
+def test_extract_reads_the_pdf_from_a_file_path(tmp_path):
+    """Com um caminho, só ele vai para o processo de extração"""
+    pdf_path = tmp_path / "cv.pdf"
+    pdf_path.write_bytes(build_text_pdf(["Ana Silva", "Python"]))
+    extractor = PDFTextExtractor(max_workers=1, timeout_seconds=30)
+    try:
+        text = asyncio.run(extractor.extract(str(pdf_path)))
+    finally:
+        extractor.shutdown()
+
+    assert text == "Ana Silva\nPython"
+
+
+def test_extract_invalid_pdf_raises_parsing_error():
+    """Conteúdo inválido vira ResumeParsingError"""
+    extractor = PDFTextExtractor(max_workers=0, timeout_seconds=30)
+
+    with pytest.raises(ResumeParsingError):
+        asyncio.run(extractor.extract(b"%PDF-1.4 corrompido"))
+
+
+def test_timeout_kills_the_stuck_worker_process(tmp_path, monkeypatch):
+    """Após o timeout, o processo preso é encerrado (não fica girando)"""
+    pid_file = tmp_path / "worker.pid"
+    monkeypatch.setattr(pdf_extractor, "_extraction_worker", _spin_forever)
+    extractor = PDFTextExtractor(max_workers=1, timeout_seconds=1)
+    try:
+        with pytest.raises(ResumeParsingError, match="tempo limite"):
+            asyncio.run(extractor.extract(str(pid_file)))
+    finally:
+        extractor.shutdown()
+
+    worker_pid = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            os.kill(worker_pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail(f"processo {worker_pid} ainda está vivo após o timeout")
@@ -0,0 +1,128 @@
+"""
+Regressão do prompt de avaliação compacto sobre o corpus de fixtures
+
+Compara o formato atual com o formato anterior (repr dos dados) em tamanho
+do prompt e em estabilidade de uma nota determinística baseada nos termos
+exigidos pela vaga que aparecem no currículo.
+"""
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from core.ai.prompt_compaction import build_resume_text, compact_value, estimate_tokens, truncate_to_tokens
+from core.ai.service import AIService
+from shared.config import AIProvider
+from tests.fakes import FakeProvider
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "evaluation_corpus.json")
+
+with open(CORPUS_PATH, encoding="utf-8") as corpus_file:
+    CORPUS: List[Dict[str, Any]] = json.load(corpus_file)
+
+
+def _legacy_prompt(resume_data: Dict[str, Any], job_data: Dict[str, Any],
+                   question_responses: Optional[List[Dict[str, str]]]) -> str:
+    """Formato anterior do prompt (repr dos dicts e listas), usado como referência"""
+    prompt = f"""
+Você é um especialista em recursos humanos e precisa avaliar a aderência de um candidato a uma vaga.
+
+VAGA:
+Título: {job_data.get('title', 'N/A')}
+Descrição: {job_data.get('description', 'N/A')}
+Requisitos: {job_data.get('requirements', [])}
+Responsabilidades: {job_data.get('responsibilities', [])}
+Formação necessária: {job_data.get('education_required', 'N/A')}
+Experiência necessária: {job_data.get('experience_required', 'N/A')}
+Habilidades necessárias: {job_data.get('skills_required', [])}
+
+CURRÍCULO DO CANDIDATO:
+Informações pessoais: {resume_data.get('personal_info', {})}
+Formação acadêmica: {resume_data.get('education', [])}
+Experiência profissional: {resume_data.get('experience', [])}
+Habilidades: {resume_data.get('skills', [])}
+Idiomas: {resume_data.get('languages', [])}
+Conquistas: {resume_data.get('achievements', [])}
+"""
+    if question_responses:
+        prompt += "\nRESPOSTAS DAS PERGUNTAS:\n"
+        for i, qr in enumerate(question_responses, 1):
+            prompt += f"Pergunta {i}: {qr.get('question', 'N/A')}\n"
+            prompt += f"Resposta {i}: {qr.get('answer', 'N/A')}\n"
+    # As instruções finais não mudaram; usa o mesmo trecho do prompt atual
+    return prompt + INSTRUCTIONS
+
+
+def _instructions() -> str:
+    prompt = AIService(AIProvider.OPENAI, provider_instance=FakeProvider())._build_evaluation_prompt({}, {"title": "x"})
+    return prompt[prompt.index("\nAvalie o candidato"):]
+
+
+INSTRUCTIONS = _instructions()
+
+
+def _keyword_score(prompt: str, job_data: Dict[str, Any]) -> int:
+    """Nota determinística: % das habilidades exigidas presentes na parte do candidato"""
+    candidate_part = prompt.split("CURRÍCULO DO CANDIDATO:", 1)[1].lower()
+    terms = job_data.get("skills_required") or []
+    found = sum(1 for term in terms if re.search(rf"\b{re.escape(term.lower())}\b", candidate_part))
+    return round(100 * found / len(terms)) if terms else 0
+
+
+def _compact_prompt(case: Dict[str, Any]) -> str:
+    service = AIService(AIProvider.OPENAI, provider_instance=FakeProvider())
+    return service._build_evaluation_prompt(case["resume"], case["job"], case.get("question_responses"))
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[case["name"] for case in CORPUS])
+def test_compact_prompt_is_smaller_and_keeps_scores(case):
+    legacy = _legacy_prompt(case["resume"], case["job"], case.get("question_responses"))
+    compact = _compact_prompt(case)
+
+    assert estimate_tokens(compact) < estimate_tokens(legacy)
+    assert _keyword_score(compact, case["job"]) == _keyword_score(legacy, case["job"])
+    # Nada de repr de Python no prompt
+    assert "{'" not in compact and "['" not in compact and "None" not in compact
+
+
+def _data_sections(prompt: str) -> str:
+    """Vaga, currículo e respostas (sem as instruções finais, iguais nos dois formatos)"""
+    return prompt[:prompt.index("\nAvalie o candidato")]
+
+
+def test_corpus_token_reduction():
+    """No corpus inteiro, os dados da vaga e do candidato usam pelo menos 20% menos tokens"""
+    legacy_total = sum(
+        estimate_tokens(_data_sections(_legacy_prompt(case["resume"], case["job"], case.get("question_responses"))))
+        for case in CORPUS
+    )
+    compact_total = sum(estimate_tokens(_data_sections(_compact_prompt(case))) for case in CORPUS)
+
+    assert compact_total <= legacy_total * 0.8
+
+
+def test_compact_prompt_is_deterministic_and_drops_contacts():
+    case = CORPUS[0]
+    resume_text = build_resume_text(case["resume"])
+
+    assert resume_text == build_resume_text(json.loads(json.dumps(case["resume"])))
+    assert "ana@example.com" not in resume_text
+    assert "Fintech X" in resume_text
+    assert "2019-03 a atual" in resume_text
+
+
+def test_compact_list_skips_duplicates_and_empty_entries():
+    text = build_resume_text(CORPUS[2]["resume"])
+
+    assert text.count("Indústria W") == 1
+    assert "Conquistas" not in text
+
+
+def test_long_text_is_truncated_at_word_boundary():
+    truncated = truncate_to_tokens("palavra " * 200, 10)
+
+    assert truncated.endswith("…")
+    assert len(truncated) <= 41
+    assert compact_value({"description": "  muitos   espaços  "}) == "muitos espaços"
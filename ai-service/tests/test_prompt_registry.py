@@ -0,0 +1,54 @@
+"""
+Testes para o registro de templates de prompt
+"""
+import os
+
+import pytest
+
+from core.prompts import PromptRegistry
+from core.prompts.registry import compile_template
+
+
+def test_compile_template_handles_escapes_and_literal_json():
+    """{{ }} viram chaves literais e chaves soltas (JSON de exemplo) são mantidas"""
+    segments = compile_template('{{"a": {valor}}}\n{\n  "b": 1\n}')
+
+    assert segments == [(False, '{"a": '), (True, "valor"), (False, '}\n{\n  "b": 1\n}')]
+
+
+def test_all_repository_prompts_load_and_render():
+    """Todos os .prompt do serviço compilam e renderizam com as variáveis declaradas"""
+    registry = PromptRegistry()
+    registry.load()
+
+    assert "resume_parse" in registry.versions()
+    for name in registry.versions():
+        template = registry.get(name)
+        rendered = template.render(**{variable: "X" for variable in template.variables})
+        assert "{job." not in rendered
+        assert len(template.version) == 12
+
+
+def test_render_requires_all_variables(tmp_path):
+    (tmp_path / "saudacao.prompt").write_text("Olá {nome}", encoding="utf-8")
+    registry = PromptRegistry(root_dir=str(tmp_path))
+    registry.load()
+
+    with pytest.raises(KeyError):
+        registry.render("saudacao")
+
+
+def test_hot_reload_picks_up_changes(tmp_path):
+    """Com hot reload, a edição do arquivo gera nova versão do template"""
+    path = tmp_path / "saudacao.prompt"
+    path.write_text("Olá {nome}", encoding="utf-8")
+    registry = PromptRegistry(root_dir=str(tmp_path), hot_reload=True)
+    registry.load()
+    version = registry.get("saudacao").version
+
+    path.write_text("Oi {nome}", encoding="utf-8")
+    mtime = os.path.getmtime(path) + 10
+    os.utime(path, (mtime, mtime))
+
+    assert registry.render("saudacao", nome="Ana") == "Oi Ana"
+    assert registry.get("saudacao").version != version
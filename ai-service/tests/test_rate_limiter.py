@@ -0,0 +1,132 @@
+"""
+Testes para o rate limit e a concorrência adaptativa dos providers
+"""
+import asyncio
+
+import pytest
+
+from core.ai.rate_limiter import (
+    AdaptiveConcurrencyLimiter,
+    LocalTokenBucket,
+    ProviderRateController,
+    parse_limit_overrides
+)
+from core.ai.service import AIService
+from shared.config import AIProvider, Config
+from shared.exceptions import ProviderRateLimitError, RateLimitExceededError
+from tests.fakes import FakeProvider
+
+
+class ThrottledProvider(FakeProvider):
+    """Responde 429 nas primeiras `failures` chamadas"""
+
+    def __init__(self, failures: int, retry_after: float = 0.01):
+        super().__init__()
+        self.failures = failures
+        self.retry_after = retry_after
+        self.calls = 0
+
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ProviderRateLimitError("429", retry_after=self.retry_after)
+        return await super().generate_text(prompt, **kwargs)
+
+
+def test_local_bucket_limits_requests_and_tokens():
+    bucket = LocalTokenBucket(requests_per_minute=2, tokens_per_minute=1000)
+
+    assert bucket.try_acquire(400) == 0
+    assert bucket.try_acquire(400) == 0
+    # Sem requisições disponíveis: espera ~30s por uma nova (2/min)
+    assert 29 < bucket.try_acquire(10) <= 30
+
+    tokens_only = LocalTokenBucket(requests_per_minute=0, tokens_per_minute=600)
+    assert tokens_only.try_acquire(600) == 0
+    assert 4.9 < tokens_only.try_acquire(50) <= 5
+
+
+def test_adaptive_limit_grows_on_success_and_halves_on_throttle():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial=4, min_limit=1, max_limit=8, latency_target_seconds=1.0)
+        for _ in range(8):
+            await limiter.acquire()
+            await limiter.release("ok", 0.1)
+        grown = limiter.limit
+        await limiter.acquire()
+        await limiter.release("throttled", 0.1)
+        # Segundo 429 da mesma rajada não reduz de novo
+        await limiter.acquire()
+        await limiter.release("throttled", 0.1)
+        return grown, limiter.limit
+
+    grown, after_throttle = asyncio.run(scenario())
+
+    assert 5 < grown < 6
+    assert after_throttle == pytest.approx(grown / 2)
+
+
+def test_adaptive_limit_caps_in_flight_calls():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial=2, min_limit=1, max_limit=2, latency_target_seconds=1.0)
+        await limiter.acquire()
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        blocked = not waiter.done()
+        await limiter.release("ok", 0.1)
+        await asyncio.wait_for(waiter, 1)
+        return blocked, limiter.in_flight
+
+    assert asyncio.run(scenario()) == (True, 2)
+
+
+def test_service_retries_after_provider_429():
+    provider = ThrottledProvider(failures=2)
+    controller = ProviderRateController(max_wait_seconds=5)
+    service = AIService(AIProvider.OPENAI, provider_instance=provider, rate_controller=controller)
+
+    response = asyncio.run(service.generate_text("prompt"))
+
+    assert "overall_score" in response
+    assert provider.calls == 3
+    assert controller.concurrency_limiter("openai", Config.DEFAULT_MODEL).limit < 10
+
+
+def test_call_without_model_uses_the_limits_of_the_default_model():
+    controller = ProviderRateController(
+        limit_overrides={f"openai:{Config.DEFAULT_MODEL}": (1, 0)}, max_wait_seconds=1
+    )
+    service = AIService(AIProvider.OPENAI, provider_instance=FakeProvider(), rate_controller=controller)
+
+    async def run():
+        await service.generate_text("prompt")
+        await service.generate_text("prompt", model=Config.DEFAULT_MODEL)
+
+    # A segunda chamada esbarra no mesmo bucket (1 req/min) da primeira
+    with pytest.raises(RateLimitExceededError):
+        asyncio.run(run())
+    assert set(controller._limiters) == {f"openai:{Config.DEFAULT_MODEL}"}
+
+
+def test_service_gives_up_when_wait_exceeds_budget():
+    provider = ThrottledProvider(failures=10, retry_after=30)
+    service = AIService(
+        AIProvider.OPENAI, provider_instance=provider,
+        rate_controller=ProviderRateController(max_wait_seconds=1)
+    )
+
+    with pytest.raises(RateLimitExceededError) as error:
+        asyncio.run(service.generate_text("prompt"))
+
+    assert error.value.retry_after == 30
+    assert provider.calls == 1
+
+
+def test_parse_limit_overrides():
+    overrides = parse_limit_overrides("openai:gpt-4o=500/300000, anthropic:*=50/")
+    controller = ProviderRateController(requests_per_minute=10, tokens_per_minute=100, limit_overrides=overrides)
+
+    assert controller.limits_for("openai", "gpt-4o") == (500, 300000)
+    assert controller.limits_for("anthropic", "claude") == (50, 0)
+    assert controller.limits_for("openai", "gpt-4.1") == (10, 100)
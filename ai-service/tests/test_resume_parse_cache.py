@@ -0,0 +1,65 @@
+"""
+Testes para o cache de parsing de currículos
+"""
+import asyncio
+
+from core.resume.cache import build_resume_parse_cache_key, get_prompt_version
+from core.resume.parser import ResumeParser
+from shared.cache import LocalLRUCache, ResultCache, sha256_hex
+from shared.config import AIProvider
+
+
+class FakeAIService:
+    provider = AIProvider.OPENAI
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        return "{}"
+
+
+def test_local_lru_evicts_least_recently_used():
+    """A camada local respeita o limite de entradas"""
+    cache = LocalLRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    cache.get("a")
+    cache.set("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.get("c") == {"v": 3}
+
+
+def test_cache_key_changes_with_model_and_prompt_version():
+    """Mesmo PDF com modelo ou prompt diferentes gera outra chave"""
+    pdf_hash = sha256_hex(b"%PDF-1.4 teste")
+    key = build_resume_parse_cache_key(pdf_hash, "openai:gpt-4")
+
+    assert key.startswith(pdf_hash)
+    assert get_prompt_version() in key
+    assert key != build_resume_parse_cache_key(pdf_hash, "openai:gpt-4o")
+    assert key != build_resume_parse_cache_key(pdf_hash, "openai:gpt-4", prompt_version="outra")
+
+
+def test_parser_returns_cached_result_without_calling_ai(tmp_path):
+    """PDF idêntico não gera nova chamada ao provider"""
+    pdf_path = tmp_path / "cv.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 conteudo")
+
+    ai_service = FakeAIService()
+    cache = ResultCache("test:resume-parse", local_max_entries=10)
+    parser = ResumeParser(ai_service, cache=cache)
+
+    cached_data = {"summary": "Desenvolvedor Python", "languages": [{"language": "Inglês"}]}
+    asyncio.run(cache.set(parser._build_cache_key(sha256_hex(pdf_path.read_bytes())), cached_data))
+
+    resume = asyncio.run(parser.parse_resume_from_pdf(str(pdf_path), "application-2"))
+
+    assert parser.cache_status == "hit"
+    assert ai_service.calls == 0
+    assert resume["applicationId"] == "application-2"
+    assert resume["summary"] == "Desenvolvedor Python"
+    assert resume["languages"] == [{"language": "Inglês", "proficiencyLevel": "intermediate"}]
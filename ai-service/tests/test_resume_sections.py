@@ -0,0 +1,101 @@
+"""
+Testes para o parsing de currículos por seção
+"""
+import asyncio
+
+from core.resume.parser import ResumeParser
+from core.resume.pdf_extractor import extract_text_from_pdf
+from core.resume.sections import is_segmented, segment_resume_text
+from shared.cache import ResultCache
+from shared.config import AIProvider
+from tests.fakes import build_text_pdf
+
+RESUME_TEXT = """Maria Souza
+Desenvolvedora backend com 8 anos de experiência
+
+EXPERIÊNCIA PROFISSIONAL
+Acme Ltda - Engenheira de Software (2019 - atual)
+
+Formação Acadêmica
+Universidade Federal - Ciência da Computação
+
+Idiomas
+Inglês fluente
+"""
+
+SECTION_RESPONSES = {
+    "resume_section_summary": '{"summary": "Desenvolvedora backend"}',
+    "resume_section_experience": '{"professionalExperiences": [{"companyName": "Acme", "position": "Engenheira"}]}',
+    "resume_section_education": '{"academicFormations": [{"institution": "UF", "course": "CC", "degree": "Bacharelado"}]}',
+    "resume_section_languages": '{"languages": [{"language": "Inglês", "proficiencyLevel": "fluent"}], "summary": "x"}',
+}
+
+
+class SectionAIService:
+    provider = AIProvider.OPENAI
+
+    def __init__(self):
+        self.calls = []
+
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        self.calls.append(kwargs["schema_name"])
+        await asyncio.sleep(0)
+        return SECTION_RESPONSES[kwargs["schema_name"]]
+
+
+def test_segments_portuguese_headings():
+    sections = segment_resume_text(RESUME_TEXT)
+
+    assert list(sections) == ["summary", "experience", "education", "languages"]
+    assert sections["experience"].startswith("Acme Ltda")
+    assert sections["languages"] == "Inglês fluente"
+    assert is_segmented(sections)
+    assert not is_segmented(segment_resume_text("Maria Souza\nDesenvolvedora"))
+
+
+def test_text_extracted_from_pdf_keeps_the_section_headings():
+    """O texto extraído do PDF mantém as quebras de linha de que a segmentação depende"""
+    pdf_bytes = build_text_pdf([
+        "Maria Souza\nEXPERIENCIA PROFISSIONAL\nAcme Ltda -   Engenheira de Software",
+        "Formacao Academica\nUniversidade Federal\nIdiomas\nIngles fluente",
+    ])
+
+    text, _ = extract_text_from_pdf(pdf_bytes)
+    sections = segment_resume_text(text)
+
+    assert is_segmented(sections)
+    assert sections["experience"] == "Acme Ltda - Engenheira de Software"
+    assert sections["education"] == "Universidade Federal"
+    assert sections["languages"] == "Ingles fluente"
+
+
+def test_sections_are_parsed_concurrently_and_merged():
+    ai_service = SectionAIService()
+    parser = ResumeParser(ai_service, sectioned=True)
+
+    data = asyncio.run(parser._parse_by_sections(RESUME_TEXT))
+
+    assert sorted(ai_service.calls) == sorted(SECTION_RESPONSES)
+    # Cada seção só contribui com os próprios campos
+    assert data["summary"] == "Desenvolvedora backend"
+    assert data["professionalExperiences"][0]["companyName"] == "Acme"
+    assert data["academicFormations"][0]["institution"] == "UF"
+    resume = parser._create_resume_model(data, "application-1")
+    assert resume["languages"] == [{"language": "Inglês", "proficiencyLevel": "fluent"}]
+
+
+def test_reupload_reparses_only_changed_section():
+    ai_service = SectionAIService()
+    parser = ResumeParser(ai_service, cache=ResultCache("test:resume-sections", local_max_entries=100), sectioned=True)
+
+    asyncio.run(parser._parse_by_sections(RESUME_TEXT))
+    ai_service.calls.clear()
+    asyncio.run(parser._parse_by_sections(RESUME_TEXT.replace("Inglês fluente", "Inglês fluente\nEspanhol básico")))
+
+    assert ai_service.calls == ["resume_section_languages"]
+
+
+def test_unsegmented_text_falls_back_to_single_prompt():
+    parser = ResumeParser(SectionAIService(), sectioned=True)
+
+    assert asyncio.run(parser._parse_by_sections("Maria Souza\nDesenvolvedora backend")) is None
@@ -0,0 +1,152 @@
+"""
+Testes para o roteamento entre providers (failover e hedge)
+"""
+import asyncio
+from typing import Dict, List, Optional
+
+import pytest
+
+from core.ai.router import HedgeBudget, ProviderRouter, Route, RouteStats, parse_routes, record_answered_route
+from core.ai.service import AIService, is_valid_evaluation_output
+from shared.config import AIProvider
+from tests.fakes import FakeProvider
+
+PRIMARY = Route(AIProvider.OPENAI, "gpt-primary")
+ALTERNATIVE = Route(AIProvider.ANTHROPIC, "claude-alt")
+
+
+class ScriptedProvider(FakeProvider):
+    """Responde com atraso configurável por modelo; `None` simula falha"""
+
+    def __init__(self, delays: Dict[str, Optional[float]]):
+        super().__init__()
+        self.delays = delays
+        self.calls: List[str] = []
+        self.cancelled: List[str] = []
+
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        model = kwargs["model"]
+        self.calls.append(model)
+        delay = self.delays[model]
+        if delay is None:
+            raise RuntimeError(f"falha em {model}")
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        return f"resposta de {model}"
+
+
+class ScriptedRegistry:
+    def __init__(self, provider: ScriptedProvider):
+        self.provider = provider
+
+    def get_ai_service(self, provider: AIProvider, api_key: Optional[str] = None) -> AIService:
+        return AIService(provider, provider_instance=self.provider)
+
+
+def _router(delays, hedge_budget_ratio=1.0, **kwargs):
+    provider = ScriptedProvider(delays)
+    router = ProviderRouter(
+        ScriptedRegistry(provider), [PRIMARY, ALTERNATIVE],
+        hedge_budget_ratio=hedge_budget_ratio, hedge_min_delay_seconds=0.01, hedge_max_delay_seconds=0.05,
+        **kwargs
+    )
+    return router, provider
+
+
+def test_hedge_takes_fastest_response_and_cancels_loser():
+    router, provider = _router({"gpt-primary": 1.0, "claude-alt": 0.01})
+
+    response = asyncio.run(router.generate_text("prompt"))
+
+    assert response == "resposta de claude-alt"
+    assert provider.calls == ["gpt-primary", "claude-alt"]
+    assert provider.cancelled == ["gpt-primary"]
+
+
+def test_no_hedge_without_budget():
+    router, provider = _router({"gpt-primary": 0.1, "claude-alt": 0.01}, hedge_budget_ratio=0.05)
+
+    response = asyncio.run(router.generate_text("prompt"))
+
+    assert response == "resposta de gpt-primary"
+    assert provider.calls == ["gpt-primary"]
+
+
+def test_failover_on_error_and_unhealthy_route_is_demoted():
+    router, provider = _router({"gpt-primary": None, "claude-alt": 0.0}, hedge_budget_ratio=0.0)
+
+    async def scenario():
+        return [await router.generate_text("prompt") for _ in range(6)]
+
+    responses = asyncio.run(scenario())
+
+    assert set(responses) == {"resposta de claude-alt"}
+    # Após alguns erros a principal passa do limite e deixa de ser chamada primeiro
+    assert provider.calls[-1] == "claude-alt" and provider.calls[-2] == "claude-alt"
+    assert router.ordered_routes()[0] == ALTERNATIVE
+
+
+def test_answered_route_is_recorded_for_hedge_winner():
+    router, _ = _router({"gpt-primary": 1.0, "claude-alt": 0.01})
+
+    async def scenario():
+        with record_answered_route() as answered:
+            await router.generate_text("prompt")
+        return answered.route
+
+    assert asyncio.run(scenario()) == ALTERNATIVE
+
+
+def test_invalid_evaluation_json_fails_over_to_next_route():
+    router, provider = _router(
+        {"gpt-primary": 0.0, "claude-alt": 0.0}, hedge_budget_ratio=0.0, validator=is_valid_evaluation_output
+    )
+    answers = {
+        "gpt-primary": "Desculpe, não consigo avaliar.",
+        "claude-alt": '{"overall_score": 70, "question_responses_score": 60, '
+                      '"education_score": 50, "experience_score": 80}',
+    }
+
+    async def generate_text(prompt: str, **kwargs) -> str:
+        provider.calls.append(kwargs["model"])
+        return answers[kwargs["model"]]
+
+    provider.generate_text = generate_text
+
+    response = asyncio.run(router.generate_text("prompt"))
+
+    assert response == answers["claude-alt"]
+    assert provider.calls == ["gpt-primary", "claude-alt"]
+
+
+def test_all_routes_failing_raises_last_error():
+    router, _ = _router({"gpt-primary": None, "claude-alt": None})
+
+    with pytest.raises(RuntimeError, match="claude-alt"):
+        asyncio.run(router.generate_text("prompt"))
+
+
+def test_hedge_budget_allows_at_most_ratio_of_extra_calls():
+    budget = HedgeBudget(ratio=0.05)
+    hedges = 0
+    for _ in range(200):
+        budget.record_request()
+        hedges += budget.try_spend()
+
+    assert hedges == 10
+
+
+def test_route_stats_p95_and_parse_routes():
+    stats = RouteStats(min_samples=20)
+    for latency in range(1, 21):
+        stats.record_success(latency / 10)
+
+    assert stats.p95() == pytest.approx(1.9)
+    assert parse_routes("anthropic:claude-x, openai:gpt-y") == [
+        Route(AIProvider.ANTHROPIC, "claude-x"), Route(AIProvider.OPENAI, "gpt-y")
+    ]
+    with pytest.raises(ValueError):
+        parse_routes("openai")
@@ -0,0 +1,99 @@
+"""
+Testes para a geração de texto em streaming (SSE)
+"""
+import asyncio
+import json
+from typing import AsyncIterator, List
+
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_provider_registry
+from api.main import app
+from core.ai.rate_limiter import ProviderRateController
+from core.ai.service import AIService
+from shared.config import AIProvider
+from tests.fakes import FakeProvider, FakeRegistry
+
+
+class StreamingProvider(FakeProvider):
+    """Devolve o texto em trechos e registra se o stream foi encerrado"""
+
+    def __init__(self, chunks: List[str]):
+        super().__init__()
+        self.chunks = chunks
+        self.prompts: List[str] = []
+        self.closed = False
+
+    async def stream_text(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        self.prompts.append(prompt)
+        try:
+            for chunk in self.chunks:
+                await asyncio.sleep(0)
+                yield chunk
+        finally:
+            self.closed = True
+
+
+def _events(body: str) -> List[tuple]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _post(path: str, provider: FakeProvider, payload: dict):
+    app.dependency_overrides[get_provider_registry] = lambda: FakeRegistry(provider)
+    try:
+        return TestClient(app).post(path, json=payload)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_generate_text_stream_forwards_tokens_as_sse():
+    provider = StreamingProvider(["Olá", ", ", "mundo"])
+
+    response = _post("/ai/generate-text/stream", provider, {"prompt": "diga olá"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert [data["text"] for event, data in events if event == "token"] == ["Olá", ", ", "mundo"]
+    assert events[-1] == ("done", {"provider": "openai", "length": 10})
+    assert provider.closed
+
+
+def test_job_enhancement_stream_uses_field_prompt():
+    provider = StreamingProvider(["Desenvolvedora\x07 Python", " Sênior"])
+
+    response = _post("/jobs/enhance-title/stream", provider, {
+        "enhancement_prompt": "mais atrativo",
+        "job": {"title": "Dev", "description": "Backend", "requirements": "Python"},
+    })
+
+    events = _events(response.text)
+    assert "".join(data["text"] for event, data in events if event == "token") == "Desenvolvedora Python Sênior"
+    assert events[-1][1]["field"] == "title"
+    assert "Título atual: Dev" in provider.prompts[0]
+
+
+def test_job_enhancement_stream_rejects_unknown_field():
+    response = _post("/jobs/enhance-salary/stream", StreamingProvider([]), {"enhancement_prompt": "x"})
+
+    assert response.status_code == 422
+
+
+def test_closing_stream_closes_provider_call_and_releases_slot():
+    provider = StreamingProvider(["a", "b", "c"])
+    controller = ProviderRateController(max_wait_seconds=1)
+    service = AIService(AIProvider.OPENAI, provider_instance=provider, rate_controller=controller)
+
+    async def consume_first_chunk():
+        stream = service.stream_text("prompt")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(consume_first_chunk()) == "a"
+    assert provider.closed
+    assert controller.concurrency_limiter("openai", "default").in_flight == 0
@@ -0,0 +1,55 @@
+"""
+Testes para o logging estruturado (JSON, fila não bloqueante e amostragem)
+"""
+import json
+import logging
+import queue
+
+from shared.structured_logging import JsonFormatter, NonBlockingQueueHandler, SamplingFilter, lazy, parse_sampling
+
+
+def _record(level: int = logging.INFO, name: str = "core.ai.service", **extra) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, "📈 Nota geral: %s/100", (82,), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_renders_message_args_and_extra_fields():
+    line = JsonFormatter().format(_record(event="evaluation", prompt_tokens=lazy(lambda: 1200)))
+
+    payload = json.loads(line)
+    assert payload["message"] == "📈 Nota geral: 82/100"
+    assert payload["level"] == "INFO" and payload["logger"] == "core.ai.service"
+    assert payload["event"] == "evaluation" and payload["prompt_tokens"] == 1200
+
+
+def test_lazy_fields_are_not_evaluated_when_the_level_is_disabled():
+    calls = []
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    logger = logging.getLogger("tests.structured_logging.lazy")
+    logger.propagate = False
+    logger.handlers = [NonBlockingQueueHandler(log_queue)]
+    logger.setLevel(logging.INFO)
+
+    logger.debug("detalhes: %s", lazy(lambda: calls.append("debug")))
+    logger.info("resumo: %s", lazy(lambda: calls.append("info") or "ok"))
+
+    assert log_queue.qsize() == 1
+    # Só é calculado na formatação, feita pela thread do listener
+    assert calls == []
+    assert log_queue.get_nowait().getMessage() == "resumo: ok"
+    assert calls == ["info"]
+
+
+def test_sampling_keeps_warnings_and_full_queue_drops_instead_of_blocking():
+    sampling = SamplingFilter(parse_sampling("evaluation=0, core.ai.router=1"))
+
+    assert not sampling.filter(_record(event="evaluation"))
+    assert sampling.filter(_record(level=logging.WARNING, event="evaluation"))
+    assert sampling.filter(_record(name="core.ai.router"))
+    assert sampling.filter(_record(event="generation"))
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record())
+    handler.handle(_record())
+    assert handler.queue.qsize() == 1 and handler.dropped == 1
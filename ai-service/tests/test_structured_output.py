@@ -0,0 +1,95 @@
+"""
+Testes para a saída estruturada (schemas) e o parser incremental de JSON
+"""
+import asyncio
+import json
+
+import pytest
+
+from core.ai.service import AIService
+from core.ai.structured_output import get_output_schema, parse_json_output
+from shared.config import AIProvider
+from shared.exceptions import TextGenerationError
+from shared.json_stream import IncrementalJSONParser, extract_json_object
+from shared.metrics import metrics
+from tests.fakes import FakeProvider
+
+NESTED = {"a": {"b": {"c": {"d": [{"e": {"f": "}{ chave em string \" aspas"}}]}}}}
+
+
+class RecordingProvider(FakeProvider):
+    def __init__(self, response: str):
+        super().__init__()
+        self.response = response
+        self.kwargs = {}
+
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        self.kwargs = kwargs
+        return self.response
+
+
+def test_extracts_deeply_nested_json_between_prose():
+    text = f"Claro! Use {{nome}} como exemplo.\n```json\n{json.dumps(NESTED)}\n```\nAté mais {{"
+
+    assert extract_json_object(text) == NESTED
+
+
+def test_incremental_parser_returns_object_as_soon_as_it_closes():
+    payload = "resposta: " + json.dumps(NESTED) + " texto depois"
+    parser = IncrementalJSONParser()
+    results = [parser.feed(payload[i:i + 7]) for i in range(0, len(payload), 7)]
+
+    first = next(i for i, result in enumerate(results) if result is not None)
+    assert results[first] == NESTED
+    assert first < len(results) - 1
+    assert parser.finish() == NESTED
+
+
+def test_invalid_json_returns_none():
+    assert extract_json_object("sem json {aqui") is None
+    assert extract_json_object("[1, 2]") is None
+
+
+def test_schemas_come_from_api_models_without_service_fields():
+    scores = get_output_schema("candidate_evaluation")
+    resume = get_output_schema("resume_parse")
+
+    assert scores["required"] == ["overall_score", "question_responses_score", "education_score", "experience_score"]
+    assert scores["properties"]["overall_score"]["maximum"] == 100
+    assert "applicationId" not in resume["properties"] and "professionalExperiences" in resume["properties"]
+    experience = resume["$defs"]["ResumeProfessionalExperience"]
+    assert "id" not in experience["properties"] and "companyName" in experience["required"]
+    assert get_output_schema("desconhecido") is None
+
+
+def test_evaluation_requests_schema_and_fails_instead_of_defaulting_to_50():
+    provider = RecordingProvider("não consegui avaliar")
+    service = AIService(AIProvider.OPENAI, provider_instance=provider)
+    before = metrics.get("ai_service_json_parse_failures_total", prompt_type="candidate_evaluation")
+
+    with pytest.raises(TextGenerationError):
+        asyncio.run(service.evaluate_candidate({"skills": ["Python"]}, {"title": "Dev"}))
+
+    assert provider.kwargs["schema_name"] == "candidate_evaluation"
+    assert provider.kwargs["json_schema"] == get_output_schema("candidate_evaluation")
+    assert metrics.get("ai_service_json_parse_failures_total", prompt_type="candidate_evaluation") == before + 1
+
+
+@pytest.mark.parametrize("scores", [
+    {"overall_score": "alto", "question_responses_score": 70, "education_score": 60, "experience_score": 90},
+    {"overall_score": 80, "education_score": 60, "experience_score": 90},
+    {"overall_score": 180, "question_responses_score": 70, "education_score": 60, "experience_score": 90},
+])
+def test_evaluation_with_invalid_or_missing_score_fails(scores):
+    service = AIService(AIProvider.OPENAI, provider_instance=RecordingProvider(json.dumps(scores)))
+
+    with pytest.raises(TextGenerationError, match="Notas inválidas"):
+        asyncio.run(service.evaluate_candidate({"skills": ["Python"]}, {"title": "Dev"}))
+
+
+def test_parse_json_output_counts_failures_per_prompt_type():
+    before = metrics.get("ai_service_json_parse_failures_total", prompt_type="job_creation")
+
+    assert parse_json_output('{"title": "Dev"}', "job_creation") == {"title": "Dev"}
+    assert parse_json_output("nada", "job_creation") is None
+    assert metrics.get("ai_service_json_parse_failures_total", prompt_type="job_creation") == before + 1
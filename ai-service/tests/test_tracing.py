@@ -0,0 +1,50 @@
+"""
+Testes para o tracing distribuído (OpenTelemetry opcional)
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_evaluation_score_cache, get_provider_registry
+from api.main import app
+from shared import tracing
+from shared.config import Config
+from tests.fakes import FakeProvider, FakeRegistry
+
+INCOMING_TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+INCOMING_TRACEPARENT = f"00-{INCOMING_TRACE_ID}-b7ad6b7169203331-01"
+
+
+def test_tracing_is_a_noop_when_disabled():
+    assert tracing.setup_tracing(exporter="none") is False
+
+    with tracing.start_span("ai.generate_text", {"ai.provider": "openai"}) as span:
+        assert span is None
+    assert tracing.inject_context({}) == {}
+
+
+def test_provider_span_continues_the_incoming_trace(tmp_path, monkeypatch):
+    pytest.importorskip("opentelemetry.sdk")
+    traces_file = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(Config, "OTEL_TRACES_FILE", str(traces_file))
+    assert tracing.setup_tracing(exporter="file")
+
+    app.dependency_overrides[get_provider_registry] = lambda: FakeRegistry(FakeProvider())
+    app.dependency_overrides[get_evaluation_score_cache] = lambda: None
+    try:
+        response = TestClient(app).post(
+            "/candidates/evaluate",
+            json={"resume": {"skills": ["Python"]}, "job": {"title": "Dev Python", "description": "Backend"}},
+            headers={"traceparent": INCOMING_TRACEPARENT},
+        )
+    finally:
+        app.dependency_overrides.clear()
+        tracing.shutdown_tracing()
+
+    assert response.status_code == 200
+    spans = {span["name"]: span for span in map(json.loads, traces_file.read_text().splitlines())}
+    server_span, provider_span = spans["POST /candidates/evaluate"], spans["ai.generate_text"]
+    assert server_span["context"]["trace_id"] == provider_span["context"]["trace_id"] == f"0x{INCOMING_TRACE_ID}"
+    assert provider_span["parent_id"] == server_span["context"]["span_id"]
+    assert provider_span["attributes"]["ai.provider"] == "openai"
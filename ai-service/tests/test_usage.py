@@ -0,0 +1,62 @@
+"""
+Testes para a contabilização de tokens e custo das chamadas aos providers
+"""
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_provider_registry
+from api.main import app
+from core.ai.usage import UsageRecord, UsageTracker, anthropic_token_counts, usage_tracker
+from tests.fakes import FakeProvider, FakeRegistry
+
+
+class MeteredProvider(FakeProvider):
+    """Registra o uso como os providers reais fazem após cada resposta"""
+
+    async def generate_text(self, prompt: str, **kwargs) -> str:
+        usage_tracker.record("openai", kwargs.get("model", "gpt-4o-mini"), 1200, 300, 1000, latency_seconds=0.25)
+        return "ok"
+
+
+def test_generate_text_returns_the_request_usage():
+    app.dependency_overrides[get_provider_registry] = lambda: FakeRegistry(MeteredProvider())
+    try:
+        response = TestClient(app).post(
+            "/ai/generate-text", json={"prompt": "Olá"}, headers={"X-Job-Id": "job-1", "X-Company-Id": "company-1"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    usage = response.json()["usage"]
+    assert usage["operation"] == "generate"
+    assert (usage["calls"], usage["prompt_tokens"], usage["completion_tokens"], usage["cached_tokens"]) == (1, 1200, 300, 1000)
+    assert usage["latency_ms"] == 250.0
+
+
+def test_cost_uses_cached_input_price_and_model_prefix():
+    tracker = UsageTracker(prices={"gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.6}})
+
+    cost = tracker.estimate_cost("gpt-4o-mini-2024-07-18", 1200, 300, 1000)
+
+    assert cost == (200 * 0.15 + 1000 * 0.075 + 300 * 0.6) / 1_000_000
+    assert tracker.estimate_cost("claude-3-haiku", 1000, 100, 0) == 0.0
+    usage = SimpleNamespace(input_tokens=50, cache_read_input_tokens=900, cache_creation_input_tokens=0, output_tokens=20)
+    assert anthropic_token_counts(usage) == (950, 20, 900)
+
+
+def test_aggregate_breaks_job_and_company_totals_down_by_operation():
+    records = [
+        UsageRecord("openai", "gpt-4o-mini", operation, "job-1", "company-1", 100, 10, 0, 0.5, 0.001, 0.0)
+        for operation in ("parse", "evaluate", "evaluate")
+    ]
+
+    totals = UsageTracker._aggregate(records)
+
+    job = totals["ai-service:usage:19700101:job:job-1"]
+    assert job["calls"] == 3 and job["evaluate:calls"] == 2 and job["parse:prompt_tokens"] == 100
+    assert totals["ai-service:usage:19700101:operation:evaluate"]["completion_tokens"] == 20
+    assert "evaluate:calls" not in totals["ai-service:usage:19700101:operation:evaluate"]
+    assert totals["ai-service:usage:19700101:model:openai:gpt-4o-mini"]["calls"] == 3
+    assert totals["ai-service:usage:19700101:company:company-1"]["latency_ms"] == 1500
@@ -0,0 +1,151 @@
+"""
+Testes para o índice vetorial de currículos por vaga
+"""
+import asyncio
+from typing import List
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_provider_registry, get_vector_index_store
+from api.main import app
+from core.ai import vector_index
+from core.ai.vector_index import VectorIndexStore
+from shared.exceptions import VectorIndexError
+from tests.fakes import FakeProvider, FakeRegistry
+
+KEYWORDS = ("python", "java", "design", "vendas")
+
+
+class KeywordEmbeddingProvider(FakeProvider):
+    """Embedding com a contagem de cada palavra-chave no texto"""
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        lowered = text.lower()
+        return [float(lowered.count(keyword)) + 0.01 for keyword in KEYWORDS]
+
+
+def test_numpy_index_ranks_by_cosine_and_upserts(tmp_path):
+    store = VectorIndexStore(str(tmp_path))
+
+    asyncio.run(store.add("job-1", "app-a", [1.0, 0.0, 0.0]))
+    asyncio.run(store.add("job-1", "app-b", [0.7, 0.7, 0.0]))
+    total = asyncio.run(store.add("job-1", "app-c", [0.0, 0.0, 5.0]))
+    results, count = asyncio.run(store.search("job-1", [2.0, 0.0, 0.0], limit=2))
+
+    assert total == count == 3
+    assert [application_id for application_id, _ in results] == ["app-a", "app-b"]
+    assert results[0][1] == pytest.approx(1.0)
+
+    # Reindexar a mesma candidatura substitui o vetor sem duplicar
+    asyncio.run(store.add("job-1", "app-a", [0.0, 0.0, 1.0]))
+    results, count = asyncio.run(store.search("job-1", [0.0, 0.0, 1.0], limit=10))
+    assert count == 3
+    assert {application_id for application_id, _ in results[:2]} == {"app-a", "app-c"}
+
+
+def test_index_persists_and_grows_on_disk(tmp_path):
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(vector_index.INITIAL_CAPACITY + 10, 8))
+    store = VectorIndexStore(str(tmp_path), max_open_indexes=1)
+    for position, vector in enumerate(vectors):
+        asyncio.run(store.add("job-1", f"app-{position}", vector.tolist()))
+    # Abrir outra vaga fecha (LRU) o índice da primeira
+    asyncio.run(store.add("job-2", "app-x", vectors[0].tolist()))
+    store.close()
+
+    reopened = VectorIndexStore(str(tmp_path))
+    results, count = asyncio.run(reopened.search("job-1", vectors[42].tolist(), limit=1))
+
+    assert count == len(vectors)
+    assert results[0][0] == "app-42"
+    with reopened.use_index("job-1") as index:
+        assert index.capacity == 2 * vector_index.INITIAL_CAPACITY
+
+
+def test_index_in_use_is_neither_evicted_nor_deleted(tmp_path):
+    store = VectorIndexStore(str(tmp_path), max_open_indexes=1)
+    asyncio.run(store.add("job-1", "app-a", [1.0, 0.0]))
+
+    async def run():
+        with store.use_index("job-1") as index:
+            # Outra vaga passa do limite da LRU, mas o índice em uso segue aberto
+            await store.add("job-2", "app-b", [0.0, 1.0])
+            with store.use_index("job-1") as same:
+                assert same is index
+            deletion = asyncio.create_task(store.delete("job-1"))
+            await asyncio.sleep(0.05)
+            assert not deletion.done()
+            with index.lock:
+                index.add("app-c", [0.5, 0.5])
+            assert (tmp_path / "job-1" / vector_index.IDS_FILE).exists()
+        return await deletion
+
+    assert asyncio.run(run()) is True
+    assert not (tmp_path / "job-1").exists()
+    results, count = asyncio.run(store.search("job-2", [0.0, 1.0], limit=1))
+    assert count == 1 and results[0][0] == "app-b"
+
+
+def test_rejects_mismatched_dimensions_and_unsafe_ids(tmp_path):
+    store = VectorIndexStore(str(tmp_path))
+    asyncio.run(store.add("job-1", "app-a", [1.0, 0.0]))
+
+    with pytest.raises(VectorIndexError):
+        asyncio.run(store.add("job-1", "app-b", [1.0, 0.0, 0.0]))
+    with pytest.raises(ValueError):
+        asyncio.run(store.add("../fora", "app-a", [1.0, 0.0]))
+    assert asyncio.run(store.search("job-vazia", [1.0, 0.0], limit=5)) == ([], 0)
+
+
+def test_hnsw_backend_matches_brute_force(tmp_path):
+    pytest.importorskip("hnswlib")
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(200, 16))
+    brute = VectorIndexStore(str(tmp_path / "numpy"))
+    hnsw = VectorIndexStore(str(tmp_path / "hnsw"), backend="hnsw")
+    for position, vector in enumerate(vectors):
+        asyncio.run(brute.add("job-1", f"app-{position}", vector.tolist()))
+        asyncio.run(hnsw.add("job-1", f"app-{position}", vector.tolist()))
+    hnsw.close()
+
+    query = vectors[10].tolist()
+    expected, _ = asyncio.run(brute.search("job-1", query, limit=5))
+    reopened = VectorIndexStore(str(tmp_path / "hnsw"), backend="hnsw")
+    results, count = asyncio.run(reopened.search("job-1", query, limit=5))
+
+    assert reopened.backend == "hnsw" and count == 200
+    assert [application_id for application_id, _ in results] == [application_id for application_id, _ in expected]
+
+
+def test_index_and_rank_endpoints(tmp_path):
+    store = VectorIndexStore(str(tmp_path))
+    app.dependency_overrides[get_provider_registry] = lambda: FakeRegistry(KeywordEmbeddingProvider())
+    app.dependency_overrides[get_vector_index_store] = lambda: store
+    try:
+        client = TestClient(app)
+        for application_id, skills in (("app-py", ["Python", "Python"]), ("app-java", ["Java"]),
+                                       ("app-vendas", ["Vendas"])):
+            response = client.post("/candidates/index", json={
+                "job_id": "job-1",
+                "application_id": application_id,
+                "resume": {"skills": skills},
+            })
+            assert response.status_code == 200
+        response = client.post("/candidates/rank", json={
+            "job_id": "job-1",
+            "job": {"title": "Dev Python", "description": "Backend em Python"},
+            "limit": 1,
+            "offset": 1,
+        })
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3 and body["backend"] == "numpy"
+    assert [candidate["rank"] for candidate in body["candidates"]] == [2]
+    assert body["candidates"][0]["application_id"] != "app-py"
@@ -0,0 +1,156 @@
+"""
+Servidor local que imita o companies-backend e o MinIO para benchmarks
+
+- GET /<bucket>/<path>.pdf: PDF sintético (texto derivado do path, então cada
+  candidatura tem um conteúdo diferente), com ETag
+- POST /resumes/<application_id>: recebe o currículo parseado
+- PATCH /internal/applications/<application_id>: recebe os scores
+- GET /stats: contadores e horário (epoch) de cada chamada por candidatura
+
+Usa apenas a biblioteca padrão (ThreadingHTTPServer), sem dependências extras.
+
+Uso standalone:
+    python benchmarks/mock_backend_server.py --port 9200 --latency-ms 20
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+def build_resume_pdf(lines: List[str]) -> bytes:
+    """Monta um PDF mínimo de uma página com as linhas de texto (Helvetica)"""
+    text = " ".join(f"({line.replace('(', '').replace(')', '')}) Tj 0 -16 Td" for line in lines)
+    stream = f"BT /F1 12 Tf 72 720 Td {text} ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 3 0 R >> >> /Contents 5 0 R >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+    ]
+    content = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(content))
+        content += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref_offset = len(content)
+    content += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    content += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    content += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return content
+
+
+class MockBackendState:
+    """Contadores e horários das chamadas recebidas (compartilhados entre as threads)"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.events: Dict[str, Dict[str, float]] = {}
+
+    def record(self, kind: str, application_id: str = "") -> None:
+        with self.lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+            if application_id:
+                self.events.setdefault(application_id, {})[kind] = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"requests": dict(self.requests), "events": {k: dict(v) for k, v in self.events.items()}}
+
+
+def create_handler(state: MockBackendState, latency_ms: float):
+    """Cria a classe de handler HTTP ligada ao estado e à latência simulada"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str = "application/json",
+                  headers: Dict[str, str] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_body(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+
+        def _simulate_latency(self) -> None:
+            if latency_ms > 0:
+                time.sleep(latency_ms / 1000.0)
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path == "/stats":
+                self._send(200, json.dumps(state.snapshot()).encode())
+                return
+            if not self.path.split("?")[0].endswith(".pdf"):
+                self._send(200, b"{}")
+                return
+            self._simulate_latency()
+            path = self.path.split("?")[0]
+            application_id = path.rsplit("/", 1)[-1][:-4]
+            pdf = build_resume_pdf([
+                f"Candidata {application_id}",
+                "Experiencia Profissional",
+                "Acme - Engenheira de Software - 2019 a atual",
+                "Formacao Academica",
+                "Universidade Federal - Ciencia da Computacao",
+            ])
+            etag = '"' + hashlib.md5(pdf).hexdigest() + '"'
+            state.record("storage_get", application_id)
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", headers={"ETag": etag})
+                return
+            self._send(200, pdf, content_type="application/pdf", headers={"ETag": etag})
+
+        def do_POST(self) -> None:  # noqa: N802
+            self._read_body()
+            self._simulate_latency()
+            if self.path.startswith("/resumes/"):
+                application_id = self.path.rsplit("/", 1)[-1]
+                state.record("resume_saved", application_id)
+                self._send(201, json.dumps({"applicationId": application_id}).encode())
+                return
+            self._send(404, b'{"error": "not found"}')
+
+        def do_PATCH(self) -> None:  # noqa: N802
+            self._read_body()
+            self._simulate_latency()
+            if self.path.startswith("/internal/applications/"):
+                application_id = self.path.rsplit("/", 1)[-1]
+                state.record("scores_saved", application_id)
+                self._send(200, json.dumps({"id": application_id}).encode())
+                return
+            self._send(404, b'{"error": "not found"}')
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock do companies-backend e do MinIO")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latência fixa de cada resposta")
+    args = parser.parse_args()
+
+    state = MockBackendState()
+    server = ThreadingHTTPServer((args.host, args.port), create_handler(state, args.latency_ms))
+    server.daemon_threads = True
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,533 @@
+"""
+Benchmark ponta a ponta do pipeline de candidaturas
+
+applications-queue -> ai-service (parsing do PDF) -> companies-backend (currículo)
+-> ai-score-queue -> ai-service (avaliação) -> companies-backend (scores)
+
+Sobe em subprocessos o mock da OpenAI (ai-service/benchmarks/mock_llm_server.py,
+com latência log-normal e taxa de erro configuráveis), o mock do
+companies-backend/MinIO (benchmarks/mock_backend_server.py) e o ai-service real
+apontando para o mock. O consumer roda neste processo com os handlers, o
+dispatcher e o RetryScheduler reais; N candidaturas sintéticas são publicadas
+no Redis e o resultado (msgs/s, p50/p95/p99 por etapa e uso de recursos) é salvo
+em JSON para comparar entre commits.
+
+Uso (a partir de async-task-service/, com Redis local):
+    python benchmarks/pipeline_benchmark.py --applications 200 --output results/atual.json
+    python benchmarks/pipeline_benchmark.py --applications 200 --compare results/anterior.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AI_SERVICE_DIR = os.path.join(os.path.dirname(SERVICE_DIR), "ai-service")
+sys.path.insert(0, os.path.join(SERVICE_DIR, "src"))
+
+APPLICATIONS_QUEUE = "benchmark-applications-queue"
+AI_SCORE_QUEUE = "benchmark-ai-score-queue"
+QUESTION_RESPONSES_QUEUE = "benchmark-question-responses-queue"
+STORAGE_BUCKET = "benchmark-bucket"
+STAGES = (
+    "application_queue_wait",
+    "resume_parse",
+    "resume_save",
+    "score_queue_wait",
+    "evaluate",
+    "update_scores",
+    "end_to_end",
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percentile / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _git_revision() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVICE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain"], cwd=SERVICE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+class ManagedProcess:
+    """Subprocesso auxiliar (mock ou ai-service) com log em arquivo e espera pelo health check"""
+
+    def __init__(self, name: str, command: List[str], cwd: str, env: Dict[str, str], health_url: str,
+                 log_dir: str) -> None:
+        self.name = name
+        self.health_url = health_url
+        self.log_path = os.path.join(log_dir, f"{name}.log")
+        self._log = open(self.log_path, "wb")
+        self.process = subprocess.Popen(command, cwd=cwd, env=env, stdout=self._log, stderr=subprocess.STDOUT)
+
+    def wait_ready(self, timeout: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                if httpx.get(self.health_url, timeout=1.0).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"{self.name} não ficou pronto; veja o log em {self.log_path}")
+
+    def stop(self) -> None:
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._log.close()
+
+
+def _process_tree(pid: int) -> List[int]:
+    """PID e descendentes (workers do uvicorn, pool de extração de PDF do ai-service)"""
+    pids = [pid]
+    for current in pids:
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as children:
+                    pids.extend(int(child) for child in children.read().split())
+        except OSError:
+            continue
+    return pids
+
+
+def _process_usage(pid: int) -> Dict[str, float]:
+    """CPU (s), RSS atual e pico (MB) e descritores abertos da árvore de processos, via /proc"""
+    ticks = os.sysconf("SC_CLK_TCK")
+    usage = {"cpu_seconds": 0.0, "rss_mb": 0.0, "peak_rss_mb": 0.0, "open_fds": 0, "processes": 0}
+    for current in _process_tree(pid):
+        try:
+            with open(f"/proc/{current}/stat") as stat:
+                fields = stat.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{current}/status") as status:
+                memory = {
+                    line.split(":")[0]: float(line.split()[1]) / 1024.0
+                    for line in status if line.startswith(("VmRSS", "VmHWM"))
+                }
+            usage["open_fds"] += len(os.listdir(f"/proc/{current}/fd"))
+        except OSError:
+            continue
+        # utime e stime são os campos 14 e 15 (11 e 12 depois do nome do processo)
+        usage["cpu_seconds"] += (int(fields[11]) + int(fields[12])) / ticks
+        usage["rss_mb"] += memory.get("VmRSS", 0.0)
+        usage["peak_rss_mb"] += memory.get("VmHWM", 0.0)
+        usage["processes"] += 1
+    return usage
+
+
+def _self_usage() -> Dict[str, float]:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        "peak_rss_mb": usage.ru_maxrss / 1024.0,
+        "open_fds": len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else None,
+    }
+
+
+class StageRecorder:
+    """
+    Instrumentação do consumer: marca o horário de cada evento por candidatura e
+    mede as chamadas HTTP (parsing, gravação do currículo, avaliação, scores)
+    """
+
+    def __init__(self) -> None:
+        self.marks: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.completed = 0
+        self.completion = asyncio.Event()
+        self.expected = 0
+
+    def mark(self, application_id: str, event: str, overwrite: bool = False) -> None:
+        if overwrite:
+            self.marks[application_id][event] = time.time()
+        else:
+            self.marks[application_id].setdefault(event, time.time())
+
+    def time_method(self, cls: type, name: str, stage: str) -> None:
+        original = getattr(cls, name)
+
+        async def timed(instance, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await original(instance, *args, **kwargs)
+            finally:
+                self.durations[stage].append(time.perf_counter() - start)
+
+        setattr(cls, name, timed)
+
+    def time_handler(self, handler, queue_kind: str):
+        async def timed(payload: Dict[str, Any]) -> None:
+            application_id = payload.get("applicationId", "")
+            self.mark(application_id, f"{queue_kind}_started")
+            await handler(payload)
+            self.mark(application_id, f"{queue_kind}_finished", overwrite=True)
+            if queue_kind == "ai_score":
+                self.completed += 1
+                if self.completed >= self.expected:
+                    self.completion.set()
+
+        return timed
+
+    def stage_latencies(self) -> Dict[str, List[float]]:
+        latencies = {
+            "resume_parse": self.durations["resume_parse"],
+            "resume_save": self.durations["resume_save"],
+            "evaluate": self.durations["evaluate"],
+            "update_scores": self.durations["update_scores"],
+        }
+        spans = {
+            "application_queue_wait": ("published", "applications_started"),
+            "score_queue_wait": ("score_enqueued", "ai_score_started"),
+            "end_to_end": ("published", "ai_score_finished"),
+        }
+        for stage, (start_event, end_event) in spans.items():
+            latencies[stage] = [
+                marks[end_event] - marks[start_event]
+                for marks in self.marks.values()
+                if start_event in marks and end_event in marks
+            ]
+        return latencies
+
+
+async def _run_pipeline(args: argparse.Namespace) -> Dict[str, Any]:
+    # Os módulos do consumer leem o ambiente no import: configurado em main() antes daqui
+    import redis.asyncio as redis
+
+    import consumer
+    from config.handler_settings import QUEUE_CONCURRENCY
+    from dispatcher import Dispatcher
+    from handlers.base import get_dlq_name
+    from handlers.registry import register_handlers, registry
+    from retry_scheduler import RetryScheduler, get_retry_key
+    from services.backend_service import BackendService
+    from services.http_client import http_clients
+    from services.score_queue_service import ScoreQueueService
+    from streams import StreamQueueReader
+
+    recorder = StageRecorder()
+    recorder.expected = args.applications
+    recorder.time_method(BackendService, "parse_resume_from_url", "resume_parse")
+    recorder.time_method(BackendService, "send_resume_data", "resume_save")
+    recorder.time_method(BackendService, "evaluate_candidate", "evaluate")
+    recorder.time_method(BackendService, "update_application_scores", "update_scores")
+
+    original_send_score_request = ScoreQueueService.send_score_request
+
+    async def send_score_request(instance, application_id, *send_args, **send_kwargs):
+        result = await original_send_score_request(instance, application_id, *send_args, **send_kwargs)
+        recorder.mark(application_id, "score_enqueued", overwrite=True)
+        return result
+
+    ScoreQueueService.send_score_request = send_score_request
+
+    register_handlers()
+    registry.register(APPLICATIONS_QUEUE, recorder.time_handler(registry.get(APPLICATIONS_QUEUE), "applications"))
+    registry.register(AI_SCORE_QUEUE, recorder.time_handler(registry.get(AI_SCORE_QUEUE), "ai_score"))
+
+    client = redis.from_url(args.redis_url, decode_responses=True)
+    queues = [APPLICATIONS_QUEUE, AI_SCORE_QUEUE, QUESTION_RESPONSES_QUEUE]
+    cleanup_keys = [key for queue in queues for key in (queue, get_retry_key(queue), get_dlq_name(queue))]
+    await client.delete(*cleanup_keys)
+
+    stream_queues = queues if args.stream_mode else []
+    reader = None
+    if stream_queues:
+        reader = StreamQueueReader(
+            client, stream_queues, group_name=f"benchmark-{uuid.uuid4().hex[:8]}", consumer_name="benchmark-1",
+            block_ms=1000, count=args.stream_batch_size,
+        )
+        await reader.ensure_groups()
+
+    dispatcher = Dispatcher(client, queues, QUEUE_CONCURRENCY, consumer.process_message, stream_reader=reader)
+    retry_scheduler = RetryScheduler(client, queues, stream_queues=stream_queues, interval_seconds=0.2)
+    consumer.shutdown_requested = False
+
+    run_id = uuid.uuid4().hex[:8]
+    retry_task = asyncio.create_task(retry_scheduler.run())
+    if reader is not None:
+        fetchers = [
+            asyncio.create_task(consumer.stream_fetcher_worker(client, dispatcher, reader, i + 1))
+            for i in range(args.fetchers)
+        ]
+    else:
+        fetchers = [
+            asyncio.create_task(consumer.fetcher_worker(client, dispatcher, queues, i + 1))
+            for i in range(args.fetchers)
+        ]
+
+    async def publish() -> None:
+        from streams import publish_to_stream
+
+        interval = 1.0 / args.arrival_rate if args.arrival_rate > 0 else 0.0
+        for position in range(args.applications):
+            application_id = f"bench-{run_id}-{position}"
+            message = json.dumps({"payload": {
+                "applicationId": application_id,
+                "jobId": "benchmark-job",
+                "resumeUrl": f"{STORAGE_BUCKET}/resumes/{application_id}.pdf",
+                "eventType": "APPLICATION_CREATED",
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }})
+            recorder.mark(application_id, "published")
+            if reader is not None:
+                await publish_to_stream(client, APPLICATIONS_QUEUE, message)
+            else:
+                await client.rpush(APPLICATIONS_QUEUE, message)
+            if interval:
+                await asyncio.sleep(interval)
+
+    async def wait_for_dead_letters() -> None:
+        # Mensagens que esgotaram as retentativas também encerram a rodada
+        while True:
+            dead = await client.llen(get_dlq_name(APPLICATIONS_QUEUE)) + await client.llen(get_dlq_name(AI_SCORE_QUEUE))
+            if recorder.completed + dead >= args.applications:
+                recorder.completion.set()
+                return
+            await asyncio.sleep(0.5)
+
+    start = time.perf_counter()
+    start_time = time.time()
+    dead_letter_task = asyncio.create_task(wait_for_dead_letters())
+    await publish()
+    timed_out = False
+    try:
+        await asyncio.wait_for(recorder.completion.wait(), timeout=args.timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+    elapsed = time.perf_counter() - start
+
+    failed = await client.llen(get_dlq_name(APPLICATIONS_QUEUE)) + await client.llen(get_dlq_name(AI_SCORE_QUEUE))
+    consumer.shutdown_requested = True
+    dead_letter_task.cancel()
+    await asyncio.gather(*fetchers, return_exceptions=True)
+    await dispatcher.drain(timeout=10)
+    retry_scheduler.stop()
+    await asyncio.gather(retry_task, dead_letter_task, return_exceptions=True)
+    await client.delete(*cleanup_keys)
+    await client.aclose()
+    await http_clients.aclose()
+
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "started_at": start_time,
+        "completed": recorder.completed,
+        "failed": failed,
+        "timed_out": timed_out,
+        "stages": recorder.stage_latencies(),
+    }
+
+
+def _summarize(stages: Dict[str, List[float]]) -> Dict[str, Dict[str, Any]]:
+    summary: Dict[str, Dict[str, Any]] = {}
+    for stage in STAGES:
+        values = stages.get(stage) or []
+        if not values:
+            summary[stage] = {"count": 0}
+            continue
+        summary[stage] = {
+            "count": len(values),
+            "p50_ms": round(_percentile(values, 50) * 1000, 2),
+            "p95_ms": round(_percentile(values, 95) * 1000, 2),
+            "p99_ms": round(_percentile(values, 99) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2),
+        }
+    return summary
+
+
+def _print_report(result: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> None:
+    def delta(current: Optional[float], before: Optional[float]) -> str:
+        if not previous or current is None or not before:
+            return ""
+        return f" ({(current - before) / before * 100:+.1f}%)"
+
+    throughput = result["throughput"]["messages_per_second"]
+    before_throughput = (previous or {}).get("throughput", {}).get("messages_per_second")
+    print(f"Commit {result['git']['commit']} | {result['completed']}/{result['config']['applications']} "
+          f"candidaturas em {result['elapsed_seconds']} s | falhas: {result['failed']}"
+          f"{' | TIMEOUT' if result['timed_out'] else ''}")
+    print(f"Throughput: {throughput} msgs/s{delta(throughput, before_throughput)}")
+    print(f"{'etapa':<24}{'p50 ms':>12}{'p95 ms':>22}{'p99 ms':>12}")
+    for stage, stats in result["stages"].items():
+        if not stats.get("count"):
+            print(f"{stage:<24}{'-':>12}")
+            continue
+        before_p95 = (previous or {}).get("stages", {}).get(stage, {}).get("p95_ms")
+        print(f"{stage:<24}{stats['p50_ms']:>12}{str(stats['p95_ms']) + delta(stats['p95_ms'], before_p95):>22}"
+              f"{stats['p99_ms']:>12}")
+    for name, usage in result["resources"].items():
+        print(f"{name:<24}" + " ".join(f"{key}={value}" for key, value in usage.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta do pipeline de candidaturas")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/15"))
+    parser.add_argument("--applications", type=int, default=200)
+    parser.add_argument("--arrival-rate", type=float, default=0.0,
+                        help="Candidaturas/s publicadas (0 = todas de uma vez)")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="Mediana da latência do mock do LLM")
+    parser.add_argument("--llm-latency-sigma", type=float, default=0.3, help="Dispersão log-normal do mock do LLM")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fração de respostas 429 do mock do LLM")
+    parser.add_argument("--backend-latency-ms", type=float, default=20.0)
+    parser.add_argument("--applications-concurrency", type=int, default=5)
+    parser.add_argument("--ai-score-concurrency", type=int, default=50)
+    parser.add_argument("--fetchers", type=int, default=2)
+    parser.add_argument("--stream-mode", action="store_true", help="Consome as filas em modo stream")
+    parser.add_argument("--stream-batch-size", type=int, default=10)
+    parser.add_argument("--ai-service-workers", type=int, default=1)
+    parser.add_argument("--with-caches", action="store_true",
+                        help="Mantém os caches de parsing e avaliação do ai-service ligados")
+    parser.add_argument("--retry-base-delay", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--output", help="Arquivo JSON com o resultado")
+    parser.add_argument("--compare", help="JSON de uma rodada anterior para comparar")
+    args = parser.parse_args()
+
+    llm_port, backend_port, ai_service_port = _free_port(), _free_port(), _free_port()
+    llm_url = f"http://127.0.0.1:{llm_port}"
+    backend_url = f"http://127.0.0.1:{backend_port}"
+    ai_service_url = f"http://127.0.0.1:{ai_service_port}"
+
+    ai_service_env = {key: value for key, value in os.environ.items() if key != "REDIS_URL"}
+    ai_service_env.update({
+        "OPENAI_API_KEY": "sk-benchmark",
+        "OPENAI_BASE_URL": f"{llm_url}/v1",
+        "DEFAULT_AI_PROVIDER": "openai",
+        "EVALUATION_PROVIDER": "openai",
+        "RESUME_PARSE_CACHE_ENABLED": "true" if args.with_caches else "false",
+        "EVALUATION_CACHE_ENABLED": "true" if args.with_caches else "false",
+    })
+
+    # Ambiente do consumer (lido no import dos módulos em _run_pipeline)
+    os.environ.update({
+        "REDIS_URL": args.redis_url,
+        "AI_SERVICE_URL": ai_service_url,
+        "COMPANIES_API_URL": backend_url,
+        "BACKEND_URL": backend_url,
+        "STORAGE_URL": backend_url,
+        "APPLICATIONS_QUEUE_NAME": APPLICATIONS_QUEUE,
+        "AI_SCORE_QUEUE_NAME": AI_SCORE_QUEUE,
+        "QUESTION_RESPONSES_QUEUE_NAME": QUESTION_RESPONSES_QUEUE,
+        "APPLICATIONS_QUEUE_CONCURRENCY": str(args.applications_concurrency),
+        "AI_SCORE_QUEUE_CONCURRENCY": str(args.ai_score_concurrency),
+        "RETRY_BASE_DELAY_SECONDS": str(args.retry_base_delay),
+        "BLPOP_TIMEOUT_SECONDS": "1",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    })
+
+    log_dir = tempfile.mkdtemp(prefix="pipeline-benchmark-")
+    processes: Dict[str, ManagedProcess] = {}
+    try:
+        processes["mock_llm"] = ManagedProcess(
+            "mock_llm",
+            [sys.executable, "-m", "benchmarks.mock_llm_server", "--port", str(llm_port),
+             "--latency-ms", str(args.llm_latency_ms), "--latency-sigma", str(args.llm_latency_sigma),
+             "--error-rate", str(args.llm_error_rate)],
+            AI_SERVICE_DIR, dict(os.environ), f"{llm_url}/stats", log_dir,
+        )
+        processes["mock_backend"] = ManagedProcess(
+            "mock_backend",
+            [sys.executable, os.path.join("benchmarks", "mock_backend_server.py"), "--port", str(backend_port),
+             "--latency-ms", str(args.backend_latency_ms)],
+            SERVICE_DIR, dict(os.environ), f"{backend_url}/stats", log_dir,
+        )
+        processes["ai_service"] = ManagedProcess(
+            "ai_service",
+            [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(ai_service_port),
+             "--workers", str(args.ai_service_workers), "--log-level", "warning"],
+            AI_SERVICE_DIR, ai_service_env, f"{ai_service_url}/health", log_dir,
+        )
+        for process in processes.values():
+            process.wait_ready()
+
+        usage_before = {name: _process_usage(process.process.pid) for name, process in processes.items()}
+        self_before = _self_usage()
+        run = asyncio.run(_run_pipeline(args))
+        self_after = _self_usage()
+        usage_after = {name: _process_usage(process.process.pid) for name, process in processes.items()}
+        llm_stats = httpx.get(f"{llm_url}/stats", timeout=5.0).json()
+        backend_stats = httpx.get(f"{backend_url}/stats", timeout=5.0).json()["requests"]
+    finally:
+        for process in processes.values():
+            process.stop()
+
+    elapsed = run["elapsed_seconds"] or 1e-9
+    resources = {
+        "consumer": {
+            "cpu_seconds": round(self_after["cpu_seconds"] - self_before["cpu_seconds"], 3),
+            "cpu_percent": round((self_after["cpu_seconds"] - self_before["cpu_seconds"]) / elapsed * 100, 1),
+            "peak_rss_mb": round(self_after["peak_rss_mb"], 1),
+            "open_fds": self_after["open_fds"],
+        }
+    }
+    for name, after in usage_after.items():
+        cpu = after["cpu_seconds"] - usage_before[name]["cpu_seconds"]
+        resources[name] = {
+            "cpu_seconds": round(cpu, 3),
+            "cpu_percent": round(cpu / elapsed * 100, 1),
+            "rss_mb": round(after["rss_mb"], 1),
+            "peak_rss_mb": round(after["peak_rss_mb"], 1),
+            "open_fds": after["open_fds"],
+            "processes": after["processes"],
+        }
+
+    result = {
+        "benchmark": "pipeline",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git": _git_revision(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "redis_url")},
+        "elapsed_seconds": run["elapsed_seconds"],
+        "completed": run["completed"],
+        "failed": run["failed"],
+        "timed_out": run["timed_out"],
+        "throughput": {"messages_per_second": round(run["completed"] / elapsed, 2)},
+        "stages": _summarize(run["stages"]),
+        "resources": resources,
+        "upstream_requests": {"llm": llm_stats, "backend": backend_stats},
+    }
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as handle:
+            previous = json.load(handle)
+    _print_report(result, previous)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as handle:
+            json.dump(result, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark: filas em modo lista (BLPOP) vs. modo stream (XREADGROUP em lote)
+
+Publica N mensagens em um Redis local, consome com os fetchers e o dispatcher
+reais do consumer (com um handler que apenas dorme `--handler-ms`) e compara
+mensagens/s em cada modo.
+
+Uso (a partir de async-task-service/):
+    REDIS_URL=redis://localhost:6379/15 python benchmarks/queue_modes_benchmark.py --messages 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+os.environ.setdefault("BLPOP_TIMEOUT_SECONDS", "1")
+
+import redis.asyncio as redis  # noqa: E402
+
+import consumer  # noqa: E402
+from dispatcher import Dispatcher  # noqa: E402
+from streams import StreamQueueReader, publish_to_stream  # noqa: E402
+
+QUEUE = "benchmark-queue"
+
+
+async def _run_mode(mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    client = redis.from_url(args.redis_url, decode_responses=True)
+    await client.delete(QUEUE, consumer.get_retry_key(QUEUE))
+
+    processed = 0
+    done = asyncio.Event()
+
+    async def process(_client: redis.Redis, _queue: str, _value: str) -> None:
+        nonlocal processed
+        await asyncio.sleep(args.handler_ms / 1000.0)
+        processed += 1
+        if processed >= args.messages:
+            done.set()
+
+    payload = json.dumps({"payload": {"benchmark": True}})
+    reader = None
+    if mode == "stream":
+        reader = StreamQueueReader(
+            client, [QUEUE], group_name="benchmark-group", consumer_name="benchmark-1",
+            block_ms=1000, count=args.batch_size,
+        )
+        await reader.ensure_groups()
+        for _ in range(args.messages):
+            await publish_to_stream(client, QUEUE, payload)
+    else:
+        async with client.pipeline() as pipe:
+            for _ in range(args.messages):
+                pipe.rpush(QUEUE, payload)
+            await pipe.execute()
+
+    dispatcher = Dispatcher(client, [QUEUE], {QUEUE: args.concurrency}, process, stream_reader=reader)
+    consumer.shutdown_requested = False
+    start = time.perf_counter()
+    if reader is not None:
+        fetchers = [
+            asyncio.create_task(consumer.stream_fetcher_worker(client, dispatcher, reader, i + 1))
+            for i in range(args.fetchers)
+        ]
+    else:
+        fetchers = [
+            asyncio.create_task(consumer.fetcher_worker(client, dispatcher, [QUEUE], i + 1))
+            for i in range(args.fetchers)
+        ]
+    await done.wait()
+    elapsed = time.perf_counter() - start
+
+    consumer.shutdown_requested = True
+    await asyncio.gather(*fetchers, return_exceptions=True)
+    await dispatcher.drain(timeout=5)
+    await client.delete(QUEUE)
+    await client.aclose()
+
+    return {
+        "mode": mode,
+        "messages": args.messages,
+        "concurrency": args.concurrency,
+        "fetchers": args.fetchers,
+        "elapsed_seconds": round(elapsed, 3),
+        "messages_per_second": round(args.messages / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/15"))
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--fetchers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=50, help="COUNT do XREADGROUP")
+    parser.add_argument("--handler-ms", type=float, default=5.0)
+    parser.add_argument("--output", help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    results = [asyncio.run(_run_mode(mode, args)) for mode in ("list", "stream")]
+    for result in results:
+        print(
+            f"{result['mode']:>6}: {result['messages_per_second']:>8} msg/s | "
+            f"{result['elapsed_seconds']} s para {result['messages']} mensagens"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
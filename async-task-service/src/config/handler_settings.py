@@ -13,3 +13,10 @@ QUEUE_HANDLERS = {
 
 # Configuração das filas que serão consumidas
 QUEUES_NAMES = QUEUE_HANDLERS.keys()
+
+# Limite de mensagens processadas simultaneamente por fila (pool do dispatcher)
+QUEUE_CONCURRENCY = {
+    os.getenv('APPLICATIONS_QUEUE_NAME', 'applications-queue'): int(os.getenv('APPLICATIONS_QUEUE_CONCURRENCY', '5')),
+    os.getenv('AI_SCORE_QUEUE_NAME', 'ai-score-queue'): int(os.getenv('AI_SCORE_QUEUE_CONCURRENCY', '50')),
+    os.getenv('QUESTION_RESPONSES_QUEUE_NAME', 'question-responses-queue'): int(os.getenv('QUESTION_RESPONSES_QUEUE_CONCURRENCY', '20')),
+}
@@ -3,8 +3,9 @@ Configurações centralizadas para o consumer Redis
 """
 
 import os
-from typing import Optional
-from dataclasses import dataclass
+import socket
+from typing import List, Optional
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -29,6 +30,8 @@ class CompaniesBackendSettings:
     """Configurações para comunicação com companies-backend"""
     url: str
     timeout: int = 30
+    max_connections: int = 50
+    max_keepalive_connections: int = 20
 
 
 @dataclass
@@ -36,6 +39,16 @@ class AIServiceSettings:
     """Configurações para comunicação com AI Service"""
     url: str
     timeout: int = 120  # Timeout maior para processamento de IA
+    max_connections: int = 100
+    max_keepalive_connections: int = 50
+
+
+@dataclass
+class HTTPClientSettings:
+    """Configurações dos clientes HTTP compartilhados (pool de conexões)"""
+    http2: bool = True
+    connect_timeout: float = 5.0
+    keepalive_expiry: float = 30.0
 
 
 @dataclass
@@ -50,6 +63,8 @@ class ProcessingSettings:
     """Configurações para processamento"""
     download_timeout: int = 30
     temp_file_suffix: str = '.pdf'
+    download_max_bytes: int = 10 * 1024 * 1024
+    download_chunk_size: int = 65536
 
 
 @dataclass
@@ -57,6 +72,17 @@ class LoggingSettings:
     """Configurações para logging"""
     level: str = "INFO"
     format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    json: bool = True  # JSON por linha; False usa `format`
+    queue_size: int = 10000  # registros pendentes na fila de logging antes de descartar
+    sampling: str = ""  # amostragem por evento/logger, ex: "processing=0.1,consumer.dispatcher=0.5"
+
+
+@dataclass
+class TracingSettings:
+    """Configurações de tracing distribuído (OpenTelemetry, opcional)"""
+    service_name: str = "async-task-service"
+    exporter: str = "none"  # otlp, file, console ou none
+    file_path: str = "traces/async-task-service.jsonl"
 
 
 @dataclass
@@ -82,6 +108,9 @@ class RedisSettings:
     max_retries: int = 3
     block_ms: int = 20000
     count: int = 10
+    # Filas consumidas como Redis Streams (consumer group) em vez de listas (BLPOP)
+    stream_queues: List[str] = field(default_factory=list)
+    claim_idle_ms: int = 300000
 
 
 @dataclass
@@ -109,10 +138,12 @@ class ConsumerSettings:
         self.backend = self._load_backend_settings()
         self.companies_backend = self._load_companies_backend_settings()
         self.ai_service = self._load_ai_service_settings()
+        self.http_client = self._load_http_client_settings()
         self.evaluation = self._load_evaluation_settings()
         self.storage = self._load_storage_settings()
         self.processing = self._load_processing_settings()
         self.logging = self._load_logging_settings()
+        self.tracing = self._load_tracing_settings()
 
     def _load_redis_settings(self) -> RedisSettings:
         """Carrega configurações Redis das variáveis de ambiente"""
@@ -123,10 +154,15 @@ class ConsumerSettings:
             db=int(os.getenv('REDIS_DB', '0')),
             stream_name=os.getenv('APPLICATIONS_REDIS_STREAM', 'applications-stream'),
             group_name=os.getenv('APPLICATIONS_REDIS_GROUP', 'applications-group'),
-            consumer_name=os.getenv('APPLICATIONS_REDIS_CONSUMER', 'consumer-1'),
+            # Único por réplica: é o dono das entradas pendentes no consumer group
+            consumer_name=os.getenv('APPLICATIONS_REDIS_CONSUMER', socket.gethostname()),
             max_retries=int(os.getenv('REDIS_MAX_RETRIES', '3')),
             block_ms=int(os.getenv('REDIS_BLOCK_MS', '20000')),
-            count=int(os.getenv('REDIS_MAX_MESSAGES', '10'))
+            count=int(os.getenv('REDIS_MAX_MESSAGES', '10')),
+            stream_queues=[
+                queue.strip() for queue in os.getenv('REDIS_STREAM_QUEUES', '').split(',') if queue.strip()
+            ],
+            claim_idle_ms=int(os.getenv('REDIS_STREAM_CLAIM_IDLE_MS', '300000'))
         )
 
     def _load_ai_score_redis_settings(self) -> AIScoreRedisSettings:
@@ -168,7 +204,9 @@ class ConsumerSettings:
         companies_url = os.getenv('COMPANIES_API_URL', 'http://localhost:3000')
         return CompaniesBackendSettings(
             url=companies_url,
-            timeout=int(os.getenv('COMPANIES_BACKEND_TIMEOUT', '30'))
+            timeout=int(os.getenv('COMPANIES_BACKEND_TIMEOUT', '30')),
+            max_connections=int(os.getenv('COMPANIES_BACKEND_MAX_CONNECTIONS', '50')),
+            max_keepalive_connections=int(os.getenv('COMPANIES_BACKEND_MAX_KEEPALIVE', '20'))
         )
 
     def _load_ai_service_settings(self) -> AIServiceSettings:
@@ -176,7 +214,17 @@ class ConsumerSettings:
         ai_service_url = os.getenv('AI_SERVICE_URL', 'http://localhost:8000')
         return AIServiceSettings(
             url=ai_service_url,
-            timeout=int(os.getenv('AI_SERVICE_TIMEOUT', '120'))
+            timeout=int(os.getenv('AI_SERVICE_TIMEOUT', '120')),
+            max_connections=int(os.getenv('AI_SERVICE_MAX_CONNECTIONS', '100')),
+            max_keepalive_connections=int(os.getenv('AI_SERVICE_MAX_KEEPALIVE', '50'))
+        )
+
+    def _load_http_client_settings(self) -> HTTPClientSettings:
+        """Carrega configurações dos clientes HTTP das variáveis de ambiente"""
+        return HTTPClientSettings(
+            http2=os.getenv('HTTP_CLIENT_HTTP2', 'true').lower() == 'true',
+            connect_timeout=float(os.getenv('HTTP_CLIENT_CONNECT_TIMEOUT', '5')),
+            keepalive_expiry=float(os.getenv('HTTP_CLIENT_KEEPALIVE_EXPIRY', '30'))
         )
 
     def _load_evaluation_settings(self) -> EvaluationSettings:
@@ -200,14 +248,27 @@ class ConsumerSettings:
         """Carrega configurações de processamento das variáveis de ambiente"""
         return ProcessingSettings(
             download_timeout=int(os.getenv('DOWNLOAD_TIMEOUT', '30')),
-            temp_file_suffix=os.getenv('TEMP_FILE_SUFFIX', '.pdf')
+            temp_file_suffix=os.getenv('TEMP_FILE_SUFFIX', '.pdf'),
+            download_max_bytes=int(os.getenv('PDF_DOWNLOAD_MAX_BYTES', str(10 * 1024 * 1024))),
+            download_chunk_size=int(os.getenv('PDF_DOWNLOAD_CHUNK_SIZE', '65536'))
         )
 
     def _load_logging_settings(self) -> LoggingSettings:
         """Carrega configurações de logging das variáveis de ambiente"""
         return LoggingSettings(
             level=os.getenv('LOG_LEVEL', 'INFO'),
-            format=os.getenv('LOG_FORMAT', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            format=os.getenv('LOG_FORMAT', '%(asctime)s - %(name)s - %(levelname)s - %(message)s'),
+            json=os.getenv('LOG_JSON', 'true').lower() == 'true',
+            queue_size=int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+            sampling=os.getenv('LOG_SAMPLING', '')
+        )
+
+    def _load_tracing_settings(self) -> TracingSettings:
+        """Carrega configurações de tracing das variáveis de ambiente"""
+        return TracingSettings(
+            service_name=os.getenv('OTEL_SERVICE_NAME', 'async-task-service'),
+            exporter=os.getenv('OTEL_TRACES_EXPORTER', 'none').lower(),
+            file_path=os.getenv('OTEL_TRACES_FILE', 'traces/async-task-service.jsonl')
         )
 
     def validate(self) -> bool:
@@ -247,7 +308,9 @@ class ConsumerSettings:
             'consumer_name': self.redis.consumer_name,
             'block_ms': self.redis.block_ms,
             'count': self.redis.count,
-            'max_retries': self.redis.max_retries
+            'max_retries': self.redis.max_retries,
+            'stream_queues': self.redis.stream_queues,
+            'claim_idle_ms': self.redis.claim_idle_ms
         }
 
     def get_ai_score_redis_config(self) -> dict:
@@ -10,9 +10,19 @@ from typing import Optional, Dict, Any, Set
 import redis.asyncio as redis
 from dotenv import load_dotenv
 
-from config.handler_settings import QUEUES_NAMES
+from config.handler_settings import QUEUES_NAMES, QUEUE_CONCURRENCY
+from config.settings import settings
+from dispatcher import Dispatcher
+from retry_scheduler import RetryScheduler, compute_retry_delay, get_retry_key
+from streams import StreamQueueReader
 from handlers.base import get_dlq_name
 from handlers.registry import registry, register_handlers
+from services.http_client import http_clients
+from utils.metrics import MetricsServer, message_age_seconds, metrics
+from utils.structured_logging import dropped_records, setup_logging as configure_logging, shutdown_logging
+from utils.tracing import (
+    TRACE_META_KEY, extract_message_carrier, inject_context, setup_tracing, shutdown_tracing, start_span
+)
 
 shutdown_requested = False
 
@@ -31,11 +41,13 @@ def _get_env(name: str, default: Optional[str] = None) -> str:
 
 
 def setup_logging() -> None:
-    level_name = os.getenv("LOG_LEVEL", "INFO").upper()
-    level = getattr(logging, level_name, logging.INFO)
-    logging.basicConfig(
-        level=level,
-        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
+    """Logger raiz na mesma fila não bloqueante do ConsumerLogger (escrita no stdout em outra thread)"""
+    configure_logging(
+        level=settings.logging.level,
+        json_output=settings.logging.json,
+        queue_size=settings.logging.queue_size,
+        sampling=settings.logging.sampling,
+        text_format=settings.logging.format,
     )
 
 
@@ -51,8 +63,9 @@ async def create_redis_client() -> redis.Redis:
     return redis.Redis(host=host, port=port, db=db, decode_responses=True)
 
 
-def get_retry_key(queue_name: str) -> str:
-    return f"{queue_name}:retry"
+def blpop_timeout_ms() -> int:
+    """Timeout de bloqueio das leituras, para que o encerramento seja percebido a tempo"""
+    return int(_get_env("BLPOP_TIMEOUT_SECONDS", "5")) * 1000
 
 
 async def handle_with_retry(client: redis.Redis, queue_name: str, raw_value: str) -> None:
@@ -62,10 +75,12 @@ async def handle_with_retry(client: redis.Redis, queue_name: str, raw_value: str
     if handler is None:
         logger.error(f"Nenhum handler registrado para a fila '{queue_name}'. Enviando para DLQ.")
         await client.rpush(get_dlq_name(queue_name), raw_value)
+        metrics.inc("async_task_dlq_total", queue=queue_name, reason="no_handler")
         return
 
     max_retries = int(_get_env("MAX_RETRIES", "3"))
     base_delay = float(_get_env("RETRY_BASE_DELAY_SECONDS", "2"))
+    max_delay = float(_get_env("RETRY_MAX_DELAY_SECONDS", "300"))
 
     # Mensagens devem ser JSON; caso contrário, vão para DLQ
     try:
@@ -73,55 +88,77 @@ async def handle_with_retry(client: redis.Redis, queue_name: str, raw_value: str
     except json.JSONDecodeError:
         logger.error(f"Mensagem inválida (não-JSON) para fila '{queue_name}'. Enviando para DLQ.")
         await client.rpush(get_dlq_name(queue_name), raw_value)
+        metrics.inc("async_task_dlq_total", queue=queue_name, reason="invalid_json")
         return
 
     retry_count = 0
     if "_meta" in message and isinstance(message["_meta"], dict):
         retry_count = int(message["_meta"].get("retry_count", 0))
 
+    # Extrai o payload da mensagem se existir, senão usa a mensagem completa
+    payload = message.get("payload", message)
+
+    # Espera em fila só na primeira tentativa (nas retentativas incluiria o backoff)
+    if retry_count == 0:
+        age = message_age_seconds(payload, message)
+        if age is not None:
+            metrics.observe("async_task_queue_wait_seconds", age, queue=queue_name)
+
+    parent_carrier = extract_message_carrier(message)
+    trace_carrier = parent_carrier
+    start = time.perf_counter()
     try:
-        # Extrai o payload da mensagem se existir, senão usa a mensagem completa
-        payload = message.get("payload", message)
-        await handler(payload)
+        # Continua o trace de quem publicou a mensagem (_meta.trace), se houver
+        with start_span(
+            f"process {queue_name}",
+            {
+                "messaging.system": "redis",
+                "messaging.destination": queue_name,
+                "messaging.retry_count": retry_count,
+                "application.id": str(payload.get("applicationId", "")) if isinstance(payload, dict) else "",
+            },
+            parent_carrier=parent_carrier,
+            kind="consumer",
+        ):
+            if trace_carrier is None:
+                # Mensagem sem contexto: as retentativas entram no trace iniciado aqui
+                trace_carrier = inject_context({}) or None
+            await handler(payload)
+        metrics.observe("async_task_handler_duration_seconds", time.perf_counter() - start,
+                        queue=queue_name, outcome="success")
+        metrics.inc("async_task_messages_total", queue=queue_name, outcome="success")
         return
     except Exception as exc:  # noqa: BLE001
+        metrics.observe("async_task_handler_duration_seconds", time.perf_counter() - start,
+                        queue=queue_name, outcome="error")
         logger.warning(
-            f"Handler falhou para fila '{queue_name}' (tentativa {retry_count + 1}/{max_retries}): {exc}"
+            "Handler falhou para fila '%s' (tentativa %d/%d): %s", queue_name, retry_count + 1, max_retries, exc
         )
 
         retry_count += 1
         if retry_count > max_retries:
             logger.error(f"Excedeu tentativas para fila '{queue_name}'. Enviando para DLQ.")
             await client.rpush(get_dlq_name(queue_name), raw_value)
+            metrics.inc("async_task_dlq_total", queue=queue_name, reason="max_retries")
+            metrics.inc("async_task_messages_total", queue=queue_name, outcome="dlq")
             return
 
         # Atualiza metadados de retentativa no payload (JSON)
         meta = dict(message.get("_meta", {}))
         meta["retry_count"] = retry_count
+        if trace_carrier:
+            meta[TRACE_META_KEY] = trace_carrier
         message["_meta"] = meta
         next_payload = json.dumps(message, ensure_ascii=False)
 
-        # Backoff exponencial simples
-        delay_seconds = base_delay * (2 ** (retry_count - 1))
+        # Backoff exponencial com jitter; a promoção de volta à fila é feita pelo RetryScheduler
+        delay_seconds = compute_retry_delay(retry_count, base_delay, max_delay)
         next_available_at = time.time() + delay_seconds
         retry_key = get_retry_key(queue_name)
         await client.zadd(retry_key, {next_payload: next_available_at})
-        logger.info(f"Reagendado para retry em {delay_seconds:.2f} s (fila={queue_name})")
-
-
-async def drain_due_retries(client: redis.Redis, queue_name: str) -> None:
-    retry_key = get_retry_key(queue_name)
-    now = time.time()
-    # Busca itens vencidos (prontos) em pequenos lotes
-    items = await client.zrangebyscore(retry_key, min=-1, max=now, start=0, num=10)
-    if not items:
-        return
-    # Move cada item da zset para a fila principal de forma atômica
-    async with client.pipeline() as pipe:
-        for item in items:
-            await pipe.zrem(retry_key, item)
-            await pipe.lpush(queue_name, item)
-        await pipe.execute()
+        metrics.inc("async_task_retries_total", queue=queue_name)
+        metrics.inc("async_task_messages_total", queue=queue_name, outcome="retry")
+        logger.info("Reagendado para retry em %.2f s (fila=%s)", delay_seconds, queue_name, extra={"event": "retry"})
 
 
 async def process_message(client: redis.Redis, queue_name: str, value: str) -> None:
@@ -133,45 +170,105 @@ async def process_message(client: redis.Redis, queue_name: str, value: str) -> N
         logger.exception(f"Erro inesperado ao processar mensagem: {exc}")
 
 
-async def consumer_worker(client: redis.Redis, queues: list[str], worker_id: int) -> None:
-    """Worker que consome mensagens de uma ou mais filas."""
-    logger = logging.getLogger(f"consumer.worker-{worker_id}")
+async def fetcher_worker(client: redis.Redis, dispatcher: Dispatcher, queues: list[str], fetcher_id: int) -> None:
+    """Fetcher que busca mensagens das filas com vaga e as entrega ao dispatcher."""
+    logger = logging.getLogger(f"consumer.fetcher-{fetcher_id}")
     blpop_timeout = int(_get_env("BLPOP_TIMEOUT_SECONDS", "5"))
 
-    logger.info(f"Worker {worker_id} iniciado. Consumindo das filas: {queues}")
+    logger.info(f"Fetcher {fetcher_id} iniciado. Consumindo das filas: {queues}")
 
     while not shutdown_requested:
         try:
-            # Antes de bloquear, drenamos eventuais retries prontos
-            for q in queues:
-                await drain_due_retries(client, q)
+            # Backpressure: só consulta as filas que ainda têm vaga no pool
+            eligible = dispatcher.eligible_queues()
+            if not eligible:
+                await dispatcher.wait_for_capacity(timeout=blpop_timeout)
+                continue
 
-            item = await client.blpop(queues, timeout=blpop_timeout)
+            item = await client.blpop(eligible, timeout=blpop_timeout)
             if item is None:
                 continue
             queue_name, value = item
 
-            # Processa a mensagem de forma assíncrona
-            await process_message(client, queue_name, value)
+            # Processamento acontece no pool; o fetcher volta a buscar imediatamente
+            await dispatcher.submit(queue_name, value)
 
         except redis.ConnectionError as exc:
-            logger.error(f"Erro de conexão com Redis no worker {worker_id}: {exc}")
+            logger.error(f"Erro de conexão com Redis no fetcher {fetcher_id}: {exc}")
             timeout_reconnect_seconds = 2
-            logger.info(f"Worker {worker_id} tentando reconectar em {timeout_reconnect_seconds} s...")
+            logger.info(f"Fetcher {fetcher_id} tentando reconectar em {timeout_reconnect_seconds} s...")
             try:
                 await asyncio.sleep(timeout_reconnect_seconds)
             except asyncio.CancelledError:
                 break
         except Exception as exc:  # noqa: BLE001
-            logger.exception(f"Erro inesperado no worker {worker_id}: {exc}")
+            logger.exception(f"Erro inesperado no fetcher {fetcher_id}: {exc}")
+
+    logger.info("Fetcher %d encerrado.", fetcher_id)
+
+
+async def stream_fetcher_worker(
+    client: redis.Redis, dispatcher: Dispatcher, reader: StreamQueueReader, fetcher_id: int
+) -> None:
+    """Fetcher das filas em modo stream: lê em lote, reivindica pendentes e apara os streams."""
+    logger = logging.getLogger(f"consumer.stream-fetcher-{fetcher_id}")
+    maintenance_interval = reader.claim_idle_ms / 1000.0 / 2
+    next_maintenance = 0.0
+
+    logger.info(
+        f"Stream fetcher {fetcher_id} iniciado. Consumindo dos streams: {reader.queues} "
+        f"(group={reader.group_name}, consumer={reader.consumer_name})"
+    )
+
+    while not shutdown_requested:
+        try:
+            # Periodicamente reivindica entradas abandonadas e apara os streams
+            if time.monotonic() >= next_maintenance:
+                for q in reader.queues:
+                    for queue_name, message_id, value in await reader.claim_stale(
+                        q, min(reader.count, dispatcher.available_slots(q))
+                    ):
+                        await dispatcher.submit(queue_name, value, message_id)
+                await reader.trim()
+                next_maintenance = time.monotonic() + maintenance_interval
+
+            # Backpressure: lê no máximo o número de vagas livres nas filas elegíveis
+            eligible = [q for q in dispatcher.eligible_queues() if q in reader.queues]
+            if not eligible:
+                await dispatcher.wait_for_capacity(timeout=reader.block_ms / 1000.0)
+                continue
+            count = min(reader.count, min(dispatcher.available_slots(q) for q in eligible))
+
+            for queue_name, message_id, value in await reader.read(eligible, count):
+                await dispatcher.submit(queue_name, value, message_id)
+
+        except redis.ConnectionError as exc:
+            logger.error(f"Erro de conexão com Redis no stream fetcher {fetcher_id}: {exc}")
+            try:
+                await asyncio.sleep(2)
+            except asyncio.CancelledError:
+                break
+        except Exception as exc:  # noqa: BLE001
+            logger.exception(f"Erro inesperado no stream fetcher {fetcher_id}: {exc}")
+
+    logger.info("Stream fetcher %d encerrado.", fetcher_id)
 
-    logger.info("Worker %d encerrado.", worker_id)
+
+def _collect_runtime_metrics(dispatcher: Dispatcher) -> None:
+    """Atualiza os gauges de ocupação do pool e dos upstreams HTTP (chamado a cada scrape)"""
+    for queue, stats in dispatcher.get_stats().items():
+        metrics.set_gauge("async_task_queue_in_flight", stats['in_flight'], queue=queue)
+        metrics.set_gauge("async_task_queue_concurrency", stats['concurrency'], queue=queue)
+    for upstream, stats in http_clients.get_pool_metrics().items():
+        metrics.set_gauge("async_task_upstream_in_flight", stats['in_flight'], upstream=upstream)
+    metrics.set_gauge("async_task_log_records_dropped", dropped_records())
 
 
 async def main_async() -> int:
     """Função principal assíncrona."""
     load_dotenv()
     setup_logging()
+    setup_tracing()
     logger = logging.getLogger("consumer")
 
     client = await create_redis_client()
@@ -179,38 +276,99 @@ async def main_async() -> int:
     # Registrar handlers
     register_handlers()
 
-    # Filas que vamos consumir: configuradas no arquivo handlers/config.py
-    queues = QUEUES_NAMES
+    # Filas que vamos consumir: configuradas no arquivo config/handler_settings.py
+    queues = list(QUEUES_NAMES)
+    # Filas em modo stream (REDIS_STREAM_QUEUES); as demais continuam em modo lista
+    stream_queues = [q for q in queues if q in settings.redis.stream_queues]
+    list_queues = [q for q in queues if q not in stream_queues]
+
+    # Poucos fetchers alimentam o pool; a concorrência real é limitada por fila
+    num_fetchers = int(_get_env("NUM_FETCHERS", "2"))
+    drain_timeout = float(_get_env("DRAIN_TIMEOUT_SECONDS", "120"))
+
+    stream_reader = None
+    if stream_queues:
+        stream_reader = StreamQueueReader(
+            client,
+            stream_queues,
+            group_name=settings.redis.group_name,
+            consumer_name=settings.redis.consumer_name,
+            block_ms=min(settings.redis.block_ms, blpop_timeout_ms()),
+            count=settings.redis.count,
+            claim_idle_ms=settings.redis.claim_idle_ms,
+        )
+        await stream_reader.ensure_groups()
 
-    # Número de workers concorrentes
-    num_workers = int(_get_env("NUM_WORKERS", "3"))
+    dispatcher = Dispatcher(
+        client, queues, QUEUE_CONCURRENCY, process_message, stream_reader=stream_reader
+    )
 
-    logger.info(f"Conectado ao Redis. Iniciando {num_workers} workers para as filas: {queues}")
+    logger.info(
+        f"Conectado ao Redis. Iniciando {num_fetchers} fetchers para as filas: "
+        f"listas={list_queues} streams={stream_queues} (concorrência por fila: {QUEUE_CONCURRENCY})"
+    )
+
+    # Um único promoter de retentativas por processo (ou por cluster, com eleição de líder)
+    retry_scheduler = RetryScheduler(
+        client,
+        queues,
+        stream_queues=stream_queues,
+        interval_seconds=float(_get_env("RETRY_SCHEDULER_INTERVAL_MS", "500")) / 1000.0,
+        batch_size=int(_get_env("RETRY_SCHEDULER_BATCH_SIZE", "500")),
+        leader_election=_get_env("RETRY_SCHEDULER_LEADER_ELECTION", "false").lower() == "true",
+    )
+    retry_scheduler_task = asyncio.create_task(retry_scheduler.run())
+
+    # Métricas em GET /metrics (METRICS_PORT=0 desliga)
+    metrics_server = None
+    metrics_port = int(_get_env("METRICS_PORT", "9400"))
+    metrics.add_collector(lambda: _collect_runtime_metrics(dispatcher))
+    if metrics_port > 0:
+        metrics_server = MetricsServer(metrics, _get_env("METRICS_HOST", "0.0.0.0"), metrics_port)
+        try:
+            await metrics_server.start()
+        except OSError as exc:
+            logger.error(f"Não foi possível expor métricas na porta {metrics_port}: {exc}")
+            metrics_server = None
 
     # Registrar sinais de encerramento
     signal.signal(signal.SIGINT, _request_shutdown)
     signal.signal(signal.SIGTERM, _request_shutdown)
 
-    # Criar workers concorrentes
-    workers = []
-    for i in range(num_workers):
-        worker = asyncio.create_task(consumer_worker(client, queues, i + 1))
-        workers.append(worker)
+    # Criar fetchers concorrentes
+    fetchers = []
+    for i in range(num_fetchers):
+        if list_queues:
+            fetchers.append(asyncio.create_task(fetcher_worker(client, dispatcher, list_queues, i + 1)))
+        if stream_reader is not None:
+            fetchers.append(asyncio.create_task(stream_fetcher_worker(client, dispatcher, stream_reader, i + 1)))
 
     try:
-        # Aguardar todos os workers
-        await asyncio.gather(*workers, return_exceptions=True)
+        # Fetchers terminam quando o encerramento é solicitado
+        await asyncio.gather(*fetchers, return_exceptions=True)
     except KeyboardInterrupt:
-        logger.info("Interrupção recebida. Encerrando workers...")
-        # Cancelar todos os workers
-        for worker in workers:
-            worker.cancel()
+        logger.info("Interrupção recebida. Encerrando fetchers...")
+        # Cancelar todos os fetchers
+        for fetcher in fetchers:
+            fetcher.cancel()
         # Aguardar cancelamento
-        await asyncio.gather(*workers, return_exceptions=True)
+        await asyncio.gather(*fetchers, return_exceptions=True)
     finally:
+        # Drena as mensagens em processamento antes de fechar as conexões
+        await dispatcher.drain(drain_timeout)
+        retry_scheduler.stop()
+        await asyncio.gather(retry_scheduler_task, return_exceptions=True)
+        logger.info(f"Estatísticas do dispatcher: {dispatcher.get_stats()}")
+        logger.info(f"Métricas de retentativas: {await retry_scheduler.get_metrics()}")
+        logger.info(f"Métricas dos pools HTTP: {http_clients.get_pool_metrics()}")
+        if metrics_server is not None:
+            await metrics_server.stop()
+        await http_clients.aclose()
         await client.close()
+        shutdown_tracing()
 
     logger.info("Consumer encerrado.")
+    shutdown_logging()
     return 0
 
 
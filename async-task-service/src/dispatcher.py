@@ -0,0 +1,151 @@
+"""
+Dispatcher de mensagens: separa a busca (fetchers) da execução dos handlers
+
+Os fetchers fazem BLPOP e entregam as mensagens a um pool de execução em
+memória com limite de concorrência por fila. Quando uma fila atinge o limite,
+os fetchers deixam de buscar mensagens dela (backpressure) até que uma
+execução termine.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import redis.asyncio as redis
+
+from streams import StreamQueueReader
+
+ProcessFn = Callable[[redis.Redis, str, str], Awaitable[None]]
+
+
+class QueueExecutor:
+    """Execuções em andamento de uma fila, limitadas a `concurrency`"""
+
+    def __init__(self, queue_name: str, concurrency: int) -> None:
+        self.queue_name = queue_name
+        self.concurrency = max(1, concurrency)
+        self.tasks: Set[asyncio.Task[None]] = set()
+        self.processed_total = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.tasks)
+
+    @property
+    def available_slots(self) -> int:
+        return max(0, self.concurrency - self.in_flight)
+
+    def has_capacity(self) -> bool:
+        return self.in_flight < self.concurrency
+
+
+class Dispatcher:
+    """Pool de execução limitado por fila, alimentado pelos fetchers"""
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        queues: List[str],
+        concurrency: Dict[str, int],
+        process: ProcessFn,
+        default_concurrency: int = 10,
+        stream_reader: Optional[StreamQueueReader] = None,
+    ) -> None:
+        self._client = client
+        self._process = process
+        self._stream_reader = stream_reader
+        self._executors: Dict[str, QueueExecutor] = {
+            queue: QueueExecutor(queue, concurrency.get(queue, default_concurrency))
+            for queue in queues
+        }
+        self._capacity_changed = asyncio.Condition()
+        self._logger = logging.getLogger("consumer.dispatcher")
+
+    def eligible_queues(self) -> List[str]:
+        """Filas com vaga no pool (as únicas que os fetchers devem consultar)"""
+        return [queue for queue, executor in self._executors.items() if executor.has_capacity()]
+
+    def available_slots(self, queue_name: str) -> int:
+        """Quantas mensagens da fila ainda cabem no pool"""
+        return self._executors[queue_name].available_slots
+
+    async def wait_for_capacity(self, timeout: float) -> None:
+        """Aguarda até que alguma execução termine (ou até o timeout)"""
+        async with self._capacity_changed:
+            try:
+                await asyncio.wait_for(self._capacity_changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def submit(self, queue_name: str, value: str, message_id: Optional[str] = None) -> None:
+        """
+        Agenda o processamento de uma mensagem
+
+        Se a fila estiver no limite (corrida entre fetchers), aguarda uma vaga
+        antes de agendar, aplicando backpressure ao fetcher. `message_id` é o
+        id da entrada quando a fila está em modo stream (confirmada com XACK
+        ao final do processamento).
+        """
+        executor = self._executors[queue_name]
+        while not executor.has_capacity():
+            await self.wait_for_capacity(timeout=1.0)
+
+        task = asyncio.create_task(self._run(executor, value, message_id))
+        executor.tasks.add(task)
+
+    async def _run(self, executor: QueueExecutor, value: str, message_id: Optional[str]) -> None:
+        try:
+            await self._process(self._client, executor.queue_name, value)
+            if message_id is not None and self._stream_reader is not None:
+                await self._stream_reader.ack(executor.queue_name, message_id)
+        except asyncio.CancelledError:
+            if message_id is None:
+                # Encerramento forçado: devolve a mensagem para o início da fila
+                await asyncio.shield(self._client.lpush(executor.queue_name, value))
+                self._logger.warning(
+                    f"Processamento cancelado; mensagem devolvida à fila '{executor.queue_name}'"
+                )
+            else:
+                # Sem XACK a entrada continua pendente e será reivindicada via XAUTOCLAIM
+                self._logger.warning(
+                    f"Processamento cancelado; entrada {message_id} continua pendente no stream "
+                    f"'{executor.queue_name}'"
+                )
+            raise
+        finally:
+            executor.tasks.discard(asyncio.current_task())  # type: ignore[arg-type]
+            executor.processed_total += 1
+            async with self._capacity_changed:
+                self._capacity_changed.notify_all()
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Aguarda as execuções em andamento terminarem
+
+        Após `timeout` segundos, as execuções restantes são canceladas e suas
+        mensagens voltam para a fila de origem.
+        """
+        pending = [task for executor in self._executors.values() for task in executor.tasks]
+        if not pending:
+            return
+
+        self._logger.info(f"Aguardando {len(pending)} mensagens em processamento (até {timeout:.0f} s)...")
+        done, still_running = await asyncio.wait(pending, timeout=timeout)
+        if still_running:
+            self._logger.warning(
+                f"{len(still_running)} mensagens não terminaram a tempo; cancelando e devolvendo às filas"
+            )
+            for task in still_running:
+                task.cancel()
+            await asyncio.gather(*still_running, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna ocupação do pool por fila"""
+        return {
+            queue: {
+                'in_flight': executor.in_flight,
+                'concurrency': executor.concurrency,
+                'processed_total': executor.processed_total,
+            }
+            for queue, executor in self._executors.items()
+        }
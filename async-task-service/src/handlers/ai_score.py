@@ -23,10 +23,11 @@ async def handler_ai_score(payload: Dict[str, Any]) -> None:
         "resumeData": {...},
         "jobData": {...},
         "questionResponses": [...],
-        "createdAt": "2025-01-12T18:26:52.877Z"
+        "createdAt": "2025-01-12T18:26:52.877Z",
+        "rescore": false
     }
     """
-    logger.info(f"📝 Processando score de candidato: {payload.get('applicationId', 'unknown')}")
+    logger.info("📝 Processando score de candidato: %s", payload.get('applicationId', 'unknown'), event="ai_score")
 
     try:
         # Extrai dados do payload
@@ -35,6 +36,7 @@ async def handler_ai_score(payload: Dict[str, Any]) -> None:
         job_data = payload.get("jobData")
         question_responses = payload.get("questionResponses")
         created_at = payload.get("createdAt")
+        rescore = bool(payload.get("rescore", False))
 
         if not application_id:
             raise ValueError("applicationId é obrigatório")
@@ -45,10 +47,10 @@ async def handler_ai_score(payload: Dict[str, Any]) -> None:
         if not job_data:
             raise ValueError("jobData é obrigatório")
 
-        logger.info(f"🆔 Application ID: {application_id}")
-        logger.info(f"📄 Resume Data: {bool(resume_data)}")
-        logger.info(f"💼 Job Data: {bool(job_data)}")
-        logger.info(f"❓ Question Responses: {bool(question_responses)}")
+        logger.debug(
+            "🆔 Application ID: %s - resume data: %s, job data: %s, question responses: %s",
+            application_id, bool(resume_data), bool(job_data), bool(question_responses)
+        )
 
         # Cria mensagem de score
         score_message = AIScoreMessage(
@@ -56,16 +58,19 @@ async def handler_ai_score(payload: Dict[str, Any]) -> None:
             resume_data=resume_data,
             job_data=job_data,
             question_responses=question_responses,
-            created_at=created_at
+            created_at=created_at,
+            rescore=rescore
         )
 
         # Processa o score
         result = await _process_candidate_score(score_message, "ai-score-handler")
 
         if result.success:
-            logger.info(f"✅ Score processado com sucesso para aplicação: {application_id}")
-            logger.info(f"📊 Tempo de processamento: {result.processing_time:.2f} segundos")
-            logger.info(f"📈 Scores calculados: {result.result_data}")
+            logger.info(
+                "✅ Score processado com sucesso para aplicação: %s (%.2f segundos)",
+                application_id, result.processing_time, event="ai_score"
+            )
+            logger.debug("📈 Scores calculados: %s", result.result_data)
         else:
             logger.error(f"❌ Falha no processamento do score: {result.error}")
             raise Exception(f"Erro no processamento: {result.error}")
@@ -111,7 +116,8 @@ async def _process_candidate_score(
             application_id=score_message.application_id,
             resume_data=score_message.resume_data,
             job_data=score_message.job_data,
-            question_responses=score_message.question_responses
+            question_responses=score_message.question_responses,
+            bypass_cache=score_message.rescore
         )
 
         # Log após receber resposta da IA
@@ -2,14 +2,16 @@
 Handler para processar mensagens de question responses usando IA
 """
 import json
-import asyncio
 import os
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+import httpx
+
 from config.settings import settings
 from models.message import QuestionResponsesMessage
 from services.backend_service import BackendService
+from services.http_client import http_clients, ai_usage_headers, AI_SERVICE
 from utils.logger import ConsumerLogger
 
 logger = ConsumerLogger()
@@ -115,7 +117,9 @@ async def handler_question_responses(payload: Dict[str, Any]) -> None:
         # Chamar o endpoint do AI service para avaliar as respostas
         evaluation_result = await _call_ai_service_for_evaluation(
             question_responses_for_ai,
-            job_data_for_ai
+            job_data_for_ai,
+            job_id=job_id,
+            company_id=company_id
         )
 
         if not evaluation_result:
@@ -167,7 +171,9 @@ async def handler_question_responses(payload: Dict[str, Any]) -> None:
 
 async def _call_ai_service_for_evaluation(
     question_responses: List[Dict[str, str]],
-    job_data: Dict[str, Any]
+    job_data: Dict[str, Any],
+    job_id: Optional[str] = None,
+    company_id: Optional[str] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Chama o endpoint do AI service para avaliar as question responses
@@ -175,12 +181,12 @@ async def _call_ai_service_for_evaluation(
     Args:
         question_responses: Lista de perguntas e respostas
         job_data: Dados da vaga
+        job_id: ID da vaga (contabilização de tokens no AI service)
+        company_id: ID da empresa (contabilização de tokens no AI service)
 
     Returns:
         Resultado da avaliação do AI service
     """
-    import aiohttp
-
     try:
         # URL do AI service
         ai_service_url = f"{settings.ai_service.url.rstrip('/')}/question-responses/evaluate"
@@ -193,23 +199,20 @@ async def _call_ai_service_for_evaluation(
 
         logger.info(f"📤 Enviando requisição para AI service: {ai_service_url}")
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                ai_service_url,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=aiohttp.ClientTimeout(total=120)  # 2 minutos timeout
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    logger.info(f"✅ Avaliação recebida do AI service com sucesso")
-                    return result
-                else:
-                    error_text = await response.text()
-                    logger.error(f"❌ Erro do AI service - Status: {response.status}, Erro: {error_text}")
-                    return None
-
-    except asyncio.TimeoutError:
+        # Usa o cliente compartilhado do AI service (pool de conexões + timeout configurado)
+        response = await http_clients.request(
+            AI_SERVICE, 'POST', ai_service_url, json=payload,
+            headers=ai_usage_headers(job_id=job_id, company_id=company_id)
+        )
+        if response.status_code == 200:
+            result = response.json()
+            logger.info(f"✅ Avaliação recebida do AI service com sucesso")
+            return result
+        else:
+            logger.error(f"❌ Erro do AI service - Status: {response.status_code}, Erro: {response.text}")
+            return None
+
+    except httpx.TimeoutException:
         logger.error("⏰ Timeout ao chamar AI service")
         return None
     except Exception as e:
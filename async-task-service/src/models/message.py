@@ -33,6 +33,7 @@ class AIScoreMessage:
     job_data: Dict[str, Any]
     question_responses: Optional[List[Dict[str, str]]] = None
     created_at: Optional[str] = None
+    rescore: bool = False  # Ignora notas em cache no ai-service
 
 
 @dataclass
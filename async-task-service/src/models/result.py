@@ -53,3 +53,6 @@ class DownloadResult:
     content_type: Optional[str] = None
     error: Optional[str] = None
     download_time: Optional[float] = None
+    sha256: Optional[str] = None
+    etag: Optional[str] = None
+    not_modified: bool = False
@@ -0,0 +1,194 @@
+"""
+Promoção das retentativas agendadas (`<fila>:retry`, ZSET) de volta às filas
+
+Um único promoter por processo (ou por cluster, com eleição de líder via
+SET NX PX) move de forma atômica, com um script Lua executado no servidor,
+todos os itens vencidos em lotes grandes. Como ZRANGEBYSCORE, LPUSH/XADD e
+ZREM acontecem no mesmo script, dois promoters nunca duplicam um item.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import redis.asyncio as redis
+
+# KEYS[1] = ZSET de retry, KEYS[2] = fila de destino
+# ARGV[1] = agora (epoch s), ARGV[2] = tamanho do lote, ARGV[3] = 'list' | 'stream'
+# (sem MAXLEN no XADD: aparar aqui poderia descartar entradas ainda não processadas)
+# Retorna {itens movidos, score (horário previsto) do item mais antigo movido}
+PROMOTE_DUE_SCRIPT = """
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, tonumber(ARGV[2]))
+local moved = 0
+local oldest = ''
+for i = 1, #items, 2 do
+  local item = items[i]
+  if oldest == '' then oldest = items[i + 1] end
+  if ARGV[3] == 'stream' then
+    redis.call('XADD', KEYS[2], '*', 'data', item)
+  else
+    redis.call('LPUSH', KEYS[2], item)
+  end
+  redis.call('ZREM', KEYS[1], item)
+  moved = moved + 1
+end
+return {moved, oldest}
+"""
+
+# Renova o lock apenas se ele ainda pertence a este processo
+RENEW_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+LEADER_LOCK_KEY = "async-task-service:retry-scheduler:leader"
+
+
+def get_retry_key(queue_name: str) -> str:
+    return f"{queue_name}:retry"
+
+
+def compute_retry_delay(retry_count: int, base_delay: float, max_delay: float) -> float:
+    """
+    Backoff exponencial com jitter (equal jitter)
+
+    Metade do atraso é fixa e a outra metade aleatória, evitando que mensagens
+    que falharam juntas (ex: AI Service fora do ar) voltem todas no mesmo instante.
+    """
+    delay = min(max_delay, base_delay * (2 ** (retry_count - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class RetryScheduler:
+    """Promoter de retentativas vencidas para todas as filas do consumer"""
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        queues: List[str],
+        stream_queues: Optional[List[str]] = None,
+        interval_seconds: float = 0.5,
+        batch_size: int = 500,
+        leader_election: bool = False,
+        leader_ttl_ms: int = 10000,
+    ) -> None:
+        self._client = client
+        self._queues = queues
+        self._stream_queues = set(stream_queues or [])
+        self._interval = interval_seconds
+        self._batch_size = batch_size
+        self._leader_election = leader_election
+        self._leader_ttl_ms = leader_ttl_ms
+        self._token = uuid.uuid4().hex
+        self._promote = client.register_script(PROMOTE_DUE_SCRIPT)
+        self._renew = client.register_script(RENEW_LOCK_SCRIPT)
+        self._stop = asyncio.Event()
+        self._logger = logging.getLogger("consumer.retry-scheduler")
+
+        self.is_leader = not leader_election
+        self.promoted_total: Dict[str, int] = {queue: 0 for queue in queues}
+        self.last_lag_seconds: Dict[str, float] = {queue: 0.0 for queue in queues}
+        self.max_lag_seconds: Dict[str, float] = {queue: 0.0 for queue in queues}
+        self.last_run_at: Optional[float] = None
+
+    async def run(self) -> None:
+        """Loop do promoter; termina quando stop() é chamado"""
+        self._logger.info(
+            f"Retry scheduler iniciado (intervalo={self._interval}s, lote={self._batch_size}, "
+            f"eleição de líder={'sim' if self._leader_election else 'não'})"
+        )
+        while not self._stop.is_set():
+            try:
+                if await self._acquire_leadership():
+                    for queue in self._queues:
+                        await self.promote_due(queue)
+                    self.last_run_at = time.time()
+            except redis.ConnectionError as exc:
+                self._logger.error(f"Erro de conexão com Redis no retry scheduler: {exc}")
+            except Exception as exc:  # noqa: BLE001
+                self._logger.exception(f"Erro inesperado no retry scheduler: {exc}")
+
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+
+        await self._release_leadership()
+        self._logger.info("Retry scheduler encerrado.")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def promote_due(self, queue: str) -> int:
+        """Move todos os itens vencidos da fila, em lotes, e retorna quantos foram movidos"""
+        mode = "stream" if queue in self._stream_queues else "list"
+        total = 0
+        while True:
+            now = time.time()
+            moved, oldest = await self._promote(
+                keys=[get_retry_key(queue), queue],
+                args=[now, self._batch_size, mode],
+            )
+            moved = int(moved)
+            if moved == 0:
+                break
+            total += moved
+            lag = max(0.0, now - float(oldest))
+            self.last_lag_seconds[queue] = lag
+            self.max_lag_seconds[queue] = max(self.max_lag_seconds[queue], lag)
+            if moved < self._batch_size:
+                break
+
+        if total:
+            self.promoted_total[queue] += total
+            self._logger.info(f"{total} retentativas promovidas para a fila '{queue}'")
+        return total
+
+    async def _acquire_leadership(self) -> bool:
+        if not self._leader_election:
+            return True
+        if self.is_leader:
+            self.is_leader = bool(await self._renew(keys=[LEADER_LOCK_KEY], args=[self._token, self._leader_ttl_ms]))
+        if not self.is_leader:
+            self.is_leader = bool(
+                await self._client.set(LEADER_LOCK_KEY, self._token, nx=True, px=self._leader_ttl_ms)
+            )
+            if self.is_leader:
+                self._logger.info("Este processo assumiu a promoção de retentativas (líder)")
+        return self.is_leader
+
+    async def _release_leadership(self) -> None:
+        if not (self._leader_election and self.is_leader):
+            return
+        try:
+            # TTL mínimo libera o lock rapidamente para outra réplica
+            await self._renew(keys=[LEADER_LOCK_KEY], args=[self._token, 1])
+        except Exception:  # noqa: BLE001
+            pass
+        self.is_leader = False
+
+    async def get_metrics(self) -> Dict[str, Any]:
+        """Profundidade dos ZSETs de retry e atraso de promoção por fila"""
+        now = time.time()
+        queues: Dict[str, Any] = {}
+        for queue in self._queues:
+            retry_key = get_retry_key(queue)
+            depth = await self._client.zcard(retry_key)
+            overdue = await self._client.zcount(retry_key, "-inf", now)
+            queues[queue] = {
+                'retry_depth': depth,
+                'retry_overdue': overdue,
+                'promoted_total': self.promoted_total[queue],
+                'last_promotion_lag_seconds': round(self.last_lag_seconds[queue], 3),
+                'max_promotion_lag_seconds': round(self.max_lag_seconds[queue], 3),
+            }
+        return {
+            'is_leader': self.is_leader,
+            'last_run_at': self.last_run_at,
+            'queues': queues,
+        }
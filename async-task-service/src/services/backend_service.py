@@ -2,17 +2,23 @@
 Serviço para comunicação com o backend
 """
 
-import requests
 from typing import Dict, Any, Optional
-from datetime import datetime
+
+import httpx
 
 from config.settings import settings
 from models.result import BackendResult
+from services.http_client import http_clients, ai_usage_headers, AI_SERVICE, BACKEND, COMPANIES_BACKEND
 from utils.logger import logger
 
 
 class BackendService:
-    """Serviço para comunicação com o backend"""
+    """
+    Serviço para comunicação com o backend
+
+    As requisições usam os clientes HTTP assíncronos compartilhados do processo
+    (services.http_client), com pool de conexões e timeouts por upstream.
+    """
 
     def __init__(self):
         self.base_url = settings.backend.url
@@ -42,13 +48,11 @@ class BackendService:
             )
 
             # Faz a requisição POST
-            response = requests.post(
+            response = await http_clients.request(
+                COMPANIES_BACKEND,
+                'POST',
                 url,
-                json=resume_data,
-                headers={
-                    'Content-Type': 'application/json',
-                },
-                timeout=self.companies_backend_timeout
+                json=resume_data
             )
 
             # Log do resultado
@@ -67,7 +71,7 @@ class BackendService:
                     error=response.text
                 )
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(
                 f"❌ Erro de conexão com o backend - URL: {url}, Erro: {str(e)}"
             )
@@ -85,7 +89,7 @@ class BackendService:
                 error=f"Erro inesperado: {str(e)}"
             )
 
-    def is_backend_available(self) -> bool:
+    async def is_backend_available(self) -> bool:
         """
         Verifica se o backend está disponível
 
@@ -93,7 +97,9 @@ class BackendService:
             True se o backend responde
         """
         try:
-            response = requests.get(
+            response = await http_clients.request(
+                BACKEND,
+                'GET',
                 self.base_url,
                 timeout=5
             )
@@ -102,13 +108,16 @@ class BackendService:
         except Exception:
             return False
 
-    async def parse_resume_from_url(self, url: str, application_id: str) -> BackendResult:
+    async def parse_resume_from_url(
+        self, url: str, application_id: str, job_id: Optional[str] = None
+    ) -> BackendResult:
         """
         Consome o endpoint /resumes/parse-from-url do AI service para processar um currículo a partir de uma URL
 
         Args:
             url: URL do PDF do currículo
             application_id: ID da aplicação
+            job_id: ID da vaga (opcional, usado na contabilização de tokens do AI service)
 
         Returns:
             BackendResult com o resultado da operação
@@ -129,13 +138,12 @@ class BackendService:
             }
 
             # Faz a requisição POST com timeout configurado para AI service
-            response = requests.post(
+            response = await http_clients.request(
+                AI_SERVICE,
+                'POST',
                 endpoint_url,
                 json=request_data,
-                headers={
-                    'Content-Type': 'application/json',
-                },
-                timeout=self.ai_service_timeout
+                headers=ai_usage_headers(job_id=job_id)
             )
 
             # Log do resultado
@@ -155,7 +163,7 @@ class BackendService:
                     error=response.text
                 )
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(
                 f"❌ Erro de conexão com o backend - URL: {endpoint_url}, Erro: {str(e)}"
             )
@@ -178,7 +186,8 @@ class BackendService:
         application_id: str,
         resume_data: Dict[str, Any],
         job_data: Dict[str, Any],
-        question_responses: Optional[list] = None
+        question_responses: Optional[list] = None,
+        bypass_cache: bool = False
     ) -> Optional[Dict[str, Any]]:
         """
         Avalia um candidato usando IA
@@ -188,6 +197,7 @@ class BackendService:
             resume_data: Dados do currículo
             job_data: Dados da vaga
             question_responses: Respostas das perguntas (opcional)
+            bypass_cache: Força nova avaliação no ai-service, ignorando notas em cache
 
         Returns:
             Dados da avaliação ou None se falhou
@@ -201,16 +211,14 @@ class BackendService:
                 f"Application ID: {application_id}"
             )
 
-            # Log dos dados que estão sendo enviados para debug
-            logger.info(f"📋 Resume data keys: {list(resume_data.keys()) if resume_data else 'None'}")
-            logger.info(f"💼 Job data keys: {list(job_data.keys()) if job_data else 'None'}")
-            logger.info(f"❓ Question responses: {len(question_responses) if question_responses else 0}")
-
-            # Log detalhado dos dados para debug do erro 422
-            logger.info(f"🔍 Resume data completo: {resume_data}")
-            logger.info(f"🔍 Job data completo: {job_data}")
+            # Dados completos só com DEBUG: formatar currículo e vaga a cada mensagem custa caro
+            logger.debug("📋 Resume data keys: %s", list(resume_data.keys()) if resume_data else None)
+            logger.debug("💼 Job data keys: %s", list(job_data.keys()) if job_data else None)
+            logger.debug("❓ Question responses: %d", len(question_responses) if question_responses else 0)
+            logger.debug("🔍 Resume data completo: %s", resume_data)
+            logger.debug("🔍 Job data completo: %s", job_data)
             if question_responses:
-                logger.info(f"🔍 Question responses: {question_responses}")
+                logger.debug("🔍 Question responses: %s", question_responses)
 
             # Valida se os dados obrigatórios estão presentes
             if not resume_data:
@@ -233,7 +241,8 @@ class BackendService:
             # Prepara os dados da requisição no formato esperado pelo ai-service
             request_data = {
                 'resume': converted_resume_data,
-                'job': converted_job_data
+                'job': converted_job_data,
+                'bypass_cache': bypass_cache
             }
 
             # Adiciona respostas das perguntas se existirem
@@ -241,13 +250,12 @@ class BackendService:
                 request_data['question_responses'] = question_responses
 
             # Faz a requisição POST com timeout configurado para processamento de IA
-            response = requests.post(
+            response = await http_clients.request(
+                AI_SERVICE,
+                'POST',
                 endpoint_url,
                 json=request_data,
-                headers={
-                    'Content-Type': 'application/json',
-                },
-                timeout=self.ai_service_timeout
+                headers=ai_usage_headers(job_id=job_data.get('id'), company_id=job_data.get('companyId'))
             )
 
             # Log do resultado
@@ -270,7 +278,7 @@ class BackendService:
                     logger.error(f"🔍 Resposta não é JSON válido: {response.text}")
                 return None
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(
                 f"❌ Erro de conexão na avaliação de candidato - URL: {endpoint_url}, Erro: {str(e)}"
             )
@@ -353,13 +361,11 @@ class BackendService:
             logger.info(f"🔧 Configurações de avaliação - Provider: {provider}, Model: {model}")
 
             # Faz a requisição PATCH
-            response = requests.patch(
+            response = await http_clients.request(
+                COMPANIES_BACKEND,
+                'PATCH',
                 endpoint_url,
-                json=request_data,
-                headers={
-                    'Content-Type': 'application/json',
-                },
-                timeout=self.companies_backend_timeout
+                json=request_data
             )
 
             # Log do resultado
@@ -383,7 +389,7 @@ class BackendService:
                     'error': response.text
                 }
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(
                 f"❌ Erro de conexão na atualização de scores - URL: {endpoint_url}, Erro: {str(e)}"
             )
@@ -401,16 +407,17 @@ class BackendService:
                 'error': f"Erro inesperado: {str(e)}"
             }
 
-    def get_backend_info(self) -> Dict[str, Any]:
-        """Retorna informações sobre o backend"""
+    async def get_backend_info(self) -> Dict[str, Any]:
+        """Retorna informações sobre o backend e os pools de conexão"""
         return {
             'base_url': self.base_url,
             'timeout': self.timeout,
-            'available': self.is_backend_available(),
+            'available': await self.is_backend_available(),
             'ai_service_url': self.ai_service_url,
             'ai_service_timeout': self.ai_service_timeout,
             'companies_backend_url': self.companies_backend_url,
-            'companies_backend_timeout': self.companies_backend_timeout
+            'companies_backend_timeout': self.companies_backend_timeout,
+            'http_pools': http_clients.get_pool_metrics()
         }
 
     def _convert_resume_for_ai_service(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -2,79 +2,124 @@
 Serviço para download e gerenciamento de arquivos
 """
 
+import hashlib
 import os
 import tempfile
 from datetime import datetime
+from typing import Optional
 
-import requests
+import httpx
 
 from config.settings import settings
 from models.result import DownloadResult
+from services.http_client import STORAGE, http_clients
 from utils.logger import logger
 
 
 class FileService:
     """Serviço para operações com arquivos"""
 
+    # A especificação permite até 1024 bytes de lixo antes do cabeçalho %PDF
+    PDF_SNIFF_BYTES = 1024
+
     def __init__(self):
         self.download_timeout = settings.processing.download_timeout
         self.temp_file_suffix = settings.processing.temp_file_suffix
+        self.max_bytes = settings.processing.download_max_bytes
+        self.chunk_size = settings.processing.download_chunk_size
 
-    def download_pdf(self, url: str) -> DownloadResult:
+    async def download_pdf(self, url: str, etag: Optional[str] = None) -> DownloadResult:
         """
-        Faz download de um PDF de uma URL
+        Faz download de um PDF de uma URL em streaming, direto para um arquivo temporário
+
+        O tamanho máximo e a assinatura %PDF são verificados durante o download,
+        sem carregar o arquivo inteiro em memória.
 
         Args:
             url: URL ou path do PDF para download
+            etag: ETag da última versão conhecida (requisição condicional);
+                se o storage responder 304, o resultado vem com not_modified=True
 
         Returns:
             DownloadResult com o resultado da operação
         """
         start_time = datetime.now()
+        full_url = url
+        temp_file = None
 
         try:
             # Monta a URL completa se necessário
             full_url = self.build_full_url(url)
             logger.log_download_start(full_url)
 
-            # Faz a requisição HTTP
-            response = requests.get(full_url, timeout=self.download_timeout)
-            response.raise_for_status()
-
-            # Verifica se o conteúdo é um PDF
-            content_type = response.headers.get('content-type', '').lower()
-            if 'pdf' not in content_type and not full_url.lower().endswith('.pdf'):
-                logger.warning(
-                    f"⚠️ Content-Type não é PDF - Content-Type: {content_type}, URL: {full_url}"
+            client = http_clients.get_client(STORAGE)
+            headers = {'If-None-Match': etag} if etag else {}
+            async with client.stream('GET', full_url, headers=headers) as response:
+                if response.status_code == 304:
+                    logger.info(f"♻️ PDF não modificado desde o último download - URL: {full_url}")
+                    return DownloadResult(
+                        success=True,
+                        etag=etag,
+                        not_modified=True,
+                        download_time=(datetime.now() - start_time).total_seconds()
+                    )
+                response.raise_for_status()
+
+                content_length = response.headers.get('content-length')
+                if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+                    raise ValueError(f"PDF excede o tamanho máximo de {self.max_bytes} bytes")
+
+                # Verifica se o conteúdo é um PDF
+                content_type = response.headers.get('content-type', '').lower()
+                if 'pdf' not in content_type and not full_url.lower().split('?')[0].endswith('.pdf'):
+                    logger.warning(
+                        f"⚠️ Content-Type não é PDF - Content-Type: {content_type}, URL: {full_url}"
+                    )
+
+                # Cria arquivo temporário e grava os chunks conforme chegam
+                temp_file = tempfile.NamedTemporaryFile(
+                    delete=False,
+                    suffix=self.temp_file_suffix
+                )
+                digest = hashlib.sha256()
+                file_size = 0
+                head = b''
+                async for chunk in response.aiter_bytes(self.chunk_size):
+                    file_size += len(chunk)
+                    if file_size > self.max_bytes:
+                        raise ValueError(f"PDF excede o tamanho máximo de {self.max_bytes} bytes")
+                    if len(head) < self.PDF_SNIFF_BYTES:
+                        head += chunk[:self.PDF_SNIFF_BYTES - len(head)]
+                        if len(head) >= self.PDF_SNIFF_BYTES and b'%PDF' not in head:
+                            raise ValueError("Arquivo não é um PDF válido")
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                temp_file.close()
+
+                if b'%PDF' not in head:
+                    raise ValueError("Arquivo não é um PDF válido")
+
+                # Calcula tempo de download
+                download_time = (datetime.now() - start_time).total_seconds()
+
+                logger.log_download_success(temp_file.name, file_size)
+                if download_time > 0:
+                    logger.info(f"📈 Throughput do download: {file_size / download_time / 1024:.0f} KiB/s")
+
+                return DownloadResult(
+                    success=True,
+                    file_path=temp_file.name,
+                    file_size=file_size,
+                    content_type=content_type,
+                    download_time=download_time,
+                    sha256=digest.hexdigest(),
+                    etag=response.headers.get('etag')
                 )
 
-            # Cria arquivo temporário
-            temp_file = tempfile.NamedTemporaryFile(
-                delete=False,
-                suffix=self.temp_file_suffix
-            )
-            temp_file.write(response.content)
-            temp_file.close()
-
-            # Calcula tempo de download
-            download_time = (datetime.now() - start_time).total_seconds()
-
-            # Obtém tamanho do arquivo
-            file_size = len(response.content)
-
-            logger.log_download_success(temp_file.name, file_size)
-
-            return DownloadResult(
-                success=True,
-                file_path=temp_file.name,
-                file_size=file_size,
-                content_type=content_type,
-                download_time=download_time
-            )
-
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             download_time = (datetime.now() - start_time).total_seconds()
             logger.log_download_error(full_url, str(e))
+            self._discard_temp_file(temp_file)
 
             return DownloadResult(
                 success=False,
@@ -85,6 +130,7 @@ class FileService:
         except Exception as e:
             download_time = (datetime.now() - start_time).total_seconds()
             logger.log_download_error(full_url, str(e))
+            self._discard_temp_file(temp_file)
 
             return DownloadResult(
                 success=False,
@@ -92,6 +138,13 @@ class FileService:
                 download_time=download_time
             )
 
+    def _discard_temp_file(self, temp_file) -> None:
+        """Remove o arquivo temporário de um download interrompido"""
+        if temp_file is None:
+            return
+        temp_file.close()
+        self.cleanup_temp_file(temp_file.name)
+
     def cleanup_temp_file(self, file_path: str) -> bool:
         """
         Remove arquivo temporário
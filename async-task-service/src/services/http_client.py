@@ -0,0 +1,226 @@
+"""
+Clientes HTTP assíncronos compartilhados, com pool de conexões por upstream
+"""
+
+import importlib.util
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from config.settings import settings
+from utils.logger import logger
+from utils.metrics import metrics, normalize_endpoint
+from utils.tracing import inject_context, set_span_error, start_span
+
+# Nomes dos upstreams conhecidos
+COMPANIES_BACKEND = "companies_backend"
+AI_SERVICE = "ai_service"
+BACKEND = "backend"
+STORAGE = "storage"
+
+
+def ai_usage_headers(job_id: Optional[str] = None, company_id: Optional[str] = None) -> Dict[str, str]:
+    """Headers com os ids usados pelo ai-service para contabilizar tokens e custo por vaga e empresa"""
+    headers = {}
+    if job_id:
+        headers['X-Job-Id'] = str(job_id)
+    if company_id:
+        headers['X-Company-Id'] = str(company_id)
+    return headers
+
+
+class _UpstreamStats:
+    """Contadores de uso de um upstream, usados para dimensionar os pools"""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests_total = 0
+        self.errors_total = 0
+        self.total_latency = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        completed = self.requests_total - self.in_flight
+        return {
+            'in_flight': self.in_flight,
+            'max_in_flight': self.max_in_flight,
+            'requests_total': self.requests_total,
+            'errors_total': self.errors_total,
+            'avg_latency_seconds': self.total_latency / completed if completed > 0 else 0.0,
+        }
+
+
+class HTTPClientPool:
+    """
+    Mantém um httpx.AsyncClient de longa duração por upstream.
+
+    Cada upstream tem seu próprio pool de conexões (keep-alive, HTTP/2 quando
+    disponível) e seus próprios timeouts, de modo que uma chamada lenta ao AI
+    service não consome conexões destinadas ao companies-backend.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, _UpstreamStats] = {}
+        self._http2 = settings.http_client.http2 and importlib.util.find_spec("h2") is not None
+
+    def _upstream_config(self, upstream: str) -> Dict[str, Any]:
+        """Retorna URL base, timeout e limites de pool de um upstream"""
+        if upstream == COMPANIES_BACKEND:
+            cfg = settings.companies_backend
+            return {
+                'base_url': cfg.url,
+                'timeout': cfg.timeout,
+                'max_connections': cfg.max_connections,
+                'max_keepalive_connections': cfg.max_keepalive_connections,
+            }
+        if upstream == AI_SERVICE:
+            cfg = settings.ai_service
+            return {
+                'base_url': cfg.url,
+                'timeout': cfg.timeout,
+                'max_connections': cfg.max_connections,
+                'max_keepalive_connections': cfg.max_keepalive_connections,
+            }
+        if upstream == BACKEND:
+            return {
+                'base_url': settings.backend.url,
+                'timeout': settings.backend.timeout,
+                'max_connections': 20,
+                'max_keepalive_connections': 10,
+            }
+        if upstream == STORAGE:
+            return {
+                'base_url': settings.storage.url,
+                'timeout': settings.processing.download_timeout,
+                'max_connections': 20,
+                'max_keepalive_connections': 10,
+            }
+        raise ValueError(f"Upstream desconhecido: {upstream}")
+
+    def get_client(self, upstream: str) -> httpx.AsyncClient:
+        """Retorna (criando sob demanda) o cliente compartilhado do upstream"""
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed:
+            cfg = self._upstream_config(upstream)
+            client = httpx.AsyncClient(
+                http2=self._http2,
+                timeout=httpx.Timeout(
+                    cfg['timeout'],
+                    connect=settings.http_client.connect_timeout
+                ),
+                limits=httpx.Limits(
+                    max_connections=cfg['max_connections'],
+                    max_keepalive_connections=cfg['max_keepalive_connections'],
+                    keepalive_expiry=settings.http_client.keepalive_expiry
+                ),
+                headers={'Content-Type': 'application/json'},
+            )
+            self._clients[upstream] = client
+            self._stats.setdefault(upstream, _UpstreamStats())
+            logger.info(
+                f"🔌 Cliente HTTP criado - upstream: {upstream}, "
+                f"max_connections: {cfg['max_connections']}, http2: {self._http2}"
+            )
+        return client
+
+    async def request(
+        self,
+        upstream: str,
+        method: str,
+        url: str,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Executa uma requisição usando o cliente compartilhado do upstream
+
+        Args:
+            upstream: Nome do upstream (companies_backend, ai_service, backend, storage)
+            method: Método HTTP
+            url: URL completa do endpoint
+            **kwargs: Parâmetros repassados ao httpx (json, headers, timeout...)
+
+        Returns:
+            httpx.Response
+
+        Raises:
+            httpx.HTTPError: Em erros de transporte/timeout
+
+        Com tracing ativo, cada chamada gera um span e o `traceparent` vai nos headers,
+        ligando o processamento no AI service / companies-backend ao trace da mensagem.
+        """
+        client = self.get_client(upstream)
+        stats = self._stats[upstream]
+        stats.in_flight += 1
+        stats.requests_total += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        endpoint = normalize_endpoint(url)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            with start_span(
+                f"{method.upper()} {endpoint}",
+                {"http.method": method.upper(), "http.url": url, "peer.service": upstream},
+                kind="client",
+            ) as span:
+                kwargs["headers"] = inject_context(dict(kwargs.get("headers") or {}))
+                response = await client.request(method, url, **kwargs)
+                status = str(response.status_code)
+                if span is not None:
+                    span.set_attribute("http.status_code", response.status_code)
+                    if response.status_code >= 500:
+                        set_span_error(span, f"HTTP {response.status_code}")
+            return response
+        except httpx.HTTPError:
+            stats.errors_total += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.in_flight -= 1
+            stats.total_latency += elapsed
+            metrics.observe(
+                "async_task_upstream_request_duration_seconds", elapsed,
+                upstream=upstream, method=method.upper(), endpoint=endpoint, status=status,
+            )
+
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna métricas dos pools de conexão de cada upstream
+
+        Contadas pelo próprio request() (sem depender de internals do httpx/httpcore):
+        com HTTP/1.1, as requisições em andamento além de max_connections estão
+        aguardando uma conexão livre.
+
+        Returns:
+            Dict por upstream com limites do pool, requisições aguardando
+            conexão livre e contadores de uso
+        """
+        metrics: Dict[str, Any] = {}
+        for upstream, client in self._clients.items():
+            cfg = self._upstream_config(upstream)
+            stats = self._stats[upstream]
+            metrics[upstream] = {
+                'base_url': cfg['base_url'],
+                'max_connections': cfg['max_connections'],
+                'max_keepalive_connections': cfg['max_keepalive_connections'],
+                'http2': self._http2,
+                'closed': client.is_closed,
+                'pending_requests': 0 if self._http2 else max(0, stats.in_flight - cfg['max_connections']),
+                **stats.as_dict(),
+            }
+        return metrics
+
+    async def aclose(self) -> None:
+        """Fecha todos os clientes (chamado no encerramento do consumer)"""
+        for upstream, client in list(self._clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"⚠️ Erro ao fechar cliente HTTP {upstream}: {e}")
+        self._clients.clear()
+
+
+# Instância global compartilhada por todos os workers do processo
+http_clients = HTTPClientPool()
+
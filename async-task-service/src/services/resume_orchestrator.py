@@ -52,7 +52,8 @@ class ResumeOrchestrator:
             # Usa o BackendService para processar o currículo via URL
             backend_result = await self.backend_service.parse_resume_from_url(
                 url=full_url,
-                application_id=application_id
+                application_id=application_id,
+                job_id=job_id
             )
 
             processing_time = (datetime.now() - start_time).total_seconds()
@@ -7,7 +7,9 @@ import redis.asyncio as redis
 from typing import Dict, Any, Optional
 
 from config.settings import settings
+from streams import publish_to_stream
 from utils.logger import logger
+from utils.tracing import inject_message_context
 
 
 class ScoreQueueService:
@@ -83,6 +85,8 @@ class ScoreQueueService:
 
             # Envia a mensagem para a fila Redis usando lpush
             queue_name = settings.ai_score_redis.stream_name
+            # Contexto de trace em _meta.trace: o processamento da fila de scores continua o mesmo trace
+            inject_message_context(message_body)
             message_json = json.dumps(message_body)
 
             # Gera um ID único para a mensagem
@@ -92,8 +96,11 @@ class ScoreQueueService:
             # Adiciona o message_id ao corpo da mensagem
             message_body['messageId'] = message_id
 
-            # Envia para a fila Redis
-            await self.redis_client.lpush(queue_name, message_json)
+            # Envia para a fila Redis (XADD se a fila estiver em modo stream)
+            if queue_name in settings.redis.stream_queues:
+                await publish_to_stream(self.redis_client, queue_name, message_json)
+            else:
+                await self.redis_client.lpush(queue_name, message_json)
 
             logger.info(
                 "✅ Mensagem de score enviada para a fila",
@@ -0,0 +1,143 @@
+"""
+Leitura de filas em modo Redis Streams (consumer group)
+
+Diferente do modo lista (BLPOP), a mensagem só sai do stream após o XACK:
+se o processo morrer no meio do handler, a entrada fica pendente (PEL) e é
+reivindicada por outro consumer via XAUTOCLAIM depois de `claim_idle_ms`.
+Produtores publicam com XADD usando o campo `data` (JSON da mensagem), sem
+MAXLEN: quem apara os streams é o consumer, e só o que todos os groups já
+confirmaram.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+import redis.asyncio as redis
+
+STREAM_DATA_FIELD = "data"
+
+# (fila, id da entrada, conteúdo JSON)
+StreamEntry = Tuple[str, str, str]
+
+
+async def publish_to_stream(client: redis.Redis, queue_name: str, value: str) -> str:
+    """Publica uma mensagem no stream (XADD)"""
+    return await client.xadd(queue_name, {STREAM_DATA_FIELD: value})
+
+
+class StreamQueueReader:
+    """Lê, confirma, reivindica e apara as filas configuradas em modo stream"""
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        queues: List[str],
+        group_name: str,
+        consumer_name: str,
+        block_ms: int = 5000,
+        count: int = 10,
+        claim_idle_ms: int = 300000,
+    ) -> None:
+        self._client = client
+        self.queues = queues
+        self.group_name = group_name
+        self.consumer_name = consumer_name
+        self.block_ms = block_ms
+        self.count = count
+        self.claim_idle_ms = claim_idle_ms
+        self._claim_cursors = {queue: "0-0" for queue in queues}
+        self._logger = logging.getLogger("consumer.streams")
+
+    async def ensure_groups(self) -> None:
+        """Cria os consumer groups (e os streams) que ainda não existem"""
+        for queue in self.queues:
+            try:
+                await self._client.xgroup_create(queue, self.group_name, id="0", mkstream=True)
+                self._logger.info(f"Consumer group '{self.group_name}' criado no stream '{queue}'")
+            except redis.ResponseError as exc:
+                if "BUSYGROUP" not in str(exc):
+                    raise
+
+    async def read(self, queues: List[str], count: int) -> List[StreamEntry]:
+        """Lê até `count` entradas novas por stream (XREADGROUP), bloqueando até block_ms"""
+        if not queues or count <= 0:
+            return []
+        response = await self._client.xreadgroup(
+            self.group_name,
+            self.consumer_name,
+            {queue: ">" for queue in queues},
+            count=count,
+            block=self.block_ms,
+        )
+        entries: List[StreamEntry] = []
+        for queue, messages in response or []:
+            entries.extend(await self._to_entries(queue, messages))
+        return entries
+
+    async def claim_stale(self, queue: str, count: int) -> List[StreamEntry]:
+        """Reivindica entradas pendentes há mais de claim_idle_ms (XAUTOCLAIM)"""
+        if count <= 0:
+            return []
+        next_cursor, messages, *_ = await self._client.xautoclaim(
+            queue,
+            self.group_name,
+            self.consumer_name,
+            min_idle_time=self.claim_idle_ms,
+            start_id=self._claim_cursors[queue],
+            count=count,
+        )
+        self._claim_cursors[queue] = next_cursor
+        if messages:
+            self._logger.warning(f"{len(messages)} entradas pendentes reivindicadas no stream '{queue}'")
+        return await self._to_entries(queue, messages)
+
+    async def ack(self, queue: str, message_id: str) -> None:
+        """Confirma o processamento da entrada (XACK), removendo-a da PEL"""
+        await self._client.xack(queue, self.group_name, message_id)
+
+    async def trim(self) -> None:
+        """Remove de cada stream as entradas já confirmadas por todos os groups (XTRIM MINID ~)"""
+        for queue in self.queues:
+            min_id = await self.processed_before(queue)
+            if min_id is not None:
+                await self._client.xtrim(queue, minid=min_id, approximate=True)
+
+    async def processed_before(self, queue: str) -> Optional[str]:
+        """
+        Id abaixo do qual todas as entradas do stream já foram confirmadas
+
+        Para cada group é a entrada pendente mais antiga (XPENDING) ou, sem
+        pendentes, a última entregue (XINFO GROUPS); vale o menor entre os
+        groups. Sem groups não há o que aparar (None).
+        """
+        groups = await self._client.xinfo_groups(queue)
+        if not groups:
+            return None
+        bounds = []
+        for group in groups:
+            if group["pending"]:
+                summary = await self._client.xpending(queue, group["name"])
+                bounds.append(summary["min"])
+            else:
+                bounds.append(group["last-delivered-id"])
+        return min(bounds, key=_parse_stream_id)
+
+    async def _to_entries(self, queue: str, messages: list) -> List[StreamEntry]:
+        entries: List[StreamEntry] = []
+        for message_id, fields in messages:
+            if not fields:
+                # Entrada removida do stream (ex: XDEL), mas ainda na PEL
+                await self._client.xack(queue, self.group_name, message_id)
+                continue
+            value = fields.get(STREAM_DATA_FIELD)
+            if value is None:
+                self._logger.error(f"Entrada {message_id} do stream '{queue}' sem campo '{STREAM_DATA_FIELD}'")
+                await self._client.xack(queue, self.group_name, message_id)
+                continue
+            entries.append((queue, message_id, value))
+        return entries
+
+
+def _parse_stream_id(stream_id: str) -> Tuple[int, int]:
+    milliseconds, _, sequence = stream_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
@@ -3,9 +3,9 @@ Sistema de logging estruturado para o consumer
 """
 
 import logging
-import sys
 
 from config.settings import settings
+from utils.structured_logging import setup_logging
 
 
 class ConsumerLogger:
@@ -16,78 +16,84 @@ class ConsumerLogger:
         self._setup_logger()
 
     def _setup_logger(self):
-        """Configura o logger com formatação e handlers_tmp"""
-        # Remove handlers_tmp existentes para evitar duplicação
-        self.logger.handlers.clear()
-
-        # Define o nível de log
-        log_level = getattr(logging, settings.logging.level.upper(), logging.INFO)
-        self.logger.setLevel(log_level)
-
-        # Handler para console
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(log_level)
-
-        # Formatação
-        formatter = logging.Formatter(settings.logging.format)
-        console_handler.setFormatter(formatter)
-
-        # Adiciona handler
-        self.logger.addHandler(console_handler)
+        """Configura o logger com a fila de logging compartilhada do processo (JSON, não bloqueante)"""
+        setup_logging(
+            level=settings.logging.level,
+            json_output=settings.logging.json,
+            queue_size=settings.logging.queue_size,
+            sampling=settings.logging.sampling,
+            text_format=settings.logging.format,
+            logger=self.logger,
+        )
 
         # Evita propagação para logger raiz
         self.logger.propagate = False
 
-    def info(self, message: str, **kwargs):
-        """Log de informação"""
-        self.logger.info(message, extra=kwargs)
+    def isEnabledFor(self, level: int) -> bool:
+        """Permite pular a montagem de logs caros quando o nível está desligado"""
+        return self.logger.isEnabledFor(level)
+
+    def info(self, message: str, *args, **kwargs):
+        """Log de informação (args formatados só se o registro for emitido)"""
+        self.logger.info(message, *args, extra=kwargs)
 
-    def error(self, message: str, **kwargs):
+    def error(self, message: str, *args, **kwargs):
         """Log de erro"""
-        self.logger.error(message, extra=kwargs)
+        self.logger.error(message, *args, extra=kwargs)
 
-    def warning(self, message: str, **kwargs):
+    def warning(self, message: str, *args, **kwargs):
         """Log de aviso"""
-        self.logger.warning(message, extra=kwargs)
+        self.logger.warning(message, *args, extra=kwargs)
 
-    def debug(self, message: str, **kwargs):
+    def debug(self, message: str, *args, **kwargs):
         """Log de debug"""
-        self.logger.debug(message, extra=kwargs)
+        self.logger.debug(message, *args, extra=kwargs)
 
-    def critical(self, message: str, **kwargs):
+    def critical(self, message: str, *args, **kwargs):
         """Log crítico"""
-        self.logger.critical(message, extra=kwargs)
+        self.logger.critical(message, *args, extra=kwargs)
 
     def log_processing_start(self, application_id: str, message_id: str):
         """Log do início do processamento"""
-        self.info(f"🔄 Iniciando processamento de currículo - Application ID: {application_id}, Message ID: {message_id}")
+        self.info(
+            "🔄 Iniciando processamento de currículo - Application ID: %s, Message ID: %s",
+            application_id, message_id, event="processing"
+        )
 
     def log_processing_success(self, application_id: str, message_id: str, processing_time: float):
         """Log de sucesso no processamento"""
-        self.info(f"✅ Currículo processado com sucesso - Application ID: {application_id}, Message ID: {message_id}, Tempo: {processing_time:.2f}s")
+        self.info(
+            "✅ Currículo processado com sucesso - Application ID: %s, Message ID: %s, Tempo: %.2fs",
+            application_id, message_id, processing_time, event="processing"
+        )
 
     def log_processing_error(self, application_id: str, message_id: str, error: str):
         """Log de erro no processamento"""
-        self.error(f"❌ Erro no processamento de currículo - Application ID: {application_id}, Message ID: {message_id}, Erro: {error}")
+        self.error(
+            "❌ Erro no processamento de currículo - Application ID: %s, Message ID: %s, Erro: %s",
+            application_id, message_id, error, event="processing"
+        )
 
     def log_download_start(self, url: str):
         """Log do início do download"""
-        self.info(f"📥 Iniciando download: {url}")
+        self.info("📥 Iniciando download: %s", url, event="download")
 
     def log_download_success(self, file_path: str, file_size: int):
         """Log de sucesso no download"""
-        self.info(f"✅ Download concluído - Arquivo: {file_path}, Tamanho: {file_size} bytes")
+        self.info("✅ Download concluído - Arquivo: %s, Tamanho: %d bytes", file_path, file_size, event="download")
 
     def log_download_error(self, url: str, error: str):
         """Log de erro no download"""
-        self.error(f"❌ Erro no download - URL: {url}, Erro: {error}")
+        self.error("❌ Erro no download - URL: %s, Erro: %s", url, error, event="download")
 
     def log_backend_communication(self, url: str, status_code: int):
         """Log de comunicação com backend"""
         if status_code in [200, 201]:
-            self.info(f"📤 Dados enviados ao backend com sucesso - URL: {url}, Status: {status_code}")
+            self.info(
+                "📤 Dados enviados ao backend com sucesso - URL: %s, Status: %s", url, status_code, event="backend"
+            )
         else:
-            self.error(f"❌ Erro na comunicação com backend - URL: {url}, Status: {status_code}")
+            self.error("❌ Erro na comunicação com backend - URL: %s, Status: %s", url, status_code, event="backend")
 
 
 # Logger global
@@ -0,0 +1,254 @@
+"""
+Métricas do consumer no formato texto do Prometheus, expostas em GET /metrics
+
+Contadores, gauges e histogramas em memória (mesmo modelo do ai-service, sem
+dependências extras). O servidor HTTP roda no próprio event loop do consumer e
+só responde a /metrics; gauges que refletem estado (ocupação do pool, conexões
+HTTP) são atualizados por coletores chamados a cada scrape.
+"""
+
+import asyncio
+import bisect
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from utils.date_utils import parse_iso_date
+from utils.logger import logger
+
+LabelsKey = Tuple[Tuple[str, str], ...]
+
+# Buckets padrão de latência (segundos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Espera em fila pode chegar a minutos quando há backlog
+QUEUE_WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+class _Histogram:
+    """Contagens acumuladas por bucket, soma e total de uma série"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Contadores, gauges e histogramas em memória, identificados por nome + labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelsKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelsKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelsKey, _Histogram]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    @staticmethod
+    def _labels_key(labels: Dict[str, Any]) -> LabelsKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Registra a descrição (HELP) de uma métrica"""
+        self._help[name] = help_text
+
+    def describe_histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Registra a descrição e os buckets (limites superiores, crescentes) de um histograma"""
+        self._help[name] = help_text
+        self._buckets[name] = tuple(sorted(buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Registra uma função chamada antes de cada render (para atualizar gauges de estado)"""
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]) -> None:
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def inc(self, name: str, amount: float = 1.0, **labels: Any) -> None:
+        """Incrementa um contador"""
+        key = self._labels_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """Define o valor de um gauge"""
+        key = self._labels_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Registra uma observação em um histograma"""
+        key = self._labels_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = _Histogram(self._buckets.get(name, DEFAULT_BUCKETS))
+            series[key].observe(value)
+
+    def get_histogram(self, name: str, **labels: Any) -> Tuple[int, float]:
+        """Total de observações e soma de um histograma ((0, 0) se inexistente)"""
+        key = self._labels_key(labels)
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(key)
+            return (histogram.count, histogram.sum) if histogram else (0, 0.0)
+
+    def get(self, name: str, **labels: Any) -> float:
+        """Valor atual de um contador ou gauge (0 se inexistente)"""
+        key = self._labels_key(labels)
+        with self._lock:
+            for store in (self._counters, self._gauges):
+                if name in store and key in store[name]:
+                    return store[name][key]
+        return 0.0
+
+    def render(self) -> str:
+        """Exporta todas as séries no formato texto do Prometheus"""
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"⚠️ Erro ao coletar métricas: {e}")
+
+        lines = []
+        with self._lock:
+            for metric_type, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(store):
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} {metric_type}")
+                    for labels, value in sorted(store[name].items()):
+                        label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                        series = f"{name}{{{label_text}}}" if label_text else name
+                        lines.append(f"{series} {value:g}")
+            for name in sorted(self._histograms):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                    prefix = f"{label_text}," if label_text else ""
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{prefix}le="{bound:g}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+                    suffix = f"{{{label_text}}}" if label_text else ""
+                    lines.append(f"{name}_sum{suffix} {histogram.sum:g}")
+                    lines.append(f"{name}_count{suffix} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+_ID_SEGMENT = re.compile(r"\d")
+_VERSION_SEGMENT = re.compile(r"^v\d+$")
+
+
+def normalize_endpoint(url: str) -> str:
+    """
+    Path da URL com ids trocados por ':id', para usar como label sem explodir a cardinalidade
+
+    Ex: http://backend/internal/applications/6f1c.../ -> /internal/applications/:id
+    """
+    segments = [
+        ":id" if _ID_SEGMENT.search(segment) and not _VERSION_SEGMENT.match(segment) else segment
+        for segment in urlsplit(url).path.split("/")
+        if segment
+    ]
+    return "/" + "/".join(segments)
+
+
+def message_age_seconds(*messages: Dict[str, Any]) -> Optional[float]:
+    """
+    Tempo desde o enfileiramento, a partir de `timestamp` ou `createdAt` (o primeiro encontrado)
+
+    Datas sem fuso são tratadas como horário local (o ScoreQueueService grava assim).
+    """
+    for message in messages:
+        for field in ("timestamp", "createdAt"):
+            value = message.get(field) if isinstance(message, dict) else None
+            if not isinstance(value, str):
+                continue
+            parsed = parse_iso_date(value)
+            if parsed is None or not hasattr(parsed, "hour"):
+                continue
+            return max(0.0, time.time() - parsed.timestamp())
+    return None
+
+
+class MetricsServer:
+    """Servidor HTTP mínimo (asyncio) que responde GET /metrics com o render do registry"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "0.0.0.0", port: int = 9400) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"📈 Métricas disponíveis em http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            # Descarta os headers da requisição
+            while (await asyncio.wait_for(reader.readline(), timeout=5.0)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, content_type = "200 OK", "text/plain; version=0.0.4; charset=utf-8"
+                body = self.registry.render().encode("utf-8")
+            else:
+                status, content_type, body = "404 Not Found", "text/plain; charset=utf-8", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+# Instância global do processo
+metrics = MetricsRegistry()
+
+metrics.describe_histogram(
+    "async_task_queue_wait_seconds",
+    "Tempo entre o enfileiramento (timestamp/createdAt) e o início do processamento, por fila",
+    buckets=QUEUE_WAIT_BUCKETS,
+)
+metrics.describe_histogram(
+    "async_task_handler_duration_seconds", "Duração do handler por fila e resultado (success/error)"
+)
+metrics.describe_histogram(
+    "async_task_upstream_request_duration_seconds",
+    "Latência das chamadas HTTP por upstream, método, endpoint e status",
+)
+metrics.describe("async_task_messages_total", "Mensagens processadas por fila e resultado (success/retry/dlq)")
+metrics.describe("async_task_retries_total", "Retentativas agendadas por fila")
+metrics.describe("async_task_dlq_total", "Mensagens enviadas à DLQ por fila e motivo")
+metrics.describe("async_task_queue_in_flight", "Mensagens em processamento no pool, por fila")
+metrics.describe("async_task_queue_concurrency", "Limite de mensagens simultâneas no pool, por fila")
+metrics.describe("async_task_upstream_in_flight", "Requisições HTTP em andamento por upstream")
+metrics.describe("async_task_log_records_dropped", "Registros de log descartados com a fila de logging cheia")
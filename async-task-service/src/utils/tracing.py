@@ -0,0 +1,157 @@
+"""
+Tracing distribuído com OpenTelemetry (opcional)
+
+Uma candidatura passa por applications-queue, parsing no AI service,
+ai-score-queue, avaliação no AI service e PATCH no companies-backend. O
+contexto W3C (`traceparent`) segue junto:
+- nas mensagens Redis, em `_meta.trace` (gravado pelo ScoreQueueService e
+  preservado nas retentativas);
+- nas requisições HTTP, nos headers (injetados pelo HTTPClientPool, usado pelo
+  BackendService).
+
+Sem o pacote opentelemetry-sdk instalado, ou com OTEL_TRACES_EXPORTER=none,
+todas as funções viram no-op. Exportadores: otlp (OTLP/HTTP, ver
+OTEL_EXPORTER_OTLP_ENDPOINT), file (um span JSON por linha em OTEL_TRACES_FILE)
+e console.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from config.settings import settings
+from utils.logger import logger
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import propagate, trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # pragma: no cover - dependência opcional
+    trace = None
+
+# Chave do contexto de trace dentro de `_meta` nas mensagens das filas
+TRACE_META_KEY = "trace"
+
+_provider = None
+_file_handle = None
+
+
+def setup_tracing(exporter: Optional[str] = None) -> bool:
+    """
+    Configura o TracerProvider do processo conforme OTEL_TRACES_EXPORTER
+
+    Returns:
+        True se o tracing ficou ativo
+    """
+    global _provider, _file_handle
+    exporter = (exporter or settings.tracing.exporter).lower()
+    if exporter in ("", "none") or _provider is not None:
+        return _provider is not None
+    if trace is None:
+        logger.warning(f"⚠️ OTEL_TRACES_EXPORTER={exporter}, mas o opentelemetry-sdk não está instalado; tracing desligado")
+        return False
+
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        span_exporter = OTLPSpanExporter()
+    elif exporter == "file":
+        os.makedirs(os.path.dirname(os.path.abspath(settings.tracing.file_path)), exist_ok=True)
+        _file_handle = open(settings.tracing.file_path, "a", encoding="utf-8")
+        span_exporter = ConsoleSpanExporter(
+            out=_file_handle, formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    elif exporter == "console":
+        span_exporter = ConsoleSpanExporter()
+    else:
+        logger.warning(f"⚠️ Exportador de traces desconhecido: {exporter}; tracing desligado")
+        return False
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": settings.tracing.service_name}))
+    _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(_provider)
+    logger.info(f"🔭 Tracing habilitado - exporter: {exporter}")
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Exporta os spans pendentes e libera o exportador"""
+    global _provider, _file_handle
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+    if _file_handle is not None:
+        _file_handle.close()
+        _file_handle = None
+
+
+def tracing_enabled() -> bool:
+    return _provider is not None
+
+
+def inject_context(carrier: Dict[str, str]) -> Dict[str, str]:
+    """Grava o contexto do span atual (traceparent) no carrier (headers HTTP ou dict da mensagem)"""
+    if _provider is not None:
+        propagate.inject(carrier)
+    return carrier
+
+
+def inject_message_context(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Grava o contexto do span atual em `_meta.trace` de uma mensagem de fila"""
+    if _provider is not None:
+        carrier = inject_context({})
+        if carrier:
+            meta = dict(message.get("_meta") or {})
+            meta[TRACE_META_KEY] = carrier
+            message["_meta"] = meta
+    return message
+
+
+def extract_message_carrier(message: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """Contexto de trace gravado em `_meta.trace` (None se a mensagem não tiver)"""
+    meta = message.get("_meta") if isinstance(message, dict) else None
+    carrier = meta.get(TRACE_META_KEY) if isinstance(meta, dict) else None
+    return carrier if isinstance(carrier, dict) else None
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: Optional[Mapping[str, Any]] = None,
+    parent_carrier: Optional[Mapping[str, str]] = None,
+    kind: str = "internal",
+) -> Iterator[Any]:
+    """
+    Abre um span (filho do atual ou do contexto em `parent_carrier`)
+
+    Exceções são registradas no span e repropagadas. Sem tracing, devolve None.
+    """
+    if _provider is None:
+        yield None
+        return
+
+    token = None
+    if parent_carrier is not None:
+        token = otel_context.attach(propagate.extract(dict(parent_carrier)))
+    try:
+        tracer = trace.get_tracer("cognitive-ats.async-task-service")
+        span_kind = {
+            "consumer": SpanKind.CONSUMER, "producer": SpanKind.PRODUCER, "client": SpanKind.CLIENT,
+        }.get(kind, SpanKind.INTERNAL)
+        with tracer.start_as_current_span(
+            name, kind=span_kind, attributes=dict(attributes or {}), record_exception=True,
+            set_status_on_exception=True,
+        ) as span:
+            yield span
+    finally:
+        if token is not None:
+            otel_context.detach(token)
+
+
+def set_span_error(span: Any, message: str) -> None:
+    """Marca o span como erro sem exceção (ex: resposta HTTP 5xx)"""
+    if span is not None:
+        span.set_status(Status(StatusCode.ERROR, message))
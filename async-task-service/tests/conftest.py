@@ -0,0 +1,20 @@
+"""
+Fixtures compartilhadas: Redis em memória (fakeredis, com Lua) no lugar do servidor
+"""
+from typing import Callable
+
+import fakeredis
+import pytest
+from fakeredis import aioredis
+
+
+@pytest.fixture
+def redis_server() -> fakeredis.FakeServer:
+    """Um "servidor" por teste; clientes criados a partir dele compartilham os dados"""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def make_client(redis_server: fakeredis.FakeServer) -> Callable[[], aioredis.FakeRedis]:
+    """Cria clientes (dentro do event loop do teste), como o create_redis_client do consumer"""
+    return lambda: aioredis.FakeRedis(server=redis_server, decode_responses=True)
@@ -0,0 +1,111 @@
+"""
+Testes do dispatcher: limite por fila, backpressure e encerramento (drain)
+"""
+import asyncio
+from typing import Dict, List
+
+from dispatcher import Dispatcher
+
+QUEUE = "applications-queue"
+
+
+class BlockingHandler:
+    """Handler que só termina quando a mensagem é liberada pelo teste"""
+
+    def __init__(self) -> None:
+        self.started: List[str] = []
+        self.finished: List[str] = []
+        self._release: Dict[str, asyncio.Event] = {}
+
+    async def __call__(self, client, queue_name: str, value: str) -> None:
+        self.started.append(value)
+        await self._release.setdefault(value, asyncio.Event()).wait()
+        self.finished.append(value)
+
+    def release(self, value: str) -> None:
+        self._release.setdefault(value, asyncio.Event()).set()
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_queue_at_its_limit_stops_being_eligible_and_submit_waits(make_client):
+    async def run():
+        handler = BlockingHandler()
+        dispatcher = Dispatcher(make_client(), [QUEUE, "other-queue"], {QUEUE: 2}, handler)
+
+        await dispatcher.submit(QUEUE, "m1")
+        await dispatcher.submit(QUEUE, "m2")
+        await _settle()
+        assert dispatcher.available_slots(QUEUE) == 0
+        assert dispatcher.eligible_queues() == ["other-queue"]
+
+        # Corrida entre fetchers: o submit além do limite espera uma vaga
+        third = asyncio.create_task(dispatcher.submit(QUEUE, "m3"))
+        await _settle()
+        assert not third.done() and handler.started == ["m1", "m2"]
+
+        handler.release("m1")
+        await asyncio.wait_for(third, timeout=2)
+        await _settle()
+        assert handler.started == ["m1", "m2", "m3"]
+        assert dispatcher.get_stats()[QUEUE] == {"in_flight": 2, "concurrency": 2, "processed_total": 1}
+
+        handler.release("m2")
+        handler.release("m3")
+        await dispatcher.drain(timeout=2)
+
+    asyncio.run(run())
+
+
+def test_drain_waits_for_running_messages(make_client):
+    async def run():
+        handler = BlockingHandler()
+        dispatcher = Dispatcher(make_client(), [QUEUE], {QUEUE: 5}, handler)
+        await dispatcher.submit(QUEUE, "m1")
+        await _settle()
+
+        asyncio.get_running_loop().call_later(0.05, handler.release, "m1")
+        await dispatcher.drain(timeout=2)
+
+        assert handler.finished == ["m1"]
+        assert dispatcher.get_stats()[QUEUE]["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_drain_timeout_cancels_and_pushes_list_messages_back(make_client):
+    async def run():
+        client = make_client()
+        handler = BlockingHandler()
+        dispatcher = Dispatcher(client, [QUEUE], {QUEUE: 5}, handler)
+        await dispatcher.submit(QUEUE, "m1")
+        await dispatcher.submit(QUEUE, "m2")
+        await _settle()
+
+        await dispatcher.drain(timeout=0.05)
+
+        assert handler.finished == []
+        # Voltam para o início da fila (o BLPOP lê pela esquerda)
+        assert sorted(await client.lrange(QUEUE, 0, -1)) == ["m1", "m2"]
+        assert dispatcher.get_stats()[QUEUE]["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_stream_message_is_left_pending_instead_of_pushed(make_client):
+    async def run():
+        client = make_client()
+        handler = BlockingHandler()
+        dispatcher = Dispatcher(client, [QUEUE], {QUEUE: 5}, handler)
+        await dispatcher.submit(QUEUE, "m1", message_id="1-0")
+        await _settle()
+
+        await dispatcher.drain(timeout=0.05)
+
+        # Sem LPUSH: a entrada continua na PEL e será reivindicada via XAUTOCLAIM
+        assert await client.llen(QUEUE) == 0
+
+    asyncio.run(run())
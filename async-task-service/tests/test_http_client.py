@@ -0,0 +1,40 @@
+"""
+Testes das métricas do pool HTTP, contadas pelo próprio HTTPClientPool
+"""
+import asyncio
+
+import httpx
+
+from services.http_client import BACKEND, HTTPClientPool
+
+
+def test_pool_metrics_count_in_flight_and_queued_requests():
+    async def run():
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await release.wait()
+            return httpx.Response(200)
+
+        pool = HTTPClientPool()
+        pool._http2 = False
+        await pool.get_client(BACKEND).aclose()
+        pool._clients[BACKEND] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        requests = [
+            asyncio.create_task(pool.request(BACKEND, "GET", f"http://backend/items/{i}")) for i in range(22)
+        ]
+        await asyncio.sleep(0.01)
+
+        stats = pool.get_pool_metrics()[BACKEND]
+        assert stats['in_flight'] == 22
+        # max_connections do backend é 20
+        assert stats['pending_requests'] == 2
+
+        release.set()
+        await asyncio.gather(*requests)
+        stats = pool.get_pool_metrics()[BACKEND]
+        assert stats['in_flight'] == stats['pending_requests'] == 0
+        assert stats['requests_total'] == 22
+        await pool.aclose()
+
+    asyncio.run(run())
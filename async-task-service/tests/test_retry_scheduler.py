@@ -0,0 +1,98 @@
+"""
+Testes do retry scheduler: promoção atômica (Lua) dos itens vencidos e lock de líder
+"""
+import asyncio
+import time
+
+from retry_scheduler import LEADER_LOCK_KEY, RetryScheduler, compute_retry_delay, get_retry_key
+from streams import STREAM_DATA_FIELD
+
+LIST_QUEUE = "applications-queue"
+STREAM_QUEUE = "ai-score-queue"
+
+
+def test_promote_moves_only_due_items_in_batches(make_client):
+    async def run():
+        client = make_client()
+        now = time.time()
+        await client.zadd(get_retry_key(LIST_QUEUE), {f"due-{i}": now - 10 + i for i in range(5)})
+        await client.zadd(get_retry_key(LIST_QUEUE), {"later": now + 60})
+        scheduler = RetryScheduler(client, [LIST_QUEUE], batch_size=2)
+
+        moved = await scheduler.promote_due(LIST_QUEUE)
+
+        assert moved == 5
+        assert sorted(await client.lrange(LIST_QUEUE, 0, -1)) == [f"due-{i}" for i in range(5)]
+        assert await client.zrange(get_retry_key(LIST_QUEUE), 0, -1) == ["later"]
+        metrics = await scheduler.get_metrics()
+        assert metrics["queues"][LIST_QUEUE]["promoted_total"] == 5
+        assert metrics["queues"][LIST_QUEUE]["retry_depth"] == 1
+        assert metrics["queues"][LIST_QUEUE]["max_promotion_lag_seconds"] >= 9
+
+    asyncio.run(run())
+
+
+def test_promote_publishes_stream_queue_items_with_xadd(make_client):
+    async def run():
+        client = make_client()
+        await client.zadd(get_retry_key(STREAM_QUEUE), {'{"id": 1}': time.time() - 1})
+        scheduler = RetryScheduler(client, [STREAM_QUEUE], stream_queues=[STREAM_QUEUE])
+
+        assert await scheduler.promote_due(STREAM_QUEUE) == 1
+
+        entries = await client.xrange(STREAM_QUEUE)
+        assert [fields for _, fields in entries] == [{STREAM_DATA_FIELD: '{"id": 1}'}]
+        assert await client.zcard(get_retry_key(STREAM_QUEUE)) == 0
+
+    asyncio.run(run())
+
+
+def test_concurrent_promoters_never_duplicate_an_item(make_client):
+    async def run():
+        now = time.time()
+        client = make_client()
+        await client.zadd(get_retry_key(LIST_QUEUE), {f"due-{i}": now - 1 for i in range(50)})
+        schedulers = [RetryScheduler(make_client(), [LIST_QUEUE], batch_size=7) for _ in range(3)]
+
+        moved = await asyncio.gather(*(scheduler.promote_due(LIST_QUEUE) for scheduler in schedulers))
+
+        assert sum(moved) == 50
+        assert sorted(await client.lrange(LIST_QUEUE, 0, -1)) == sorted(f"due-{i}" for i in range(50))
+
+    asyncio.run(run())
+
+
+def test_only_the_leader_promotes_and_the_lock_passes_on_shutdown(make_client):
+    async def run():
+        client = make_client()
+        await client.zadd(get_retry_key(LIST_QUEUE), {"due": time.time() - 1})
+        leader = RetryScheduler(make_client(), [LIST_QUEUE], interval_seconds=0.01, leader_election=True)
+        follower = RetryScheduler(make_client(), [LIST_QUEUE], interval_seconds=0.01, leader_election=True)
+
+        leader_task = asyncio.create_task(leader.run())
+        while leader.last_run_at is None:
+            await asyncio.sleep(0.01)
+        follower_task = asyncio.create_task(follower.run())
+        await asyncio.sleep(0.05)
+
+        assert leader.is_leader and not follower.is_leader
+        assert leader.promoted_total[LIST_QUEUE] == 1 and follower.promoted_total[LIST_QUEUE] == 0
+        assert follower.last_run_at is None
+
+        # Ao encerrar, o líder libera o lock e a outra réplica assume
+        leader.stop()
+        await leader_task
+        while not follower.is_leader:
+            await asyncio.sleep(0.01)
+        assert await client.get(LEADER_LOCK_KEY) is not None
+        follower.stop()
+        await follower_task
+
+    asyncio.run(run())
+
+
+def test_retry_delay_is_capped_and_jittered():
+    delays = [compute_retry_delay(10, base_delay=2, max_delay=300) for _ in range(50)]
+
+    assert all(150 <= delay <= 300 for delay in delays)
+    assert len(set(delays)) > 1
@@ -0,0 +1,117 @@
+"""
+Testes do modo stream: XREADGROUP, XACK, XAUTOCLAIM e o trim que só remove entradas confirmadas
+"""
+import asyncio
+
+from dispatcher import Dispatcher
+from streams import StreamQueueReader, publish_to_stream
+
+QUEUE = "ai-score-queue"
+
+
+def _reader(client, consumer_name: str = "consumer-1", claim_idle_ms: int = 300000) -> StreamQueueReader:
+    return StreamQueueReader(
+        client, [QUEUE], group_name="applications-group", consumer_name=consumer_name,
+        block_ms=10, count=10, claim_idle_ms=claim_idle_ms,
+    )
+
+
+def test_read_delivers_new_entries_once_and_ack_clears_them(make_client):
+    async def run():
+        client = make_client()
+        reader = _reader(client)
+        await reader.ensure_groups()
+        await reader.ensure_groups()  # BUSYGROUP é ignorado
+        for value in ("m1", "m2", "m3"):
+            await publish_to_stream(client, QUEUE, value)
+
+        first = await reader.read([QUEUE], count=2)
+        second = await reader.read([QUEUE], count=10)
+
+        assert [value for _, _, value in first] == ["m1", "m2"]
+        assert [value for _, _, value in second] == ["m3"]
+        await reader.ack(QUEUE, first[0][1])
+        assert (await client.xpending(QUEUE, "applications-group"))["pending"] == 2
+
+    asyncio.run(run())
+
+
+def test_dispatcher_acks_stream_entry_after_the_handler(make_client):
+    async def run():
+        client = make_client()
+        reader = _reader(client)
+        await reader.ensure_groups()
+        await publish_to_stream(client, QUEUE, "m1")
+        processed = []
+
+        async def handler(_client, queue_name, value):
+            processed.append(value)
+
+        dispatcher = Dispatcher(client, [QUEUE], {QUEUE: 5}, handler, stream_reader=reader)
+        for queue_name, message_id, value in await reader.read([QUEUE], count=10):
+            await dispatcher.submit(queue_name, value, message_id)
+        await dispatcher.drain(timeout=2)
+
+        assert processed == ["m1"]
+        assert (await client.xpending(QUEUE, "applications-group"))["pending"] == 0
+
+    asyncio.run(run())
+
+
+def test_entries_abandoned_by_a_consumer_are_claimed_by_another(make_client):
+    async def run():
+        client = make_client()
+        crashed = _reader(client, consumer_name="consumer-1")
+        await crashed.ensure_groups()
+        await publish_to_stream(client, QUEUE, "m1")
+        await publish_to_stream(client, QUEUE, "m2")
+        await crashed.read([QUEUE], count=10)  # lidas e nunca confirmadas
+
+        survivor = _reader(client, consumer_name="consumer-2", claim_idle_ms=0)
+        claimed = await survivor.claim_stale(QUEUE, count=10)
+
+        assert [value for _, _, value in claimed] == ["m1", "m2"]
+        summary = await client.xpending(QUEUE, "applications-group")
+        assert summary["consumers"] == [{"name": "consumer-2", "pending": 2}]
+
+    asyncio.run(run())
+
+
+def test_trim_never_removes_pending_or_undelivered_entries(make_client):
+    async def run():
+        client = make_client()
+        reader = _reader(client)
+        await reader.ensure_groups()
+        ids = [await publish_to_stream(client, QUEUE, f"m{i}") for i in range(6)]
+        delivered = await reader.read([QUEUE], count=3)
+        await reader.ack(QUEUE, delivered[0][1])
+        await reader.ack(QUEUE, delivered[1][1])
+        # ids[2] segue pendente; ids[3:] ainda não foram entregues
+
+        assert await reader.processed_before(QUEUE) == ids[2]
+        await reader.trim()
+
+        remaining = [entry_id for entry_id, _ in await client.xrange(QUEUE)]
+        assert set(ids[2:]) <= set(remaining)
+
+    asyncio.run(run())
+
+
+def test_trim_waits_for_every_consumer_group(make_client):
+    async def run():
+        client = make_client()
+        reader = _reader(client)
+        await reader.ensure_groups()
+        # Outro serviço lê o mesmo stream com um group próprio e ainda não leu nada
+        await client.xgroup_create(QUEUE, "audit-group", id="0")
+        for value in ("m1", "m2"):
+            await publish_to_stream(client, QUEUE, value)
+        for _, message_id, _ in await reader.read([QUEUE], count=10):
+            await reader.ack(QUEUE, message_id)
+
+        assert await reader.processed_before(QUEUE) == "0-0"
+        await reader.trim()
+
+        assert await client.xlen(QUEUE) == 2
+
+    asyncio.run(run())